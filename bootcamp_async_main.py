@@ -0,0 +1,317 @@
+"""
+Bootcamp F2025
+
+Alternative main running the whole pipeline as coroutines on one event loop, in a single process.
+The MAVLink socket is read without blocking and data passes through asyncio queues.
+To run:
+```
+python -m bootcamp_async_main
+```
+"""
+
+import asyncio
+import time
+
+from pymavlink import mavutil
+
+import bootcamp_main
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.command import command
+from modules.heartbeat import heartbeat_receiver
+from modules.heartbeat import heartbeat_sender
+from modules.mavlink_io import async_reader
+from modules.telemetry import telemetry
+from utilities.workers import restart_policy
+
+
+HEARTBEAT_PERIOD = 1.0  # seconds
+# Received MAVLink messages waiting for their task, the oldest are dropped when full
+MESSAGE_QUEUE_MAX_SIZE = 16
+# Command only acts on the freshest telemetry
+TELEMETRY_QUEUE_MAX_SIZE = 1
+
+
+async def supervise(
+    name: str,
+    run_task: "() -> object",  # type: ignore
+    worker_restart_policy: restart_policy.RestartPolicy,
+    local_logger: logger.Logger,
+) -> None:
+    """
+    Runs the task again whenever it crashes or returns, with the backoff of the restart policy.
+    Returns when the task crash loops.
+
+    name: Name of the task in logs.
+    run_task: Creates the coroutine of the task.
+    """
+    crash_loop_detector = worker_restart_policy.create_crash_loop_detector()
+    consecutive_crashes = 0
+    while True:
+        start_time = time.monotonic()
+        try:
+            await run_task()
+            local_logger.warning(f"{name} returned", True)
+        # Crashes are restarted like crashed worker processes
+        # pylint: disable-next=broad-exception-caught
+        except Exception as e:
+            local_logger.error(f"{name} crashed: {e}", True)
+
+        crash_time = time.monotonic()
+        if worker_restart_policy.is_healthy_uptime(crash_time - start_time):
+            consecutive_crashes = 0
+
+        consecutive_crashes += 1
+        if crash_loop_detector.record_crash(crash_time):
+            local_logger.error(
+                f"{name} crashed {crash_loop_detector.get_crash_count()} times, parked", True
+            )
+            return
+
+        await asyncio.sleep(worker_restart_policy.get_restart_delay(consecutive_crashes))
+
+
+async def heartbeat_sender_task(connection: mavutil.mavfile) -> None:
+    """
+    Sends a heartbeat every period.
+    """
+    result, sender = heartbeat_sender.HeartbeatSender.create(connection)
+    if not result:
+        raise RuntimeError("Failed to create HeartbeatSender")
+
+    while True:
+        sender.run()
+        await asyncio.sleep(HEARTBEAT_PERIOD)
+
+
+async def heartbeat_receiver_task(
+    connection: mavutil.mavfile,
+    heartbeat_messages: asyncio.Queue,
+    status_queue: asyncio.Queue,
+    local_logger: logger.Logger,
+) -> None:
+    """
+    Reports the connection status after each period, with or without a heartbeat.
+    """
+    result, receiver = heartbeat_receiver.HeartbeatReceiver.create(connection, local_logger)
+    if not result:
+        raise RuntimeError("Failed to create HeartbeatReceiver")
+
+    while True:
+        try:
+            msg = await asyncio.wait_for(heartbeat_messages.get(), HEARTBEAT_PERIOD)
+        except TimeoutError:
+            msg = None
+
+        await status_queue.put(receiver.update(msg))
+
+
+async def telemetry_task(
+    connection: mavutil.mavfile,
+    telemetry_messages: asyncio.Queue,
+    telemetry_queue: asyncio.Queue,
+    local_logger: logger.Logger,
+) -> None:
+    """
+    Combines position and attitude into telemetry, replacing telemetry command has not taken.
+    """
+    result, telem = telemetry.Telemetry.create(connection, local_logger)
+    if not result:
+        raise RuntimeError("Failed to create Telemetry")
+
+    while True:
+        # Both messages must arrive within the timeout, as in Telemetry.run()
+        telem.reset()
+        deadline = time.monotonic() + telem.timeout
+        telemetry_data = None
+        while telemetry_data is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.0:
+                break
+
+            try:
+                msg = await asyncio.wait_for(telemetry_messages.get(), remaining)
+            except TimeoutError:
+                break
+
+            _, telemetry_data = telem.update(msg)
+
+        if telemetry_data is None:
+            local_logger.warning("Telemetry timeout, restarting", True)
+            continue
+
+        if telemetry_queue.full():
+            telemetry_queue.get_nowait()
+
+        telemetry_queue.put_nowait(telemetry_data)
+
+
+async def command_task(
+    connection: mavutil.mavfile,
+    telemetry_queue: asyncio.Queue,
+    report_queue: asyncio.Queue,
+    local_logger: logger.Logger,
+) -> None:
+    """
+    Decides on each telemetry sample and reports the commands sent.
+    """
+    result, cmd = command.Command.create(connection, bootcamp_main.TARGET_POSITION, local_logger)
+    if not result:
+        raise RuntimeError("Failed to create Command")
+
+    while True:
+        telemetry_data = await telemetry_queue.get()
+        result, action = cmd.run(telemetry_data)
+        if result:
+            await report_queue.put(action)
+
+
+async def run_pipeline(connection: mavutil.mavfile, main_logger: logger.Logger) -> int:
+    """
+    Runs all tasks until the drone disconnects, a task crash loops, or the duration passes.
+
+    Returns 0 on success, negative on failure.
+    """
+    result, reader = async_reader.AsyncMavlinkReader.create(connection)
+    if not result:
+        main_logger.error("Connection cannot be read asynchronously")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert reader is not None
+
+    result, worker_restart_policy = restart_policy.RestartPolicy.create(
+        initial_delay=bootcamp_main.WORKER_RESTART_INITIAL_DELAY,
+        max_delay=bootcamp_main.WORKER_RESTART_MAX_DELAY,
+        healthy_uptime=bootcamp_main.WORKER_HEALTHY_UPTIME,
+        crash_loop_window=bootcamp_main.WORKER_CRASH_LOOP_WINDOW,
+        crash_loop_limit=bootcamp_main.WORKER_CRASH_LOOP_LIMIT,
+    )
+    if not result:
+        main_logger.error("Failed to create restart policy")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert worker_restart_policy is not None
+
+    task_loggers = {}
+    for name in ["heartbeat_receiver_task", "telemetry_task", "command_task"]:
+        result, task_logger = logger.Logger.create(name, True)
+        if not result:
+            main_logger.error(f"Failed to create {name} logger")
+            return -1
+
+        task_loggers[name] = task_logger
+
+    heartbeat_messages = reader.subscribe(["HEARTBEAT"], MESSAGE_QUEUE_MAX_SIZE)
+    telemetry_messages = reader.subscribe(
+        ["LOCAL_POSITION_NED", "ATTITUDE"], MESSAGE_QUEUE_MAX_SIZE
+    )
+    status_queue = asyncio.Queue(bootcamp_main.HEARTBEAT_QUEUE_MAX_SIZE)
+    telemetry_queue = asyncio.Queue(TELEMETRY_QUEUE_MAX_SIZE)
+    report_queue = asyncio.Queue(bootcamp_main.REPORT_QUEUE_MAX_SIZE)
+
+    task_coroutines = {
+        "heartbeat_sender_task": lambda: heartbeat_sender_task(connection),
+        "heartbeat_receiver_task": lambda: heartbeat_receiver_task(
+            connection,
+            heartbeat_messages,
+            status_queue,
+            task_loggers["heartbeat_receiver_task"],
+        ),
+        "telemetry_task": lambda: telemetry_task(
+            connection, telemetry_messages, telemetry_queue, task_loggers["telemetry_task"]
+        ),
+        "command_task": lambda: command_task(
+            connection, telemetry_queue, report_queue, task_loggers["command_task"]
+        ),
+    }
+
+    reader.start()
+    supervisors = [
+        asyncio.create_task(supervise(name, run_task, worker_restart_policy, main_logger))
+        for name, run_task in task_coroutines.items()
+    ]
+
+    main_logger.info("Started")
+
+    # Main's work: read the statuses and reports, and log any commands that we make
+    status_get = asyncio.create_task(status_queue.get())
+    report_get = asyncio.create_task(report_queue.get())
+    start_time = time.monotonic()
+    while True:
+        remaining = bootcamp_main.MAIN_LOOP_DURATION - (time.monotonic() - start_time)
+        if remaining <= 0.0:
+            break
+
+        done, _ = await asyncio.wait(
+            [status_get, report_get] + supervisors,
+            timeout=remaining,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+
+        # Supervisors only return on a crash loop, this could degrade instead of aborting
+        if any(supervisor in done for supervisor in supervisors):
+            main_logger.error("Task crash looping, exiting")
+            break
+
+        if report_get in done:
+            main_logger.info(f"Command report: {report_get.result()}")
+            report_get = asyncio.create_task(report_queue.get())
+
+        if status_get in done:
+            heartbeat_status = status_get.result()
+            main_logger.info(f"Heartbeat status: {heartbeat_status}")
+            if heartbeat_status == "Disconnected":
+                main_logger.warning("Drone disconnected, exiting")
+                break
+
+            status_get = asyncio.create_task(status_queue.get())
+
+    # Stop the tasks, cancelling wakes them from any wait
+    reader.stop()
+    for task in supervisors + [status_get, report_get]:
+        task.cancel()
+
+    await asyncio.gather(*supervisors, status_get, report_get, return_exceptions=True)
+
+    main_logger.info("Stopped")
+
+    return 0
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    connection = mavutil.mavlink_connection(bootcamp_main.CONNECTION_STRING)
+    connection.wait_heartbeat(timeout=30)  # Wait for the "drone" to connect
+
+    return asyncio.run(run_pipeline(connection, main_logger))
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
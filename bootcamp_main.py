@@ -4,9 +4,9 @@ Bootcamp F2025
 Main process to setup and manage all the other working processes
 """
 
-# pylint: disable=no-value-for-parameter,unexpected-keyword-arg
-
 import multiprocessing as mp
+import os
+import pathlib
 import queue
 import time
 
@@ -16,13 +16,15 @@ from modules.common.modules.logger import logger
 from modules.common.modules.logger import logger_main_setup
 from modules.common.modules.read_yaml import read_yaml
 from modules.command import command
-from modules.command import command_worker
-from modules.heartbeat import heartbeat_receiver_worker
-from modules.heartbeat import heartbeat_sender_worker
-from modules.telemetry import telemetry_worker
-from utilities.workers import queue_proxy_wrapper
+from modules.mavlink_io import outbound_writer
+from modules.mavlink_io import router
+from utilities.workers import batch_queue
+from utilities.workers import pipeline
+from utilities.workers import pipeline_topology
+from utilities.workers import queue_selector
+from utilities.workers import restart_policy
 from utilities.workers import worker_controller
-from utilities.workers import worker_manager
+from utilities.workers import worker_resources
 
 
 # MAVLink connection
@@ -41,11 +43,151 @@ HEARTBEAT_SENDER_WORKER_COUNT = 1
 HEARTBEAT_RECEIVER_WORKER_COUNT = 1
 TELEMETRY_WORKER_COUNT = 1
 COMMAND_WORKER_COUNT = 1
+# Command workers grow up to this under input queue backlog, and shrink back when idle
+COMMAND_WORKER_MAX_COUNT = 3
 
 # Any other constants
+# The router worker owns the MAVLink connection, which cannot be pickled, so only fork can start it
+# forkserver starts workers from a server with the preloaded modules already imported
+WORKER_START_METHOD = "fork"
+FORKSERVER_PRELOAD_MODULES = [
+    "pymavlink.mavutil",
+    "modules.command.command_worker",
+    "modules.heartbeat.heartbeat_receiver_worker",
+    "modules.heartbeat.heartbeat_sender_worker",
+    "modules.mavlink_io.router_worker",
+    "modules.telemetry.telemetry_worker",
+]
+# Started workers kept waiting per group, so restarts do not wait for process startup
+WORKER_WARM_SPARE_COUNT = 1
+# Spares of the critical groups also have their logger and module object set up,
+# so taking over from a dead worker is only a wake up
+CRITICAL_WORKER_HOT_STANDBY = True
+# Maximum items main takes from a queue per round trip
+QUEUE_DRAIN_BATCH_SIZE = 100
+# Longest main waits for queue data before checking its timers
+MAIN_WAIT_TIMEOUT = 1.0  # seconds
+# Queue statistics are logged every period while instrumented
+QUEUE_INSTRUMENTATION = True
+QUEUE_STATISTICS_PERIOD = 10  # seconds
+# Workers get this long to exit on their own, longer than their longest blocking call
+# Then they are terminated, and killed if still running after the grace period
+SHUTDOWN_DEADLINE = 2.0  # seconds
+SHUTDOWN_TERMINATE_GRACE = 0.5  # seconds
+# Worker CPU, memory, context switches, and fds are logged every period and written out at exit
+# into the log directory of the run
+WORKER_RESOURCES_PERIOD = 10  # seconds
+WORKER_RESOURCES_FILE_NAME = "worker_resources.csv"
+# Crashed workers restart immediately, then with exponential backoff
+WORKER_RESTART_INITIAL_DELAY = 0.1  # seconds
+WORKER_RESTART_MAX_DELAY = 10.0  # seconds
+# Running this long counts as healthy and resets the backoff
+WORKER_HEALTHY_UPTIME = 10.0  # seconds
+# This many crashes of a group within the window parks it
+WORKER_CRASH_LOOP_WINDOW = 30.0  # seconds
+WORKER_CRASH_LOOP_LIMIT = 5
+# Workers whose loop reports no progress for this long are killed and restarted
+# Longer than the longest blocking call in a worker loop, which is about 1 second
+WORKER_STALL_DEADLINE = 5.0  # seconds
+# Queued items per worker above which a group grows
+WORKER_SCALE_UP_DEPTH = 4.0
+# Fraction of time consumers wait at or above which a group shrinks
+WORKER_SCALE_DOWN_IDLE = 0.8
+WORKER_SCALING_PERIOD = 1.0  # seconds
+WORKER_SCALING_COOLDOWN = 5.0  # seconds
+# Message types each receiving stage subscribes to, the router parses every message once
+HEARTBEAT_MESSAGE_TYPES = ["HEARTBEAT"]
+TELEMETRY_MESSAGE_TYPES = ["LOCAL_POSITION_NED", "ATTITUDE"]
+# Frames waiting for a congested link per priority, the oldest are dropped beyond this
+# Heartbeats go out first, then commands, so commands wait for at most a few heartbeats
+MAVLINK_OUTBOUND_QUEUE_MAX_SIZE = 16
+# The router carries every frame, so it runs on a core of its own
+# Heartbeat and command workers share the next core, so telemetry bursts and logging
+# cannot delay them, the other workers use the remaining cores
+# With fewer cores nothing is pinned, since sharing a core would make the critical workers
+# wait on each other, and only the higher priority separates them
+# Raising the priority needs CAP_SYS_NICE, without it workers keep the priority of main
+AVAILABLE_CPUS = sorted(os.sched_getaffinity(0))
+IS_WORKER_PINNED = len(AVAILABLE_CPUS) >= 3
+ROUTER_WORKER_CPU_SET = AVAILABLE_CPUS[-1:] if IS_WORKER_PINNED else None
+CRITICAL_WORKER_CPU_SET = AVAILABLE_CPUS[-2:-1] if IS_WORKER_PINNED else None
+OTHER_WORKER_CPU_SET = AVAILABLE_CPUS[:-2] if IS_WORKER_PINNED else None
+CRITICAL_WORKER_NICE = -5
 TARGET_POSITION = command.Position(10, 20, 30)
 MAIN_LOOP_DURATION = 100  # seconds
 
+# Default pipeline, the pipeline section of the configuration file overrides any part of it
+# The high rate edges use shared memory to skip the manager round trip
+# Command only acts on the freshest telemetry, so telemetry overwrites instead of queueing
+# Queues are instrumented to find the bottleneck when tuning sizes and worker counts
+# Only the command stage consumes a queue, the others receive from the router
+# The latest value telemetry queue holds at most 1 item, so command grows only if it is FIFO
+DEFAULT_PIPELINE_CONFIG = {
+    "queues": {
+        "heartbeat_queue": {
+            "max_size": HEARTBEAT_QUEUE_MAX_SIZE,
+            "backend": "manager",
+            "instrumented": QUEUE_INSTRUMENTATION,
+        },
+        "telemetry_queue": {
+            "max_size": TELEMETRY_QUEUE_MAX_SIZE,
+            "backend": "latest_value",
+            "instrumented": QUEUE_INSTRUMENTATION,
+        },
+        "report_queue": {
+            "max_size": REPORT_QUEUE_MAX_SIZE,
+            "backend": "shared_memory",
+            "instrumented": QUEUE_INSTRUMENTATION,
+        },
+    },
+    "stages": {
+        "mavlink_router": {
+            "target": "modules.mavlink_io.router_worker.router_worker",
+            "count": 1,
+            "cpu_set": ROUTER_WORKER_CPU_SET,
+            "nice": CRITICAL_WORKER_NICE,
+        },
+        "heartbeat_sender": {
+            "target": "modules.heartbeat.heartbeat_sender_worker.heartbeat_sender_worker",
+            "count": HEARTBEAT_SENDER_WORKER_COUNT,
+            "cpu_set": CRITICAL_WORKER_CPU_SET,
+            "nice": CRITICAL_WORKER_NICE,
+        },
+        "heartbeat_receiver": {
+            "target": "modules.heartbeat.heartbeat_receiver_worker.heartbeat_receiver_worker",
+            "count": HEARTBEAT_RECEIVER_WORKER_COUNT,
+            "cpu_set": CRITICAL_WORKER_CPU_SET,
+            "nice": CRITICAL_WORKER_NICE,
+            "hot_standby": CRITICAL_WORKER_HOT_STANDBY,
+            "output_queues": ["heartbeat_queue"],
+        },
+        "telemetry": {
+            "target": "modules.telemetry.telemetry_worker.telemetry_worker",
+            "count": TELEMETRY_WORKER_COUNT,
+            "cpu_set": OTHER_WORKER_CPU_SET,
+            "hot_standby": CRITICAL_WORKER_HOT_STANDBY,
+            "output_queues": ["telemetry_queue"],
+        },
+        "command": {
+            "target": "modules.command.command_worker.command_worker",
+            "count": COMMAND_WORKER_COUNT,
+            "cpu_set": CRITICAL_WORKER_CPU_SET,
+            "nice": CRITICAL_WORKER_NICE,
+            "input_queues": ["telemetry_queue"],
+            "output_queues": ["report_queue"],
+            "scaling": {
+                "max_count": COMMAND_WORKER_MAX_COUNT,
+                "scale_up_depth": WORKER_SCALE_UP_DEPTH,
+                "scale_down_idle": WORKER_SCALE_DOWN_IDLE,
+                "cooldown": WORKER_SCALING_COOLDOWN,
+                "sample_period": WORKER_SCALING_PERIOD,
+            },
+        },
+    },
+}
+# Queues main consumes, in the order main_selector returns them
+MAIN_QUEUE_NAMES = ["heartbeat_queue", "report_queue"]
+
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
 # =================================================================================================
@@ -65,13 +207,14 @@ def main() -> int:
     assert config is not None
 
     # Setup main logger
-    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    result, main_logger, logging_path = logger_main_setup.setup_main_logger(config)
     if not result:
         print("ERROR: Failed to create main logger")
         return -1
 
     # Get Pylance to stop complaining
     assert main_logger is not None
+    assert logging_path is not None
 
     # Create a connection to the drone. Assume that this is safe to pass around to all processes
     # In reality, this will not work, but to simplify the bootamp, preetend it is allowed
@@ -84,158 +227,200 @@ def main() -> int:
     # =============================================================================================
     #                          ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
     # =============================================================================================
+    # Only the router worker uses the connection, every other worker gets a routed connection
+    result, mavlink_router = router.MavlinkRouter.create(
+        connection, MAVLINK_OUTBOUND_QUEUE_MAX_SIZE
+    )
+    if not result:
+        main_logger.error("Failed to create MAVLink router")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert mavlink_router is not None
+
     # Create a worker controller
     controller = worker_controller.WorkerController()
 
-    # Create a multiprocess manager for synchronized queues
-    mp_manager = mp.Manager()
-
-    # Create queues
-    heartbeat_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, HEARTBEAT_QUEUE_MAX_SIZE)
-    telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, TELEMETRY_QUEUE_MAX_SIZE)
-    report_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, REPORT_QUEUE_MAX_SIZE)
-
-    # Create worker properties for each worker type (what inputs it takes, how many workers)
-    # Heartbeat sender
-    result, heartbeat_sender_properties = worker_manager.WorkerProperties.create(
-        num_workers=HEARTBEAT_SENDER_WORKER_COUNT,
-        worker_function=heartbeat_sender_worker.heartbeat_sender_worker,
-        worker_kwargs={
-            "connection": connection,
-            "controller": controller,
-        },
-        local_logger=main_logger,
+    # Create a multiprocess manager for synchronized queues, with batches in one round trip
+    mp_manager = batch_queue.start_manager()
+
+    # Deployments override any part of the default pipeline in the configuration file
+    result, topology, reason = pipeline_topology.PipelineTopology.create(
+        pipeline_topology.merge_config(DEFAULT_PIPELINE_CONFIG, config.get("pipeline", {}))
     )
     if not result:
-        main_logger.error("Failed to create heartbeat sender properties")
+        main_logger.error(f"Invalid pipeline configuration: {reason}")
         return -1
-    # Heartbeat receiver
-    result, heartbeat_receiver_properties = worker_manager.WorkerProperties.create(
-        num_workers=HEARTBEAT_RECEIVER_WORKER_COUNT,
-        worker_function=heartbeat_receiver_worker.heartbeat_receiver_worker,
-        worker_kwargs={
-            "connection": connection,
-            "heartbeat_queue": heartbeat_queue,
-            "controller": controller,
-        },
-        output_queues=[heartbeat_queue],
-        controller=controller,
-        local_logger=main_logger,
-    )
-    if not result:
-        main_logger.error("Failed to create heartbeat receiver properties")
+
+    # Get Pylance to stop complaining
+    assert topology is not None
+
+    # Main handles heartbeat statuses and command reports differently
+    if topology.get_main_queue_names() != MAIN_QUEUE_NAMES:
+        main_logger.error(f"Main must consume exactly {MAIN_QUEUE_NAMES}")
         return -1
 
-    # Telemetry
-    result, telemetry_properties = worker_manager.WorkerProperties.create(
-        num_workers=TELEMETRY_WORKER_COUNT,
-        worker_function=telemetry_worker.telemetry_worker,
-        worker_kwargs={
-            "connection": connection,
-            "telemetry_queue": telemetry_queue,
-            "controller": controller,
-        },
-        input_queues=[],
-        output_queues=[telemetry_queue],
-        controller=controller,
-        local_logger=main_logger,
+    # Shared by all groups, every group is needed so any crash loop aborts main
+    result, worker_restart_policy = restart_policy.RestartPolicy.create(
+        initial_delay=WORKER_RESTART_INITIAL_DELAY,
+        max_delay=WORKER_RESTART_MAX_DELAY,
+        healthy_uptime=WORKER_HEALTHY_UPTIME,
+        crash_loop_window=WORKER_CRASH_LOOP_WINDOW,
+        crash_loop_limit=WORKER_CRASH_LOOP_LIMIT,
     )
     if not result:
-        main_logger.error("Failed to create telemetry properties")
+        main_logger.error("Failed to create restart policy")
         return -1
 
-    # Command
-    result, command_properties = worker_manager.WorkerProperties.create(
-        num_workers=COMMAND_WORKER_COUNT,
-        worker_function=command_worker.command_worker,
-        worker_kwargs={
-            "connection": connection,
-            "target": TARGET_POSITION,
-            "telemetry_queue": telemetry_queue,
-            "report_queue": report_queue,
-            "controller": controller,
+    # Supervisor threads report parked groups here
+    crash_loop_reports: "queue.SimpleQueue[tuple[str, int]]" = queue.SimpleQueue()
+
+    def on_crash_loop(target_name: str, crash_count: int) -> None:
+        """
+        Forwards a parked group to the main loop.
+        """
+        crash_loop_reports.put((target_name, crash_count))
+
+    # Main waits on all of its input queues at once
+    main_selector = queue_selector.QueueSelector()
+    # Command workers wait on telemetry and on exit and pause requests at once
+    command_selector = queue_selector.QueueSelector()
+    command_selector.register_controller(controller)
+
+    # Create the queues and workers (processes) of every stage
+    # Workers start now and wait, start() releases them
+    result, bootcamp_pipeline = pipeline.Pipeline.create(
+        topology,
+        {
+            "mavlink_router": (mavlink_router,),
+            "heartbeat_sender": (
+                mavlink_router.create_connection(priority=outbound_writer.HEARTBEAT_PRIORITY),
+            ),
+            "heartbeat_receiver": (mavlink_router.create_connection(HEARTBEAT_MESSAGE_TYPES),),
+            "telemetry": (mavlink_router.create_connection(TELEMETRY_MESSAGE_TYPES),),
+            "command": (
+                mavlink_router.create_connection(priority=outbound_writer.COMMAND_PRIORITY),
+                TARGET_POSITION,
+                command_selector,
+            ),
         },
-        input_queues=[telemetry_queue],
-        output_queues=[report_queue],
-        controller=controller,
-        local_logger=main_logger,
+        controller,
+        main_logger,
+        mp_manager=mp_manager,
+        main_selector=main_selector,
+        stage_selectors={"command": command_selector},
+        worker_restart_policy=worker_restart_policy,
+        on_crash_loop=on_crash_loop,
+        warm_spare_count=WORKER_WARM_SPARE_COUNT,
+        stall_deadline=WORKER_STALL_DEADLINE,
     )
     if not result:
-        main_logger.error("Failed to create command properties")
+        main_logger.error("Failed to create pipeline")
         return -1
 
-    # Create the workers (processes) and obtain their managers
-    result, heartbeat_sender_manager = worker_manager.WorkerManager.create(
-        heartbeat_sender_properties
-    )
-    if not result:
-        main_logger.error("Failed to create heartbeat sender manager")
-        return -1
-    result, heartbeat_receiver_manager = worker_manager.WorkerManager.create(
-        heartbeat_receiver_properties
-    )
-    if not result:
-        main_logger.error("Failed to create heartbeat receiver manager")
-        return -1
-    result, telemetry_manager = worker_manager.WorkerManager.create(telemetry_properties)
-    if not result:
-        main_logger.error("Failed to create telemetry manager")
-        return -1
-    result, command_manager = worker_manager.WorkerManager.create(command_properties)
-    if not result:
-        main_logger.error("Failed to create command manager")
-        return -1
+    # Get Pylance to stop complaining
+    assert bootcamp_pipeline is not None
 
-    # Start worker processes
-    heartbeat_sender_manager.start_workers()
-    heartbeat_receiver_manager.start_workers()
-    telemetry_manager.start_workers()
-    command_manager.start_workers()
+    # Start worker processes, then restart any worker as soon as it dies and resize groups
+    bootcamp_pipeline.start()
 
     main_logger.info("Started")
 
+    resource_time_series = worker_resources.ResourceTimeSeries()
+    # CPU use of the first period is measured from here
+    bootcamp_pipeline.sample_resources()
+
     # Main's work: read from all queues that output to main, and log any commands that we make
     # Continue running for 100 seconds or until the drone disconnects
     start_time = time.time()
+    statistics_time = start_time
+    resources_time = start_time
     while time.time() - start_time < MAIN_LOOP_DURATION:
 
-        try:
-            # Read from heartbeat queue
-            if not heartbeat_queue.queue.empty():
-                heartbeat_status = heartbeat_queue.queue.get_nowait()
-                main_logger.info(f"Heartbeat status: {heartbeat_status}")
-
-                if heartbeat_status == "Disconnected":
-                    main_logger.warning("Drone disconnected, exiting")
-                    break
-            # Read from report queue
-            if not report_queue.queue.empty():
-                report = report_queue.queue.get_nowait()
-                main_logger.info(f"Command report: {report}")
-        except queue.Empty:
-            pass
-
-        time.sleep(0.1)
-
-    # Stop the processes
-    controller.request_exit()
+        # Block until any queue has data, then read everything available
+        heartbeat_statuses, reports = main_selector.select(
+            QUEUE_DRAIN_BATCH_SIZE, MAIN_WAIT_TIMEOUT
+        )
+
+        disconnected = False
+        for heartbeat_status in heartbeat_statuses:
+            main_logger.info(f"Heartbeat status: {heartbeat_status}")
+
+            if heartbeat_status == "Disconnected":
+                disconnected = True
+
+        if disconnected:
+            main_logger.warning("Drone disconnected, exiting")
+            break
+
+        # Decide on crash looping groups, this could degrade instead of aborting
+        crash_looping = False
+        while not crash_loop_reports.empty():
+            target_name, crash_count = crash_loop_reports.get_nowait()
+            main_logger.error(f"{target_name} crashed {crash_count} times, parked")
+            crash_looping = True
+
+        if crash_looping:
+            main_logger.error("Worker group crash looping, exiting")
+            break
+
+        for report in reports:
+            main_logger.info(f"Command report: {report}")
+
+        # Supervisors do not fork from their threads, main starts the spares they restart from
+        bootcamp_pipeline.replenish_spares()
+
+        # Log the queue statistics of the last period
+        if time.time() - statistics_time >= QUEUE_STATISTICS_PERIOD:
+            statistics_time = time.time()
+            for stats_queue in bootcamp_pipeline.get_queues():
+                result, snapshot = stats_queue.get_statistics_snapshot(True)
+                if result:
+                    main_logger.info(f"Queue statistics {snapshot}")
+
+            # Time from a worker sending to the socket write, through the router
+            main_logger.info(
+                f"Queue statistics {mavlink_router.get_outbound_statistics_snapshot(True)}, "
+                f"dropped {mavlink_router.get_outbound_dropped_count()}"
+            )
+
+        # Log which workers use the most of the companion computer
+        if time.time() - resources_time >= WORKER_RESOURCES_PERIOD:
+            resources_time = time.time()
+            samples = bootcamp_pipeline.sample_resources()
+            resource_time_series.record(samples)
+            for sample in samples:
+                main_logger.info(f"Worker resources {sample}")
+
+    # Stop the processes, all stages at once, forcibly after the deadline
+    result, shutdown_reports = bootcamp_pipeline.shutdown(
+        controller, main_logger, SHUTDOWN_DEADLINE, SHUTDOWN_TERMINATE_GRACE
+    )
+    if not result:
+        main_logger.error("Failed to shut down pipeline")
+        return -1
 
-    main_logger.info("Requested exit")
+    for shutdown_report in shutdown_reports:
+        main_logger.info(f"Shutdown {shutdown_report}")
 
-    # Fill and drain queues from END TO START
-    report_queue.fill_and_drain_queue()
-    telemetry_queue.fill_and_drain_queue()
-    heartbeat_queue.fill_and_drain_queue()
+    main_logger.info("Stopped")
 
-    main_logger.info("Queues cleared")
+    for manager in bootcamp_pipeline.get_managers():
+        restart_counts = manager.get_restart_counts()
+        if sum(restart_counts) > 0:
+            latencies = manager.get_restart_latencies()
+            main_logger.info(
+                f"Worker restart counts: {restart_counts}, "
+                f"max restart latency: {max(latencies) * 1000:.1f} ms"
+            )
 
-    # Clean up worker processes
-    command_manager.join_workers()
-    telemetry_manager.join_workers()
-    heartbeat_receiver_manager.join_workers()
-    heartbeat_sender_manager.join_workers()
+    try:
+        resource_time_series.write_csv(pathlib.Path(logging_path, WORKER_RESOURCES_FILE_NAME))
+    except OSError as e:
+        main_logger.warning(f"Failed to write worker resources: {e}")
 
-    main_logger.info("Stopped")
+    # Release shared memory now that no worker is attached
+    bootcamp_pipeline.close_queues()
 
     # We can reset controller in case we want to reuse it
     # Alternatively, create a new WorkerController instance
@@ -248,6 +433,11 @@ def main() -> int:
 
 
 if __name__ == "__main__":
+    # Before anything creates processes or synchronization primitives
+    mp.set_start_method(WORKER_START_METHOD)
+    if WORKER_START_METHOD == "forkserver":
+        mp.set_forkserver_preload(FORKSERVER_PRELOAD_MODULES)
+
     result_main = main()
     if result_main < 0:
         print(f"Failed with return code {result_main}")
@@ -7,7 +7,9 @@ import math
 from pymavlink import mavutil
 
 from ..common.modules.logger import logger
+from ..mavlink_io import packet_template
 from ..telemetry import telemetry
+from ..telemetry import telemetry_wire_format
 
 
 class Position:
@@ -42,7 +44,53 @@ class Command:  # pylint: disable=too-many-instance-attributes
         """
         Falliable create (instantiation) method to create a Command object.
         """
-        return True, Command(cls.__private_key, connection, target, local_logger)
+        # Use COMMAND_LONG (76) message, assume the target_system=1 and target_componenet=0
+        # The appropriate commands to use are instructed below
+        # The target is fixed, so the altitude command never changes
+        result, change_altitude = packet_template.PacketTemplate.create(
+            connection.mav,
+            connection.mav.command_long_encode(
+                1,  # target_system
+                0,
+                # Adjust height using the comand MAV_CMD_CONDITION_CHANGE_ALT (113)
+                mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT,
+                0,
+                1.0,  # (descent/climb rate in m/s), change from 0
+                0,
+                0,
+                0,
+                0,
+                0,  # unused param
+                target.z,  # param7 (target altitude)
+            ),
+        )
+        if not result:
+            return False, None
+
+        # Only the angle and the direction of the yaw command change
+        result, change_yaw = packet_template.PacketTemplate.create(
+            connection.mav,
+            connection.mav.command_long_encode(
+                1,  # target_system
+                0,  # target_component
+                mavutil.mavlink.MAV_CMD_CONDITION_YAW,  # command (115)
+                0,  # confirmation
+                0,  # param1 (target angle in degrees), set on each send
+                5.0,  # param2 (angular speed in deg/s) - CHANGE FROM 0
+                0,  # param3 (direction: 1=clockwise, -1=counter-clockwise), set on each send
+                1,  # param4 (relative=1, absolute=0)
+                0,  # param5
+                0,  # param6
+                0,  # param7
+            ),
+            ["param1", "param3"],
+        )
+        if not result:
+            return False, None
+
+        return True, Command(
+            cls.__private_key, connection, target, local_logger, change_altitude, change_yaw
+        )
 
     def __init__(
         self,
@@ -50,6 +98,8 @@ class Command:  # pylint: disable=too-many-instance-attributes
         connection: mavutil.mavfile,
         target: Position,
         local_logger: logger.Logger,
+        change_altitude: packet_template.PacketTemplate,
+        change_yaw: packet_template.PacketTemplate,
     ) -> None:
         assert key is Command.__private_key, "Use create() method"
 
@@ -57,6 +107,8 @@ class Command:  # pylint: disable=too-many-instance-attributes
         self.connection = connection
         self.target = target
         self.local_logger = local_logger
+        self.change_altitude = change_altitude
+        self.change_yaw = change_yaw
 
         # Thresholds
         self.height_tolerance = 0.5  # meters
@@ -65,7 +117,7 @@ class Command:  # pylint: disable=too-many-instance-attributes
         self.velocity_history = []
 
     def run(
-        self, telemetry_data: telemetry.TelemetryData
+        self, telemetry_data: telemetry.TelemetryData | telemetry_wire_format.TelemetryDataView
     ) -> "tuple[True, str] | tuple[False, None]":
         """
         Make a decision based on received telemetry data.
@@ -83,22 +135,7 @@ class Command:  # pylint: disable=too-many-instance-attributes
 
         delta_z = self.target.z - telemetry_data.z
         if telemetry_data.z is not None and abs(delta_z) > self.height_tolerance:
-            # Use COMMAND_LONG (76) message, assume the target_system=1 and target_componenet=0
-            # The appropriate commands to use are instructed below
-            self.connection.mav.command_long_send(
-                1,  # target_system
-                0,
-                # Adjust height using the comand MAV_CMD_CONDITION_CHANGE_ALT (113)
-                mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT,
-                0,
-                1.0,  # (descent/climb rate in m/s), change from 0
-                0,
-                0,
-                0,
-                0,
-                0,  # unused param
-                self.target.z,  # param7 (target altitude)
-            )
+            self.change_altitude.send()
             # String to return to main: "CHANGE_ALTITUDE: {amount you changed it by, delta height in meters}"
             return True, f"CHANGE ALTITUDE: {delta_z:.2f}"
         # Adjust direction (yaw) using MAV_CMD_CONDITION_YAW (115). Must use relative angle to current state
@@ -115,19 +152,7 @@ class Command:  # pylint: disable=too-many-instance-attributes
                 direction = -1 if angle_diff_deg >= 0 else 1  # 1=clockwise, -1=counter-clockwise
 
                 # Send yaw change command (relative)
-                self.connection.mav.command_long_send(
-                    1,  # target_system
-                    0,  # target_component
-                    mavutil.mavlink.MAV_CMD_CONDITION_YAW,  # command (115)
-                    0,  # confirmation
-                    angle_diff_deg,  # param1 (target angle in degrees)
-                    5.0,  # param2 (angular speed in deg/s) - CHANGE FROM 0
-                    direction,  # param3 (direction: 1=clockwise, -1=counter-clockwise, not used for relative)
-                    1,  # param4 (relative=1, absolute=0)
-                    0,  # param5
-                    0,  # param6
-                    0,  # param7
-                )
+                self.change_yaw.send(angle_diff_deg, direction)
 
                 action = f"CHANGE YAW: {angle_diff_deg:.2f}"
                 # self.local_logger.info(action, True)
@@ -4,12 +4,13 @@ Command worker to make decisions based on Telemetry Data.
 
 import os
 import pathlib
-import time
 
 from pymavlink import mavutil
 
 from utilities.workers import queue_proxy_wrapper
+from utilities.workers import queue_selector
 from utilities.workers import worker_controller
+from utilities.workers import worker_liveness
 from . import command
 from ..common.modules.logger import logger
 
@@ -17,9 +18,13 @@ from ..common.modules.logger import logger
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+TELEMETRY_WAIT_TIMEOUT = 1.0  # seconds
+
+
 def command_worker(
     connection: mavutil.mavfile,
     target: command.Position,
+    telemetry_selector: queue_selector.QueueSelector,
     telemetry_queue: queue_proxy_wrapper.QueueProxyWrapper,
     report_queue: queue_proxy_wrapper.QueueProxyWrapper,
     controller: worker_controller.WorkerController,
@@ -30,6 +35,7 @@ def command_worker(
     Args:
         connection: MAVLink connection to the drone
         target: Target position for the command
+        telemetry_selector: Selector with the input queue and the controller registered
         input_queue: Queue to receive telemetry data
         output_queue: Queue to send command results
         controller: Controller to manage worker lifecycle
@@ -64,22 +70,45 @@ def command_worker(
 
     # Main loop: do work.
     while not controller.is_exit_requested():
+        # Also stamped after a wait timed out, so an idle worker does not look hung
+        worker_liveness.report_progress()
+
+        # Pause takes effect before taking a sample
         controller.check_pause()
-        if not telemetry_queue.queue.empty():
-            telemetry_data = telemetry_queue.queue.get()
-            # local_logger.info(f"Received telemetry: {telemetry_data}", True)
 
-            if telemetry_data is None:
-                continue
+        # Block until telemetry arrives instead of polling
+        # Exit and pause requests also end the wait, the timeout only bounds the liveness stamps
+        if not telemetry_selector.wait(TELEMETRY_WAIT_TIMEOUT):
+            continue
+
+        # Exit or pause was requested during the wait, the loop handles both first
+        if controller.is_exit_requested() or controller.is_pause_requested():
+            continue
+
+        # Only the newest sample matters, older ones are stale
+        # Another worker of the group may have taken it first
+        result, telemetry_data, skipped = telemetry_queue.get_latest()
+        if not result:
+            continue
+
+        # Exit on sentinel
+        if telemetry_data is None:
+            break
+
+        if skipped > 0:
+            local_logger.info(f"Skipped {skipped} stale telemetry samples", True)
+
+        # local_logger.info(f"Received telemetry: {telemetry_data}", True)
+
+        result, action = cmd.run(telemetry_data)
 
-            result, action = cmd.run(telemetry_data)
+        # Exit may have been requested while deciding
+        if result and not controller.is_exit_requested():
+            # Send action string to report queue
+            report_queue.put(action)
+            # local_logger.info(f"Action taken: {action}", True)
 
-            if result:
-                # Send action string to report queue
-                report_queue.queue.put(action)
-                # local_logger.info(f"Action taken: {action}", True)
-        else:
-            time.sleep(0.01)
+    local_logger.info("Worker exiting", True)
 
 
 # =================================================================================================
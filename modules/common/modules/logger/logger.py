@@ -0,0 +1,8 @@
+import pathlib
+CONFIG_FILE_PATH = pathlib.Path("config.yaml")
+class Logger:
+    @classmethod
+    def create(cls, name, enable_log_to_file=True):
+        return True, Logger()
+    def _log(self, *a, **k): pass
+    debug = info = warning = error = critical = _log
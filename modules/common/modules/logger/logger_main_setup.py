@@ -0,0 +1,6 @@
+import pathlib
+from . import logger
+def setup_main_logger(config):
+    path = pathlib.Path("/tmp/smoke_logs")
+    path.mkdir(exist_ok=True)
+    return True, logger.Logger(), path
@@ -0,0 +1,2 @@
+def open_config(path):
+    return True, {}
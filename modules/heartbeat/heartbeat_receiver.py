@@ -2,9 +2,12 @@
 Heartbeat receiving logic.
 """
 
+import time
+
 from pymavlink import mavutil
 
 from ..common.modules.logger import logger
+from ..mavlink_io import message_dispatcher
 
 
 # =================================================================================================
@@ -26,12 +29,18 @@ class HeartbeatReceiver:
         """
         Falliable create (instantiation) method to create a HeartbeatReceiver object.
         """
-        return True, HeartbeatReceiver(cls.__private_key, connection, local_logger)
+        result, dispatcher = message_dispatcher.MessageDispatcher.create(connection)
+        if not result:
+            local_logger.error("Failed to create MessageDispatcher", True)
+            return False, None
+
+        return True, HeartbeatReceiver(cls.__private_key, connection, dispatcher, local_logger)
 
     def __init__(
         self,
         key: object,
         connection: mavutil.mavfile,
+        dispatcher: message_dispatcher.MessageDispatcher,
         local_logger: logger.Logger,
     ) -> None:
         assert key is HeartbeatReceiver.__private_key, "Use create() method"
@@ -43,6 +52,11 @@ class HeartbeatReceiver:
         self.status = "Connected"
         self.disconnect_threshold = 5
 
+        # Latest heartbeat of the current period, set by the handler
+        self.heartbeat_msg = None
+        self.dispatcher = dispatcher
+        self.dispatcher.register("HEARTBEAT", self.handle_message)
+
     def run(
         self,
     ) -> str:
@@ -52,8 +66,29 @@ class HeartbeatReceiver:
         the connection is considered disconnected.
         """
         # Try to receive a HEARTBEAT message with 1 second timeout
-        msg = self.connection.recv_match(type="HEARTBEAT", blocking=True, timeout=1.0)
+        self.heartbeat_msg = None
+        end_time = time.time() + 1.0
+        while self.heartbeat_msg is None and time.time() < end_time:
+            self.dispatcher.receive(end_time - time.time())
+
+        return self.update(self.heartbeat_msg)
+
+    def handle_message(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        Dispatcher handler of HEARTBEAT messages.
+        """
+        self.heartbeat_msg = msg
+
+    def update(
+        self,
+        msg: "mavutil.mavlink.MAVLink_message | None",
+    ) -> str:
+        """
+        Updates the status with the result of waiting 1 period for a heartbeat,
+        for callers receiving messages themselves.
 
+        msg: The heartbeat, None if none arrived within the period.
+        """
         if msg and msg.get_type() == "HEARTBEAT":
             # Received heartbeat successfully
             self.missed_heartbeats = 0
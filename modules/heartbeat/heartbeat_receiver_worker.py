@@ -9,6 +9,8 @@ from pymavlink import mavutil
 
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
+from utilities.workers import worker_liveness
+from utilities.workers import worker_standby
 from . import heartbeat_receiver
 from ..common.modules.logger import logger
 
@@ -58,12 +60,18 @@ def heartbeat_receiver_worker(
     assert receiver is not None
     local_logger.info("HeartbeatReceiver created", True)
 
+    # As a hot standby, wait here already set up until replacing a dead worker
+    if not worker_standby.wait_until_active():
+        local_logger.info("Standby cancelled", True)
+        return
+
     # Main loop: do work.
     while not controller.is_exit_requested():
+        worker_liveness.report_progress()
         controller.check_pause()
         status = receiver.run()
 
-        report_queue.queue.put(status)
+        report_queue.put(status)
         local_logger.info(f"Status changed to: {status}", True)
 
     local_logger.info("Worker Exiting", True)
@@ -4,6 +4,8 @@ Heartbeat sending logic.
 
 from pymavlink import mavutil
 
+from ..mavlink_io import packet_template
+
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
@@ -23,17 +25,33 @@ class HeartbeatSender:
         """
         Falliable create (instantiation) method to create a HeartbeatSender object.
         """
-        return True, HeartbeatSender(cls.__private_key, connection)
+        # Every heartbeat is the same, only the sequence number and checksum change
+        result, heartbeat = packet_template.PacketTemplate.create(
+            connection.mav,
+            connection.mav.heartbeat_encode(
+                mavutil.mavlink.MAV_TYPE_GCS,
+                mavutil.mavlink.MAV_AUTOPILOT_INVALID,
+                0,  # base_mode
+                0,  # custom_mode
+                mavutil.mavlink.MAV_STATE_ACTIVE,
+            ),
+        )
+        if not result:
+            return False, None
+
+        return True, HeartbeatSender(cls.__private_key, connection, heartbeat)
 
     def __init__(
         self,
         key: object,
         connection: mavutil.mavfile,
+        heartbeat: packet_template.PacketTemplate,
     ) -> None:
         assert key is HeartbeatSender.__private_key, "Use create() method"
 
         # Do any intializiation here
         self.connection = connection
+        self.heartbeat = heartbeat
 
     def run(
         self,
@@ -41,13 +59,7 @@ class HeartbeatSender:
         """
         Attempt to send a heartbeat message.
         """
-        self.connection.mav.heartbeat_send(
-            mavutil.mavlink.MAV_TYPE_GCS,
-            mavutil.mavlink.MAV_AUTOPILOT_INVALID,
-            0,  # base_mode
-            0,  # custom_mode
-            mavutil.mavlink.MAV_STATE_ACTIVE,
-        )
+        self.heartbeat.send()
 
         return f"HeartbeatSender(connection={self.connection})"
 
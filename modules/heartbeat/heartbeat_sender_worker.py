@@ -4,11 +4,11 @@ Heartbeat worker that sends heartbeats periodically.
 
 import os
 import pathlib
-import time
 
 from pymavlink import mavutil
 
 from utilities.workers import worker_controller
+from utilities.workers import worker_liveness
 from . import heartbeat_sender
 from ..common.modules.logger import logger
 
@@ -57,10 +57,12 @@ def heartbeat_sender_worker(
     local_logger.info("HeartbeatSender created successfully", True)
     # Main loop: do work.
     while not controller.is_exit_requested():
+        worker_liveness.report_progress()
         controller.check_pause()
         sender.run()
         local_logger.info("Heartbeat sent", True)
-        time.sleep(heartbeat_period)  # Send once per second
+        # Send once per second, waking immediately on exit
+        controller.wait_for_exit(heartbeat_period)
 
     local_logger.info("Worker exiting", True)
 
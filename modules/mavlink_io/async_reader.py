@@ -0,0 +1,109 @@
+"""
+Reading MAVLink messages on an asyncio event loop.
+"""
+
+import asyncio
+
+from pymavlink import mavutil
+
+from . import socket_reader
+
+
+class AsyncMavlinkReader:
+    """
+    Reads the connection socket whenever it is readable, without blocking the event loop,
+    and puts each message into the queues subscribed to its type.
+
+    Full queues drop their oldest message, so a slow consumer only sees fresher data.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(cls, connection: mavutil.mavfile) -> "tuple[bool, AsyncMavlinkReader | None]":
+        """
+        Creates a reader, which does nothing until started.
+
+        connection: Connection backed by a connected socket, such as TCP or UDP.
+
+        Returns whether the connection can be read asynchronously and the reader.
+        """
+        result, reader = socket_reader.SocketReader.create(connection)
+        if not result:
+            return False, None
+
+        # Get Pylance to stop complaining
+        assert reader is not None
+
+        return True, AsyncMavlinkReader(cls.__create_key, reader)
+
+    def __init__(
+        self, class_private_create_key: object, reader: socket_reader.SocketReader
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is AsyncMavlinkReader.__create_key, "Use create() method"
+
+        # The event loop waits on the socket, the reader only reads it
+        self.__socket_reader = reader
+        self.__subscribers: "dict[str, list[asyncio.Queue]]" = {}
+        self.__loop: "asyncio.AbstractEventLoop | None" = None
+        self.__is_closed = False
+
+    def subscribe(self, message_types: "list[str]", maxsize: int) -> asyncio.Queue:
+        """
+        Creates a queue receiving the messages of the types.
+
+        message_types: MAVLink message type names, such as "HEARTBEAT".
+        maxsize: Most messages held, must be greater than 0 .
+
+        Returns the queue.
+        """
+        assert maxsize > 0, "Subscriber queues must be bounded"
+
+        message_queue = asyncio.Queue(maxsize)
+        for message_type in message_types:
+            self.__subscribers.setdefault(message_type, []).append(message_queue)
+
+        return message_queue
+
+    def start(self) -> None:
+        """
+        Starts reading on the running event loop, call from a coroutine.
+        """
+        self.__loop = asyncio.get_running_loop()
+        self.__loop.add_reader(self.__socket_reader.fileno(), self.__on_readable)
+
+    def stop(self) -> None:
+        """
+        Stops reading, does nothing if not reading.
+        """
+        if self.__loop is None:
+            return
+
+        self.__loop.remove_reader(self.__socket_reader.fileno())
+        self.__loop = None
+
+    def is_closed(self) -> bool:
+        """
+        Returns whether the other end closed the connection, which stops reading.
+        """
+        return self.__is_closed
+
+    def __on_readable(self) -> None:
+        """
+        Parses everything that arrived and delivers it.
+        """
+        is_open, messages = self.__socket_reader.read()
+        for message in messages:
+            for message_queue in self.__subscribers.get(message.get_type(), []):
+                if message_queue.full():
+                    message_queue.get_nowait()
+
+                message_queue.put_nowait(message)
+
+        if not is_open:
+            # Otherwise the closed socket stays readable and this runs in a loop
+            self.__is_closed = True
+            self.stop()
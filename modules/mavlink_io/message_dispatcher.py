@@ -0,0 +1,140 @@
+"""
+Dispatching received MAVLink messages to handlers by message ID.
+"""
+
+import socket
+import time
+
+from pymavlink import mavutil
+
+from . import router
+from . import socket_reader
+
+
+class MessageDispatcher:
+    """
+    Drains every message the connection has buffered in one pass and calls the handlers
+    registered for the ID of each, messages without handlers are dropped.
+
+    TCP connections are read with a SocketReader , other connections with `recv_msg()` .
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls, connection: mavutil.mavfile | router.RoutedConnection
+    ) -> "tuple[bool, MessageDispatcher | None]":
+        """
+        connection: Connection to receive from, supporting `select()` and `recv_msg()` .
+
+        Returns whether the dispatcher was able to be created and the dispatcher.
+        """
+        return True, MessageDispatcher(cls.__create_key, connection)
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        connection: mavutil.mavfile | router.RoutedConnection,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is MessageDispatcher.__create_key, "Use create() method"
+
+        self.__connection = connection
+        # UDP connections keep reading through the connection, which tracks reply addresses
+        self.__socket_reader: "socket_reader.SocketReader | None" = None
+        port = getattr(connection, "port", None)
+        if isinstance(port, socket.socket) and port.type == socket.SOCK_STREAM:
+            _, self.__socket_reader = socket_reader.SocketReader.create(connection)
+
+        self.__handlers: "dict[int, list[(mavutil.mavlink.MAVLink_message) -> None]]" = {}  # type: ignore
+
+    def register(
+        self,
+        message_type: str,
+        handler: "(mavutil.mavlink.MAVLink_message) -> None",  # type: ignore
+    ) -> bool:
+        """
+        Calls the handler with every received message of the type, after earlier handlers.
+
+        message_type: MAVLink message type name, such as "HEARTBEAT".
+        handler: Called in the thread calling receive().
+
+        Returns whether the message type exists.
+        """
+        message_id = getattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{message_type}", None)
+        if message_id is None:
+            return False
+
+        self.__handlers.setdefault(message_id, []).append(handler)
+        return True
+
+    def dispatch(self, msg: mavutil.mavlink.MAVLink_message) -> bool:
+        """
+        Calls the handlers of a message received elsewhere.
+
+        Returns whether the message had any handlers.
+        """
+        handlers = self.__handlers.get(msg.get_msgId())
+        if handlers is None:
+            return False
+
+        for handler in handlers:
+            handler(msg)
+
+        return True
+
+    def receive(self, timeout: float) -> int:
+        """
+        Dispatches every buffered message, waiting for data first if there is none.
+        Returns after dispatching, callers waiting for a message call again until their deadline.
+
+        timeout: Longest wait for data, in seconds.
+
+        Returns the number of messages received, including those without handlers.
+        """
+        if self.__socket_reader is not None:
+            return self.__receive_socket(self.__socket_reader, timeout)
+
+        received_count = self.__drain()
+        if received_count > 0 or timeout <= 0.0:
+            return received_count
+
+        if not self.__connection.select(timeout):
+            return 0
+
+        return self.__drain()
+
+    def __receive_socket(self, reader: socket_reader.SocketReader, timeout: float) -> int:
+        """
+        Waits until data arrives, then dispatches everything read.
+        The reader parses all it reads, so nothing is left buffered between calls.
+        """
+        if reader.is_closed():
+            # Waiting out the timeout keeps callers from spinning
+            time.sleep(max(0.0, timeout))
+            return 0
+
+        if not reader.wait(max(0.0, timeout)):
+            return 0
+
+        _, messages = reader.read()
+        for msg in messages:
+            self.dispatch(msg)
+
+        return len(messages)
+
+    def __drain(self) -> int:
+        """
+        Dispatches messages until none is buffered.
+        """
+        received_count = 0
+        while True:
+            msg = self.__connection.recv_msg()
+            if msg is None:
+                return received_count
+
+            received_count += 1
+            self.dispatch(msg)
@@ -0,0 +1,311 @@
+"""
+Writing MAVLink frames to a connection by priority, coalescing them into few system calls.
+"""
+
+import collections
+import ctypes
+import multiprocessing as mp
+import socket
+import struct
+import time
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_statistics
+
+
+# Lower values are sent first
+HEARTBEAT_PRIORITY = 0
+COMMAND_PRIORITY = 1
+DEFAULT_PRIORITY = 2
+PRIORITY_COUNT = 3
+
+# Most frames passed to one sendmsg() call, within the IOV_MAX of Linux
+MAX_BATCH_FRAME_COUNT = 1024
+
+_CRC = struct.Struct("<H")
+_CRC_EXTRA = struct.Struct("B")
+
+_MAVLINK_1_MAGIC = 0xFE
+_MAVLINK_2_MAGIC = 0xFD
+
+
+def _renumber(frame: bytes, seq: int) -> bytes:
+    """
+    Returns the frame with the sequence number, and its checksum recomputed.
+    Signed frames and frames of unknown messages are returned unchanged.
+    """
+    if frame[0] == _MAVLINK_2_MAGIC:
+        # The signature covers the sequence number
+        if frame[2] & mavutil.mavlink.MAVLINK_IFLAG_SIGNED:
+            return frame
+
+        header_size = 10
+        sequence_index = 4
+        message_id = int.from_bytes(frame[7:10], "little")
+    elif frame[0] == _MAVLINK_1_MAGIC:
+        header_size = 6
+        sequence_index = 2
+        message_id = frame[5]
+    else:
+        return frame
+
+    message_type = mavutil.mavlink.mavlink_map.get(message_id)
+    if message_type is None:
+        return frame
+
+    crc_index = header_size + frame[1]
+    numbered = bytearray(frame)
+    numbered[sequence_index] = seq
+    crc = mavutil.mavlink.x25crc(numbered[1:crc_index])
+    crc.accumulate(_CRC_EXTRA.pack(message_type.crc_extra))
+    _CRC.pack_into(numbered, crc_index, crc.crc)
+
+    return bytes(numbered)
+
+
+class OutboundWriter:  # pylint: disable=too-many-instance-attributes
+    """
+    Single writer of a connection: queues frames by priority and sends every queued frame
+    with one system call per flush, without ever blocking.
+
+    Each priority has a bounded queue, which drops its oldest frame when full, so a congested
+    link delays a frame by at most the higher priority queues and a partly sent frame.
+    A partly sent frame is finished before any other, so frames never interleave.
+
+    Frames of datagram connections are each written separately, as a whole datagram.
+
+    Frames from several encoders can be renumbered into one sequence, in the order they are sent.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        max_size: int,
+        name: str = "mavlink_outbound",
+        is_renumbered: bool = False,
+    ) -> "tuple[bool, OutboundWriter | None]":
+        """
+        connection: Connection backed by a non-blocking socket, such as TCP or UDP.
+        max_size: Most frames queued per priority, must be greater than 0 .
+        name: Name of the outbound queue in statistics.
+        is_renumbered: Whether to overwrite the sequence number of each frame as it is sent,
+            for frames packed by more than one encoder.
+
+        Returns whether the writer was able to be created and the writer.
+        """
+        if max_size <= 0:
+            return False, None
+
+        port = getattr(connection, "port", None)
+        if not isinstance(port, socket.socket):
+            return False, None
+
+        return True, OutboundWriter(
+            cls.__create_key, connection, port, max_size, name, is_renumbered
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        connection: mavutil.mavfile,
+        port: socket.socket,
+        max_size: int,
+        name: str,
+        is_renumbered: bool,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is OutboundWriter.__create_key, "Use create() method"
+
+        self.__connection = connection
+        self.__port = port
+        self.__is_stream = port.type == socket.SOCK_STREAM
+        # Frames and the times they were sent by workers, per priority
+        self.__queues: "list[collections.deque[tuple[bytes, float]]]" = [
+            collections.deque() for _ in range(PRIORITY_COUNT)
+        ]
+        self.__max_size = max_size
+        # Unsent end of a partly sent frame, and the time the frame was sent by a worker
+        self.__remainder: "tuple[memoryview, float] | None" = None
+        self.__is_renumbered = is_renumbered
+        # Sequence number of the next frame sent
+        self.__seq = 0
+
+        # Shared memory, so main can read them while the router process writes
+        self.__statistics = queue_statistics.QueueStatistics(name)
+        self.__dropped_count = mp.RawValue(ctypes.c_uint64, 0)
+
+    def enqueue(self, frame: bytes, priority: int, send_time: float) -> None:
+        """
+        Queues a frame, dropping the oldest frame of the priority if its queue is full.
+
+        frame: Packed MAVLink frame.
+        priority: From HEARTBEAT_PRIORITY, sent first, to DEFAULT_PRIORITY .
+        send_time: `time.monotonic()` when the worker sent the frame.
+        """
+        frame_queue = self.__queues[min(max(priority, 0), PRIORITY_COUNT - 1)]
+        if len(frame_queue) >= self.__max_size:
+            frame_queue.popleft()
+            self.__dropped_count.value += 1
+
+        frame_queue.append((frame, send_time))
+        self.__statistics.record_put(1, 0.0, self.get_depth())
+
+    def has_pending(self) -> bool:
+        """
+        Returns whether any frame is waiting to be sent.
+        """
+        if self.__remainder is not None:
+            return True
+
+        return any(len(frame_queue) > 0 for frame_queue in self.__queues)
+
+    def get_depth(self) -> int:
+        """
+        Returns the number of queued frames.
+        """
+        return sum(len(frame_queue) for frame_queue in self.__queues)
+
+    def get_dropped_count(self) -> int:
+        """
+        Returns the number of frames dropped because their queue was full.
+        """
+        return self.__dropped_count.value
+
+    def get_statistics_snapshot(
+        self, reset: bool = False
+    ) -> queue_statistics.QueueStatisticsSnapshot:
+        """
+        Copies the depth and the latency from worker send to socket write of the frames.
+
+        reset: Whether to zero the statistics afterwards.
+        """
+        return self.__statistics.snapshot(reset)
+
+    def flush(self) -> bool:
+        """
+        Sends as much as the socket takes without blocking, highest priority first.
+
+        Returns whether everything was sent, otherwise wait until the socket is writable.
+        """
+        if not self.__is_stream:
+            return self.__flush_datagrams()
+
+        if self.__remainder is not None and not self.__send_remainder():
+            return False
+
+        batch: "list[tuple[bytes, float, int]]" = []
+        for priority, frame_queue in enumerate(self.__queues):
+            while len(frame_queue) > 0 and len(batch) < MAX_BATCH_FRAME_COUNT:
+                frame, send_time = frame_queue.popleft()
+                batch.append((frame, send_time, priority))
+
+        if len(batch) == 0:
+            return True
+
+        # Unsent frames are put back as they were, and numbered again when they are sent
+        frames = [self.__number(frame, i) for i, (frame, _, _) in enumerate(batch)]
+        try:
+            sent_size = self.__port.sendmsg(frames)
+        except (BlockingIOError, InterruptedError):
+            sent_size = 0
+        except OSError:
+            # The connection is gone, there is nowhere to send anything
+            self.__discard()
+            return True
+
+        end_time = time.monotonic()
+        latencies = []
+        unsent_index = len(batch)
+        for i, (frame, (_, send_time, _)) in enumerate(zip(frames, batch)):
+            if sent_size >= len(frame):
+                sent_size -= len(frame)
+                latencies.append(end_time - send_time)
+                continue
+
+            unsent_index = i
+            if sent_size > 0:
+                self.__remainder = (memoryview(frame)[sent_size:], send_time)
+                unsent_index += 1
+
+            self.__requeue(batch[unsent_index:])
+            break
+
+        self.__seq = (self.__seq + unsent_index) % 256
+
+        if len(latencies) > 0:
+            self.__statistics.record_get(latencies, 0.0)
+
+        return not self.has_pending()
+
+    def __send_remainder(self) -> bool:
+        """
+        Sends the rest of the partly sent frame.
+
+        Returns whether all of it was sent.
+        """
+        # Get Pylance to stop complaining
+        assert self.__remainder is not None
+
+        remainder, send_time = self.__remainder
+        try:
+            sent_size = self.__port.send(remainder)
+        except (BlockingIOError, InterruptedError):
+            return False
+        except OSError:
+            self.__discard()
+            return True
+
+        if sent_size < len(remainder):
+            self.__remainder = (remainder[sent_size:], send_time)
+            return False
+
+        self.__remainder = None
+        self.__statistics.record_get([time.monotonic() - send_time], 0.0)
+        return True
+
+    def __flush_datagrams(self) -> bool:
+        """
+        Writes each queued frame as its own datagram, highest priority first.
+        """
+        latencies = []
+        for frame_queue in self.__queues:
+            while len(frame_queue) > 0:
+                frame, send_time = frame_queue.popleft()
+                self.__connection.write(self.__number(frame, 0))
+                self.__seq = (self.__seq + 1) % 256
+                latencies.append(time.monotonic() - send_time)
+
+        if len(latencies) > 0:
+            self.__statistics.record_get(latencies, 0.0)
+
+        return True
+
+    def __number(self, frame: bytes, offset: int) -> bytes:
+        """
+        Returns the frame numbered as the frame sent after `offset` others, if renumbering.
+        """
+        if not self.__is_renumbered:
+            return frame
+
+        return _renumber(frame, (self.__seq + offset) % 256)
+
+    def __requeue(self, frames: "list[tuple[bytes, float, int]]") -> None:
+        """
+        Puts unsent frames back at the front of their queues, keeping their order.
+        """
+        for frame, send_time, priority in reversed(frames):
+            self.__queues[priority].appendleft((frame, send_time))
+
+    def __discard(self) -> None:
+        """
+        Drops every queued frame.
+        """
+        self.__remainder = None
+        for frame_queue in self.__queues:
+            frame_queue.clear()
@@ -0,0 +1,149 @@
+"""
+Sending periodic MAVLink messages from frames packed once.
+"""
+
+import re
+import struct
+
+from pymavlink import mavutil
+
+
+# One token per field in the payload format of a message, arrays are a single token
+_FORMAT_TOKEN = re.compile(r"(\d*)([a-zA-Z?])")
+
+_CRC = struct.Struct("<H")
+_CRC_EXTRA = struct.Struct("B")
+
+_MAVLINK_2_MAGIC = 0xFD
+
+
+class PacketTemplate:  # pylint: disable=too-many-instance-attributes
+    """
+    Frame of a message packed once, where each send only writes the sequence number,
+    the variable fields and the checksum into a reused buffer.
+
+    Frames are numbered by the encoder, in the same sequence as the messages it packs itself.
+    Messages without variable fields have a frame for every sequence number, packed up front.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        mav: mavutil.mavlink.MAVLink,
+        msg: mavutil.mavlink.MAVLink_message,
+        field_names: "list[str] | None" = None,
+    ) -> "tuple[bool, PacketTemplate | None]":
+        """
+        mav: Encoder that sends the frames, such as `connection.mav` .
+        msg: Message with the values of every field that stays the same.
+        field_names: Numeric fields set on each send, in the order the values are passed.
+
+        Returns whether the template was able to be created and the template.
+        """
+        # Signatures cover a timestamp, so they cannot be packed in advance
+        if mav.signing.sign_outgoing:
+            return False, None
+
+        field_names = [] if field_names is None else field_names
+        tokens = _FORMAT_TOKEN.findall(msg.unpacker.format)
+        if len(tokens) != len(msg.ordered_fieldnames):
+            return False, None
+
+        fields = []
+        for name in field_names:
+            if name not in msg.ordered_fieldnames:
+                return False, None
+
+            index = msg.ordered_fieldnames.index(name)
+            if msg.array_lengths[index] != 0:
+                return False, None
+
+            offset = struct.calcsize("<" + "".join(count + code for count, code in tokens[:index]))
+            fields.append((offset, struct.Struct("<" + tokens[index][1])))
+
+        # Packing takes a sequence number, which the encoder only uses up when sending
+        seq = mav.seq
+        frame = msg.pack(mav)
+        mav.seq = seq
+
+        return True, PacketTemplate(cls.__create_key, mav, msg, frame, fields)
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        mav: mavutil.mavlink.MAVLink,
+        msg: mavutil.mavlink.MAVLink_message,
+        frame: bytes,
+        fields: "list[tuple[int, struct.Struct]]",
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is PacketTemplate.__create_key, "Use create() method"
+
+        self.__mav = mav
+        self.__fields = fields
+        self.__crc_extra = _CRC_EXTRA.pack(msg.crc_extra)
+
+        self.__is_mavlink_2 = frame[0] == _MAVLINK_2_MAGIC
+        self.__header_size = 10 if self.__is_mavlink_2 else 6
+        self.__sequence_index = 4 if self.__is_mavlink_2 else 2
+        # Full size, MAVLink 2 frames drop trailing zeros of the payload when sent
+        self.__payload_size = msg.unpacker.size
+        self.__buffer = bytearray(self.__header_size + self.__payload_size)
+        crc_index = len(frame) - _CRC.size
+        self.__buffer[:crc_index] = frame[:crc_index]
+        self.__view = memoryview(self.__buffer)
+
+        self.__frames: "list[bytes]" = []
+        if len(fields) == 0:
+            self.__frames = [self.__pack_sequence(seq) for seq in range(256)]
+
+    def pack(self, *values: "int | float") -> bytes:
+        """
+        Packs the next frame of the encoder, taking up its sequence number.
+
+        values: Values of the variable fields, in the order they were named.
+
+        Returns the frame.
+        """
+        seq = self.__mav.seq
+        self.__mav.seq = (seq + 1) % 256
+        if len(self.__frames) > 0:
+            return self.__frames[seq]
+
+        for (offset, field), value in zip(self.__fields, values):
+            field.pack_into(self.__buffer, self.__header_size + offset, value)
+
+        return self.__pack_sequence(seq)
+
+    def send(self, *values: "int | float") -> None:
+        """
+        Sends the next frame through the encoder, like its `*_send()` methods.
+
+        values: Values of the variable fields, in the order they were named.
+        """
+        frame = self.pack(*values)
+        self.__mav.file.write(frame)
+        self.__mav.total_packets_sent += 1
+        self.__mav.total_bytes_sent += len(frame)
+
+    def __pack_sequence(self, seq: int) -> bytes:
+        """
+        Numbers the buffered frame and checksums it.
+        """
+        end = self.__header_size + self.__payload_size
+        if self.__is_mavlink_2:
+            while end > self.__header_size + 1 and self.__buffer[end - 1] == 0:
+                end -= 1
+
+        self.__buffer[1] = end - self.__header_size
+        self.__buffer[self.__sequence_index] = seq
+
+        crc = mavutil.mavlink.x25crc(self.__view[1:end])
+        crc.accumulate(self.__crc_extra)
+
+        # Appended, the payload past a shortened MAVLink 2 payload stays zero for the next send
+        return self.__view[:end].tobytes() + _CRC.pack(crc.crc)
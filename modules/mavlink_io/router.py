@@ -0,0 +1,401 @@
+"""
+Routing MAVLink messages between one connection and many worker processes.
+"""
+
+import ctypes
+import multiprocessing as mp
+import multiprocessing.connection
+import select
+import struct
+import time
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_statistics
+from . import outbound_writer
+from . import socket_reader
+
+
+# Outbound pipe messages start with the priority and the time the worker sent the frame
+_OUTBOUND_HEADER = struct.Struct("<Bd")
+
+
+class Subscription:
+    """
+    Pipe carrying the frames of some message types from the router to a group of workers.
+    Workers of the group take turns reading, so each frame reaches one of them.
+    """
+
+    def __init__(self, message_types: "list[str]") -> None:
+        """
+        message_types: MAVLink message type names, such as "HEARTBEAT".
+        """
+        self.message_types = set(message_types)
+        self.receiver, self.sender = mp.Pipe(False)
+        # Frames are a length header and a body, read by one worker at a time
+        self.receive_lock = mp.Lock()
+        # Only written by the router
+        self.__dropped_count = mp.RawValue(ctypes.c_uint64, 0)
+
+    def record_drop(self) -> None:
+        """
+        Counts a frame dropped because the pipe was full.
+        """
+        self.__dropped_count.value += 1
+
+    def get_dropped_count(self) -> int:
+        """
+        Returns the number of frames dropped because the workers did not keep up.
+        """
+        return self.__dropped_count.value
+
+
+class _PipeWriter:
+    """
+    File-like end of the outbound pipe, for the MAVLink encoder of a worker.
+    """
+
+    def __init__(self, sender: multiprocessing.connection.Connection, priority: int) -> None:
+        self.__sender = sender
+        self.__priority = priority
+
+    def write(self, buf: bytes) -> None:
+        """
+        Sends a packed frame, a single write so frames of different workers do not interleave.
+        """
+        self.__sender.send_bytes(_OUTBOUND_HEADER.pack(self.__priority, time.monotonic()) + buf)
+
+
+class RoutedConnection:
+    """
+    Stand-in for `mavutil.mavfile` in workers: receives the subscribed messages from the router
+    and sends through it. Supports `recv_match()` , `select()` , `recv_msg()`
+    and the `mav.*_send()` methods.
+
+    The router renumbers sent frames as it writes them,
+    so the frames of every connection form one sequence.
+    """
+
+    def __init__(
+        self,
+        subscription: "Subscription | None",
+        outbound_sender: multiprocessing.connection.Connection,
+        priority: int,
+        source_system: int,
+        source_component: int,
+    ) -> None:
+        """
+        subscription: Messages to receive, None to only send.
+        outbound_sender: Sending end of the outbound pipe of the router.
+        priority: Priority of sent messages, see outbound_writer .
+        source_system: System ID of sent messages.
+        source_component: Component ID of sent messages.
+        """
+        self.__subscription = subscription
+        self.__outbound_sender = outbound_sender
+        self.__priority = priority
+        self.__source_system = source_system
+        self.__source_component = source_component
+        # Created in the worker on first use
+        self.__mav: "mavutil.mavlink.MAVLink | None" = None
+
+    @property
+    def mav(self) -> mavutil.mavlink.MAVLink:
+        """
+        Encoder and decoder of this connection, sending through the router.
+        """
+        if self.__mav is None:
+            self.__mav = mavutil.mavlink.MAVLink(
+                _PipeWriter(self.__outbound_sender, self.__priority),
+                srcSystem=self.__source_system,
+                srcComponent=self.__source_component,
+            )
+
+        return self.__mav
+
+    def recv_match(
+        self,
+        condition: "str | None" = None,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: "float | None" = None,
+    ) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Receives the next subscribed message of the types, like `mavutil.mavfile.recv_match()` .
+
+        condition: Not supported, must be None.
+        type: Message type name or names, None for any subscribed type.
+        blocking: Whether to wait for a message.
+        timeout: Time waiting in seconds when blocking, None to wait forever.
+
+        Returns the message, None if there was none in time.
+        """
+        assert condition is None, "Conditions are not supported"
+
+        if self.__subscription is None:
+            return None
+
+        if type is not None and not isinstance(type, (list, set)):
+            type = [type]
+
+        deadline = None
+        if blocking and timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        while True:
+            remaining = 0.0
+            if blocking:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+
+            frame = self.__receive_frame(remaining)
+            if frame is None:
+                return None
+
+            msg = self.mav.decode(bytearray(frame))
+            if type is None or msg.get_type() in type:
+                return msg
+
+    def select(self, timeout: float) -> bool:
+        """
+        Waits for a subscribed message, like `mavutil.mavfile.select()` .
+
+        timeout: Longest wait in seconds.
+
+        Returns whether a message may be ready, another worker of the group can take it first.
+        """
+        if self.__subscription is None:
+            time.sleep(timeout)
+            return False
+
+        return self.__subscription.receiver.poll(timeout)
+
+    def recv_msg(self) -> "mavutil.mavlink.MAVLink_message | None":
+        """
+        Receives the next subscribed message without waiting, like `mavutil.mavfile.recv_msg()` .
+
+        Returns the message, None if there is none.
+        """
+        if self.__subscription is None:
+            return None
+
+        frame = self.__receive_frame(0.0)
+        if frame is None:
+            return None
+
+        return self.mav.decode(bytearray(frame))
+
+    def __receive_frame(self, timeout: "float | None") -> "bytes | None":
+        """
+        Returns the next frame, None if there was none in time.
+        """
+        # Get Pylance to stop complaining
+        assert self.__subscription is not None
+
+        # A negative timeout does not wait
+        if timeout is None:
+            self.__subscription.receive_lock.acquire()
+        elif not self.__subscription.receive_lock.acquire(timeout=timeout):
+            return None
+
+        try:
+            if not self.__subscription.receiver.poll(timeout):
+                return None
+
+            return self.__subscription.receiver.recv_bytes()
+        finally:
+            self.__subscription.receive_lock.release()
+
+
+class MavlinkRouter:
+    """
+    Owns the connection: parses every received message once and forwards its frame to the
+    subscriptions of its type, and writes the frames workers send by priority.
+    Only one router process may run route() at a time.
+
+    Subscriptions that do not keep up drop frames instead of stalling the router,
+    and so do outbound priorities while the link is congested.
+    """
+
+    __create_key = object()
+
+    # Longest route() waits before checking for an exit request, data wakes it immediately
+    __WAIT_TIMEOUT = 0.1  # seconds
+
+    @classmethod
+    def create(
+        cls, connection: mavutil.mavfile, outbound_max_size: int
+    ) -> "tuple[bool, MavlinkRouter | None]":
+        """
+        Creates a router, subscribe and create connections before starting any worker.
+
+        connection: Connection backed by a connected socket, such as TCP or UDP.
+        outbound_max_size: Most frames waiting to be sent per priority, must be greater than 0 .
+
+        Returns whether the connection can be routed and the router.
+        """
+        result, reader = socket_reader.SocketReader.create(connection)
+        if not result:
+            return False, None
+
+        # Get Pylance to stop complaining
+        assert reader is not None
+
+        result, writer = outbound_writer.OutboundWriter.create(
+            connection, outbound_max_size, is_renumbered=True
+        )
+        if not result:
+            return False, None
+
+        # Get Pylance to stop complaining
+        assert writer is not None
+
+        return True, MavlinkRouter(cls.__create_key, connection, reader, writer)
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        connection: mavutil.mavfile,
+        reader: socket_reader.SocketReader,
+        writer: outbound_writer.OutboundWriter,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is MavlinkRouter.__create_key, "Use create() method"
+
+        self.__connection = connection
+        self.__socket_reader = reader
+        self.__outbound_writer = writer
+        self.__subscriptions: "dict[str, list[Subscription]]" = {}
+        self.__outbound_receiver, self.__outbound_sender = mp.Pipe(False)
+
+    def create_connection(
+        self,
+        message_types: "list[str] | None" = None,
+        priority: int = outbound_writer.DEFAULT_PRIORITY,
+    ) -> RoutedConnection:
+        """
+        Creates a connection for a group of workers.
+
+        message_types: MAVLink message type names the group receives, None to only send.
+        priority: Priority of the messages the group sends, see outbound_writer .
+
+        Returns the connection.
+        """
+        subscription = None
+        if message_types is not None:
+            subscription = Subscription(message_types)
+            for message_type in subscription.message_types:
+                self.__subscriptions.setdefault(message_type, []).append(subscription)
+
+        return RoutedConnection(
+            subscription,
+            self.__outbound_sender,
+            priority,
+            self.__connection.source_system,
+            self.__connection.source_component,
+        )
+
+    def get_subscriptions(self) -> "list[Subscription]":
+        """
+        Returns every subscription.
+        """
+        subscriptions = []
+        for type_subscriptions in self.__subscriptions.values():
+            for subscription in type_subscriptions:
+                if subscription not in subscriptions:
+                    subscriptions.append(subscription)
+
+        return subscriptions
+
+    def get_outbound_statistics_snapshot(
+        self, reset: bool = False
+    ) -> queue_statistics.QueueStatisticsSnapshot:
+        """
+        Copies the depth and latency statistics of the frames workers send.
+
+        reset: Whether to zero the statistics afterwards.
+        """
+        return self.__outbound_writer.get_statistics_snapshot(reset)
+
+    def get_outbound_dropped_count(self) -> int:
+        """
+        Returns the number of frames workers sent that were dropped while the link was congested.
+        """
+        return self.__outbound_writer.get_dropped_count()
+
+    def route(self, is_exit_requested: "() -> bool") -> None:  # type: ignore
+        """
+        Forwards messages in both directions until exit is requested.
+
+        is_exit_requested: Checked at least every 0.1 seconds.
+        """
+        # Created here, in the router process
+        epoll = select.epoll(2)
+        outbound_fd = self.__outbound_receiver.fileno()
+        inbound_fd = self.__socket_reader.fileno()
+        epoll.register(outbound_fd, select.EPOLLIN)
+        # Also waits for the socket to become writable while the link is congested
+        socket_events = select.EPOLLIN
+        epoll.register(inbound_fd, socket_events)
+        is_open = True
+        try:
+            while not is_exit_requested():
+                for fd, events in epoll.poll(self.__WAIT_TIMEOUT):
+                    if fd == outbound_fd:
+                        self.__receive_outbound()
+                    elif events & (select.EPOLLIN | select.EPOLLHUP | select.EPOLLERR):
+                        is_open = self.__receive_inbound()
+
+                # Everything sent since the last wake up goes out together
+                is_flushed = True
+                if self.__outbound_writer.has_pending():
+                    is_flushed = self.__outbound_writer.flush()
+
+                if not is_open:
+                    # The other end closing leaves the socket readable forever
+                    if socket_events != 0:
+                        epoll.unregister(inbound_fd)
+                        socket_events = 0
+
+                    continue
+
+                wanted_events = select.EPOLLIN if is_flushed else select.EPOLLIN | select.EPOLLOUT
+                if wanted_events != socket_events:
+                    epoll.modify(inbound_fd, wanted_events)
+                    socket_events = wanted_events
+        finally:
+            epoll.close()
+
+    def __receive_outbound(self) -> None:
+        """
+        Queues every frame the workers have sent.
+        """
+        while self.__outbound_receiver.poll():
+            data = self.__outbound_receiver.recv_bytes()
+            priority, send_time = _OUTBOUND_HEADER.unpack_from(data)
+            self.__outbound_writer.enqueue(data[_OUTBOUND_HEADER.size :], priority, send_time)
+
+    def __receive_inbound(self) -> bool:
+        """
+        Parses what arrived and forwards each frame.
+
+        Returns whether the connection is still open.
+        """
+        is_open, messages = self.__socket_reader.read()
+        for msg in messages:
+            subscriptions = self.__subscriptions.get(msg.get_type(), [])
+            if len(subscriptions) == 0:
+                continue
+
+            frame = msg.get_msgbuf()
+            for subscription in subscriptions:
+                # Writable pipes have room for a frame, which is far smaller than a page
+                _, writable, _ = select.select([], [subscription.sender], [], 0.0)
+                if len(writable) == 0:
+                    subscription.record_drop()
+                    continue
+
+                subscription.sender.send_bytes(frame)
+
+        return is_open
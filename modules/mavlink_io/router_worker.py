@@ -0,0 +1,58 @@
+"""
+Router worker that owns the MAVLink connection and routes messages for all other workers.
+"""
+
+import os
+import pathlib
+
+from utilities.workers import worker_controller
+from utilities.workers import worker_liveness
+from . import router
+from ..common.modules.logger import logger
+
+
+def router_worker(
+    mavlink_router: router.MavlinkRouter,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process.
+
+    mavlink_router: Router with every subscription created.
+    controller: How the main process communicates to this worker process.
+    """
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    def is_exit_requested() -> bool:
+        """
+        Reports progress on every wake up, so a stuck router is restarted.
+        """
+        worker_liveness.report_progress()
+        controller.check_pause()
+        return controller.is_exit_requested()
+
+    mavlink_router.route(is_exit_requested)
+
+    for subscription in mavlink_router.get_subscriptions():
+        dropped_count = subscription.get_dropped_count()
+        if dropped_count > 0:
+            local_logger.warning(
+                f"Dropped {dropped_count} of {sorted(subscription.message_types)}", True
+            )
+
+    outbound_dropped_count = mavlink_router.get_outbound_dropped_count()
+    if outbound_dropped_count > 0:
+        local_logger.warning(f"Dropped {outbound_dropped_count} outbound frames", True)
+
+    local_logger.info("Worker exiting", True)
@@ -0,0 +1,142 @@
+"""
+Reading everything available on a MAVLink connection socket with few system calls.
+"""
+
+import select
+import socket
+
+from pymavlink import mavutil
+
+
+class SocketReader:  # pylint: disable=too-many-instance-attributes
+    """
+    Waits on the connection socket with epoll, then reads everything available into a reused
+    buffer and parses it, instead of the few bytes per system call of `recv_msg()` .
+    Parsed messages also update the connection state, as if the connection had received them.
+    """
+
+    __create_key = object()
+
+    # Enough for a burst of many messages per read
+    __BUFFER_SIZE = 65536  # bytes
+
+    @classmethod
+    def create(cls, connection: mavutil.mavfile) -> "tuple[bool, SocketReader | None]":
+        """
+        connection: Connection backed by a connected socket, such as TCP or UDP.
+
+        Returns whether the connection can be read and the reader.
+        """
+        if not isinstance(getattr(connection, "port", None), socket.socket):
+            return False, None
+
+        return True, SocketReader(cls.__create_key, connection)
+
+    def __init__(self, class_private_create_key: object, connection: mavutil.mavfile) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is SocketReader.__create_key, "Use create() method"
+
+        self.__connection = connection
+        self.__port: socket.socket = connection.port
+        # A short stream read means the socket is empty, datagrams are read until none is left
+        self.__is_stream = self.__port.type == socket.SOCK_STREAM
+        self.__buffer = bytearray(self.__BUFFER_SIZE)
+        self.__view = memoryview(self.__buffer)
+        # Created on first wait, processes forked before then each get their own
+        self.__epoll: "select.epoll | None" = None
+        self.__is_closed = False
+        self.__read_count = 0
+        self.__message_count = 0
+
+    def fileno(self) -> int:
+        """
+        Returns the socket file descriptor, for waiting on it together with others.
+        """
+        return self.__port.fileno()
+
+    def wait(self, timeout: "float | None") -> bool:
+        """
+        Waits until the socket is readable, waking as soon as data arrives.
+
+        timeout: Longest wait in seconds, None to wait forever.
+
+        Returns whether the socket is readable.
+        """
+        if self.__is_closed:
+            return False
+
+        if self.__epoll is None:
+            self.__epoll = select.epoll(1)
+            self.__epoll.register(self.__port.fileno(), select.EPOLLIN)
+
+        events = self.__epoll.poll(-1 if timeout is None else timeout, 1)
+        return len(events) > 0
+
+    def read(self) -> "tuple[bool, list[mavutil.mavlink.MAVLink_message]]":
+        """
+        Reads and parses everything available without blocking.
+
+        Returns whether the connection is still open, and the messages in order of arrival.
+        """
+        messages = []
+        while not self.__is_closed:
+            try:
+                read_size = self.__port.recv_into(self.__buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionError:
+                read_size = 0
+
+            self.__read_count += 1
+            if read_size == 0:
+                # Otherwise the closed socket stays readable forever
+                self.__is_closed = True
+                self.close()
+                break
+
+            data = self.__view[:read_size]
+            if self.__connection.first_byte:
+                self.__connection.auto_mavlink_version(data)
+
+            # The parser copies into its own buffer, so the read buffer can be reused
+            parsed = self.__connection.mav.parse_buffer(data)
+            if parsed is not None:
+                for msg in parsed:
+                    # Keeps the connection state, such as the last message of each type, up to date
+                    self.__connection.post_message(msg)
+
+                messages.extend(parsed)
+
+            if self.__is_stream and read_size < self.__BUFFER_SIZE:
+                break
+
+        self.__message_count += len(messages)
+        return not self.__is_closed, messages
+
+    def is_closed(self) -> bool:
+        """
+        Returns whether the other end closed the connection.
+        """
+        return self.__is_closed
+
+    def close(self) -> None:
+        """
+        Releases the epoll instance, the connection stays open.
+        """
+        if self.__epoll is not None:
+            self.__epoll.close()
+            self.__epoll = None
+
+    def get_read_count(self) -> int:
+        """
+        Returns the number of socket reads so far.
+        """
+        return self.__read_count
+
+    def get_message_count(self) -> int:
+        """
+        Returns the number of messages parsed so far.
+        """
+        return self.__message_count
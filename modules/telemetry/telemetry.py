@@ -6,12 +6,18 @@ import time
 
 from pymavlink import mavutil
 
+from . import telemetry_wire_format
+from ..mavlink_io import message_dispatcher
 from ..common.modules.logger import logger
 
 
 class TelemetryData:  # pylint: disable=too-many-instance-attributes
     """
     Python struct to represent Telemtry Data. Contains the most recent attitude and position reading.
+
+    Pickles to the fixed layout binary encoding of telemetry_wire_format ,
+    so it is compact when crossing process boundaries through any queue.
+    Unpickles as a TelemetryDataView over the received encoding, which has the same attributes.
     """
 
     def __init__(
@@ -44,6 +50,9 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
         self.pitch_speed = pitch_speed
         self.yaw_speed = yaw_speed
 
+    def __reduce__(self) -> "tuple[object, tuple[bytes]]":
+        return telemetry_wire_format.TelemetryDataView, (telemetry_wire_format.encode(self),)
+
     def __str__(self) -> str:
         return f"""{{
             time_since_boot: {self.time_since_boot},
@@ -81,12 +90,18 @@ class Telemetry:
         """
         Falliable create (instantiation) method to create a Telemetry object.
         """
-        return True, Telemetry(cls.__private_key, connection, local_logger)
+        result, dispatcher = message_dispatcher.MessageDispatcher.create(connection)
+        if not result:
+            local_logger.error("Failed to create MessageDispatcher", True)
+            return False, None
+
+        return True, Telemetry(cls.__private_key, connection, dispatcher, local_logger)
 
     def __init__(
         self,
         key: object,
         connection: mavutil.mavfile,
+        dispatcher: message_dispatcher.MessageDispatcher,
         local_logger: logger.Logger,
     ) -> None:
         assert key is Telemetry.__private_key, "Use create() method"
@@ -96,6 +111,15 @@ class Telemetry:
         self.local_logger = local_logger
         self.timeout = 1.0
 
+        self.position_msg = None
+        self.attitude_msg = None
+        # Combined by the handlers, taken by run()
+        self.telemetry_data = None
+
+        self.dispatcher = dispatcher
+        self.dispatcher.register("LOCAL_POSITION_NED", self.handle_message)
+        self.dispatcher.register("ATTITUDE", self.handle_message)
+
     def run(
         self,
     ) -> "tuple[True, TelemetryData] | tuple[False, None]":
@@ -106,49 +130,83 @@ class Telemetry:
 
         start_time = time.time()
 
-        position_msg = None
-        attitude_msg = None
+        self.reset()
+        self.telemetry_data = None
 
         # Try to receive both messages within timeout
+        # Each wake up handles everything buffered, so a backlog leaves the freshest data
         while time.time() - start_time < self.timeout:
-            # Read MAVLink message LOCAL_POSITION_NED (32)
-            msg = self.connection.recv_match(type=["LOCAL_POSITION_NED", "ATTITUDE"], timeout=0.1)
-            if position_msg is None:
-                if msg and msg.get_type() == "LOCAL_POSITION_NED":
-                    position_msg = msg
-                    self.local_logger.info("Received LOCAL_POSITION_NED", True)
-
-            # Read MAVLink message ATTITUDE (30)
-            if attitude_msg is None:
-                if msg and msg.get_type() == "ATTITUDE":
-                    attitude_msg = msg
-                    self.local_logger.info("Received ATTITUDE", True)
-
-            # Return the most recent of both, and use the most recent message's timestamp
-            if position_msg is not None and attitude_msg is not None:
-                telemetry_data = TelemetryData(
-                    time_since_boot=max(attitude_msg.time_boot_ms, position_msg.time_boot_ms),
-                    x=position_msg.x,
-                    y=position_msg.y,
-                    z=position_msg.z,
-                    x_velocity=position_msg.vx,
-                    y_velocity=position_msg.vy,
-                    z_velocity=position_msg.vz,
-                    roll=attitude_msg.roll,
-                    pitch=attitude_msg.pitch,
-                    yaw=attitude_msg.yaw,
-                    roll_speed=attitude_msg.rollspeed,
-                    pitch_speed=attitude_msg.pitchspeed,
-                    yaw_speed=attitude_msg.yawspeed,
-                )
-
-                self.local_logger.info("Created TelemetryData", True)
+            self.dispatcher.receive(self.timeout - (time.time() - start_time))
+            if self.telemetry_data is not None:
+                telemetry_data = self.telemetry_data
+                self.telemetry_data = None
                 return True, telemetry_data
 
         # Didn't receive both messages
         self.local_logger.error("Timeout: Did not receive both messages within 1 second", True)
         return False, None
 
+    def reset(self) -> None:
+        """
+        Forgets the messages received so far, starting a new TelemetryData .
+        """
+        self.position_msg = None
+        self.attitude_msg = None
+
+    def handle_message(self, msg: mavutil.mavlink.MAVLink_message) -> None:
+        """
+        Dispatcher handler of LOCAL_POSITION_NED and ATTITUDE messages.
+        """
+        result, telemetry_data = self.update(msg)
+        if result:
+            self.telemetry_data = telemetry_data
+
+    def update(
+        self,
+        msg: "mavutil.mavlink.MAVLink_message | None",
+    ) -> "tuple[True, TelemetryData] | tuple[False, None]":
+        """
+        Adds a received message, for callers receiving messages themselves.
+        Once both messages were received, combines them and starts over.
+
+        msg: LOCAL_POSITION_NED or ATTITUDE message, None if nothing arrived.
+        """
+        if self.position_msg is None:
+            if msg and msg.get_type() == "LOCAL_POSITION_NED":
+                self.position_msg = msg
+                self.local_logger.info("Received LOCAL_POSITION_NED", True)
+
+        if self.attitude_msg is None:
+            if msg and msg.get_type() == "ATTITUDE":
+                self.attitude_msg = msg
+                self.local_logger.info("Received ATTITUDE", True)
+
+        if self.position_msg is None or self.attitude_msg is None:
+            return False, None
+
+        # Return the most recent of both, and use the most recent message's timestamp
+        position_msg = self.position_msg
+        attitude_msg = self.attitude_msg
+        telemetry_data = TelemetryData(
+            time_since_boot=max(attitude_msg.time_boot_ms, position_msg.time_boot_ms),
+            x=position_msg.x,
+            y=position_msg.y,
+            z=position_msg.z,
+            x_velocity=position_msg.vx,
+            y_velocity=position_msg.vy,
+            z_velocity=position_msg.vz,
+            roll=attitude_msg.roll,
+            pitch=attitude_msg.pitch,
+            yaw=attitude_msg.yaw,
+            roll_speed=attitude_msg.rollspeed,
+            pitch_speed=attitude_msg.pitchspeed,
+            yaw_speed=attitude_msg.yawspeed,
+        )
+
+        self.local_logger.info("Created TelemetryData", True)
+        self.reset()
+        return True, telemetry_data
+
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
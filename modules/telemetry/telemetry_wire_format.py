@@ -0,0 +1,160 @@
+"""
+Fixed layout binary encoding of telemetry data.
+"""
+
+import struct
+
+
+# Field order of the encoding, matches the TelemetryData constructor
+FIELD_NAMES = (
+    "time_since_boot",
+    "x",
+    "y",
+    "z",
+    "x_velocity",
+    "y_velocity",
+    "z_velocity",
+    "roll",
+    "pitch",
+    "yaw",
+    "roll_speed",
+    "pitch_speed",
+    "yaw_speed",
+)
+
+# Little endian presence bitmask, bit i set if field i is not None, then the fields as doubles
+# Fields that are None are encoded as 0, so NaN is a value like any other
+# time_since_boot is an integer number of ms, which a double holds exactly
+WIRE_FORMAT = "<H" + "d" * len(FIELD_NAMES)
+WIRE_SIZE = struct.calcsize(WIRE_FORMAT)  # bytes
+
+_WIRE_STRUCT = struct.Struct(WIRE_FORMAT)
+_PRESENCE_STRUCT = struct.Struct("<H")
+_FIELD_STRUCT = struct.Struct("<d")
+
+
+def encode(telemetry_data: object) -> bytes:
+    """
+    Encodes any object with the TelemetryData attributes.
+    """
+    return _WIRE_STRUCT.pack(*_wire_values(telemetry_data))
+
+
+def encode_into(telemetry_data: object, buffer: "bytearray | memoryview", offset: int = 0) -> None:
+    """
+    Encodes any object with the TelemetryData attributes into an existing buffer.
+    """
+    _WIRE_STRUCT.pack_into(buffer, offset, *_wire_values(telemetry_data))
+
+
+def decode_fields(
+    buffer: "bytes | bytearray | memoryview", offset: int = 0
+) -> "tuple[int | float | None, ...]":
+    """
+    Decodes the fields in the order of FIELD_NAMES , as TelemetryData constructor arguments.
+    """
+    presence, *values = _WIRE_STRUCT.unpack_from(buffer, offset)
+    fields = [value if presence >> i & 1 else None for i, value in enumerate(values)]
+    if fields[0] is not None:
+        fields[0] = int(fields[0])
+
+    return tuple(fields)
+
+
+def _wire_values(telemetry_data: object) -> "list[int | float]":
+    """
+    Presence bitmask, then field values in encoding order with None replaced by 0 .
+    """
+    values = (
+        telemetry_data.time_since_boot,
+        telemetry_data.x,
+        telemetry_data.y,
+        telemetry_data.z,
+        telemetry_data.x_velocity,
+        telemetry_data.y_velocity,
+        telemetry_data.z_velocity,
+        telemetry_data.roll,
+        telemetry_data.pitch,
+        telemetry_data.yaw,
+        telemetry_data.roll_speed,
+        telemetry_data.pitch_speed,
+        telemetry_data.yaw_speed,
+    )
+
+    presence = 0
+    for i, value in enumerate(values):
+        if value is not None:
+            presence |= 1 << i
+
+    return [presence] + [0.0 if value is None else value for value in values]
+
+
+class _WireField:
+    """
+    Descriptor reading a single field of a TelemetryDataView on access.
+    """
+
+    def __init__(self, index: int, is_integer: bool = False) -> None:
+        self.__mask = 1 << index
+        self.__offset = _PRESENCE_STRUCT.size + index * _FIELD_STRUCT.size
+        self.__is_integer = is_integer
+
+    def __get__(
+        self, view: "TelemetryDataView | None", owner: type
+    ) -> "_WireField | int | float | None":
+        # Accessed on the class, such as by introspection
+        if view is None:
+            return self
+
+        (presence,) = _PRESENCE_STRUCT.unpack_from(view.buffer, view.offset)
+        if not presence & self.__mask:
+            return None
+
+        (value,) = _FIELD_STRUCT.unpack_from(view.buffer, view.offset + self.__offset)
+        if self.__is_integer:
+            return int(value)
+
+        return value
+
+
+class TelemetryDataView:
+    """
+    Read only view of encoded telemetry data with the TelemetryData attributes.
+    Fields are decoded on access, nothing is copied.
+    TelemetryData unpickles as a view, so consumers only decode the fields they read.
+    """
+
+    time_since_boot = _WireField(0, True)
+    x = _WireField(1)
+    y = _WireField(2)
+    z = _WireField(3)
+    x_velocity = _WireField(4)
+    y_velocity = _WireField(5)
+    z_velocity = _WireField(6)
+    roll = _WireField(7)
+    pitch = _WireField(8)
+    yaw = _WireField(9)
+    roll_speed = _WireField(10)
+    pitch_speed = _WireField(11)
+    yaw_speed = _WireField(12)
+
+    def __init__(self, buffer: "bytes | bytearray | memoryview", offset: int = 0) -> None:
+        """
+        buffer: Buffer containing the encoding, must remain valid while the view is used.
+        offset: Start of the encoding in the buffer.
+        """
+        assert len(buffer) - offset >= WIRE_SIZE, "Buffer too small"
+
+        self.buffer = buffer
+        self.offset = offset
+
+    def __reduce__(self) -> "tuple[object, tuple[bytes]]":
+        # Only the encoding, the rest of the buffer may be large or not picklable
+        return TelemetryDataView, (bytes(self.buffer[self.offset : self.offset + WIRE_SIZE]),)
+
+    def __str__(self) -> str:
+        fields = ", ".join(
+            f"{name}: {value}"
+            for name, value in zip(FIELD_NAMES, decode_fields(self.buffer, self.offset))
+        )
+        return f"{{{fields}}}"
@@ -9,6 +9,8 @@ from pymavlink import mavutil
 
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
+from utilities.workers import worker_liveness
+from utilities.workers import worker_standby
 from . import telemetry
 from ..common.modules.logger import logger
 
@@ -56,13 +58,20 @@ def telemetry_worker(
         return
 
     local_logger.info("Telemetry created", True)
+
+    # As a hot standby, wait here already set up until replacing a dead worker
+    if not worker_standby.wait_until_active():
+        local_logger.info("Standby cancelled", True)
+        return
+
     # Main loop: do work.
     while not controller.is_exit_requested():
+        worker_liveness.report_progress()
         controller.check_pause()
         success, telemetry_data = telem.run()
 
         if success:  # Success
-            telemetry_queue.queue.put(telemetry_data)
+            telemetry_queue.put(telemetry_data)
             local_logger.info(f"Sent telemetry data: {telemetry_data}", True)
         else:  # Timeout occurred, restart and try again
             local_logger.warning("Telemetry timeout, restarting", True)
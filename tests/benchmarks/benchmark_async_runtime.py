@@ -0,0 +1,204 @@
+"""
+Benchmark the multiprocess and the single process asyncio pipelines against a mock drone:
+latency from telemetry to command, CPU time, and memory. To run:
+```
+python -m tests.benchmarks.benchmark_async_runtime
+```
+"""
+
+import multiprocessing as mp
+import os
+import resource
+import select
+import statistics
+import subprocess
+import sys
+import time
+
+from pymavlink import mavutil
+
+
+RUNTIME_MODULES = ["bootcamp_main", "bootcamp_async_main"]
+CONNECTION_STRING = "tcpin:localhost:12345"
+DRONE_DURATION = 20.0  # seconds
+HEARTBEAT_PERIOD = 1.0  # seconds
+TELEMETRY_PERIOD = 0.05  # seconds
+MEMORY_SAMPLE_PERIOD = 0.5  # seconds
+# Far from the target altitude, so every sample makes command send a command
+DRONE_ALTITUDE = 0.0  # m
+
+
+def run_drone(latencies: "mp.Queue") -> None:
+    """
+    Mock drone sending heartbeats and telemetry, timing each first command after a sample.
+    Closes the connection after the duration, which the pipeline sees as a disconnection.
+    """
+    connection = mavutil.mavlink_connection(CONNECTION_STRING, source_system=1, source_component=0)
+    # Accept the pipeline, which waits for a heartbeat before sending anything
+    while connection.port is None:
+        select.select([connection.listen], [], [])
+        connection.recv(0)
+
+    start_time = time.monotonic()
+    next_heartbeat_time = start_time
+    next_telemetry_time = start_time
+    sample_time = None
+    sample_latencies = []
+    while time.monotonic() - start_time < DRONE_DURATION:
+        now = time.monotonic()
+        if now >= next_heartbeat_time:
+            connection.mav.heartbeat_send(
+                mavutil.mavlink.MAV_TYPE_QUADROTOR,
+                mavutil.mavlink.MAV_AUTOPILOT_GENERIC,
+                0,
+                0,
+                mavutil.mavlink.MAV_STATE_ACTIVE,
+            )
+            next_heartbeat_time += HEARTBEAT_PERIOD
+
+        if now >= next_telemetry_time:
+            time_boot_ms = int((now - start_time) * 1000)
+            connection.mav.local_position_ned_send(
+                time_boot_ms, 0.0, 0.0, DRONE_ALTITUDE, 0.0, 0.0, 0.0
+            )
+            connection.mav.attitude_send(time_boot_ms, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+            sample_time = time.monotonic()
+            next_telemetry_time += TELEMETRY_PERIOD
+
+        timeout = max(0.0, min(next_heartbeat_time, next_telemetry_time) - time.monotonic())
+        readable, _, _ = select.select([connection.port], [], [], timeout)
+        if len(readable) == 0:
+            continue
+
+        receive_time = time.monotonic()
+        while True:
+            msg = connection.recv_match(type="COMMAND_LONG", blocking=False)
+            if msg is None:
+                break
+
+            # Later commands answer the same sample
+            if sample_time is not None:
+                sample_latencies.append(receive_time - sample_time)
+                sample_time = None
+
+    connection.close()
+    latencies.put(sample_latencies)
+
+
+def get_descendants(pid: int) -> "list[int]":
+    """
+    Returns the process and all of its descendants.
+    """
+    children: "dict[int, list[int]]" = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as stat_file:
+                # The name can contain spaces, the fields after it cannot
+                parent_pid = int(stat_file.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+
+        children.setdefault(parent_pid, []).append(int(entry))
+
+    pids = [pid]
+    for current_pid in pids:
+        pids.extend(children.get(current_pid, []))
+
+    return pids
+
+
+def get_memory(pids: "list[int]") -> "tuple[int, int]":
+    """
+    Returns the total proportional set size, which splits shared pages between processes,
+    and the total resident set size, in kB.
+    """
+    total_pss = 0
+    total_rss = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as smaps_file:
+                for line in smaps_file:
+                    if line.startswith("Pss:"):
+                        total_pss += int(line.split()[1])
+                    elif line.startswith("Rss:"):
+                        total_rss += int(line.split()[1])
+        except OSError:
+            continue
+
+    return total_pss, total_rss
+
+
+def measure(runtime_module: str) -> str:
+    """
+    Runs the pipeline against the drone until the drone disconnects.
+
+    Returns the results.
+    """
+    latencies = mp.Queue()
+    drone = mp.Process(target=run_drone, args=(latencies,))
+    drone.start()
+    # Let the drone listen before the pipeline connects
+    time.sleep(0.5)
+
+    cpu_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start_time = time.monotonic()
+    with subprocess.Popen(
+        [sys.executable, "-m", runtime_module],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    ) as pipeline:
+        peak_pss = 0
+        peak_rss = 0
+        process_count = 0
+        while pipeline.poll() is None:
+            pids = get_descendants(pipeline.pid)
+            pss, rss = get_memory(pids)
+            if pss > peak_pss:
+                peak_pss = pss
+                peak_rss = rss
+                process_count = len(pids)
+
+            time.sleep(MEMORY_SAMPLE_PERIOD)
+
+    elapsed_time = time.monotonic() - start_time
+    sample_latencies = latencies.get()
+    drone.join()
+    cpu_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    # Includes the drone, which is the same for both pipelines
+    cpu_time = (cpu_after.ru_utime + cpu_after.ru_stime) - (
+        cpu_before.ru_utime + cpu_before.ru_stime
+    )
+    if len(sample_latencies) == 0:
+        return f"{runtime_module:>20}: no commands received, exit code {pipeline.returncode}"
+
+    return (
+        f"{runtime_module:>20}: "
+        f"{len(sample_latencies)} commands, "
+        f"latency median {statistics.median(sample_latencies) * 1000:7.3f} ms "
+        f"max {max(sample_latencies) * 1000:7.3f} ms, "
+        f"CPU {cpu_time:6.2f} s over {elapsed_time:5.1f} s, "
+        f"peak PSS {peak_pss / 1024:6.1f} MiB RSS {peak_rss / 1024:6.1f} MiB "
+        f"in {process_count} processes"
+    )
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    for runtime_module in RUNTIME_MODULES:
+        print(measure(runtime_module))
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
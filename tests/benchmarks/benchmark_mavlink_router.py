@@ -0,0 +1,172 @@
+"""
+Benchmark delivering a burst of messages to more and more subscriber processes,
+through the router and with every process reading the shared connection. To run:
+```
+python -m tests.benchmarks.benchmark_mavlink_router
+```
+Shared readers race for the socket, so each message reaches at most one of them,
+and messages split between readers are lost.
+"""
+
+import multiprocessing as mp
+import socket
+import threading
+import time
+
+from pymavlink import mavutil
+
+from modules.mavlink_io import router
+
+
+SUBSCRIBER_COUNTS = [1, 2, 4, 8]
+MESSAGE_COUNT = 20000
+# Sent in chunks like a telemetry stream, not as one write
+CHUNK_MESSAGE_COUNT = 50
+# Subscribers stop once nothing arrives for this long
+IDLE_TIMEOUT = 1.0  # seconds
+OUTBOUND_MAX_SIZE = 16
+
+
+def count_messages(
+    connection: "mavutil.mavfile | router.RoutedConnection",
+    ready_barrier: "mp.Barrier",  # type: ignore
+    result_queue: "mp.Queue",
+) -> None:
+    """
+    Counts heartbeats until idle, reporting the count and the time of the last one.
+    """
+    ready_barrier.wait()
+
+    received_count = 0
+    last_time = time.monotonic()
+    while True:
+        msg = connection.recv_match(type="HEARTBEAT", blocking=True, timeout=IDLE_TIMEOUT)
+        if msg is None:
+            break
+
+        received_count += 1
+        last_time = time.monotonic()
+
+    result_queue.put((received_count, last_time))
+
+
+def send_burst(drone_socket: socket.socket) -> float:
+    """
+    Sends every message, returning when sending started.
+    """
+    sender = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+    frame = sender.heartbeat_encode(
+        mavutil.mavlink.MAV_TYPE_QUADROTOR,
+        mavutil.mavlink.MAV_AUTOPILOT_GENERIC,
+        0,
+        0,
+        mavutil.mavlink.MAV_STATE_ACTIVE,
+    ).pack(sender)
+
+    start_time = time.monotonic()
+    for _ in range(MESSAGE_COUNT // CHUNK_MESSAGE_COUNT):
+        drone_socket.sendall(frame * CHUNK_MESSAGE_COUNT)
+
+    return start_time
+
+
+def measure(subscriber_count: int, is_routed: bool) -> "tuple[float, float, int]":
+    """
+    Delivers the burst to the subscribers.
+
+    Returns messages delivered per second over all subscribers, the fraction of messages
+    each subscriber received on average, and the messages the router dropped.
+    """
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        connection = mavutil.mavlink_connection(f"tcp:127.0.0.1:{server.getsockname()[1]}")
+        drone_socket, _ = server.accept()
+
+    ready_barrier = mp.Barrier(subscriber_count + 1)
+    result_queue = mp.Queue()
+
+    mavlink_router = None
+    connections = [connection] * subscriber_count
+    if is_routed:
+        _, mavlink_router = router.MavlinkRouter.create(connection, OUTBOUND_MAX_SIZE)
+        # Get Pylance to stop complaining
+        assert mavlink_router is not None
+
+        connections = [
+            mavlink_router.create_connection(["HEARTBEAT"]) for _ in range(subscriber_count)
+        ]
+
+    subscribers = [
+        mp.Process(target=count_messages, args=(subscriber_connection, ready_barrier, result_queue))
+        for subscriber_connection in connections
+    ]
+    for subscriber in subscribers:
+        subscriber.start()
+
+    exit_event = mp.Event()
+    router_process = None
+    if mavlink_router is not None:
+        router_process = mp.Process(target=mavlink_router.route, args=(exit_event.is_set,))
+        router_process.start()
+
+    ready_barrier.wait()
+    # Sending blocks once the socket buffer is full, so it runs beside collecting the results
+    start_times = []
+    send_thread = threading.Thread(target=lambda: start_times.append(send_burst(drone_socket)))
+    send_thread.start()
+
+    results = [result_queue.get() for _ in range(subscriber_count)]
+    send_thread.join()
+
+    exit_event.set()
+    for subscriber in subscribers:
+        subscriber.join()
+
+    dropped_count = 0
+    if router_process is not None:
+        router_process.join()
+        # Counts are shared memory, written by the router process
+        dropped_count = sum(
+            subscription.get_dropped_count() for subscription in mavlink_router.get_subscriptions()
+        )
+
+    drone_socket.close()
+    connection.close()
+
+    received_count = sum(count for count, _ in results)
+    duration = max(last_time for _, last_time in results) - start_times[0]
+    return (
+        received_count / duration,
+        received_count / (MESSAGE_COUNT * subscriber_count),
+        dropped_count,
+    )
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    print(f"{MESSAGE_COUNT} messages per run")
+    for subscriber_count in SUBSCRIBER_COUNTS:
+        for is_routed in [False, True]:
+            name = "routed" if is_routed else "shared"
+            messages_per_second, delivered_fraction, dropped_count = measure(
+                subscriber_count, is_routed
+            )
+            print(
+                f"{subscriber_count} subscribers {name:>6}: "
+                f"{messages_per_second:9.0f} messages/s, "
+                f"each received {delivered_fraction * 100:5.1f} %, "
+                f"router dropped {dropped_count}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    mp.set_start_method("fork")
+
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
@@ -0,0 +1,171 @@
+"""
+Benchmark receiving telemetry among other messages, with recv_match() filtering
+and with dispatch by message ID. To run:
+```
+python -m tests.benchmarks.benchmark_message_dispatch
+```
+Reports CPU time per received message and the time from sending ATTITUDE to its handler.
+"""
+
+import multiprocessing as mp
+import socket
+import statistics
+import time
+
+from pymavlink import mavutil
+
+from modules.mavlink_io import message_dispatcher
+
+
+ROUND_COUNT = 1000
+ROUND_PERIOD = 0.002  # seconds
+# Messages nobody handles, sent with each telemetry pair like a real autopilot stream
+OTHER_MESSAGE_COUNT = 8
+# Receiving stops once nothing arrives for this long
+IDLE_TIMEOUT = 1.0  # seconds
+
+
+def run_drone(drone_socket: socket.socket, send_times_queue: "mp.Queue") -> None:
+    """
+    Sends rounds of telemetry and other messages, numbered by time_boot_ms .
+    """
+    sender = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+    other = sender.sys_status_encode(0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0).pack(sender)
+
+    send_times = []
+    next_time = time.monotonic()
+    for i in range(ROUND_COUNT):
+        time.sleep(max(0.0, next_time - time.monotonic()))
+        next_time += ROUND_PERIOD
+        frames = (
+            other * (OTHER_MESSAGE_COUNT // 2)
+            + sender.local_position_ned_encode(i, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0).pack(sender)
+            + other * (OTHER_MESSAGE_COUNT - OTHER_MESSAGE_COUNT // 2)
+            + sender.attitude_encode(i, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0).pack(sender)
+        )
+        send_times.append(time.monotonic())
+        drone_socket.sendall(frames)
+
+    send_times_queue.put(send_times)
+    # Keep the connection open until the receiver goes idle
+    time.sleep(IDLE_TIMEOUT * 2)
+    drone_socket.close()
+
+
+def receive_recv_match(connection: mavutil.mavfile, handle_times: "dict[int, float]") -> None:
+    """
+    Receives like Telemetry did, polling recv_match() for either type.
+    """
+    last_time = time.monotonic()
+    while time.monotonic() - last_time < IDLE_TIMEOUT:
+        msg = connection.recv_match(type=["LOCAL_POSITION_NED", "ATTITUDE"], timeout=0.1)
+        if msg is None:
+            continue
+
+        last_time = time.monotonic()
+        if msg.get_type() == "ATTITUDE":
+            handle_times[msg.time_boot_ms] = last_time
+
+
+def receive_blocking_recv_match(
+    connection: mavutil.mavfile, handle_times: "dict[int, float]"
+) -> None:
+    """
+    Receives with recv_match() waiting for either type.
+    """
+    while True:
+        msg = connection.recv_match(
+            type=["LOCAL_POSITION_NED", "ATTITUDE"], blocking=True, timeout=IDLE_TIMEOUT
+        )
+        if msg is None:
+            return
+
+        if msg.get_type() == "ATTITUDE":
+            handle_times[msg.time_boot_ms] = time.monotonic()
+
+
+def receive_dispatch(connection: mavutil.mavfile, handle_times: "dict[int, float]") -> None:
+    """
+    Receives with the dispatcher.
+    """
+    _, dispatcher = message_dispatcher.MessageDispatcher.create(connection)
+    # Get Pylance to stop complaining
+    assert dispatcher is not None
+
+    def handle_attitude(msg: mavutil.mavlink.MAVLink_message) -> None:
+        handle_times[msg.time_boot_ms] = time.monotonic()
+
+    dispatcher.register("LOCAL_POSITION_NED", lambda msg: None)
+    dispatcher.register("ATTITUDE", handle_attitude)
+
+    while dispatcher.receive(IDLE_TIMEOUT) > 0:
+        pass
+
+
+def measure(receive: "(mavutil.mavfile, dict[int, float]) -> None") -> "tuple[float, list[float]]":  # type: ignore
+    """
+    Receives every round from the drone.
+
+    Returns the CPU time per received message and the latencies of ATTITUDE.
+    """
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        connection = mavutil.mavlink_connection(f"tcp:127.0.0.1:{server.getsockname()[1]}")
+        drone_socket, _ = server.accept()
+
+    send_times_queue = mp.Queue()
+    # Forked, so the drone keeps its end of the connection
+    drone = mp.Process(target=run_drone, args=(drone_socket, send_times_queue))
+    drone.start()
+    drone_socket.close()
+
+    handle_times = {}
+
+    cpu_start = time.process_time()
+    receive(connection, handle_times)
+    cpu_time = time.process_time() - cpu_start
+
+    send_times = send_times_queue.get()
+    drone.join()
+    connection.close()
+
+    latencies = [handle_time - send_times[i] for i, handle_time in handle_times.items()]
+    message_count = ROUND_COUNT * (OTHER_MESSAGE_COUNT + 2)
+    return cpu_time / message_count, latencies
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    receivers = {
+        "recv_match poll": receive_recv_match,
+        "recv_match block": receive_blocking_recv_match,
+        "dispatcher": receive_dispatch,
+    }
+
+    print(
+        f"{ROUND_COUNT} rounds of {OTHER_MESSAGE_COUNT + 2} messages every "
+        f"{ROUND_PERIOD * 1000:.1f} ms"
+    )
+    for name, receive in receivers.items():
+        cpu_per_message, latencies = measure(receive)
+        latencies.sort()
+        print(
+            f"{name:>16}: "
+            f"CPU {cpu_per_message * 1000000:7.1f} us/message (idle wait included), "
+            f"ATTITUDE {len(latencies)}/{ROUND_COUNT}, "
+            f"latency median {statistics.median(latencies) * 1000:6.3f} ms "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.3f} ms"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    mp.set_start_method("fork")
+
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
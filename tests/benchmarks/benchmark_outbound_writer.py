@@ -0,0 +1,156 @@
+"""
+Benchmark command latency over a congested link, with every frame in one first in first out
+queue and with commands queued ahead of bulk frames, and the flushes per frame. To run:
+```
+python -m tests.benchmarks.benchmark_outbound_writer
+```
+The drone reads more slowly than bulk frames are queued, like a narrow telemetry radio.
+"""
+
+import socket
+import threading
+import time
+
+from pymavlink import mavutil
+
+from modules.mavlink_io import outbound_writer
+
+
+DURATION = 3.0  # seconds
+TICK_PERIOD = 0.001  # seconds
+# Bulk frames queued per tick, about twice what the drone reads
+BULK_FRAME_COUNT = 20
+DRONE_READ_SIZE = 360  # bytes per tick
+COMMAND_PERIOD = 0.02  # seconds
+MAX_SIZE = 1024
+# Small, so the kernel holds little of the backlog
+BUFFER_SIZE = 4096  # bytes
+
+
+def run_drone(
+    drone_socket: socket.socket, arrival_times: "dict[int, float]", stop_event: threading.Event
+) -> None:
+    """
+    Reads at a limited rate, recording when each command arrives.
+    """
+    parser = mavutil.mavlink.MAVLink(None)
+    drone_socket.settimeout(TICK_PERIOD)
+    while not stop_event.is_set():
+        time.sleep(TICK_PERIOD)
+        try:
+            data = drone_socket.recv(DRONE_READ_SIZE)
+        except TimeoutError:
+            continue
+
+        if len(data) == 0:
+            break
+
+        for msg in parser.parse_buffer(data) or []:
+            if msg.get_type() == "COMMAND_LONG":
+                arrival_times[int(msg.param1)] = time.monotonic()
+
+
+def measure(is_prioritized: bool) -> "tuple[float, float, float, float, int]":
+    """
+    Sends bulk frames and commands over the congested link.
+
+    Returns the fraction of commands delivered, the median and the maximum command latency
+    in seconds, the flushes per sent frame, and the frames dropped.
+    """
+    with socket.socket() as server:
+        # Before connecting, the receive window is agreed on when connecting
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, BUFFER_SIZE)
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        connection = mavutil.mavlink_connection(f"tcp:127.0.0.1:{server.getsockname()[1]}")
+        drone_socket, _ = server.accept()
+
+    connection.port.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, BUFFER_SIZE)
+
+    _, writer = outbound_writer.OutboundWriter.create(connection, MAX_SIZE)
+    # Get Pylance to stop complaining
+    assert writer is not None
+
+    arrival_times: "dict[int, float]" = {}
+    stop_event = threading.Event()
+    drone = threading.Thread(target=run_drone, args=(drone_socket, arrival_times, stop_event))
+    drone.start()
+
+    sender = mavutil.mavlink.MAVLink(None, srcSystem=255, srcComponent=0)
+    bulk_frame = sender.attitude_encode(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0).pack(sender)
+    command_priority = (
+        outbound_writer.COMMAND_PRIORITY if is_prioritized else outbound_writer.DEFAULT_PRIORITY
+    )
+
+    send_times: "dict[int, float]" = {}
+    flush_count = 0
+    start_time = time.monotonic()
+    next_command_time = start_time
+    next_tick_time = start_time
+    while next_tick_time < start_time + DURATION:
+        now = time.monotonic()
+        for _ in range(BULK_FRAME_COUNT):
+            writer.enqueue(bulk_frame, outbound_writer.DEFAULT_PRIORITY, now)
+
+        if now >= next_command_time:
+            command_id = len(send_times)
+            frame = sender.command_long_encode(
+                1, 0, mavutil.mavlink.MAV_CMD_CONDITION_YAW, 0, command_id, 0, 0, 0, 0, 0, 0
+            ).pack(sender)
+            send_times[command_id] = now
+            writer.enqueue(frame, command_priority, now)
+            next_command_time += COMMAND_PERIOD
+
+        writer.flush()
+        flush_count += 1
+        next_tick_time += TICK_PERIOD
+        time.sleep(max(0.0, next_tick_time - time.monotonic()))
+
+    stop_event.set()
+    drone.join()
+    snapshot = writer.get_statistics_snapshot()
+    drone_socket.close()
+    connection.close()
+
+    latencies = sorted(
+        arrival_times[command_id] - send_time
+        for command_id, send_time in send_times.items()
+        if command_id in arrival_times
+    )
+    if len(latencies) == 0:
+        return 0.0, float("inf"), float("inf"), 0.0, writer.get_dropped_count()
+
+    return (
+        len(latencies) / len(send_times),
+        latencies[len(latencies) // 2],
+        latencies[-1],
+        flush_count / max(snapshot.get_count, 1),
+        writer.get_dropped_count(),
+    )
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    for is_prioritized in [False, True]:
+        name = "priority" if is_prioritized else "fifo"
+        delivered_fraction, median_latency, max_latency, flushes_per_frame, dropped_count = measure(
+            is_prioritized
+        )
+        print(
+            f"{name:>8}: {delivered_fraction * 100:5.1f} % of commands delivered, latency median {median_latency * 1000:7.1f} ms, "
+            f"max {max_latency * 1000:7.1f} ms, "
+            f"{flushes_per_frame:5.3f} flushes/frame, "
+            f"dropped {dropped_count}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
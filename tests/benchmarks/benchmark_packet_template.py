@@ -0,0 +1,143 @@
+"""
+Benchmark packets per second of the periodic outbound messages, packed each time
+by `mav.*_send()` and sent from a PacketTemplate . To run:
+```
+python -m tests.benchmarks.benchmark_packet_template
+```
+Frames are written to a file that discards them, so only encoding is measured.
+"""
+
+import time
+
+from pymavlink import mavutil
+
+from modules.mavlink_io import packet_template
+
+
+PACKET_COUNT = 200000
+
+
+class NullFile:
+    """
+    Discards every frame.
+    """
+
+    def write(self, buf: bytes) -> None:
+        """
+        Does nothing.
+        """
+
+
+def create_encoder() -> mavutil.mavlink.MAVLink:
+    """
+    Encoder like that of a worker connection.
+    """
+    return mavutil.mavlink.MAVLink(NullFile(), srcSystem=255, srcComponent=0)
+
+
+def heartbeat_send() -> float:
+    """
+    Returns the seconds taken to send every packet.
+    """
+    mav = create_encoder()
+    start_time = time.perf_counter()
+    for _ in range(PACKET_COUNT):
+        mav.heartbeat_send(
+            mavutil.mavlink.MAV_TYPE_GCS,
+            mavutil.mavlink.MAV_AUTOPILOT_INVALID,
+            0,
+            0,
+            mavutil.mavlink.MAV_STATE_ACTIVE,
+        )
+
+    return time.perf_counter() - start_time
+
+
+def heartbeat_template() -> float:
+    """
+    Returns the seconds taken to send every packet.
+    """
+    mav = create_encoder()
+    _, heartbeat = packet_template.PacketTemplate.create(
+        mav,
+        mav.heartbeat_encode(
+            mavutil.mavlink.MAV_TYPE_GCS,
+            mavutil.mavlink.MAV_AUTOPILOT_INVALID,
+            0,
+            0,
+            mavutil.mavlink.MAV_STATE_ACTIVE,
+        ),
+    )
+    # Get Pylance to stop complaining
+    assert heartbeat is not None
+
+    start_time = time.perf_counter()
+    for _ in range(PACKET_COUNT):
+        heartbeat.send()
+
+    return time.perf_counter() - start_time
+
+
+def yaw_send() -> float:
+    """
+    Returns the seconds taken to send every packet.
+    """
+    mav = create_encoder()
+    start_time = time.perf_counter()
+    for i in range(PACKET_COUNT):
+        mav.command_long_send(
+            1, 0, mavutil.mavlink.MAV_CMD_CONDITION_YAW, 0, i % 360 - 180, 5.0, -1, 1, 0, 0, 0
+        )
+
+    return time.perf_counter() - start_time
+
+
+def yaw_template() -> float:
+    """
+    Returns the seconds taken to send every packet.
+    """
+    mav = create_encoder()
+    _, change_yaw = packet_template.PacketTemplate.create(
+        mav,
+        mav.command_long_encode(
+            1, 0, mavutil.mavlink.MAV_CMD_CONDITION_YAW, 0, 0, 5.0, 0, 1, 0, 0, 0
+        ),
+        ["param1", "param3"],
+    )
+    # Get Pylance to stop complaining
+    assert change_yaw is not None
+
+    start_time = time.perf_counter()
+    for i in range(PACKET_COUNT):
+        change_yaw.send(i % 360 - 180, -1)
+
+    return time.perf_counter() - start_time
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    senders = {
+        "HEARTBEAT *_send": heartbeat_send,
+        "HEARTBEAT template": heartbeat_template,
+        "COMMAND_LONG *_send": yaw_send,
+        "COMMAND_LONG template": yaw_template,
+    }
+
+    for name, send in senders.items():
+        duration = send()
+        print(
+            f"{name:>21}: {PACKET_COUNT / duration:9.0f} packets/s, "
+            f"{duration / PACKET_COUNT * 1000000:5.2f} us/packet"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
@@ -0,0 +1,88 @@
+"""
+Benchmark queue backends across a process boundary. To run:
+```
+python -m tests.benchmarks.benchmark_queue_backends
+```
+"""
+
+import multiprocessing as mp
+import time
+
+from utilities.workers import batch_queue
+from utilities.workers import queue_proxy_wrapper
+
+
+ITEM_COUNT = 20000
+QUEUE_MAX_SIZE = 10
+# In process queues live in the memory of one process, a forked producer puts into its own copy
+CROSS_PROCESS_BACKENDS = [
+    queue_proxy_wrapper.QueueBackend.MANAGER,
+    queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+    queue_proxy_wrapper.QueueBackend.LATEST_VALUE,
+]
+
+# Roughly the shape of a telemetry sample and of a command report
+TELEMETRY_ITEM = (1234,) + tuple(float(i) for i in range(12))
+REPORT_ITEM = "CHANGE YAW: -12.34"
+
+
+def produce(item: object, count: int, output_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+    """
+    Producer process.
+    """
+    for _ in range(count):
+        output_queue.queue.put(item)
+
+    output_queue.queue.put(None)
+
+
+def measure(
+    item: object,
+    backend: queue_proxy_wrapper.QueueBackend,
+    mp_manager: "mp.managers.SyncManager",
+) -> float:
+    """
+    Returns items per second moved from a producer process to main.
+    """
+    test_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE, backend)
+
+    producer = mp.Process(target=produce, args=(item, ITEM_COUNT, test_queue))
+    start_time = time.perf_counter()
+    producer.start()
+    while test_queue.queue.get() is not None:
+        pass
+
+    elapsed_time = time.perf_counter() - start_time
+    producer.join()
+    test_queue.close()
+
+    return ITEM_COUNT / elapsed_time
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    mp_manager = batch_queue.start_manager()
+
+    for name, item in [("telemetry", TELEMETRY_ITEM), ("report", REPORT_ITEM)]:
+        rates = {}
+        for backend in CROSS_PROCESS_BACKENDS:
+            rates[backend] = measure(item, backend, mp_manager)
+            print(f"{name:>10} {backend.name:>14}: {rates[backend]:>12.0f} items/s")
+
+        speedup = (
+            rates[queue_proxy_wrapper.QueueBackend.SHARED_MEMORY]
+            / rates[queue_proxy_wrapper.QueueBackend.MANAGER]
+        )
+        print(f"{name:>10} {'speedup':>14}: {speedup:>12.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
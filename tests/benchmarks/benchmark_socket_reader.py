@@ -0,0 +1,157 @@
+"""
+Benchmark system calls and CPU time per received message at increasing telemetry rates,
+with `select()` and `recv_msg()` and with the epoll SocketReader . To run:
+```
+python -m tests.benchmarks.benchmark_socket_reader
+```
+"""
+
+import multiprocessing as mp
+import socket
+import time
+
+from pymavlink import mavutil
+
+from modules.mavlink_io import socket_reader
+
+
+# Messages per second
+MESSAGE_RATES = [100, 1000, 10000]
+DURATION = 2.0  # seconds
+# Sent in bursts like an autopilot stream, every period
+BURST_PERIOD = 0.005  # seconds
+# Receiving stops once nothing arrives for this long
+IDLE_TIMEOUT = 0.5  # seconds
+
+
+def run_drone(drone_socket: socket.socket, message_rate: int) -> None:
+    """
+    Sends ATTITUDE at the rate, then closes the connection.
+    """
+    sender = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+    frame = sender.attitude_encode(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0).pack(sender)
+    burst_count = max(1, int(message_rate * BURST_PERIOD))
+    period = burst_count / message_rate
+
+    next_time = time.monotonic()
+    end_time = next_time + DURATION
+    while next_time < end_time:
+        time.sleep(max(0.0, next_time - time.monotonic()))
+        drone_socket.sendall(frame * burst_count)
+        next_time += period
+
+    time.sleep(IDLE_TIMEOUT * 2)
+    drone_socket.close()
+
+
+def receive_recv_msg(connection: mavutil.mavfile) -> "tuple[int, int]":
+    """
+    Waits with select() and reads with recv_msg() until idle.
+
+    Returns the number of messages and system calls.
+    """
+    recv = connection.recv
+    recv_count = 0
+
+    def counting_recv(n: "int | None" = None) -> bytes:
+        nonlocal recv_count
+        recv_count += 1
+        return recv(n)
+
+    connection.recv = counting_recv
+
+    message_count = 0
+    select_count = 0
+    while True:
+        select_count += 1
+        if not connection.select(IDLE_TIMEOUT):
+            break
+
+        while connection.recv_msg() is not None:
+            message_count += 1
+
+    return message_count, select_count + recv_count
+
+
+def receive_socket_reader(connection: mavutil.mavfile) -> "tuple[int, int]":
+    """
+    Waits with epoll and reads everything available until idle.
+
+    Returns the number of messages and system calls.
+    """
+    _, reader = socket_reader.SocketReader.create(connection)
+    # Get Pylance to stop complaining
+    assert reader is not None
+
+    wait_count = 0
+    while True:
+        wait_count += 1
+        if not reader.wait(IDLE_TIMEOUT):
+            break
+
+        reader.read()
+
+    reader.close()
+    return reader.get_message_count(), wait_count + reader.get_read_count()
+
+
+def measure(
+    receive: "(mavutil.mavfile) -> tuple[int, int]", message_rate: int  # type: ignore
+) -> "tuple[int, float, float]":
+    """
+    Receives from the drone at the rate.
+
+    Returns the messages received, and the system calls and CPU time per message.
+    """
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        connection = mavutil.mavlink_connection(f"tcp:127.0.0.1:{server.getsockname()[1]}")
+        drone_socket, _ = server.accept()
+
+    # Forked, so the drone keeps its end of the connection
+    drone = mp.Process(target=run_drone, args=(drone_socket, message_rate))
+    drone.start()
+    drone_socket.close()
+
+    cpu_start = time.process_time()
+    message_count, system_call_count = receive(connection)
+    cpu_time = time.process_time() - cpu_start
+
+    drone.join()
+    connection.close()
+
+    message_count = max(message_count, 1)
+    return message_count, system_call_count / message_count, cpu_time / message_count
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    receivers = {
+        "recv_msg": receive_recv_msg,
+        "socket_reader": receive_socket_reader,
+    }
+
+    for message_rate in MESSAGE_RATES:
+        for name, receive in receivers.items():
+            message_count, system_calls_per_message, cpu_per_message = measure(
+                receive, message_rate
+            )
+            print(
+                f"{message_rate:6} messages/s {name:>14}: "
+                f"{message_count:6} received, "
+                f"{system_calls_per_message:6.3f} system calls/message, "
+                f"CPU {cpu_per_message * 1000000:6.1f} us/message"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    mp.set_start_method("fork")
+
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
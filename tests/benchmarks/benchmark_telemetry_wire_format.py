@@ -0,0 +1,81 @@
+"""
+Benchmark the telemetry binary encoding against plain pickling. To run:
+```
+python -m tests.benchmarks.benchmark_telemetry_wire_format
+```
+"""
+
+import copyreg
+import io
+import pickle
+import timeit
+
+from modules.telemetry import telemetry
+from modules.telemetry import telemetry_wire_format
+
+
+REPEAT_COUNT = 100000
+
+
+class AttributePickler(pickle.Pickler):
+    """
+    Pickles TelemetryData the default way, with its class path and attribute dictionary.
+    """
+
+    def reducer_override(self, obj: object) -> object:
+        """
+        Reduces TelemetryData as the default object reduction would.
+        """
+        if isinstance(obj, telemetry.TelemetryData):
+            return copyreg.__newobj__, (type(obj),), vars(obj)
+
+        return NotImplemented
+
+
+def attribute_pickle(telemetry_data: telemetry.TelemetryData) -> bytes:
+    """
+    Pickles as TelemetryData did before the binary encoding.
+    """
+    stream = io.BytesIO()
+    AttributePickler(stream, pickle.HIGHEST_PROTOCOL).dump(telemetry_data)
+    return stream.getvalue()
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    telemetry_data = telemetry.TelemetryData(
+        123456, 1.0, 2.0, -3.0, 0.5, 0.25, 0.0, 0.01, -0.02, 1.57, 0.0, 0.0, 3.14
+    )
+
+    attribute_data = attribute_pickle(telemetry_data)
+    wire_pickle_data = pickle.dumps(telemetry_data, pickle.HIGHEST_PROTOCOL)
+    wire_data = telemetry_wire_format.encode(telemetry_data)
+
+    print(f"{'bytes per sample, attribute pickle':>40}: {len(attribute_data)}")
+    print(f"{'bytes per sample, binary pickle':>40}: {len(wire_pickle_data)}")
+    print(f"{'bytes per sample, binary encoding':>40}: {len(wire_data)}")
+
+    cases = {
+        "attribute pickle dumps": lambda: attribute_pickle(telemetry_data),
+        "attribute pickle loads": lambda: pickle.loads(attribute_data),
+        "binary pickle dumps": lambda: pickle.dumps(telemetry_data, pickle.HIGHEST_PROTOCOL),
+        "binary pickle loads": lambda: pickle.loads(wire_pickle_data),
+        "binary encode": lambda: telemetry_wire_format.encode(telemetry_data),
+        "binary decode": lambda: telemetry_wire_format.decode_fields(wire_data),
+        "binary view one field": lambda: telemetry_wire_format.TelemetryDataView(wire_data).z,
+    }
+    for name, case in cases.items():
+        elapsed_time = timeit.timeit(case, number=REPEAT_COUNT)
+        print(f"{name:>40}: {elapsed_time / REPEAT_COUNT * 1e6:.3f} us")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
@@ -0,0 +1,141 @@
+"""
+Benchmark the wake up jitter of a periodic worker, like the heartbeat sender,
+while other workers load every core, with and without CPU sets and a higher priority. To run:
+```
+python -m tests.benchmarks.benchmark_worker_scheduling
+```
+Raising the priority needs CAP_SYS_NICE , without it only the CPU sets apply.
+"""
+
+import multiprocessing as mp
+import os
+import statistics
+import tempfile
+import time
+
+from utilities.workers import warm_process
+from utilities.workers import worker_execution
+
+
+# Faster than the 1 Hz heartbeat to collect enough wake ups
+PERIOD = 0.01  # seconds
+DURATION = 5.0  # seconds
+CRITICAL_NICE = -5
+# Writes like a logger flushing to disk
+LOG_WRITE_SIZE = 4096  # bytes
+
+
+def periodic_worker(lateness_queue: "mp.Queue") -> None:
+    """
+    Wakes up every period, measuring how late each wake up is.
+    """
+    latenesses = []
+    next_time = time.monotonic() + PERIOD
+    end_time = next_time + DURATION
+    while next_time < end_time:
+        time.sleep(max(0.0, next_time - time.monotonic()))
+        latenesses.append(time.monotonic() - next_time)
+        next_time += PERIOD
+
+    lateness_queue.put(latenesses)
+
+
+def busy_worker(exit_event: "mp.Event") -> None:  # type: ignore
+    """
+    Uses a whole core, like a telemetry burst.
+    """
+    while not exit_event.is_set():
+        for _ in range(10000):
+            pass
+
+
+def logging_worker(exit_event: "mp.Event") -> None:  # type: ignore
+    """
+    Writes and flushes to disk continuously.
+    """
+    with tempfile.TemporaryFile() as log_file:
+        while not exit_event.is_set():
+            log_file.write(b"x" * LOG_WRITE_SIZE)
+            log_file.flush()
+            os.fsync(log_file.fileno())
+            if log_file.tell() > 2**24:
+                log_file.seek(0)
+
+
+def measure(critical_cpu_set: "list[int] | None", other_cpu_set: "list[int] | None", critical_nice: "int | None") -> "tuple[list[float], str]":  # type: ignore
+    """
+    Runs the periodic worker against the load.
+
+    Returns the latenesses, and the reason if the scheduling could not be applied.
+    """
+    exit_event = mp.Event()
+    load_workers = [
+        warm_process.WarmProcess(busy_worker, (exit_event,)) for _ in range(os.cpu_count() or 1)
+    ]
+    load_workers.append(warm_process.WarmProcess(logging_worker, (exit_event,)))
+
+    lateness_queue = mp.Queue()
+    critical_worker = warm_process.WarmProcess(periodic_worker, (lateness_queue,))
+
+    reasons = []
+    for worker in load_workers:
+        worker.warm()
+        _, reason = worker_execution.set_process_scheduling(worker.pid, other_cpu_set, None)
+        reasons.append(reason)
+
+    critical_worker.warm()
+    _, reason = worker_execution.set_process_scheduling(
+        critical_worker.pid, critical_cpu_set, critical_nice
+    )
+    reasons.append(reason)
+
+    for worker in load_workers:
+        worker.release()
+
+    critical_worker.release()
+    latenesses = lateness_queue.get()
+
+    exit_event.set()
+    for worker in load_workers + [critical_worker]:
+        worker.join()
+
+    return latenesses, "; ".join(sorted(set(reason for reason in reasons if reason != "")))
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    available_cpus = sorted(os.sched_getaffinity(0))
+    critical_cpu_set = available_cpus[-1:]
+    other_cpu_set = available_cpus[:-1] if len(available_cpus) > 1 else available_cpus
+
+    configurations = {
+        "shared": (None, None, None),
+        "priority": (None, None, CRITICAL_NICE),
+        "isolated": (critical_cpu_set, other_cpu_set, None),
+        "isolated+priority": (critical_cpu_set, other_cpu_set, CRITICAL_NICE),
+    }
+
+    print(f"{len(available_cpus)} CPUs, critical worker on {critical_cpu_set}")
+    for name, (critical_cpus, other_cpus, nice) in configurations.items():
+        latenesses, reason = measure(critical_cpus, other_cpus, nice)
+        latenesses.sort()
+        print(
+            f"{name:>20}: "
+            f"lateness median {statistics.median(latenesses) * 1000:7.3f} ms "
+            f"p99 {latenesses[int(len(latenesses) * 0.99)] * 1000:7.3f} ms "
+            f"max {latenesses[-1] * 1000:7.3f} ms"
+        )
+        if reason != "":
+            print(f"{'':>20}  not applied: {reason}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
@@ -0,0 +1,128 @@
+"""
+Benchmark the time from starting a worker to its first output, cold, from a warm process,
+and from a hot standby that has already set up, for each start method. To run:
+```
+python -m tests.benchmarks.benchmark_worker_startup
+```
+"""
+
+import multiprocessing as mp
+import statistics
+import time
+
+# Imported by the workers, as the real workers do
+from pymavlink import mavutil  # pylint: disable=unused-import
+
+from utilities.workers import warm_process
+from utilities.workers import worker_standby
+
+
+REPEAT_COUNT = 10
+WARM_UP_TIME = 0.5  # seconds
+# Stands in for creating the logger and module object, and connecting
+SETUP_TIME = 0.05  # seconds
+
+# The heavy import of the workers, the forkserver skips modules that fail to import
+FORKSERVER_PRELOAD_MODULES = ["pymavlink.mavutil"]
+
+
+def report_started(started: "mp.synchronize.Event") -> None:
+    """
+    Worker target, sets up then its first output is signalling that it runs.
+    """
+    time.sleep(SETUP_TIME)
+    if not worker_standby.wait_until_active():
+        return
+
+    started.set()
+
+
+def measure_cold(context: mp.context.BaseContext) -> float:
+    """
+    Returns the time from starting a new process to its first output.
+    """
+    started = context.Event()
+    worker = context.Process(target=report_started, args=(started,))
+
+    start_time = time.perf_counter()
+    worker.start()
+    started.wait()
+    elapsed_time = time.perf_counter() - start_time
+
+    worker.join()
+    return elapsed_time
+
+
+def measure_warm(context: mp.context.BaseContext) -> float:
+    """
+    Returns the time from releasing a warm process to its first output.
+    """
+    started = context.Event()
+    worker = warm_process.WarmProcess(report_started, (started,), context)
+    worker.warm()
+    # Let the interpreter finish starting, as a spare would have
+    time.sleep(WARM_UP_TIME)
+
+    start_time = time.perf_counter()
+    worker.release()
+    started.wait()
+    elapsed_time = time.perf_counter() - start_time
+
+    worker.join()
+    return elapsed_time
+
+
+def measure_hot(context: mp.context.BaseContext) -> float:
+    """
+    Returns the time from releasing a hot standby to its first output.
+    """
+    started = context.Event()
+    worker = warm_process.WarmProcess(report_started, (started,), context, is_hot=True)
+    worker.warm()
+    # Let the setup finish, as a standby would have
+    time.sleep(WARM_UP_TIME)
+
+    start_time = time.perf_counter()
+    worker.release()
+    started.wait()
+    elapsed_time = time.perf_counter() - start_time
+
+    worker.join()
+    return elapsed_time
+
+
+def main() -> int:
+    """
+    Main function.
+    """
+    mp.set_forkserver_preload(FORKSERVER_PRELOAD_MODULES)
+
+    for start_method in ["fork", "forkserver", "spawn"]:
+        context = mp.get_context(start_method)
+
+        # The first forkserver start also starts the server
+        measure_cold(context)
+
+        cold_times = [measure_cold(context) for _ in range(REPEAT_COUNT)]
+        warm_times = [measure_warm(context) for _ in range(REPEAT_COUNT)]
+        hot_times = [measure_hot(context) for _ in range(REPEAT_COUNT)]
+
+        print(
+            f"{start_method:>10}: "
+            f"cold median {statistics.median(cold_times) * 1000:8.3f} ms "
+            f"max {max(cold_times) * 1000:8.3f} ms, "
+            f"warm median {statistics.median(warm_times) * 1000:8.3f} ms "
+            f"max {max(warm_times) * 1000:8.3f} ms, "
+            f"hot median {statistics.median(hot_times) * 1000:8.3f} ms "
+            f"max {max(hot_times) * 1000:8.3f} ms"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
+
+    print("Done!")
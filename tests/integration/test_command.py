@@ -17,6 +17,7 @@ from modules.common.modules.logger import logger_main_setup
 from modules.common.modules.read_yaml import read_yaml
 from modules.telemetry import telemetry
 from utilities.workers import queue_proxy_wrapper
+from utilities.workers import queue_selector
 from utilities.workers import worker_controller
 
 
@@ -79,8 +80,7 @@ def read_queue(
         return
 
     while not controller.is_exit_requested():
-        if not report_queue.queue.empty():
-            change = report_queue.queue.get()
+        for change in report_queue.get_many(REPORT_QUEUE_MAX_SIZE, 0.1):
             main_logger.info(change, True)
 
 
@@ -95,7 +95,7 @@ def put_queue(
     for telemetry_data in path:
         if controller.is_exit_requested():
             break
-        telemetry_queue.queue.put(telemetry_data)
+        telemetry_queue.put(telemetry_data)
         time.sleep(TELEMETRY_PERIOD)
 
 
@@ -151,6 +151,10 @@ def main() -> int:
     # Create your queues
     telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, TELEMETRY_QUEUE_MAX_SIZE)
     report_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, REPORT_QUEUE_MAX_SIZE)
+    # The worker waits on telemetry and on exit requests at once
+    telemetry_selector = queue_selector.QueueSelector()
+    telemetry_selector.register(telemetry_queue)
+    telemetry_selector.register_controller(controller)
     # Test cases, DO NOT EDIT!
     path = [
         # Test singular points
@@ -249,6 +253,7 @@ def main() -> int:
     command_worker.command_worker(
         connection,
         TARGET,
+        telemetry_selector,
         telemetry_queue,
         report_queue,
         controller,
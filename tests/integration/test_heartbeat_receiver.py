@@ -5,7 +5,6 @@ Test the heartbeat reciever worker with a mocked drone.
 import multiprocessing as mp
 import subprocess
 import threading
-import time
 
 from pymavlink import mavutil
 
@@ -69,10 +68,9 @@ def read_queue(
     Read and print the output queue.
     """
     while not controller.is_exit_requested():
-        if not report_queue.queue.empty():
-            status = report_queue.queue.get()
+        # Timeout avoids busy waiting
+        for status in report_queue.get_many(REPORT_QUEUE_MAX_SIZE, 0.1):
             main_logger.info(f"Worker status: {status}", True)
-        time.sleep(0.1)  # Small sleep to avoid busy waiting
 
     main_logger.info("Disconnected!", False)
 
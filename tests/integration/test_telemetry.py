@@ -5,7 +5,6 @@ Test the telemetry worker with a mocked drone.
 import multiprocessing as mp
 import subprocess
 import threading
-import time
 
 from pymavlink import mavutil
 
@@ -67,10 +66,8 @@ def read_queue(
     Read and print the output queue.
     """
     while not controller.is_exit_requested():
-        if not telemetry_queue.queue.empty():
-            telemetry_data = telemetry_queue.queue.get()
+        for telemetry_data in telemetry_queue.get_many(MX_QUEUE, 0.1):
             main_logger.info(f"Received telemetry: {telemetry_data}", True)
-        time.sleep(0.1)
 
 
 # =================================================================================================
@@ -0,0 +1,176 @@
+"""
+Test reading MAVLink messages on an event loop.
+"""
+
+import asyncio
+import socket
+
+import pytest
+from pymavlink import mavutil
+
+from modules.mavlink_io import async_reader
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+RECEIVE_TIMEOUT = 5.0  # seconds
+# Long enough for the event loop to handle everything sent
+READ_WAIT = 0.2  # seconds
+
+
+@pytest.fixture
+def connected_pair() -> "tuple[mavutil.mavfile, socket.socket]":  # type: ignore
+    """
+    MAVLink TCP connection and the socket of the other end.
+    """
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        connection = mavutil.mavlink_connection(f"tcp:127.0.0.1:{server.getsockname()[1]}")
+        drone_socket, _ = server.accept()
+
+    yield connection, drone_socket
+
+    drone_socket.close()
+    connection.close()
+
+
+def pack_heartbeat(sender: mavutil.mavlink.MAVLink, custom_mode: int) -> bytes:
+    """
+    Heartbeat, numbered by its custom mode.
+    """
+    return sender.heartbeat_encode(
+        mavutil.mavlink.MAV_TYPE_QUADROTOR,
+        mavutil.mavlink.MAV_AUTOPILOT_GENERIC,
+        0,
+        custom_mode,
+        mavutil.mavlink.MAV_STATE_ACTIVE,
+    ).pack(sender)
+
+
+def pack_attitude(sender: mavutil.mavlink.MAVLink) -> bytes:
+    """
+    Attitude message.
+    """
+    return sender.attitude_encode(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0).pack(sender)
+
+
+class TestAsyncMavlinkReader:
+    """
+    Delivering messages to subscribers.
+    """
+
+    def test_create_requires_socket(self) -> None:
+        """
+        Connections without a socket cannot be read on the event loop.
+        """
+        # Setup
+        connection = mavutil.mavlink_connection("udpout:127.0.0.1:14550")
+        connection.port.close()
+        connection.port = None
+
+        # Run
+        result, reader = async_reader.AsyncMavlinkReader.create(connection)
+
+        # Test
+        assert not result
+        assert reader is None
+
+    def test_delivers_by_type(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        Each message goes to the queues subscribed to its type, in order.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        sender = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+        result, reader = async_reader.AsyncMavlinkReader.create(connection)
+        assert result
+
+        async def receive() -> "tuple[list[int], list[str]]":
+            heartbeats = reader.subscribe(["HEARTBEAT"], 10)
+            everything = reader.subscribe(["HEARTBEAT", "ATTITUDE"], 10)
+            reader.start()
+            drone_socket.sendall(
+                pack_heartbeat(sender, 1) + pack_attitude(sender) + pack_heartbeat(sender, 2)
+            )
+
+            custom_modes = []
+            for _ in range(2):
+                msg = await asyncio.wait_for(heartbeats.get(), RECEIVE_TIMEOUT)
+                custom_modes.append(msg.custom_mode)
+
+            types = []
+            for _ in range(3):
+                msg = await asyncio.wait_for(everything.get(), RECEIVE_TIMEOUT)
+                types.append(msg.get_type())
+
+            reader.stop()
+            return custom_modes, types
+
+        # Run
+        custom_modes, types = asyncio.run(receive())
+
+        # Test
+        assert custom_modes == [1, 2]
+        assert types == ["HEARTBEAT", "ATTITUDE", "HEARTBEAT"]
+        # The connection knows what arrived, as if it had received it
+        assert connection.messages["HEARTBEAT"].custom_mode == 2
+
+    def test_full_queue_drops_oldest(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        A full queue keeps the newest messages.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        sender = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+        result, reader = async_reader.AsyncMavlinkReader.create(connection)
+        assert result
+
+        async def receive() -> "list[int]":
+            heartbeats = reader.subscribe(["HEARTBEAT"], 2)
+            reader.start()
+            drone_socket.sendall(b"".join(pack_heartbeat(sender, i) for i in range(5)))
+            await asyncio.sleep(READ_WAIT)
+            reader.stop()
+
+            return [heartbeats.get_nowait().custom_mode for _ in range(heartbeats.qsize())]
+
+        # Run
+        custom_modes = asyncio.run(receive())
+
+        # Test
+        assert custom_modes == [3, 4]
+
+    def test_stops_when_closed(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        The reader stops once the other end closes the connection.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        result, reader = async_reader.AsyncMavlinkReader.create(connection)
+        assert result
+
+        async def receive() -> bool:
+            reader.start()
+            is_closed_before = reader.is_closed()
+            drone_socket.close()
+            await asyncio.sleep(READ_WAIT)
+
+            return is_closed_before
+
+        # Run
+        is_closed_before = asyncio.run(receive())
+
+        # Test
+        assert not is_closed_before
+        assert reader.is_closed()
@@ -0,0 +1,108 @@
+"""
+Test the command worker reacting to exit requests.
+"""
+
+import threading
+import time
+
+from pymavlink import mavutil
+
+from modules.command import command
+from modules.command import command_worker
+from modules.telemetry import telemetry
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import queue_selector
+from utilities.workers import worker_controller
+
+
+TARGET = command.Position(10, 20, 30)
+QUEUE_MAX_SIZE = 4
+RECEIVE_TIMEOUT = 5.0  # seconds
+# Well within the telemetry wait timeout of the worker
+EXIT_TIMEOUT = command_worker.TELEMETRY_WAIT_TIMEOUT / 2
+
+
+class RecordingFile:
+    """
+    Keeps every frame written to it.
+    """
+
+    def __init__(self) -> None:
+        self.frames: "list[bytes]" = []
+
+    def write(self, buf: bytes) -> None:
+        """
+        Records the frame.
+        """
+        self.frames.append(bytes(buf))
+
+
+class RecordingConnection:
+    """
+    Stand-in for a connection, recording the sent frames.
+    """
+
+    def __init__(self) -> None:
+        self.mav = mavutil.mavlink.MAVLink(RecordingFile(), srcSystem=255, srcComponent=0)
+
+
+class TestCommandWorker:
+    """
+    Waiting on telemetry and on requests at once.
+    """
+
+    def test_exit_while_waiting(self) -> None:
+        """
+        A worker blocked on telemetry returns soon after exit is requested, sending nothing more.
+        """
+        # Setup
+        controller = worker_controller.WorkerController()
+        telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(
+            None, 1, queue_proxy_wrapper.QueueBackend.LATEST_VALUE
+        )
+        report_queue = queue_proxy_wrapper.QueueProxyWrapper(
+            None, QUEUE_MAX_SIZE, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY
+        )
+        telemetry_selector = queue_selector.QueueSelector()
+        telemetry_selector.register(telemetry_queue)
+        telemetry_selector.register_controller(controller)
+        connection = RecordingConnection()
+
+        worker = threading.Thread(
+            target=command_worker.command_worker,
+            args=(
+                connection,
+                TARGET,
+                telemetry_selector,
+                telemetry_queue,
+                report_queue,
+                controller,
+            ),
+        )
+        worker.start()
+
+        # Below the target, so the worker sends a command and reports it
+        telemetry_queue.put(
+            telemetry.TelemetryData(x=0, y=0, z=20, yaw=0, x_velocity=0, y_velocity=0, z_velocity=0)
+        )
+        report = report_queue.get(RECEIVE_TIMEOUT)
+
+        # Run
+        start_time = time.monotonic()
+        controller.request_exit()
+        worker.join(EXIT_TIMEOUT)
+        exit_time = time.monotonic() - start_time
+        is_alive = worker.is_alive()
+
+        # Let a worker that did not exit finish, so the test ends either way
+        telemetry_queue.fill_queue_with_sentinel()
+        worker.join()
+
+        # Test
+        assert report.startswith("CHANGE ALTITUDE")
+        assert not is_alive
+        assert exit_time < EXIT_TIMEOUT
+        assert report_queue.get_many(QUEUE_MAX_SIZE) == []
+        assert len(connection.mav.file.frames) == 1
+
+        report_queue.close()
@@ -0,0 +1,100 @@
+"""
+Test the latest value mailbox.
+"""
+
+import multiprocessing as mp
+import queue
+
+import pytest
+
+from utilities.workers import latest_value_mailbox
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+MAILBOX_SLOT_SIZE = 256  # bytes
+
+
+@pytest.fixture()
+def mailbox() -> latest_value_mailbox.LatestValueMailbox:  # type: ignore
+    """
+    Creates an empty mailbox.
+    """
+    yield latest_value_mailbox.LatestValueMailbox(MAILBOX_SLOT_SIZE)  # type: ignore
+
+
+def produce(mailbox_to_fill: latest_value_mailbox.LatestValueMailbox, count: int) -> None:
+    """
+    Producer process.
+    """
+    for i in range(count):
+        mailbox_to_fill.put(i)
+
+
+class TestLatestValueMailbox:
+    """
+    Overwrite semantics.
+    """
+
+    def test_overwrite(self, mailbox: latest_value_mailbox.LatestValueMailbox) -> None:
+        """
+        Only the newest value is taken, with a count of the overwritten ones.
+        """
+        # Run
+        for i in range(5):
+            mailbox.put_nowait(i)
+
+        actual, skipped = mailbox.get_latest(timeout=1.0)
+
+        # Test
+        assert actual == 4
+        assert skipped == 4
+        assert mailbox.empty()
+
+    def test_taken_once(self, mailbox: latest_value_mailbox.LatestValueMailbox) -> None:
+        """
+        A value is not delivered twice.
+        """
+        # Run
+        mailbox.put("telemetry")
+        actual = mailbox.get(timeout=1.0)
+
+        # Test
+        assert actual == "telemetry"
+        with pytest.raises(queue.Empty):
+            mailbox.get(timeout=0.01)
+
+        assert mailbox.get_many(4, 0.01) == []
+
+    def test_put_many(self, mailbox: latest_value_mailbox.LatestValueMailbox) -> None:
+        """
+        A batch counts every item but keeps the last.
+        """
+        # Run
+        mailbox.put_many([1, 2, 3])
+        actual, skipped = mailbox.get_latest(False)
+
+        # Test
+        assert actual == 3
+        assert skipped == 2
+
+    def test_never_full(self, mailbox: latest_value_mailbox.LatestValueMailbox) -> None:
+        """
+        A producer process never blocks, and the last value survives.
+        """
+        # Setup
+        count = 1000
+
+        # Run
+        producer = mp.Process(target=produce, args=(mailbox, count))
+        producer.start()
+        producer.join(timeout=10.0)
+        actual, skipped = mailbox.get_latest(timeout=1.0)
+
+        # Test
+        assert not mailbox.full()
+        assert actual == count - 1
+        assert skipped == count - 1
@@ -0,0 +1,272 @@
+"""
+Test routing MAVLink messages through one owner of the connection.
+"""
+
+import socket
+import threading
+
+import pytest
+from pymavlink import mavutil
+
+from modules.mavlink_io import router
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+RECEIVE_TIMEOUT = 5.0  # seconds
+OUTBOUND_MAX_SIZE = 16
+# Far more than a pipe holds
+FLOOD_COUNT = 10000
+SENDER_COUNT = 2
+
+
+@pytest.fixture
+def connected_pair() -> "tuple[mavutil.mavfile, socket.socket]":  # type: ignore
+    """
+    MAVLink TCP connection and the socket of the other end.
+    """
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        connection = mavutil.mavlink_connection(f"tcp:127.0.0.1:{server.getsockname()[1]}")
+        drone_socket, _ = server.accept()
+
+    yield connection, drone_socket
+
+    drone_socket.close()
+    connection.close()
+
+
+def start_routing(mavlink_router: router.MavlinkRouter) -> "tuple[threading.Thread, threading.Event]":  # type: ignore
+    """
+    Routes in a thread until the event is set.
+    """
+    exit_event = threading.Event()
+    route_thread = threading.Thread(target=mavlink_router.route, args=(exit_event.is_set,))
+    route_thread.start()
+
+    return route_thread, exit_event
+
+
+def pack_heartbeat(sender: mavutil.mavlink.MAVLink, custom_mode: int) -> bytes:
+    """
+    Heartbeat, numbered by its custom mode.
+    """
+    return sender.heartbeat_encode(
+        mavutil.mavlink.MAV_TYPE_QUADROTOR,
+        mavutil.mavlink.MAV_AUTOPILOT_GENERIC,
+        0,
+        custom_mode,
+        mavutil.mavlink.MAV_STATE_ACTIVE,
+    ).pack(sender)
+
+
+def pack_attitude(sender: mavutil.mavlink.MAVLink) -> bytes:
+    """
+    Attitude message.
+    """
+    return sender.attitude_encode(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0).pack(sender)
+
+
+class TestMavlinkRouter:
+    """
+    Routing in both directions.
+    """
+
+    def test_create_requires_socket(self) -> None:
+        """
+        Connections without a socket cannot be routed.
+        """
+        # Setup
+        connection = mavutil.mavlink_connection("udpout:127.0.0.1:14550")
+        connection.port.close()
+        connection.port = None
+
+        # Run
+        result, mavlink_router = router.MavlinkRouter.create(connection, OUTBOUND_MAX_SIZE)
+
+        # Test
+        assert not result
+        assert mavlink_router is None
+
+    def test_routes_by_type(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        Each connection receives the subscribed types, in order.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        sender = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+        result, mavlink_router = router.MavlinkRouter.create(connection, OUTBOUND_MAX_SIZE)
+        assert result
+        assert mavlink_router is not None
+
+        heartbeats = mavlink_router.create_connection(["HEARTBEAT"])
+        everything = mavlink_router.create_connection(["HEARTBEAT", "ATTITUDE"])
+        route_thread, exit_event = start_routing(mavlink_router)
+
+        # Run
+        drone_socket.sendall(
+            pack_heartbeat(sender, 1) + pack_attitude(sender) + pack_heartbeat(sender, 2)
+        )
+
+        custom_modes = []
+        for _ in range(2):
+            msg = heartbeats.recv_match(type="HEARTBEAT", blocking=True, timeout=RECEIVE_TIMEOUT)
+            custom_modes.append(msg.custom_mode)
+
+        types = []
+        for _ in range(3):
+            msg = everything.recv_match(blocking=True, timeout=RECEIVE_TIMEOUT)
+            types.append(msg.get_type())
+
+        exit_event.set()
+        route_thread.join()
+
+        # Test
+        assert custom_modes == [1, 2]
+        assert types == ["HEARTBEAT", "ATTITUDE", "HEARTBEAT"]
+        # Nothing else was routed, and without blocking nothing is waited for
+        assert heartbeats.recv_match(type="HEARTBEAT") is None
+        assert everything.recv_match(blocking=True, timeout=0.0) is None
+        # The connection knows what arrived, as if it had received it
+        assert connection.messages["HEARTBEAT"].custom_mode == 2
+
+    def test_recv_msg(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        Waiting then receiving without blocking, as dispatchers receive.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        sender = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+        result, mavlink_router = router.MavlinkRouter.create(connection, OUTBOUND_MAX_SIZE)
+        assert result
+        assert mavlink_router is not None
+
+        heartbeats = mavlink_router.create_connection(["HEARTBEAT"])
+        route_thread, exit_event = start_routing(mavlink_router)
+
+        # Run
+        drone_socket.sendall(pack_heartbeat(sender, 1))
+        is_ready = heartbeats.select(RECEIVE_TIMEOUT)
+        msg = heartbeats.recv_msg()
+        msg_empty = heartbeats.recv_msg()
+
+        exit_event.set()
+        route_thread.join()
+
+        # Test
+        assert is_ready
+        assert msg.custom_mode == 1
+        assert msg_empty is None
+
+    def test_sends_through_router(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        Messages sent on a routed connection reach the other end with the connection's IDs,
+        and are counted in the outbound statistics.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        result, mavlink_router = router.MavlinkRouter.create(connection, OUTBOUND_MAX_SIZE)
+        assert result
+        assert mavlink_router is not None
+
+        send_only = mavlink_router.create_connection()
+        route_thread, exit_event = start_routing(mavlink_router)
+        receiver = mavutil.mavlink.MAVLink(None)
+        drone_socket.settimeout(RECEIVE_TIMEOUT)
+
+        # Run
+        send_only.mav.heartbeat_send(
+            mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0
+        )
+        messages = None
+        while not messages:
+            messages = receiver.parse_buffer(drone_socket.recv(4096))
+
+        exit_event.set()
+        route_thread.join()
+        snapshot = mavlink_router.get_outbound_statistics_snapshot()
+
+        # Test
+        assert messages[0].get_type() == "HEARTBEAT"
+        assert messages[0].get_srcSystem() == connection.source_system
+        assert send_only.recv_match() is None
+        assert snapshot.get_count == 1
+        assert mavlink_router.get_outbound_dropped_count() == 0
+
+    def test_slow_subscriber_drops(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        A connection nobody reads drops messages without holding up the others.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        sender = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+        result, mavlink_router = router.MavlinkRouter.create(connection, OUTBOUND_MAX_SIZE)
+        assert result
+        assert mavlink_router is not None
+
+        mavlink_router.create_connection(["HEARTBEAT"])
+        attitudes = mavlink_router.create_connection(["ATTITUDE"])
+        route_thread, exit_event = start_routing(mavlink_router)
+
+        # Run
+        drone_socket.sendall(
+            b"".join(pack_heartbeat(sender, i) for i in range(FLOOD_COUNT)) + pack_attitude(sender)
+        )
+        msg = attitudes.recv_match(type="ATTITUDE", blocking=True, timeout=RECEIVE_TIMEOUT)
+
+        exit_event.set()
+        route_thread.join()
+
+        # Test
+        assert msg is not None
+        subscriptions = mavlink_router.get_subscriptions()
+        assert 0 < subscriptions[0].get_dropped_count() < FLOOD_COUNT
+        assert subscriptions[1].get_dropped_count() == 0
+
+    def test_renumbers_sent_frames(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        Frames of connections numbering their own frames go out as one sequence,
+        with valid checksums.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        result, mavlink_router = router.MavlinkRouter.create(connection, OUTBOUND_MAX_SIZE)
+        assert result
+        assert mavlink_router is not None
+
+        senders = [mavlink_router.create_connection() for _ in range(SENDER_COUNT)]
+        route_thread, exit_event = start_routing(mavlink_router)
+        receiver = mavutil.mavlink.MAVLink(None)
+        drone_socket.settimeout(RECEIVE_TIMEOUT)
+
+        # Run
+        for i in range(OUTBOUND_MAX_SIZE):
+            senders[i % SENDER_COUNT].mav.attitude_send(i, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+        messages = []
+        while len(messages) < OUTBOUND_MAX_SIZE:
+            messages.extend(receiver.parse_buffer(drone_socket.recv(4096)) or [])
+
+        exit_event.set()
+        route_thread.join()
+
+        # Test
+        assert [msg.get_seq() for msg in messages] == list(range(OUTBOUND_MAX_SIZE))
+        assert receiver.total_receive_errors == 0
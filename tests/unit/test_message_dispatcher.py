@@ -0,0 +1,160 @@
+"""
+Test dispatching received MAVLink messages by ID.
+"""
+
+import socket
+import time
+
+import pytest
+from pymavlink import mavutil
+
+from modules.mavlink_io import message_dispatcher
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+RECEIVE_TIMEOUT = 5.0  # seconds
+EMPTY_TIMEOUT = 0.1  # seconds
+
+
+@pytest.fixture
+def connected_pair() -> "tuple[mavutil.mavfile, socket.socket]":  # type: ignore
+    """
+    MAVLink TCP connection and the socket of the other end.
+    """
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        connection = mavutil.mavlink_connection(f"tcp:127.0.0.1:{server.getsockname()[1]}")
+        drone_socket, _ = server.accept()
+
+    yield connection, drone_socket
+
+    drone_socket.close()
+    connection.close()
+
+
+def pack_heartbeat(sender: mavutil.mavlink.MAVLink, custom_mode: int) -> bytes:
+    """
+    Heartbeat, numbered by its custom mode.
+    """
+    return sender.heartbeat_encode(
+        mavutil.mavlink.MAV_TYPE_QUADROTOR,
+        mavutil.mavlink.MAV_AUTOPILOT_GENERIC,
+        0,
+        custom_mode,
+        mavutil.mavlink.MAV_STATE_ACTIVE,
+    ).pack(sender)
+
+
+def pack_attitude(sender: mavutil.mavlink.MAVLink) -> bytes:
+    """
+    Attitude message.
+    """
+    return sender.attitude_encode(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0).pack(sender)
+
+
+class TestMessageDispatcher:
+    """
+    Receiving and dispatching.
+    """
+
+    def test_register_unknown_type(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        Only existing message types can have handlers.
+        """
+        # Setup
+        connection, _ = connected_pair
+        result, dispatcher = message_dispatcher.MessageDispatcher.create(connection)
+        assert result
+        assert dispatcher is not None
+
+        # Run
+        result_known = dispatcher.register("HEARTBEAT", lambda msg: None)
+        result_unknown = dispatcher.register("NOT_A_MESSAGE", lambda msg: None)
+
+        # Test
+        assert result_known
+        assert not result_unknown
+
+    def test_dispatches_buffered_by_type(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        One receive handles every buffered message, each by the handlers of its type in order.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        sender = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+        result, dispatcher = message_dispatcher.MessageDispatcher.create(connection)
+        assert result
+        assert dispatcher is not None
+
+        calls = []
+        dispatcher.register("HEARTBEAT", lambda msg: calls.append(("first", msg.custom_mode)))
+        dispatcher.register("HEARTBEAT", lambda msg: calls.append(("second", msg.custom_mode)))
+
+        drone_socket.sendall(
+            pack_heartbeat(sender, 1) + pack_attitude(sender) + pack_heartbeat(sender, 2)
+        )
+        # Everything is in the socket buffer
+        time.sleep(EMPTY_TIMEOUT)
+
+        # Run
+        received_count = dispatcher.receive(RECEIVE_TIMEOUT)
+
+        # Test
+        assert received_count == 3
+        assert calls == [("first", 1), ("second", 1), ("first", 2), ("second", 2)]
+
+    def test_receive_waits(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        Receiving waits up to the timeout when nothing is buffered.
+        """
+        # Setup
+        connection, _ = connected_pair
+        result, dispatcher = message_dispatcher.MessageDispatcher.create(connection)
+        assert result
+        assert dispatcher is not None
+
+        # Run
+        start_time = time.monotonic()
+        received_count = dispatcher.receive(EMPTY_TIMEOUT)
+        elapsed_time = time.monotonic() - start_time
+
+        # Test
+        assert received_count == 0
+        assert elapsed_time >= EMPTY_TIMEOUT * 0.9
+
+    def test_closed_connection_waits(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        Once the other end closes, receiving still waits instead of spinning.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        result, dispatcher = message_dispatcher.MessageDispatcher.create(connection)
+        assert result
+        assert dispatcher is not None
+
+        drone_socket.close()
+        dispatcher.receive(EMPTY_TIMEOUT)
+
+        # Run
+        start_time = time.monotonic()
+        received_count = dispatcher.receive(EMPTY_TIMEOUT)
+        elapsed_time = time.monotonic() - start_time
+
+        # Test
+        assert received_count == 0
+        assert elapsed_time >= EMPTY_TIMEOUT * 0.9
@@ -0,0 +1,217 @@
+"""
+Test writing MAVLink frames by priority in coalesced writes.
+"""
+
+import socket
+import time
+
+import pytest
+from pymavlink import mavutil
+
+from modules.mavlink_io import outbound_writer
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+MAX_SIZE = 4
+# Far more than the small send buffer holds
+CONGESTION_COUNT = 2000
+# Small enough to fill quickly
+SEND_BUFFER_SIZE = 4096  # bytes
+RECEIVE_TIMEOUT = 5.0  # seconds
+
+
+@pytest.fixture
+def connected_pair() -> "tuple[mavutil.mavfile, socket.socket]":  # type: ignore
+    """
+    MAVLink TCP connection and the socket of the other end.
+    """
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        connection = mavutil.mavlink_connection(f"tcp:127.0.0.1:{server.getsockname()[1]}")
+        drone_socket, _ = server.accept()
+
+    yield connection, drone_socket
+
+    drone_socket.close()
+    connection.close()
+
+
+def pack_heartbeat(sender: mavutil.mavlink.MAVLink, custom_mode: int) -> bytes:
+    """
+    Heartbeat, numbered by its custom mode.
+    """
+    return sender.heartbeat_encode(
+        mavutil.mavlink.MAV_TYPE_QUADROTOR,
+        mavutil.mavlink.MAV_AUTOPILOT_GENERIC,
+        0,
+        custom_mode,
+        mavutil.mavlink.MAV_STATE_ACTIVE,
+    ).pack(sender)
+
+
+def receive_custom_modes(
+    drone_socket: socket.socket, parser: mavutil.mavlink.MAVLink, count: int
+) -> "list[int]":
+    """
+    Parses heartbeats arriving at the other end until there are at least enough.
+    """
+    drone_socket.settimeout(RECEIVE_TIMEOUT)
+    custom_modes = []
+    while len(custom_modes) < count:
+        data = drone_socket.recv(65536)
+        assert len(data) > 0
+
+        for msg in parser.parse_buffer(data) or []:
+            custom_modes.append(msg.custom_mode)
+
+    return custom_modes
+
+
+class TestOutboundWriter:
+    """
+    Queueing and flushing.
+    """
+
+    def test_create_requires_socket(self) -> None:
+        """
+        Connections without a socket cannot be written directly.
+        """
+        # Setup
+        connection = mavutil.mavlink_connection("udpout:127.0.0.1:14550")
+        connection.port.close()
+        connection.port = None
+
+        # Run
+        result, writer = outbound_writer.OutboundWriter.create(connection, MAX_SIZE)
+
+        # Test
+        assert not result
+        assert writer is None
+
+    def test_create_requires_size(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        Queues must hold at least one frame.
+        """
+        # Setup
+        connection, _ = connected_pair
+
+        # Run
+        result, writer = outbound_writer.OutboundWriter.create(connection, 0)
+
+        # Test
+        assert not result
+        assert writer is None
+
+    def test_priority_order(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        Heartbeats go first, then commands, each in the order they were queued.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        sender = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+        result, writer = outbound_writer.OutboundWriter.create(connection, MAX_SIZE)
+        assert result
+        assert writer is not None
+
+        now = time.monotonic()
+        writer.enqueue(pack_heartbeat(sender, 20), outbound_writer.DEFAULT_PRIORITY, now)
+        writer.enqueue(pack_heartbeat(sender, 10), outbound_writer.COMMAND_PRIORITY, now)
+        writer.enqueue(pack_heartbeat(sender, 11), outbound_writer.COMMAND_PRIORITY, now)
+        writer.enqueue(pack_heartbeat(sender, 0), outbound_writer.HEARTBEAT_PRIORITY, now)
+
+        # Run
+        is_flushed = writer.flush()
+        custom_modes = receive_custom_modes(drone_socket, mavutil.mavlink.MAVLink(None), 4)
+        snapshot = writer.get_statistics_snapshot()
+
+        # Test
+        assert is_flushed
+        assert not writer.has_pending()
+        assert custom_modes == [0, 10, 11, 20]
+        assert snapshot.depth_max == 4
+        assert snapshot.get_count == 4
+
+    def test_full_queue_drops_oldest(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        A full queue keeps the newest frames, other priorities are unaffected.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        sender = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+        result, writer = outbound_writer.OutboundWriter.create(connection, MAX_SIZE)
+        assert result
+        assert writer is not None
+
+        now = time.monotonic()
+        writer.enqueue(pack_heartbeat(sender, 100), outbound_writer.HEARTBEAT_PRIORITY, now)
+
+        # Run
+        for i in range(MAX_SIZE + 2):
+            writer.enqueue(pack_heartbeat(sender, i), outbound_writer.COMMAND_PRIORITY, now)
+
+        depth = writer.get_depth()
+        writer.flush()
+        custom_modes = receive_custom_modes(
+            drone_socket, mavutil.mavlink.MAVLink(None), MAX_SIZE + 1
+        )
+
+        # Test
+        assert depth == MAX_SIZE + 1
+        assert writer.get_dropped_count() == 2
+        assert custom_modes == [100] + list(range(2, MAX_SIZE + 2))
+
+    def test_congestion(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        Frames stay whole when the socket is full, and a later heartbeat goes ahead of
+        everything still queued.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        connection.port.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_SIZE)
+        drone_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SEND_BUFFER_SIZE)
+        sender = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+        result, writer = outbound_writer.OutboundWriter.create(connection, CONGESTION_COUNT)
+        assert result
+        assert writer is not None
+
+        now = time.monotonic()
+        for i in range(1, CONGESTION_COUNT + 1):
+            writer.enqueue(pack_heartbeat(sender, i), outbound_writer.DEFAULT_PRIORITY, now)
+
+        # Run
+        is_flushed = writer.flush()
+        writer.enqueue(pack_heartbeat(sender, 0), outbound_writer.HEARTBEAT_PRIORITY, now)
+
+        # Frames split between reads are completed by the same parser
+        parser = mavutil.mavlink.MAVLink(None)
+        custom_modes = []
+        while len(custom_modes) < CONGESTION_COUNT + 1:
+            writer.flush()
+            custom_modes.extend(receive_custom_modes(drone_socket, parser, 1))
+
+        # Test
+        assert not is_flushed
+        assert not writer.has_pending()
+        assert sorted(custom_modes) == list(range(CONGESTION_COUNT + 1))
+        # Only frames already in the socket, and at most one partly sent, go before it
+        heartbeat_index = custom_modes.index(0)
+        assert heartbeat_index < CONGESTION_COUNT
+        assert custom_modes[:heartbeat_index] == list(range(1, heartbeat_index + 1))
+        assert custom_modes[heartbeat_index + 1 :] == list(
+            range(heartbeat_index + 1, CONGESTION_COUNT + 1)
+        )
@@ -0,0 +1,162 @@
+"""
+Test sending MAVLink messages from frames packed once.
+"""
+
+import pytest
+from pymavlink import mavutil
+from pymavlink.dialects.v20 import common as mavlink2
+
+from modules.mavlink_io import packet_template
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+# More than the sequence numbers, so they wrap around
+SEND_COUNT = 300
+
+
+class RecordingFile:
+    """
+    Keeps every frame written to it.
+    """
+
+    def __init__(self) -> None:
+        self.frames: "list[bytes]" = []
+
+    def write(self, buf: bytes) -> None:
+        """
+        Records the frame.
+        """
+        self.frames.append(bytes(buf))
+
+
+@pytest.fixture
+def encoders() -> "tuple[mavutil.mavlink.MAVLink, mavutil.mavlink.MAVLink]":  # type: ignore
+    """
+    Encoder for templates and encoder for the same messages packed each time.
+    """
+    template_mav = mavutil.mavlink.MAVLink(RecordingFile(), srcSystem=255, srcComponent=0)
+    packed_mav = mavutil.mavlink.MAVLink(RecordingFile(), srcSystem=255, srcComponent=0)
+
+    yield template_mav, packed_mav
+
+
+class TestPacketTemplate:
+    """
+    Frames match those packed each time.
+    """
+
+    def test_constant_message(
+        self,
+        encoders: "tuple[mavutil.mavlink.MAVLink, mavutil.mavlink.MAVLink]",  # type: ignore
+    ) -> None:
+        """
+        Heartbeats are only numbered, in the same sequence as other messages of the encoder.
+        """
+        # Setup
+        template_mav, packed_mav = encoders
+        heartbeat_args = (
+            mavutil.mavlink.MAV_TYPE_GCS,
+            mavutil.mavlink.MAV_AUTOPILOT_INVALID,
+            0,
+            0,
+            mavutil.mavlink.MAV_STATE_ACTIVE,
+        )
+        result, heartbeat = packet_template.PacketTemplate.create(
+            template_mav, template_mav.heartbeat_encode(*heartbeat_args)
+        )
+        assert result
+        assert heartbeat is not None
+
+        # Run
+        for i in range(SEND_COUNT):
+            heartbeat.send()
+            packed_mav.heartbeat_send(*heartbeat_args)
+            if i % 7 == 0:
+                template_mav.attitude_send(i, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+                packed_mav.attitude_send(i, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+        # Test
+        assert template_mav.file.frames == packed_mav.file.frames
+        assert template_mav.seq == packed_mav.seq
+        assert template_mav.total_packets_sent == packed_mav.total_packets_sent
+        assert template_mav.total_bytes_sent == packed_mav.total_bytes_sent
+
+    def test_variable_fields(
+        self,
+        encoders: "tuple[mavutil.mavlink.MAVLink, mavutil.mavlink.MAVLink]",  # type: ignore
+    ) -> None:
+        """
+        Named fields are set on each send, the others keep their values.
+        """
+        # Setup
+        template_mav, packed_mav = encoders
+        result, change_yaw = packet_template.PacketTemplate.create(
+            template_mav,
+            template_mav.command_long_encode(
+                1, 0, mavutil.mavlink.MAV_CMD_CONDITION_YAW, 0, 0, 5.0, 0, 1, 0, 0, 0
+            ),
+            ["param1", "param3"],
+        )
+        assert result
+        assert change_yaw is not None
+
+        # Run
+        for i in range(SEND_COUNT):
+            angle = i * 1.5 - 180.0
+            direction = -1 if angle >= 0 else 1
+            change_yaw.send(angle, direction)
+            packed_mav.command_long_send(
+                1, 0, mavutil.mavlink.MAV_CMD_CONDITION_YAW, 0, angle, 5.0, direction, 1, 0, 0, 0
+            )
+
+        # Test
+        assert template_mav.file.frames == packed_mav.file.frames
+
+    def test_mavlink_2_payload_length(self) -> None:
+        """
+        MAVLink 2 frames shorten the payload by its trailing zeros, as they change.
+        """
+        # Setup
+        template_mav = mavlink2.MAVLink(RecordingFile(), srcSystem=255, srcComponent=0)
+        packed_mav = mavlink2.MAVLink(RecordingFile(), srcSystem=255, srcComponent=0)
+        result, command = packet_template.PacketTemplate.create(
+            template_mav,
+            template_mav.command_long_encode(1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+            ["param1", "confirmation"],
+        )
+        assert result
+        assert command is not None
+
+        # Run
+        for param1, confirmation in [(0.0, 0), (2.0, 0), (0.0, 3), (0.0, 0), (1.0, 1)]:
+            command.send(param1, confirmation)
+            packed_mav.command_long_send(1, 0, 0, confirmation, param1, 0, 0, 0, 0, 0, 0)
+
+        # Test
+        assert template_mav.file.frames == packed_mav.file.frames
+        assert len({len(frame) for frame in template_mav.file.frames}) > 1
+
+    def test_create_rejects_unknown_field(
+        self,
+        encoders: "tuple[mavutil.mavlink.MAVLink, mavutil.mavlink.MAVLink]",  # type: ignore
+    ) -> None:
+        """
+        Only fields of the message can be set.
+        """
+        # Setup
+        template_mav, _ = encoders
+
+        # Run
+        result, template = packet_template.PacketTemplate.create(
+            template_mav, template_mav.command_long_encode(1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0), ["yaw"]
+        )
+
+        # Test
+        assert not result
+        assert template is None
+        # Nothing was sent, the sequence is untouched
+        assert template_mav.seq == 0
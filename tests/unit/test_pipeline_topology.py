@@ -0,0 +1,214 @@
+"""
+Test the pipeline topology.
+"""
+
+import pytest
+
+from utilities.workers import pipeline_topology
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_execution
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def pipeline_config() -> dict:  # type: ignore
+    """
+    Two stages with a queue between them and a queue to main, listed out of order.
+    """
+    config = {
+        "queues": {
+            "report_queue": {"max_size": 4, "backend": "shared_memory"},
+            "data_queue": {"max_size": 4},
+        },
+        "stages": {
+            "consumer": {
+                "target": "package.module.consumer_worker",
+                "count": 2,
+                "input_queues": ["data_queue"],
+                "output_queues": ["report_queue"],
+            },
+            "producer": {
+                "target": "package.module.producer_worker",
+                "output_queues": ["data_queue"],
+            },
+        },
+    }
+
+    yield config  # type: ignore
+
+
+class TestPipelineTopology:
+    """
+    Reading and validating topologies.
+    """
+
+    def test_create(self, pipeline_config: dict) -> None:
+        """
+        Stages and queues are ordered along the data path, unconsumed queues go to main.
+        """
+        # Run
+        result, topology, reason = pipeline_topology.PipelineTopology.create(pipeline_config)
+
+        # Test
+        assert result, reason
+        assert topology is not None
+        assert [stage.name for stage in topology.get_stages()] == ["producer", "consumer"]
+        assert [queue.name for queue in topology.get_queues()] == ["data_queue", "report_queue"]
+        assert topology.get_main_queue_names() == ["report_queue"]
+
+        producer = topology.get_stages()[0]
+        assert producer.count == 1
+        assert producer.input_queue_names == []
+        assert topology.get_queues()[1].backend == queue_proxy_wrapper.QueueBackend.SHARED_MEMORY
+
+    def test_merge_config(self, pipeline_config: dict) -> None:
+        """
+        Overrides replace single keys and add stages, without modifying the defaults.
+        """
+        # Run
+        merged = pipeline_topology.merge_config(
+            pipeline_config,
+            {
+                "queues": {"data_queue": {"max_size": 8}},
+                "stages": {"consumer": {"count": 3}},
+            },
+        )
+
+        # Test
+        assert merged["queues"]["data_queue"]["max_size"] == 8
+        assert merged["stages"]["consumer"]["count"] == 3
+        assert merged["stages"]["consumer"]["input_queues"] == ["data_queue"]
+        assert pipeline_config["stages"]["consumer"]["count"] == 2
+        assert pipeline_topology.merge_config(pipeline_config, None) == pipeline_config
+
+    def test_queue_smaller_than_workers(self, pipeline_config: dict) -> None:
+        """
+        Queues smaller than their producers or consumers are rejected, unless they never block.
+        """
+        # Setup
+        pipeline_config["queues"]["data_queue"]["max_size"] = 1
+        latest_value_config = pipeline_topology.merge_config(
+            pipeline_config, {"queues": {"data_queue": {"backend": "latest_value"}}}
+        )
+        unbounded_config = pipeline_topology.merge_config(
+            pipeline_config, {"queues": {"data_queue": {"max_size": 0}}}
+        )
+
+        # Run
+        result, topology, reason = pipeline_topology.PipelineTopology.create(pipeline_config)
+        latest_value_result, _, _ = pipeline_topology.PipelineTopology.create(latest_value_config)
+        unbounded_result, _, _ = pipeline_topology.PipelineTopology.create(unbounded_config)
+
+        # Test
+        assert not result
+        assert topology is None
+        assert "data_queue" in reason
+        assert latest_value_result
+        assert unbounded_result
+
+    def test_scaling_counts_maximum(self, pipeline_config: dict) -> None:
+        """
+        Scaling stages count with their most workers.
+        """
+        # Setup
+        pipeline_config["stages"]["consumer"]["scaling"] = {"max_count": 5}
+
+        # Run
+        result, topology, _ = pipeline_topology.PipelineTopology.create(pipeline_config)
+
+        # Test
+        assert not result
+        assert topology is None
+
+    def test_in_process_queue(self, pipeline_config: dict) -> None:
+        """
+        In process queues are only allowed between stages that are not processes, and main.
+        """
+        # Setup
+        thread_config = pipeline_topology.merge_config(
+            pipeline_config,
+            {
+                "queues": {"data_queue": {"backend": "in_process"}},
+                "stages": {
+                    "producer": {"execution": "thread"},
+                    "consumer": {"execution": "asyncio"},
+                },
+            },
+        )
+        process_config = pipeline_topology.merge_config(
+            thread_config, {"stages": {"consumer": {"execution": "process"}}}
+        )
+
+        # Run
+        thread_result, topology, reason = pipeline_topology.PipelineTopology.create(thread_config)
+        process_result, _, _ = pipeline_topology.PipelineTopology.create(process_config)
+
+        # Test
+        assert thread_result, reason
+        assert topology is not None
+        assert topology.get_stages()[1].execution_mode == worker_execution.ExecutionMode.ASYNCIO
+        assert not process_result
+
+    def test_scheduling(self, pipeline_config: dict) -> None:
+        """
+        CPU sets, nice values, and hot standby are read for stages in processes.
+        """
+        # Setup
+        config = pipeline_topology.merge_config(
+            pipeline_config,
+            {"stages": {"producer": {"cpu_set": [0, 1], "nice": -5, "hot_standby": True}}},
+        )
+
+        # Run
+        result, topology, reason = pipeline_topology.PipelineTopology.create(config)
+
+        # Test
+        assert result, reason
+        assert topology is not None
+        producer, consumer = topology.get_stages()
+        assert producer.cpu_set == [0, 1]
+        assert producer.nice == -5
+        assert producer.hot_standby
+        assert consumer.cpu_set is None
+        assert consumer.nice is None
+        assert not consumer.hot_standby
+
+    def test_create_invalid(self, pipeline_config: dict) -> None:
+        """
+        Unknown queues and keys, bad values, missing producers, and cycles are rejected.
+        """
+        # Setup
+        overrides = [
+            {"stages": {"consumer": {"input_queues": ["missing_queue"]}}},
+            {"stages": {"consumer": {"cuont": 2}}},
+            {"stages": {"consumer": {"count": 0}}},
+            {"stages": {"consumer": {"target": "consumer_worker"}}},
+            {"stages": {"consumer": {"scaling": {"max_count": 1, "min_count": 1}}}},
+            {"stages": {"consumer": {"scaling": {"max_count": 4, "unknown": 1}}}},
+            {"stages": {"consumer": {"execution": "fiber"}}},
+            {"stages": {"consumer": {"cpu_set": []}}},
+            {"stages": {"consumer": {"cpu_set": [-1]}}},
+            {"stages": {"consumer": {"nice": "high"}}},
+            {"stages": {"consumer": {"execution": "thread", "nice": 0}}},
+            {"stages": {"consumer": {"hot_standby": 1}}},
+            {"stages": {"consumer": {"execution": "asyncio", "hot_standby": True}}},
+            {"queues": {"data_queue": {"backend": "pipe"}}},
+            {"queues": {"data_queue": {"max_size": True}}},
+            {"queues": {"unused_queue": {}}},
+            {"stages": {"producer": {"input_queues": ["report_queue"]}}},
+        ]
+
+        for override in overrides:
+            # Run
+            result, topology, reason = pipeline_topology.PipelineTopology.create(
+                pipeline_topology.merge_config(pipeline_config, override)
+            )
+
+            # Test
+            assert not result, override
+            assert topology is None
+            assert reason != ""
@@ -0,0 +1,242 @@
+"""
+Test the queue proxy wrapper.
+"""
+
+import multiprocessing as mp
+import multiprocessing.managers
+import queue
+
+import pytest
+
+from utilities.workers import batch_queue
+from utilities.workers import queue_proxy_wrapper
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+QUEUE_MAX_SIZE = 8
+FIFO_BACKENDS = [
+    queue_proxy_wrapper.QueueBackend.MANAGER,
+    queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+    queue_proxy_wrapper.QueueBackend.IN_PROCESS,
+]
+
+
+@pytest.fixture(scope="module")
+def mp_manager() -> multiprocessing.managers.SyncManager:  # type: ignore
+    """
+    Manager shared by all tests in this module.
+    """
+    manager = batch_queue.start_manager()
+    yield manager  # type: ignore
+    manager.shutdown()
+
+
+@pytest.fixture(params=FIFO_BACKENDS)
+def test_queue(
+    request: pytest.FixtureRequest, mp_manager: multiprocessing.managers.SyncManager
+) -> queue_proxy_wrapper.QueueProxyWrapper:  # type: ignore
+    """
+    Creates an empty queue for each first in first out backend.
+    """
+    wrapper = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAX_SIZE, request.param)
+    yield wrapper  # type: ignore
+    wrapper.close()
+
+
+class TestBatches:
+    """
+    Batched put and get.
+    """
+
+    def test_put_many_get_many(self, test_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        A batch comes out whole and in order.
+        """
+        # Setup
+        expected = ["a", None, 3]
+
+        # Run
+        test_queue.put_many(expected)
+        actual = test_queue.get_many(QUEUE_MAX_SIZE, 1.0)
+
+        # Test
+        assert actual == expected
+
+    def test_get_many_limit(self, test_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Items past the limit are returned by the next call.
+        """
+        # Setup
+        expected = list(range(5))
+
+        # Run
+        test_queue.put_many(expected)
+        actual = test_queue.get_many(2, 1.0)
+        actual += test_queue.get_many(QUEUE_MAX_SIZE, 1.0)
+
+        # Test
+        assert actual == expected
+
+    def test_get_many_mixed(self, test_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Single puts and batches are interleaved in order.
+        """
+        # Setup
+        expected = [0, 1, 2, 3]
+
+        # Run
+        test_queue.queue.put(0)
+        test_queue.put_many([1, 2])
+        test_queue.queue.put(3)
+        actual = []
+        while len(actual) < len(expected):
+            actual += test_queue.get_many(QUEUE_MAX_SIZE, 1.0)
+
+        # Test
+        assert actual == expected
+
+    def test_maxsize_counts_items(self, test_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        A batch takes a slot per item, and reading the queue directly gets items.
+        """
+        # Setup
+        expected = list(range(QUEUE_MAX_SIZE))
+
+        # Run
+        test_queue.put_many(expected)
+        size = test_queue.queue.qsize()
+        with pytest.raises(queue.Full):
+            test_queue.put_many([QUEUE_MAX_SIZE], 0.01)
+
+        first = test_queue.queue.get(timeout=1.0)
+
+        # Test
+        assert size == QUEUE_MAX_SIZE
+        assert first == 0
+
+    def test_plain_manager(self) -> None:
+        """
+        Queues of a manager without batch operations still take batches, one item at a time.
+        """
+        # Setup
+        manager = mp.Manager()
+        test_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, QUEUE_MAX_SIZE)
+        expected = [1, None, 3]
+
+        # Run
+        test_queue.put_many(expected)
+        actual = test_queue.get_many(2, 1.0)
+        actual += test_queue.get_many(QUEUE_MAX_SIZE, 1.0)
+        manager.shutdown()
+
+        # Test
+        assert actual == expected
+
+    def test_get_many_empty(self, test_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Nothing available returns an empty list.
+        """
+        # Run
+        actual_nowait = test_queue.get_many(QUEUE_MAX_SIZE)
+        actual_timeout = test_queue.get_many(QUEUE_MAX_SIZE, 0.01)
+
+        # Test
+        assert actual_nowait == []
+        assert actual_timeout == []
+
+
+class TestLatest:
+    """
+    Taking only the newest item.
+    """
+
+    def test_get_latest(self, test_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Older items are skipped and counted.
+        """
+        # Run
+        test_queue.put_many([1, 2, 3])
+        result, actual, skipped = test_queue.get_latest(1.0)
+
+        # Test
+        assert result
+        assert actual == 3
+        assert skipped == 2
+        assert test_queue.queue.empty()
+
+    def test_get_latest_sentinel(self, test_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        A sentinel wins over newer items.
+        """
+        # Run
+        test_queue.put_many([1, None, 3])
+        result, actual, _ = test_queue.get_latest(1.0)
+
+        # Test
+        assert result
+        assert actual is None
+
+    def test_get_latest_empty(self, test_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Nothing available.
+        """
+        # Run
+        result, actual, skipped = test_queue.get_latest()
+
+        # Test
+        assert not result
+        assert actual is None
+        assert skipped == 0
+
+
+class TestInstrumentation:
+    """
+    Statistics of instrumented queues.
+    """
+
+    def test_statistics(self, mp_manager: multiprocessing.managers.SyncManager) -> None:
+        """
+        Puts and gets are counted and items come out unstamped.
+        """
+        # Setup
+        test_queue = queue_proxy_wrapper.QueueProxyWrapper(
+            mp_manager, QUEUE_MAX_SIZE, instrumented=True, name="test"
+        )
+        expected = [1, 2, 3]
+
+        # Run
+        test_queue.put(1)
+        test_queue.put_many([2, 3])
+        actual = [test_queue.get(1.0)]
+        actual += test_queue.get_many(QUEUE_MAX_SIZE, 1.0)
+        result, snapshot = test_queue.get_statistics_snapshot(True)
+        _, reset_snapshot = test_queue.get_statistics_snapshot()
+
+        # Test
+        assert actual == expected
+        assert result
+        assert snapshot is not None
+        assert snapshot.name == "test"
+        assert snapshot.put_count == 3
+        assert snapshot.get_count == 3
+        assert snapshot.depth_samples == 2
+        assert snapshot.depth_max >= 1
+        assert sum(snapshot.latency_histogram) == 3
+        assert snapshot.latency_max >= snapshot.mean_latency() > 0.0
+        assert reset_snapshot is not None
+        assert reset_snapshot.put_count == 0
+
+    def test_not_instrumented(self, test_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        No statistics without instrumentation.
+        """
+        # Run
+        result, snapshot = test_queue.get_statistics_snapshot()
+
+        # Test
+        assert not result
+        assert snapshot is None
@@ -0,0 +1,163 @@
+"""
+Test waiting on several queues.
+"""
+
+import multiprocessing as mp
+import threading
+import time
+
+import pytest
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import queue_selector
+from utilities.workers import worker_controller
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+QUEUE_MAX_SIZE = 64
+REPORT_COUNT = 5000
+REQUEST_DELAY = 0.1  # seconds
+WAIT_TIMEOUT = 5.0  # seconds
+
+
+@pytest.fixture()
+def queues() -> "list[queue_proxy_wrapper.QueueProxyWrapper]":  # type: ignore
+    """
+    Creates two empty shared memory queues.
+    """
+    created_queues = [
+        queue_proxy_wrapper.QueueProxyWrapper(
+            None, QUEUE_MAX_SIZE, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY
+        )
+        for _ in range(2)
+    ]
+    yield created_queues  # type: ignore
+
+    for created_queue in created_queues:
+        created_queue.close()
+
+
+def produce(output_queue: queue_proxy_wrapper.QueueProxyWrapper, count: int) -> None:
+    """
+    Producer process.
+    """
+    for i in range(count):
+        output_queue.put(i)
+
+
+class TestQueueSelector:
+    """
+    Select across queues.
+    """
+
+    def test_timeout(self, queues: "list[queue_proxy_wrapper.QueueProxyWrapper]") -> None:
+        """
+        Nothing arrives.
+        """
+        # Setup
+        selector = queue_selector.QueueSelector()
+        for registered_queue in queues:
+            selector.register(registered_queue)
+
+        # Run
+        actual = selector.select(QUEUE_MAX_SIZE, 0.01)
+
+        # Test
+        assert actual == [[], []]
+
+    def test_drains_all(self, queues: "list[queue_proxy_wrapper.QueueProxyWrapper]") -> None:
+        """
+        Every queue is drained once any has data.
+        """
+        # Setup
+        selector = queue_selector.QueueSelector()
+        for registered_queue in queues:
+            selector.register(registered_queue)
+
+        # Run
+        queues[0].put_many([1, 2])
+        queues[1].put(3)
+        actual = selector.select(1, 1.0)
+
+        # Test
+        assert actual == [[1, 2], [3]]
+
+    def test_keeps_up(self, queues: "list[queue_proxy_wrapper.QueueProxyWrapper]") -> None:
+        """
+        A producer process at full speed is drained in far less than a poll interval per item.
+        """
+        # Setup
+        selector = queue_selector.QueueSelector()
+        for registered_queue in queues:
+            selector.register(registered_queue)
+
+        producer = mp.Process(target=produce, args=(queues[1], REPORT_COUNT))
+
+        # Run
+        start_time = time.monotonic()
+        producer.start()
+        actual = []
+        while len(actual) < REPORT_COUNT:
+            _, reports = selector.select(QUEUE_MAX_SIZE, 5.0)
+            actual += reports
+
+        elapsed_time = time.monotonic() - start_time
+        producer.join()
+
+        # Test
+        assert actual == list(range(REPORT_COUNT))
+        # Polling every 0.1 s for one item would take minutes
+        assert elapsed_time < 10.0
+
+    def test_wait_leaves_items(self, queues: "list[queue_proxy_wrapper.QueueProxyWrapper]") -> None:
+        """
+        Waiting returns once any queue has data, without taking it.
+        """
+        # Setup
+        selector = queue_selector.QueueSelector()
+        for registered_queue in queues:
+            selector.register(registered_queue)
+
+        # Run
+        is_empty_ready = selector.wait(0.01)
+        queues[1].put(3)
+        is_ready = selector.wait(1.0)
+
+        # Test
+        assert not is_empty_ready
+        assert is_ready
+        assert queues[1].get(0.0) == 3
+
+    def test_controller_ends_wait(
+        self, queues: "list[queue_proxy_wrapper.QueueProxyWrapper]"
+    ) -> None:
+        """
+        Exit and pause requests end a wait on queues with no data.
+        """
+        # Setup
+        controller = worker_controller.WorkerController()
+        selector = queue_selector.QueueSelector()
+        selector.register(queues[0])
+        selector.register_controller(controller)
+
+        # Run
+        threading.Timer(REQUEST_DELAY, controller.request_pause).start()
+        start_time = time.monotonic()
+        is_paused_ready = selector.wait(WAIT_TIMEOUT)
+        pause_time = time.monotonic() - start_time
+
+        controller.request_resume()
+        threading.Timer(REQUEST_DELAY, controller.request_exit).start()
+        start_time = time.monotonic()
+        batches = selector.select(QUEUE_MAX_SIZE, WAIT_TIMEOUT)
+        exit_time = time.monotonic() - start_time
+
+        # Test
+        assert not is_paused_ready
+        assert pause_time < WAIT_TIMEOUT / 2
+        assert batches == [[]]
+        assert exit_time < WAIT_TIMEOUT / 2
@@ -0,0 +1,68 @@
+"""
+Test the queue statistics.
+"""
+
+import math
+
+from utilities.workers import queue_statistics
+
+
+class TestQueueStatistics:
+    """
+    Recording and summarizing.
+    """
+
+    def test_latency_percentile(self) -> None:
+        """
+        Percentiles come from the histogram bucket bounds.
+        """
+        # Setup
+        statistics = queue_statistics.QueueStatistics("test")
+        fast = queue_statistics.LATENCY_BUCKET_BOUNDS[0] / 2
+        slow = queue_statistics.LATENCY_BUCKET_BOUNDS[3]
+
+        # Run
+        statistics.record_get([fast] * 9 + [slow], 0.5)
+        snapshot = statistics.snapshot()
+
+        # Test
+        assert snapshot.get_count == 10
+        assert snapshot.get_calls == 1
+        assert math.isclose(
+            snapshot.latency_percentile(50), queue_statistics.LATENCY_BUCKET_BOUNDS[0]
+        )
+        assert math.isclose(snapshot.latency_percentile(99), slow)
+        assert math.isclose(snapshot.latency_max, slow)
+
+    def test_overflow_bucket(self) -> None:
+        """
+        Latencies past the last bound report the maximum.
+        """
+        # Setup
+        statistics = queue_statistics.QueueStatistics("test")
+
+        # Run
+        statistics.record_get([10.0], 10.0)
+        snapshot = statistics.snapshot()
+
+        # Test
+        assert snapshot.latency_histogram[-1] == 1
+        assert math.isclose(snapshot.latency_percentile(50), 10.0)
+
+    def test_depth(self) -> None:
+        """
+        Depth mean and maximum.
+        """
+        # Setup
+        statistics = queue_statistics.QueueStatistics("test")
+
+        # Run
+        statistics.record_put(1, 0.0, 2)
+        statistics.record_put(1, 0.25, 4)
+        snapshot = statistics.snapshot()
+
+        # Test
+        assert math.isclose(snapshot.mean_depth(), 3.0)
+        assert snapshot.depth_max == 4
+        assert math.isclose(snapshot.put_blocked_max, 0.25)
+        assert snapshot.mean_latency() == 0.0
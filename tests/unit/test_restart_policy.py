@@ -0,0 +1,150 @@
+"""
+Test the restart policy.
+"""
+
+import pytest
+
+from utilities.workers import restart_policy
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def policy() -> restart_policy.RestartPolicy:  # type: ignore
+    """
+    Creates a policy with a 0.1 s initial delay doubling up to 1 s, and 3 crashes in 10 s as a loop.
+    """
+    result, policy = restart_policy.RestartPolicy.create(
+        initial_delay=0.1,
+        max_delay=1.0,
+        multiplier=2.0,
+        jitter=0.2,
+        healthy_uptime=5.0,
+        crash_loop_window=10.0,
+        crash_loop_limit=3,
+    )
+    assert result
+    assert policy is not None
+
+    yield policy  # type: ignore
+
+
+class TestRestartPolicy:
+    """
+    Backoff delays and crash loop detection.
+    """
+
+    def test_create_invalid(self) -> None:
+        """
+        Invalid limits are rejected.
+        """
+        # Run
+        results = [
+            restart_policy.RestartPolicy.create(initial_delay=-1.0),
+            restart_policy.RestartPolicy.create(initial_delay=2.0, max_delay=1.0),
+            restart_policy.RestartPolicy.create(multiplier=0.5),
+            restart_policy.RestartPolicy.create(jitter=1.0),
+            restart_policy.RestartPolicy.create(crash_loop_limit=0),
+        ]
+
+        # Test
+        for result, policy in results:
+            assert not result
+            assert policy is None
+
+    def test_backoff(self, policy: restart_policy.RestartPolicy) -> None:
+        """
+        The first restart is immediate, then delays grow exponentially up to the maximum.
+        """
+        # Run
+        delays = [policy.get_restart_delay(crashes) for crashes in range(1, 8)]
+
+        # Test
+        assert delays[0] == 0.0
+        expected_delays = [0.1, 0.2, 0.4, 0.8, 1.0, 1.0]
+        for delay, expected_delay in zip(delays[1:], expected_delays):
+            assert expected_delay * 0.8 <= delay <= expected_delay * 1.2
+
+    def test_healthy_uptime(self, policy: restart_policy.RestartPolicy) -> None:
+        """
+        Only long enough runs reset the backoff.
+        """
+        # Test
+        assert not policy.is_healthy_uptime(4.9)
+        assert policy.is_healthy_uptime(5.0)
+
+    def test_crash_loop(self, policy: restart_policy.RestartPolicy) -> None:
+        """
+        Only crashes within the sliding window count towards a crash loop.
+        """
+        # Setup
+        detector = policy.create_crash_loop_detector()
+
+        # Run
+        spread_out = [detector.record_crash(crash_time) for crash_time in [0.0, 6.0, 12.0]]
+        looping = detector.record_crash(13.0)
+        crash_count = detector.get_crash_count()
+        detector.reset()
+        after_reset = detector.record_crash(14.0)
+
+        # Test
+        assert spread_out == [False, False, False]
+        assert looping
+        assert crash_count == 3
+        assert not after_reset
+
+
+class TestRestartTracker:
+    """
+    Scheduling restarts of a worker group.
+    """
+
+    def test_park_and_resume(self, policy: restart_policy.RestartPolicy) -> None:
+        """
+        Deaths are scheduled with backoff until the crash loop parks the group,
+        resuming makes every dead worker due at once.
+        """
+        # Setup
+        tracker = restart_policy.RestartTracker(policy, 2)
+
+        # Run
+        first_uptime, first_delay = tracker.record_death(0, 1.0)
+        due_restarts = tracker.get_due_restarts(1.0)
+        tracker.record_restart(0, 1.5, 1.0)
+        _, second_delay = tracker.record_death(0, 2.0)
+        _, parked_delay = tracker.record_death(1, 2.0)
+        parked_due_times = tracker.get_due_times()
+        notifications = [tracker.take_crash_loop_notification() for _ in range(2)]
+        tracker.resume(3.0)
+        resumed_due_restarts = tracker.get_due_restarts(3.0)
+
+        # Test
+        assert (first_uptime, first_delay) == (1.0, 0.0)
+        assert due_restarts == [(0, 1.0)]
+        assert second_delay is not None and second_delay > 0.0
+        assert parked_delay is None
+        assert parked_due_times == []
+        assert notifications == [True, False]
+        assert not tracker.is_parked()
+        assert resumed_due_restarts == [(0, 3.0), (1, 3.0)]
+        assert tracker.get_restart_counts() == [1, 0]
+        assert tracker.get_restart_latencies() == [0.5]
+
+    def test_remove_worker(self, policy: restart_policy.RestartPolicy) -> None:
+        """
+        Removing a worker moves the dead workers after it down.
+        """
+        # Setup
+        tracker = restart_policy.RestartTracker(policy, 3)
+        tracker.record_death(2, 1.0)
+
+        # Run
+        tracker.remove_worker(0)
+
+        # Test
+        assert tracker.is_dead(1)
+        assert not tracker.is_dead(2)
+        assert tracker.get_restart_counts() == [0, 0]
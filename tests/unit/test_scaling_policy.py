@@ -0,0 +1,113 @@
+"""
+Test the scaling policy.
+"""
+
+import pytest
+
+from utilities.workers import scaling_policy
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def policy() -> scaling_policy.ScalingPolicy:  # type: ignore
+    """
+    Creates a policy for 1 to 3 workers deciding after 2 samples, with a 5 s cooldown.
+    """
+    result, policy = scaling_policy.ScalingPolicy.create(
+        min_count=1,
+        max_count=3,
+        scale_up_depth=4.0,
+        scale_down_depth=0.5,
+        scale_down_idle=0.8,
+        sustain_count=2,
+        cooldown=5.0,
+    )
+    assert result
+    assert policy is not None
+
+    yield policy  # type: ignore
+
+
+class TestScalingPolicy:
+    """
+    Scaling decisions.
+    """
+
+    def test_create_invalid(self) -> None:
+        """
+        Invalid bounds and thresholds without a hysteresis band are rejected.
+        """
+        # Run
+        results = [
+            scaling_policy.ScalingPolicy.create(0, 2),
+            scaling_policy.ScalingPolicy.create(3, 2),
+            scaling_policy.ScalingPolicy.create(1, 2, scale_up_depth=1.0, scale_down_depth=1.0),
+            scaling_policy.ScalingPolicy.create(1, 2, scale_down_idle=1.5),
+            scaling_policy.ScalingPolicy.create(1, 2, sustain_count=0),
+        ]
+
+        # Test
+        for result, policy in results:
+            assert not result
+            assert policy is None
+
+    def test_grow_sustained(self, policy: scaling_policy.ScalingPolicy) -> None:
+        """
+        Grows only after the depth stays high for the sustain count.
+        """
+        # Run
+        changes = [
+            policy.evaluate(1, 10, 0.0, 0.0),
+            policy.evaluate(1, 1, 0.0, 1.0),
+            policy.evaluate(1, 10, 0.0, 2.0),
+            policy.evaluate(1, 10, 0.0, 3.0),
+        ]
+
+        # Test
+        assert changes == [0, 0, 0, 1]
+
+    def test_cooldown(self, policy: scaling_policy.ScalingPolicy) -> None:
+        """
+        No change is made within the cooldown after a change.
+        """
+        # Run
+        changes = [policy.evaluate(1, 10, 0.0, now) for now in [0.0, 1.0]]
+        changes += [policy.evaluate(2, 20, 0.0, now) for now in [2.0, 3.0, 4.0, 6.0]]
+
+        # Test
+        assert changes == [0, 1, 0, 0, 0, 1]
+
+    def test_shrink_hysteresis(self, policy: scaling_policy.ScalingPolicy) -> None:
+        """
+        Shrinks only when the queue is nearly empty and consumers are idle,
+        a depth between the thresholds changes nothing.
+        """
+        # Run
+        busy = [policy.evaluate(2, 0, 0.5, now) for now in [0.0, 1.0, 2.0]]
+        between = [policy.evaluate(2, 4, 1.0, now) for now in [3.0, 4.0, 5.0]]
+        idle = [policy.evaluate(2, 0, 0.9, now) for now in [6.0, 7.0]]
+
+        # Test
+        assert busy == [0, 0, 0]
+        assert between == [0, 0, 0]
+        assert idle == [0, -1]
+
+    def test_bounds(self, policy: scaling_policy.ScalingPolicy) -> None:
+        """
+        Stays within the bounds, and restores them immediately.
+        """
+        # Run
+        at_max = [policy.evaluate(3, 100, 0.0, now) for now in [0.0, 1.0, 2.0]]
+        at_min = [policy.evaluate(1, 0, 1.0, now) for now in [3.0, 4.0, 5.0]]
+        above_max = policy.evaluate(4, 0, 0.0, 6.0)
+        below_min = policy.evaluate(0, 0, 1.0, 6.5)
+
+        # Test
+        assert at_max == [0, 0, 0]
+        assert at_min == [0, 0, 0]
+        assert above_max == -1
+        assert below_min == 1
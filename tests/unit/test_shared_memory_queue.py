@@ -0,0 +1,167 @@
+"""
+Test the shared memory queue.
+"""
+
+import multiprocessing as mp
+import queue
+
+import pytest
+
+from utilities.workers import shared_memory_queue
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+QUEUE_CAPACITY = 4
+QUEUE_SLOT_SIZE = 256  # bytes
+PRODUCER_TIMEOUT = 10.0  # seconds
+
+
+@pytest.fixture()
+def ring() -> shared_memory_queue.SharedMemoryQueue:  # type: ignore
+    """
+    Creates an empty shared memory queue.
+    """
+    ring_queue = shared_memory_queue.SharedMemoryQueue(QUEUE_CAPACITY, QUEUE_SLOT_SIZE)
+    yield ring_queue  # type: ignore
+    ring_queue.close()
+
+
+def produce(ring_queue: shared_memory_queue.SharedMemoryQueue, count: int) -> None:
+    """
+    Producer process.
+    """
+    for i in range(count):
+        ring_queue.put(i)
+
+
+def produce_many(
+    ring_queue: shared_memory_queue.SharedMemoryQueue, first: int, chunk_count: int
+) -> None:
+    """
+    Producer process putting capacity sized chunks.
+    """
+    for i in range(chunk_count):
+        start = first + i * QUEUE_CAPACITY
+        ring_queue.put_many(list(range(start, start + QUEUE_CAPACITY)))
+
+
+class TestSharedMemoryQueue:
+    """
+    Put and get through the ring buffer.
+    """
+
+    def test_fifo_order(self, ring: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Items come out in the order they went in.
+        """
+        # Setup
+        expected = [None, "report", (1.0, 2.0)]
+
+        # Run
+        for item in expected:
+            ring.put(item)
+
+        actual = [ring.get(timeout=1.0) for _ in expected]
+
+        # Test
+        assert actual == expected
+        assert ring.empty()
+
+    def test_wraps_around(self, ring: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        More items than slots pass through in order.
+        """
+        # Setup
+        expected = list(range(QUEUE_CAPACITY * 3))
+
+        # Run
+        actual = []
+        for item in expected:
+            ring.put(item)
+            actual.append(ring.get())
+
+        # Test
+        assert actual == expected
+
+    def test_full(self, ring: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Putting into a full queue times out.
+        """
+        # Run
+        for i in range(QUEUE_CAPACITY):
+            ring.put_nowait(i)
+
+        # Test
+        assert ring.full()
+        assert ring.qsize() == QUEUE_CAPACITY
+        with pytest.raises(queue.Full):
+            ring.put(QUEUE_CAPACITY, timeout=0.01)
+
+    def test_empty(self, ring: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Getting from an empty queue times out.
+        """
+        # Test
+        with pytest.raises(queue.Empty):
+            ring.get(timeout=0.01)
+
+        with pytest.raises(queue.Empty):
+            ring.get_nowait()
+
+    def test_item_too_large(self, ring: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Items larger than a slot are rejected without consuming a slot.
+        """
+        # Test
+        with pytest.raises(ValueError):
+            ring.put(bytes(QUEUE_SLOT_SIZE))
+
+        assert ring.empty()
+
+    def test_across_processes(self, ring: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        A producer process blocks on the full ring until main drains it.
+        """
+        # Setup
+        count = QUEUE_CAPACITY * 5
+        expected = list(range(count))
+
+        # Run
+        producer = mp.Process(target=produce, args=(ring, count))
+        producer.start()
+        actual = [ring.get(timeout=5.0) for _ in range(count)]
+        producer.join()
+
+        # Test
+        assert actual == expected
+
+    def test_put_many_producers(self, ring: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Producers putting capacity sized chunks at once all finish, each chunk in order.
+        """
+        # Setup
+        chunk_count = 50
+        item_count = chunk_count * QUEUE_CAPACITY
+        producers = [
+            mp.Process(target=produce_many, args=(ring, first, chunk_count))
+            for first in [0, item_count]
+        ]
+
+        # Run
+        for producer in producers:
+            producer.start()
+
+        actual = [ring.get(timeout=PRODUCER_TIMEOUT) for _ in range(2 * item_count)]
+        for producer in producers:
+            producer.join(PRODUCER_TIMEOUT)
+
+        # Test
+        assert not any(producer.is_alive() for producer in producers)
+        assert sorted(actual) == list(range(2 * item_count))
+        # Items of each producer stay in order
+        assert [item for item in actual if item < item_count] == list(range(item_count))
+        assert ring.empty()
@@ -0,0 +1,147 @@
+"""
+Test stopping all worker groups at once.
+"""
+
+import signal
+import time
+
+import pytest
+
+from modules.common.modules.logger import logger
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import shutdown_coordinator
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+DEADLINE = 0.5  # seconds
+TERMINATE_GRACE = 0.5  # seconds
+# Time for escalating and joining beyond the grace periods
+BOUND_SLACK = 0.4  # seconds
+HUNG_STAGE_COUNT = 3
+QUEUE_MAX_SIZE = 4
+WORKER_SLEEP_PERIOD = 0.01  # seconds
+
+
+def consume_worker(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Blocks on its queue until a sentinel arrives, then exits.
+    """
+    while not controller.is_exit_requested():
+        if input_queue.queue.get() is None:
+            return
+
+
+def hang_worker(_controller: worker_controller.WorkerController) -> None:
+    """
+    Never exits on its own, ends on SIGTERM.
+    """
+    while True:
+        time.sleep(WORKER_SLEEP_PERIOD)
+
+
+def ignore_terminate_worker(_controller: worker_controller.WorkerController) -> None:
+    """
+    Never exits on its own and ignores SIGTERM, ends on SIGKILL.
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    while True:
+        time.sleep(WORKER_SLEEP_PERIOD)
+
+
+@pytest.fixture
+def local_logger() -> logger.Logger:  # type: ignore
+    """
+    Logger of the test process.
+    """
+    result, test_logger = logger.Logger.create("test_shutdown_coordinator", False)
+    assert result
+    assert test_logger is not None
+
+    yield test_logger  # type: ignore
+
+
+def create_stage(
+    target: "(...) -> object",  # type: ignore
+    input_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+    controller: worker_controller.WorkerController,
+    local_logger: logger.Logger,
+) -> worker_manager.WorkerManager:
+    """
+    Starts a single worker process.
+    """
+    result, properties = worker_manager.WorkerProperties.create(
+        1, target, (), input_queues, [], controller, local_logger
+    )
+    assert result
+    assert properties is not None
+
+    result, manager = worker_manager.WorkerManager.create(properties, local_logger)
+    assert result
+    assert manager is not None
+
+    manager.start_workers()
+    return manager
+
+
+class TestShutdownCoordinator:
+    """
+    Escalation of stages which do not exit.
+    """
+
+    def test_hung_stages_share_grace(self, local_logger: logger.Logger) -> None:
+        """
+        Several stages which ignore SIGTERM are stopped within the deadline and 2 grace periods,
+        not 2 grace periods each.
+        """
+        # Setup
+        controller = worker_controller.WorkerController()
+        input_queue = queue_proxy_wrapper.QueueProxyWrapper(
+            None, QUEUE_MAX_SIZE, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY
+        )
+        stages = [
+            (
+                "consume",
+                create_stage(consume_worker, [input_queue], controller, local_logger),
+            ),
+            ("hang", create_stage(hang_worker, [], controller, local_logger)),
+        ]
+        for i in range(HUNG_STAGE_COUNT):
+            stages.append(
+                (f"ignore_{i}", create_stage(ignore_terminate_worker, [], controller, local_logger))
+            )
+
+        result, coordinator = shutdown_coordinator.ShutdownCoordinator.create(
+            stages, [input_queue], controller, local_logger, DEADLINE, TERMINATE_GRACE
+        )
+        assert result
+        assert coordinator is not None
+
+        # Let the workers ignore SIGTERM before exit is requested
+        time.sleep(DEADLINE)
+
+        # Run
+        start_time = time.monotonic()
+        reports = coordinator.shutdown()
+        elapsed_time = time.monotonic() - start_time
+        input_queue.close()
+
+        # Test
+        assert elapsed_time < DEADLINE + 2 * TERMINATE_GRACE + BOUND_SLACK
+        assert [report.name for report in reports] == [name for name, _ in stages]
+        assert all(report.is_stopped for report in reports)
+
+        consume_report, hang_report, *ignore_reports = reports
+        assert (consume_report.terminated_count, consume_report.killed_count) == (0, 0)
+        assert consume_report.shutdown_time < DEADLINE
+        assert (hang_report.terminated_count, hang_report.killed_count) == (1, 0)
+        for report in ignore_reports:
+            assert (report.terminated_count, report.killed_count) == (1, 1)
@@ -0,0 +1,152 @@
+"""
+Test reading everything available on a MAVLink connection socket.
+"""
+
+import socket
+import time
+
+import pytest
+from pymavlink import mavutil
+
+from modules.mavlink_io import socket_reader
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+WAIT_TIMEOUT = 5.0  # seconds
+EMPTY_TIMEOUT = 0.1  # seconds
+BURST_COUNT = 100
+
+
+@pytest.fixture
+def connected_pair() -> "tuple[mavutil.mavfile, socket.socket]":  # type: ignore
+    """
+    MAVLink TCP connection and the socket of the other end.
+    """
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        connection = mavutil.mavlink_connection(f"tcp:127.0.0.1:{server.getsockname()[1]}")
+        drone_socket, _ = server.accept()
+
+    yield connection, drone_socket
+
+    drone_socket.close()
+    connection.close()
+
+
+def pack_heartbeat(sender: mavutil.mavlink.MAVLink, custom_mode: int) -> bytes:
+    """
+    Heartbeat, numbered by its custom mode.
+    """
+    return sender.heartbeat_encode(
+        mavutil.mavlink.MAV_TYPE_QUADROTOR,
+        mavutil.mavlink.MAV_AUTOPILOT_GENERIC,
+        0,
+        custom_mode,
+        mavutil.mavlink.MAV_STATE_ACTIVE,
+    ).pack(sender)
+
+
+class TestSocketReader:
+    """
+    Waiting and reading.
+    """
+
+    def test_create_requires_socket(self) -> None:
+        """
+        Connections without a socket cannot be read directly.
+        """
+        # Setup
+        connection = mavutil.mavlink_connection("udpout:127.0.0.1:14550")
+        connection.port.close()
+        connection.port = None
+
+        # Run
+        result, reader = socket_reader.SocketReader.create(connection)
+
+        # Test
+        assert not result
+        assert reader is None
+
+    def test_burst_in_one_read(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        A burst is read with a single system call, in order, split messages are completed later.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        sender = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=0)
+        result, reader = socket_reader.SocketReader.create(connection)
+        assert result
+        assert reader is not None
+
+        data = b"".join(pack_heartbeat(sender, i) for i in range(BURST_COUNT))
+        split = len(data) - 5
+
+        # Run
+        drone_socket.sendall(data[:split])
+        is_readable = reader.wait(WAIT_TIMEOUT)
+        is_open, messages = reader.read()
+        drone_socket.sendall(data[split:])
+        reader.wait(WAIT_TIMEOUT)
+        _, messages_rest = reader.read()
+
+        # Test
+        assert is_readable
+        assert is_open
+        assert [msg.custom_mode for msg in messages + messages_rest] == list(range(BURST_COUNT))
+        assert reader.get_read_count() == 2
+        assert reader.get_message_count() == BURST_COUNT
+        # The connection knows what arrived, as if it had received it
+        assert connection.messages["HEARTBEAT"].custom_mode == BURST_COUNT - 1
+
+    def test_wait_without_data(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        Waiting times out when nothing arrives.
+        """
+        # Setup
+        connection, _ = connected_pair
+        result, reader = socket_reader.SocketReader.create(connection)
+        assert result
+        assert reader is not None
+
+        # Run
+        start_time = time.monotonic()
+        is_readable = reader.wait(EMPTY_TIMEOUT)
+        elapsed_time = time.monotonic() - start_time
+
+        # Test
+        assert not is_readable
+        assert elapsed_time >= EMPTY_TIMEOUT * 0.9
+
+    def test_closed(
+        self,
+        connected_pair: "tuple[mavutil.mavfile, socket.socket]",  # type: ignore
+    ) -> None:
+        """
+        The other end closing is reported once, then the reader stops waiting.
+        """
+        # Setup
+        connection, drone_socket = connected_pair
+        result, reader = socket_reader.SocketReader.create(connection)
+        assert result
+        assert reader is not None
+
+        # Run
+        drone_socket.close()
+        reader.wait(WAIT_TIMEOUT)
+        is_open, messages = reader.read()
+        is_readable = reader.wait(WAIT_TIMEOUT)
+
+        # Test
+        assert not is_open
+        assert len(messages) == 0
+        assert reader.is_closed()
+        assert not is_readable
@@ -0,0 +1,128 @@
+"""
+Test the telemetry binary encoding.
+"""
+
+import math
+import pickle
+
+from modules.telemetry import telemetry
+from modules.telemetry import telemetry_wire_format
+
+
+class FakeTelemetryData:
+    """
+    Object with the TelemetryData attributes.
+    """
+
+    def __init__(self, values: "list[int | float | None]") -> None:
+        for name, value in zip(telemetry_wire_format.FIELD_NAMES, values):
+            setattr(self, name, value)
+
+
+class TestTelemetryWireFormat:
+    """
+    Encoding and decoding.
+    """
+
+    def test_round_trip(self) -> None:
+        """
+        Values and None survive encoding.
+        """
+        # Setup
+        expected = [12345, 1.5, -2.25, None, 0.0, 1e-9, -1e9, math.pi, None, 3.0, 4.0, 5.0, 6.0]
+
+        # Run
+        data = telemetry_wire_format.encode(FakeTelemetryData(expected))
+        actual = telemetry_wire_format.decode_fields(data)
+
+        # Test
+        assert len(data) == telemetry_wire_format.WIRE_SIZE
+        assert list(actual) == expected
+        assert isinstance(actual[0], int)
+
+    def test_missing_time(self) -> None:
+        """
+        A missing time since boot decodes as None.
+        """
+        # Setup
+        values = [None] * len(telemetry_wire_format.FIELD_NAMES)
+
+        # Run
+        actual = telemetry_wire_format.decode_fields(
+            telemetry_wire_format.encode(FakeTelemetryData(values))
+        )
+
+        # Test
+        assert list(actual) == values
+
+    def test_view(self) -> None:
+        """
+        The view reads fields in place from a larger buffer.
+        """
+        # Setup
+        values = [7, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, None, 10.0, 11.0, 12.0]
+        offset = 16
+        buffer = bytearray(offset + telemetry_wire_format.WIRE_SIZE)
+
+        # Run
+        telemetry_wire_format.encode_into(FakeTelemetryData(values), buffer, offset)
+        view = telemetry_wire_format.TelemetryDataView(memoryview(buffer), offset)
+
+        # Test
+        assert view.time_since_boot == 7
+        assert view.z_velocity == 6.0
+        assert view.yaw is None
+        assert view.yaw_speed == 12.0
+
+    def test_nan_is_not_none(self) -> None:
+        """
+        NaN is a value, distinct from a missing field.
+        """
+        # Setup
+        values = [1, math.nan, None, 0.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 11.0, 12.0]
+
+        # Run
+        data = telemetry_wire_format.encode(FakeTelemetryData(values))
+        actual = telemetry_wire_format.decode_fields(data)
+        view = telemetry_wire_format.TelemetryDataView(data)
+
+        # Test
+        assert math.isnan(actual[1])
+        assert actual[2] is None
+        assert actual[3] == 0.0
+        assert math.isnan(view.x)
+        assert view.y is None
+        assert view.z == 0.0
+
+    def test_class_access(self) -> None:
+        """
+        Fields accessed on the view class are the descriptors, not decoded values.
+        """
+        # Run
+        field = telemetry_wire_format.TelemetryDataView.yaw
+
+        # Test
+        assert not isinstance(field, (int, float))
+        assert field is vars(telemetry_wire_format.TelemetryDataView)["yaw"]
+
+    def test_unpickles_as_view(self) -> None:
+        """
+        TelemetryData crossing a queue arrives as a view with the same values,
+        which pickles again with only the encoding.
+        """
+        # Setup
+        telemetry_data = telemetry.TelemetryData(
+            123, 1.0, 2.0, None, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 11.0, 12.0
+        )
+
+        # Run
+        view = pickle.loads(pickle.dumps(telemetry_data, pickle.HIGHEST_PROTOCOL))
+        forwarded = pickle.loads(pickle.dumps(view, pickle.HIGHEST_PROTOCOL))
+
+        # Test
+        assert isinstance(view, telemetry_wire_format.TelemetryDataView)
+        for name in telemetry_wire_format.FIELD_NAMES:
+            assert getattr(view, name) == getattr(telemetry_data, name)
+            assert getattr(forwarded, name) == getattr(telemetry_data, name)
+
+        assert len(forwarded.buffer) == telemetry_wire_format.WIRE_SIZE
@@ -0,0 +1,143 @@
+"""
+Test warm processes.
+"""
+
+import multiprocessing as mp
+
+from utilities.workers import warm_process
+from utilities.workers import worker_standby
+
+
+JOIN_TIMEOUT = 5.0  # seconds
+
+
+def set_event(event: "mp.synchronize.Event") -> None:
+    """
+    Target signalling that it ran.
+    """
+    event.set()
+
+
+def set_up_then_set_event(set_up: "mp.synchronize.Event", ran: "mp.synchronize.Event") -> None:
+    """
+    Target signalling that it is set up, then that it ran once active.
+    """
+    set_up.set()
+    if not worker_standby.wait_until_active():
+        return
+
+    ran.set()
+
+
+class TestWarmProcess:
+    """
+    Releasing and cancelling started processes.
+    """
+
+    def test_release(self) -> None:
+        """
+        The target only runs after release.
+        """
+        # Setup
+        ran = mp.Event()
+        process = warm_process.WarmProcess(set_event, (ran,))
+
+        # Run
+        process.warm()
+        ran_before_release = ran.wait(0.1)
+        is_alive_before_release = process.is_alive()
+        process.release()
+        process.join(JOIN_TIMEOUT)
+
+        # Test
+        assert not ran_before_release
+        assert is_alive_before_release
+        assert ran.is_set()
+        assert process.is_released()
+        assert process.exitcode == 0
+
+    def test_start(self) -> None:
+        """
+        Start warms and releases in one call, like a plain process.
+        """
+        # Setup
+        ran = mp.Event()
+        process = warm_process.WarmProcess(set_event, (ran,))
+
+        # Run
+        process.start()
+        process.join(JOIN_TIMEOUT)
+
+        # Test
+        assert ran.is_set()
+        assert process.exitcode == 0
+
+    def test_cancel(self) -> None:
+        """
+        Cancelled processes exit without running the target, and cannot be released after.
+        """
+        # Setup
+        ran = mp.Event()
+        process = warm_process.WarmProcess(set_event, (ran,))
+        process.warm()
+
+        # Run
+        process.cancel()
+        process.release()
+        process.join(JOIN_TIMEOUT)
+
+        # Test
+        assert not ran.is_set()
+        assert not process.is_released()
+        assert process.exitcode == 0
+
+    def test_hot_release(self) -> None:
+        """
+        Hot processes set up before release, and only run the rest of the target after.
+        """
+        # Setup
+        set_up = mp.Event()
+        ran = mp.Event()
+        process = warm_process.WarmProcess(set_up_then_set_event, (set_up, ran), is_hot=True)
+
+        # Run
+        process.warm()
+        is_set_up_before_release = set_up.wait(JOIN_TIMEOUT)
+        ran_before_release = ran.wait(0.1)
+        process.release()
+        process.join(JOIN_TIMEOUT)
+
+        # Test
+        assert is_set_up_before_release
+        assert not ran_before_release
+        assert ran.is_set()
+        assert process.exitcode == 0
+
+    def test_hot_cancel(self) -> None:
+        """
+        Cancelled hot processes return from the target after setting up.
+        """
+        # Setup
+        set_up = mp.Event()
+        ran = mp.Event()
+        process = warm_process.WarmProcess(set_up_then_set_event, (set_up, ran), is_hot=True)
+        process.warm()
+        assert set_up.wait(JOIN_TIMEOUT)
+
+        # Run
+        process.cancel()
+        process.join(JOIN_TIMEOUT)
+
+        # Test
+        assert not ran.is_set()
+        assert process.exitcode == 0
+
+    def test_wait_until_active_outside_standby(self) -> None:
+        """
+        Workers that are not hot standbys run at once.
+        """
+        # Run
+        is_active = worker_standby.wait_until_active()
+
+        # Test
+        assert is_active
@@ -0,0 +1,124 @@
+"""
+Test the worker controller.
+"""
+
+import multiprocessing as mp
+import time
+
+import pytest
+
+from utilities.workers import worker_controller
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+WAIT_TIMEOUT = 5.0  # seconds
+
+
+@pytest.fixture()
+def controller() -> worker_controller.WorkerController:  # type: ignore
+    """
+    Creates a controller with no requests.
+    """
+    yield worker_controller.WorkerController()  # type: ignore
+
+
+def pausable_worker(
+    controller: worker_controller.WorkerController, passed_pause: "mp.synchronize.Event"
+) -> None:
+    """
+    Worker process that signals after passing a pause check.
+    """
+    controller.check_pause()
+    passed_pause.set()
+
+
+class TestWorkerController:
+    """
+    Pause and exit requests.
+    """
+
+    def test_exit(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Exit requests are visible immediately and can be cleared.
+        """
+        # Run
+        start_time = time.monotonic()
+        controller.request_exit()
+        requested = controller.is_exit_requested()
+        waited = controller.wait_for_exit(0.0)
+        controller.clear_exit()
+        elapsed_time = time.monotonic() - start_time
+
+        # Test
+        assert requested
+        assert waited
+        assert not controller.is_exit_requested()
+        assert not controller.wait_for_exit(0.0)
+        # No fixed sleeps
+        assert elapsed_time < 0.05
+
+    def test_pause_blocks_worker(self, controller: worker_controller.WorkerController) -> None:
+        """
+        A worker blocks in a pause check until resumed.
+        """
+        # Setup
+        passed_pause = mp.Event()
+        worker = mp.Process(target=pausable_worker, args=(controller, passed_pause))
+
+        # Run
+        controller.request_pause()
+        worker.start()
+        blocked = not passed_pause.wait(0.2)
+        controller.request_resume()
+        released = passed_pause.wait(WAIT_TIMEOUT)
+        worker.join()
+
+        # Test
+        assert blocked
+        assert released
+        assert not controller.is_pause_requested()
+
+    def test_exit_releases_paused_worker(
+        self, controller: worker_controller.WorkerController
+    ) -> None:
+        """
+        An exit request releases paused workers so they can exit.
+        """
+        # Setup
+        passed_pause = mp.Event()
+        worker = mp.Process(target=pausable_worker, args=(controller, passed_pause))
+
+        # Run
+        controller.request_pause()
+        worker.start()
+        controller.request_exit()
+        released = passed_pause.wait(WAIT_TIMEOUT)
+        worker.join()
+
+        # Test
+        assert released
+        assert controller.is_pause_requested()
+
+    def test_clear_exit_keeps_pause(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Clearing exit while paused pauses workers again.
+        """
+        # Setup
+        passed_pause = mp.Event()
+        worker = mp.Process(target=pausable_worker, args=(controller, passed_pause))
+
+        # Run
+        controller.request_pause()
+        controller.request_exit()
+        controller.clear_exit()
+        worker.start()
+        blocked = not passed_pause.wait(0.2)
+        controller.request_resume()
+        worker.join()
+
+        # Test
+        assert blocked
@@ -0,0 +1,232 @@
+"""
+Test workers running in threads and asyncio tasks.
+"""
+
+import asyncio
+import multiprocessing as mp
+import multiprocessing.connection
+import os
+import threading
+
+import pytest
+
+from utilities.workers import worker_execution
+
+
+JOIN_TIMEOUT = 5.0  # seconds
+IN_PROCESS_MODES = [worker_execution.ExecutionMode.THREAD, worker_execution.ExecutionMode.ASYNCIO]
+# One more than the default executor of an event loop has threads
+BLOCKING_WORKER_COUNT = min(32, (os.cpu_count() or 1) + 4) + 1
+
+
+def set_event(event: threading.Event) -> None:
+    """
+    Target signalling that it ran.
+    """
+    event.set()
+
+
+def raise_error() -> None:
+    """
+    Target crashing.
+    """
+    raise RuntimeError("Crashed")
+
+
+def wait_for_exit(exit_event: "mp.Event") -> None:  # type: ignore
+    """
+    Process target idling until told to exit.
+    """
+    exit_event.wait(JOIN_TIMEOUT)
+
+
+def wait_for_all(barrier: threading.Barrier) -> None:
+    """
+    Target blocking until every worker runs at once.
+    """
+    barrier.wait(JOIN_TIMEOUT)
+
+
+async def wait_forever(started: threading.Event) -> None:
+    """
+    Coroutine target that only ends when cancelled.
+    """
+    started.set()
+    await asyncio.Event().wait()
+
+
+class TestInProcessWorker:
+    """
+    Running, cancelling, and detecting the end of in process workers.
+    """
+
+    @pytest.mark.parametrize("execution_mode", IN_PROCESS_MODES)
+    def test_release(self, execution_mode: worker_execution.ExecutionMode) -> None:
+        """
+        The target only runs after release, and the sentinel is ready once it ends.
+        """
+        # Setup
+        ran = threading.Event()
+        worker = worker_execution.InProcessWorker(set_event, (ran,), execution_mode)
+
+        # Run
+        worker.warm()
+        is_alive_before_release = worker.is_alive()
+        ran_before_release = ran.is_set()
+        worker.release()
+        ready = multiprocessing.connection.wait([worker.sentinel], JOIN_TIMEOUT)
+        worker.join()
+
+        # Test
+        assert is_alive_before_release
+        assert not ran_before_release
+        assert ready == [worker.sentinel]
+        assert ran.is_set()
+        assert not worker.is_alive()
+        assert worker.exitcode == 0
+
+        worker.close()
+
+    # The thread crash is reported by the thread exception hook
+    @pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+    @pytest.mark.parametrize("execution_mode", IN_PROCESS_MODES)
+    def test_crash(self, execution_mode: worker_execution.ExecutionMode) -> None:
+        """
+        Exceptions end the worker with a non zero exit code.
+        """
+        # Setup
+        worker = worker_execution.InProcessWorker(raise_error, (), execution_mode)
+
+        # Run
+        worker.start()
+        worker.join(JOIN_TIMEOUT)
+
+        # Test
+        assert worker.exitcode == 1
+
+        worker.close()
+
+    def test_cancel(self) -> None:
+        """
+        Cancelled workers end without running the target, and cannot be released after.
+        """
+        # Setup
+        ran = threading.Event()
+        worker = worker_execution.InProcessWorker(
+            set_event, (ran,), worker_execution.ExecutionMode.THREAD
+        )
+        worker.warm()
+
+        # Run
+        worker.cancel()
+        worker.release()
+        worker.join(JOIN_TIMEOUT)
+
+        # Test
+        assert not ran.is_set()
+        assert not worker.is_released()
+        assert not worker.is_alive()
+
+        worker.close()
+
+    def test_kill_task(self) -> None:
+        """
+        Killing a coroutine task cancels it.
+        """
+        # Setup
+        started = threading.Event()
+        worker = worker_execution.InProcessWorker(
+            wait_forever, (started,), worker_execution.ExecutionMode.ASYNCIO
+        )
+        worker.start()
+        assert started.wait(JOIN_TIMEOUT)
+
+        # Run
+        worker.kill()
+        worker.join(JOIN_TIMEOUT)
+
+        # Test
+        assert not worker.is_alive()
+        assert worker.exitcode == 1
+
+        worker.close()
+
+    def test_blocking_tasks(self) -> None:
+        """
+        Function targets in asyncio mode all run at once, beyond the default executor size.
+        """
+        # Setup
+        barrier = threading.Barrier(BLOCKING_WORKER_COUNT)
+        workers = [
+            worker_execution.InProcessWorker(
+                wait_for_all, (barrier,), worker_execution.ExecutionMode.ASYNCIO
+            )
+            for _ in range(BLOCKING_WORKER_COUNT)
+        ]
+
+        # Run
+        for worker in workers:
+            worker.start()
+
+        for worker in workers:
+            worker.join(2 * JOIN_TIMEOUT)
+
+        # Test
+        assert [worker.exitcode for worker in workers] == [0] * BLOCKING_WORKER_COUNT
+
+        for worker in workers:
+            worker.close()
+
+
+class TestProcessScheduling:
+    """
+    CPU sets and nice values of processes.
+    """
+
+    def test_check(self) -> None:
+        """
+        Only available CPUs and nice values in range are accepted.
+        """
+        # Setup
+        available_cpus = sorted(os.sched_getaffinity(0))
+
+        # Run
+        valid_result, _ = worker_execution.check_process_scheduling(available_cpus[:1], 0)
+        empty_result, _ = worker_execution.check_process_scheduling([], None)
+        unavailable_result, _ = worker_execution.check_process_scheduling(
+            [available_cpus[-1] + 1], None
+        )
+        nice_result, _ = worker_execution.check_process_scheduling(
+            None, worker_execution.MAX_NICE + 1
+        )
+
+        # Test
+        assert valid_result
+        assert not empty_result
+        assert not unavailable_result
+        assert not nice_result
+
+    def test_set(self) -> None:
+        """
+        Another process is pinned and its priority lowered, which needs no privileges.
+        """
+        # Setup
+        exit_event = mp.Event()
+        process = mp.Process(target=wait_for_exit, args=(exit_event,))
+        process.start()
+        cpu_set = sorted(os.sched_getaffinity(0))[:1]
+        nice = min(os.getpriority(os.PRIO_PROCESS, 0) + 1, worker_execution.MAX_NICE)
+
+        # Run
+        result, reason = worker_execution.set_process_scheduling(process.pid, cpu_set, nice)
+        process_cpus = os.sched_getaffinity(process.pid)
+        process_nice = os.getpriority(os.PRIO_PROCESS, process.pid)
+        exit_event.set()
+        process.join(JOIN_TIMEOUT)
+        reaped_result, _ = worker_execution.set_process_scheduling(process.pid, cpu_set, None)
+
+        # Test
+        assert result, reason
+        assert process_cpus == set(cpu_set)
+        assert process_nice == nice
+        assert not reaped_result
@@ -0,0 +1,132 @@
+"""
+Test worker liveness reporting.
+"""
+
+import multiprocessing as mp
+import time
+
+import pytest
+
+from utilities.workers import worker_liveness
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+BOARD_CAPACITY = 2
+ITERATION_COUNT = 5
+JOIN_TIMEOUT = 5.0  # seconds
+STALL_DEADLINE = 1.0  # seconds
+
+
+@pytest.fixture()
+def board() -> worker_liveness.LivenessBoard:  # type: ignore
+    """
+    Creates a board with 2 slots.
+    """
+    yield worker_liveness.LivenessBoard(BOARD_CAPACITY)  # type: ignore
+
+
+def loop_worker(iteration_count: int) -> None:
+    """
+    Worker reporting progress for each iteration.
+    """
+    for _ in range(iteration_count):
+        worker_liveness.report_progress()
+
+
+class TestWorkerLiveness:
+    """
+    Slots and progress reports.
+    """
+
+    def test_slots(self, board: worker_liveness.LivenessBoard) -> None:
+        """
+        Slots are allocated until none are free, and freed slots are reused.
+        """
+        # Run
+        first = board.allocate_slot()
+        second = board.allocate_slot()
+        exhausted = board.allocate_slot()
+        board.free_slot(first[1])
+        reused = board.allocate_slot()
+
+        # Test
+        assert first[0]
+        assert second[0]
+        assert first[1] != second[1]
+        assert exhausted == (False, -1)
+        assert reused == first
+
+    def test_report_progress(self, board: worker_liveness.LivenessBoard) -> None:
+        """
+        A bound worker stamps its slot on every iteration.
+        """
+        # Setup
+        _, slot = board.allocate_slot()
+        board.reset_slot(slot, 0.0)
+        worker = mp.Process(
+            target=worker_liveness.run_bound,
+            args=(board, slot, loop_worker, (ITERATION_COUNT,)),
+        )
+
+        # Run
+        start_time = time.monotonic()
+        worker.start()
+        worker.join(JOIN_TIMEOUT)
+        stamp, iterations = board.get_progress(slot)
+
+        # Test
+        assert worker.exitcode == 0
+        assert iterations == ITERATION_COUNT
+        assert start_time <= stamp <= time.monotonic()
+
+    def test_unbound(self, board: worker_liveness.LivenessBoard) -> None:
+        """
+        Reporting without a slot does nothing.
+        """
+        # Setup
+        _, slot = board.allocate_slot()
+        board.reset_slot(slot, 0.0)
+
+        # Run
+        loop_worker(ITERATION_COUNT)
+
+        # Test
+        assert board.get_progress(slot) == (0.0, 0)
+
+    def test_stall_detector(self) -> None:
+        """
+        Bound workers are stalled past the deadline, counting from the last pause if later.
+        """
+        # Setup
+        detector = worker_liveness.StallDetector(1, STALL_DEADLINE)
+        result, slot, target, args = detector.bind(loop_worker, (ITERATION_COUNT,))
+        exhausted = detector.bind(loop_worker, ())
+        worker = mp.Process(target=target, args=args)
+        detector.track(worker, slot)
+        detector.reset(worker, 0.0)
+
+        # Run
+        worker.start()
+        worker.join(JOIN_TIMEOUT)
+        stamp = time.monotonic()
+        progressing = detector.get_stall(worker, stamp)
+        stalled = detector.get_stall(worker, stamp + 2 * STALL_DEADLINE)
+        detector.record_pause(stamp + 2 * STALL_DEADLINE)
+        after_pause = detector.get_stall(worker, stamp + 2 * STALL_DEADLINE)
+        detector.untrack(worker)
+        untracked = detector.get_stall(worker, stamp + 2 * STALL_DEADLINE)
+
+        # Test
+        assert result
+        assert exhausted[:2] == (False, -1)
+        assert not progressing[0]
+        assert progressing[2] == ITERATION_COUNT
+        assert stalled[0]
+        assert stalled[1] > STALL_DEADLINE
+        assert not after_pause[0]
+        assert not untracked[0]
+        assert detector.bind(loop_worker, ())[0]
@@ -0,0 +1,390 @@
+"""
+Test supervising worker groups.
+"""
+
+import multiprocessing as mp
+import queue
+import sys
+import time
+
+import pytest
+
+from modules.common.modules.logger import logger
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import restart_policy
+from utilities.workers import scaling_policy
+from utilities.workers import worker_controller
+from utilities.workers import worker_liveness
+from utilities.workers import worker_manager
+
+
+# Test functions use test fixture signature names
+# No enable
+# pylint: disable=redefined-outer-name
+
+
+INITIAL_DELAY = 0.05  # seconds
+CRASH_LOOP_LIMIT = 4
+CRASH_LOOP_WINDOW = 30.0  # seconds
+SAMPLE_PERIOD = 0.05  # seconds
+STALL_DEADLINE = 0.2  # seconds
+WAIT_TIMEOUT = 10.0  # seconds
+# Workers which ignore exit requests are killed after this
+JOIN_TIMEOUT = 1.0  # seconds
+WORKER_SLEEP_PERIOD = 0.01  # seconds
+QUEUE_MAX_SIZE = 16
+MAX_COUNT = 3
+CHECK_COUNT = 50
+
+
+def crash_worker(
+    start_times: "mp.Queue[float]", _controller: worker_controller.WorkerController
+) -> None:
+    """
+    Records when it started, then crashes.
+    """
+    start_times.put(time.monotonic())
+    sys.exit(1)
+
+
+def loop_worker(controller: worker_controller.WorkerController) -> None:
+    """
+    Reports progress until exit is requested.
+    """
+    while not controller.wait_for_exit(WORKER_SLEEP_PERIOD):
+        worker_liveness.report_progress()
+
+
+def stall_worker(_controller: worker_controller.WorkerController) -> None:
+    """
+    Never reports progress.
+    """
+    while True:
+        time.sleep(WORKER_SLEEP_PERIOD)
+
+
+def consume_worker(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Takes items while not paused, exits cleanly on a sentinel.
+    """
+    while not controller.is_exit_requested():
+        controller.check_pause()
+        try:
+            item = input_queue.get(WORKER_SLEEP_PERIOD)
+        except queue.Empty:
+            continue
+
+        if item is None:
+            return
+
+
+@pytest.fixture
+def local_logger() -> logger.Logger:  # type: ignore
+    """
+    Logger of the test process.
+    """
+    result, test_logger = logger.Logger.create("test_worker_manager", False)
+    assert result
+    assert test_logger is not None
+
+    yield test_logger  # type: ignore
+
+
+def create_manager(
+    target: "(...) -> object",  # type: ignore
+    work_arguments: "tuple",
+    input_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+    controller: worker_controller.WorkerController,
+    local_logger: logger.Logger,
+    **kwargs: object,
+) -> worker_manager.WorkerManager:
+    """
+    Creates a manager of 1 worker process, without starting it.
+    """
+    result, properties = worker_manager.WorkerProperties.create(
+        1, target, work_arguments, input_queues, [], controller, local_logger
+    )
+    assert result
+    assert properties is not None
+
+    result, manager = worker_manager.WorkerManager.create(properties, local_logger, **kwargs)
+    assert result
+    assert manager is not None
+
+    return manager
+
+
+def wait_until(
+    condition: "() -> bool",  # type: ignore
+    managers: "list[worker_manager.WorkerManager]",
+) -> bool:
+    """
+    Returns whether the condition held within the wait timeout.
+    Replenishes the spares of the managers meanwhile, like the loop of main.
+    """
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+
+        for manager in managers:
+            manager.replenish_spares()
+
+        time.sleep(WORKER_SLEEP_PERIOD)
+
+    return True
+
+
+def stop(
+    manager: worker_manager.WorkerManager, controller: worker_controller.WorkerController
+) -> None:
+    """
+    Stops the supervisor and the workers.
+    """
+    manager.stop_supervisor()
+    controller.request_exit()
+    if not manager.join_workers(JOIN_TIMEOUT):
+        manager.kill_workers()
+        manager.join_workers()
+
+
+class TestWorkerManager:
+    """
+    Restarting, scaling, and killing workers from the supervisor.
+    """
+
+    def test_backoff_and_parking(self, local_logger: logger.Logger) -> None:
+        """
+        A crashing worker is restarted with growing delays until the crash loop parks the group,
+        and restarted again once resumed.
+        """
+        # Setup
+        controller = worker_controller.WorkerController()
+        start_times: "mp.Queue[float]" = mp.Queue()
+        result, policy = restart_policy.RestartPolicy.create(
+            initial_delay=INITIAL_DELAY,
+            jitter=0.0,
+            crash_loop_window=CRASH_LOOP_WINDOW,
+            crash_loop_limit=CRASH_LOOP_LIMIT,
+        )
+        assert result
+        crash_loops = []
+        manager = create_manager(
+            crash_worker,
+            (start_times,),
+            [],
+            controller,
+            local_logger,
+            worker_restart_policy=policy,
+            on_crash_loop=lambda name, count: crash_loops.append((name, count)),
+        )
+
+        # Run
+        manager.start_workers()
+        manager.start_supervisor()
+        # Started once only
+        manager.start_supervisor()
+        is_parked = wait_until(manager.is_parked, [manager])
+        parked_restart_counts = manager.get_restart_counts()
+
+        manager.resume_parked_workers()
+        is_resumed = wait_until(
+            lambda: manager.get_restart_counts()[0] > CRASH_LOOP_LIMIT - 1, [manager]
+        )
+        stop(manager, controller)
+
+        times = [start_times.get(True, WAIT_TIMEOUT) for _ in range(CRASH_LOOP_LIMIT)]
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+
+        # Test
+        assert is_parked
+        assert parked_restart_counts == [CRASH_LOOP_LIMIT - 1]
+        assert len(crash_loops) == 1
+        assert crash_loops[0][1] == CRASH_LOOP_LIMIT
+        assert len(manager.get_restart_latencies()) >= CRASH_LOOP_LIMIT - 1
+        # The second and third restarts wait the initial delay, then twice it
+        assert gaps[1] >= INITIAL_DELAY
+        assert gaps[2] >= 2 * INITIAL_DELAY
+        assert is_resumed
+
+    def test_deaths_detected_twice(self, local_logger: logger.Logger) -> None:
+        """
+        Main checking for dead workers while the supervisor runs handles each death once.
+        """
+        # Setup
+        controller = worker_controller.WorkerController()
+        start_times: "mp.Queue[float]" = mp.Queue()
+        result, policy = restart_policy.RestartPolicy.create(
+            initial_delay=INITIAL_DELAY, max_delay=INITIAL_DELAY, crash_loop_limit=CHECK_COUNT
+        )
+        assert result
+        manager = create_manager(
+            crash_worker,
+            (start_times,),
+            [],
+            controller,
+            local_logger,
+            worker_restart_policy=policy,
+        )
+
+        # Run
+        manager.start_workers()
+        manager.start_supervisor()
+        for _ in range(CHECK_COUNT):
+            manager.check_and_restart_dead_workers()
+            time.sleep(WORKER_SLEEP_PERIOD)
+
+        # The supervisor keeps restarting on its own
+        checked_restart_count = manager.get_restart_counts()[0]
+        is_supervised = wait_until(
+            lambda: manager.get_restart_counts()[0] > checked_restart_count, [manager]
+        )
+        stop(manager, controller)
+        start_count = 0
+        while True:
+            try:
+                start_times.get(True, JOIN_TIMEOUT)
+            except queue.Empty:
+                break
+
+            start_count += 1
+
+        # Test
+        assert checked_restart_count > 0
+        assert is_supervised
+        assert manager.get_restart_counts() == [start_count - 1]
+
+    def test_supervisor_does_not_fork(self, local_logger: logger.Logger) -> None:
+        """
+        With the fork start method, the supervisor restarts from spares only,
+        which main starts.
+        """
+        # Setup
+        controller = worker_controller.WorkerController()
+        start_times: "mp.Queue[float]" = mp.Queue()
+        result, policy = restart_policy.RestartPolicy.create(
+            initial_delay=INITIAL_DELAY, max_delay=INITIAL_DELAY, crash_loop_limit=CHECK_COUNT
+        )
+        assert result
+        manager = create_manager(
+            crash_worker,
+            (start_times,),
+            [],
+            controller,
+            local_logger,
+            worker_restart_policy=policy,
+        )
+
+        # Run
+        manager.start_workers()
+        manager.start_supervisor()
+        start_times.get(True, WAIT_TIMEOUT)
+        # Several retries of the restart
+        time.sleep(4 * INITIAL_DELAY)
+        unreplenished_restart_counts = manager.get_restart_counts()
+
+        is_restarted = wait_until(lambda: manager.get_restart_counts()[0] > 0, [manager])
+        stop(manager, controller)
+
+        # Test
+        assert mp.get_start_method() != "fork" or unreplenished_restart_counts == [0]
+        assert is_restarted
+
+    def test_exit_is_not_restarted(self, local_logger: logger.Logger) -> None:
+        """
+        Workers exiting on request are joined, not restarted.
+        """
+        # Setup
+        controller = worker_controller.WorkerController()
+        manager = create_manager(loop_worker, (), [], controller, local_logger)
+
+        # Run
+        manager.start_workers()
+        manager.start_supervisor()
+        controller.request_exit()
+        is_joined = manager.join_workers(WAIT_TIMEOUT)
+        manager.stop_supervisor()
+
+        # Test
+        assert is_joined
+        assert manager.get_restart_counts() == [0]
+
+    def test_stall_kill(self, local_logger: logger.Logger) -> None:
+        """
+        A worker reporting no progress is killed and restarted, one that does is left alone.
+        """
+        # Setup
+        controller = worker_controller.WorkerController()
+        stalled = create_manager(
+            stall_worker, (), [], controller, local_logger, stall_deadline=STALL_DEADLINE
+        )
+        progressing = create_manager(
+            loop_worker, (), [], controller, local_logger, stall_deadline=STALL_DEADLINE
+        )
+
+        # Run
+        for manager in [stalled, progressing]:
+            manager.start_workers()
+            manager.start_supervisor()
+
+        is_restarted = wait_until(lambda: stalled.get_restart_counts()[0] > 0, [stalled])
+        time.sleep(2 * STALL_DEADLINE)
+        progressing_restart_counts = progressing.get_restart_counts()
+        for manager in [stalled, progressing]:
+            stop(manager, controller)
+
+        # Test
+        assert is_restarted
+        assert progressing_restart_counts == [0]
+
+    def test_scaling(self, local_logger: logger.Logger) -> None:
+        """
+        The group grows to its maximum while items queue up, then shrinks back once drained.
+        """
+        # Setup
+        controller = worker_controller.WorkerController()
+        input_queue = queue_proxy_wrapper.QueueProxyWrapper(
+            None, QUEUE_MAX_SIZE, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY
+        )
+        result, policy = scaling_policy.ScalingPolicy.create(
+            min_count=1,
+            max_count=MAX_COUNT,
+            scale_up_depth=1.0,
+            scale_down_depth=0.5,
+            scale_down_idle=0.0,
+            sustain_count=1,
+            cooldown=0.0,
+            sample_period=SAMPLE_PERIOD,
+        )
+        assert result
+        manager = create_manager(
+            consume_worker,
+            (),
+            [input_queue],
+            controller,
+            local_logger,
+            worker_scaling_policy=policy,
+            warm_spare_count=1,
+        )
+
+        # Run
+        controller.request_pause()
+        input_queue.put_many(list(range(QUEUE_MAX_SIZE)))
+        manager.start_workers()
+        manager.start_supervisor()
+        is_grown = wait_until(lambda: manager.get_worker_count() == MAX_COUNT, [manager])
+
+        controller.request_resume()
+        is_shrunk = wait_until(lambda: manager.get_worker_count() == 1, [manager])
+        restart_counts = manager.get_restart_counts()
+        stop(manager, controller)
+        input_queue.close()
+
+        # Test
+        assert is_grown
+        assert is_shrunk
+        # Retired workers exit cleanly and are removed, not restarted
+        assert restart_counts == [0]
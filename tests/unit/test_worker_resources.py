@@ -0,0 +1,152 @@
+"""
+Test reading and recording worker resource usage.
+"""
+
+import csv
+import json
+import multiprocessing as mp
+import os
+import pathlib
+import time
+
+from utilities.workers import worker_resources
+
+
+BUSY_TIME = 0.2  # seconds
+JOIN_TIMEOUT = 5.0  # seconds
+
+
+def wait_for_exit(exit_event: "mp.Event") -> None:  # type: ignore
+    """
+    Worker idling until told to exit.
+    """
+    exit_event.wait(JOIN_TIMEOUT)
+
+
+def create_sample(timestamp: float, worker_name: str) -> worker_resources.WorkerResourceSample:
+    """
+    Sample with fixed usage.
+    """
+    return worker_resources.WorkerResourceSample(
+        timestamp,
+        "target",
+        worker_name,
+        1234,
+        worker_resources.ProcessUsage(1.5, 4096, 10, 2, 7),
+        25.0,
+    )
+
+
+class TestReadProcessUsage:
+    """
+    Reading /proc .
+    """
+
+    def test_own_process(self) -> None:
+        """
+        CPU time grows while busy, and this process has memory and open files.
+        """
+        # Setup
+        result, before = worker_resources.read_process_usage(os.getpid())
+        assert result
+        assert before is not None
+
+        # Run
+        busy_end = time.process_time() + BUSY_TIME
+        while time.process_time() < busy_end:
+            pass
+
+        result, after = worker_resources.read_process_usage(os.getpid())
+
+        # Test
+        assert result
+        assert after is not None
+        assert after.cpu_time > before.cpu_time
+        assert after.rss > 0
+        assert after.open_fds >= 3
+        assert after.voluntary_context_switches >= before.voluntary_context_switches
+
+    def test_child_process(self) -> None:
+        """
+        Other processes are read by pid, and cannot be read once reaped.
+        """
+        # Setup
+        exit_event = mp.Event()
+        process = mp.Process(target=wait_for_exit, args=(exit_event,))
+        process.start()
+
+        # Run
+        result_alive, usage = worker_resources.read_process_usage(process.pid)
+        exit_event.set()
+        process.join(JOIN_TIMEOUT)
+        result_reaped, _ = worker_resources.read_process_usage(process.pid)
+
+        # Test
+        assert result_alive
+        assert usage is not None
+        assert usage.rss > 0
+        assert not result_reaped
+
+
+class TestResourceTimeSeries:
+    """
+    Recording and writing samples.
+    """
+
+    def test_bounded(self) -> None:
+        """
+        The oldest samples are dropped.
+        """
+        # Setup
+        time_series = worker_resources.ResourceTimeSeries(2)
+
+        # Run
+        time_series.record([create_sample(1.0, "a"), create_sample(1.0, "b")])
+        time_series.record([create_sample(2.0, "a")])
+
+        # Test
+        samples = time_series.get_samples()
+        assert [(sample.timestamp, sample.worker_name) for sample in samples] == [
+            (1.0, "b"),
+            (2.0, "a"),
+        ]
+
+    def test_write_csv(self, tmp_path: pathlib.Path) -> None:
+        """
+        A row per sample, with every field.
+        """
+        # Setup
+        time_series = worker_resources.ResourceTimeSeries()
+        time_series.record([create_sample(1.0, "a"), create_sample(2.0, "b")])
+        path = tmp_path / "resources.csv"
+
+        # Run
+        time_series.write_csv(path)
+
+        # Test
+        with open(path, encoding="utf-8", newline="") as csv_file:
+            rows = list(csv.DictReader(csv_file))
+
+        assert len(rows) == 2
+        assert list(rows[0].keys()) == worker_resources.SAMPLE_FIELDS
+        assert rows[1]["worker_name"] == "b"
+        assert float(rows[1]["cpu_time"]) == 1.5
+        assert int(rows[1]["involuntary_context_switches"]) == 2
+
+    def test_write_json(self, tmp_path: pathlib.Path) -> None:
+        """
+        An object per sample, with every field.
+        """
+        # Setup
+        time_series = worker_resources.ResourceTimeSeries()
+        time_series.record([create_sample(1.0, "a")])
+        path = tmp_path / "resources.json"
+
+        # Run
+        time_series.write_json(path)
+
+        # Test
+        with open(path, encoding="utf-8") as json_file:
+            samples = json.load(json_file)
+
+        assert samples == [create_sample(1.0, "a").to_dict()]
@@ -0,0 +1,84 @@
+"""
+Batch queue.
+"""
+
+import multiprocessing.managers
+import queue
+import time
+
+
+class BatchQueue(queue.Queue):
+    """
+    `queue.Queue` with batch operations, each taking the queue lock once.
+
+    Served by BatchQueueManager , each batch operation is a single round trip to the manager.
+    `maxsize` bounds the number of items, not the number of batches.
+    """
+
+    def put_many(self, items: "list[object]", timeout: "float | None" = None) -> None:
+        """
+        Puts all items in order, waiting for space as needed.
+
+        Raises queue.Full if there was no space in time,
+        in which case the items not yet put are not put.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.not_full:
+            for item in items:
+                while 0 < self.maxsize <= self._qsize():
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0.0:
+                        raise queue.Full
+
+                    self.not_full.wait(remaining)
+
+                self._put(item)
+                self.unfinished_tasks += 1
+                self.not_empty.notify()
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> "list[object]":
+        """
+        Removes and returns up to `max_items` items.
+        Waits for the first item only, the rest are what is immediately available.
+
+        Returns an empty list if no item arrived in time.
+        """
+        if max_items <= 0:
+            return []
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.not_empty:
+            while self._qsize() == 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0.0:
+                    return []
+
+                self.not_empty.wait(remaining)
+
+            items = []
+            while self._qsize() > 0 and len(items) < max_items:
+                items.append(self._get())
+
+            self.not_full.notify(len(items))
+
+        return items
+
+
+class BatchQueueManager(multiprocessing.managers.SyncManager):
+    """
+    SyncManager which also serves BatchQueue .
+    """
+
+
+BatchQueueManager.register("BatchQueue", BatchQueue)
+
+
+def start_manager() -> BatchQueueManager:
+    """
+    Starts a manager serving batch queues, like `multiprocessing.Manager()` .
+    Shut it down once the queues are no longer used.
+    """
+    manager = BatchQueueManager()
+    # Returned running, the caller shuts it down
+    manager.start()  # pylint: disable=consider-using-with
+    return manager
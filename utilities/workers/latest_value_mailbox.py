@@ -0,0 +1,151 @@
+"""
+Latest value mailbox.
+"""
+
+import ctypes
+import multiprocessing as mp
+import pickle
+import queue
+
+
+class LatestValueMailbox:
+    """
+    Single slot channel where each put overwrites the previous value.
+
+    Producers never block. Consumers always get the newest value, and each value is
+    delivered at most once. A sequence number counts every put, so consumers also
+    learn how many values were overwritten before being read.
+    Supports the subset of the `queue.Queue` interface used by the workers.
+    """
+
+    def __init__(self, slot_size: int) -> None:
+        """
+        Constructor allocates the slot in shared memory.
+
+        slot_size: Maximum pickled size of a value in bytes, must be greater than 0 .
+        """
+        assert slot_size > 0, "Slot size must be greater than 0"
+
+        self.__slot_size = slot_size
+        self.__slot = mp.RawArray(ctypes.c_char, slot_size)
+        self.__length = mp.RawValue(ctypes.c_uint32, 0)
+        # Number of values put, and the sequence number of the last value taken
+        self.__sequence = mp.RawValue(ctypes.c_uint64, 0)
+        self.__taken_sequence = mp.RawValue(ctypes.c_uint64, 0)
+        self.__condition = mp.Condition(mp.Lock())
+
+    def __write(self, item: object, count: int) -> None:
+        """
+        Overwrites the slot with the item and advances the sequence number by `count`.
+        """
+        data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.__slot_size:
+            raise ValueError(f"Item of {len(data)} bytes exceeds slot size {self.__slot_size}")
+
+        with self.__condition:
+            ctypes.memmove(self.__slot, data, len(data))
+            self.__length.value = len(data)
+            self.__sequence.value += count
+            self.__condition.notify_all()
+
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Overwrites the value, never blocks.
+        `block` and `timeout` exist for compatibility with `queue.Queue` .
+
+        Raises ValueError if the pickled item does not fit in the slot.
+        """
+        # Unused, the mailbox is never full
+        _ = block, timeout
+
+        self.__write(item, 1)
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Overwrites the value.
+        """
+        self.put(item, False)
+
+    def put_many(self, items: "list[object]", timeout: "float | None" = None) -> None:
+        """
+        Overwrites the value with the last item, the others count as overwritten.
+        """
+        # Unused, the mailbox is never full
+        _ = timeout
+
+        if len(items) == 0:
+            return
+
+        self.__write(items[-1], len(items))
+
+    def get_latest(
+        self, block: bool = True, timeout: "float | None" = None
+    ) -> "tuple[object, int]":
+        """
+        Takes the newest value.
+
+        Returns the value and the number of values overwritten since the previous take.
+        Raises queue.Empty if no new value arrived in time.
+        """
+        with self.__condition:
+            if self.__sequence.value == self.__taken_sequence.value:
+                if not block:
+                    raise queue.Empty
+
+                if not self.__condition.wait_for(
+                    lambda: self.__sequence.value != self.__taken_sequence.value, timeout
+                ):
+                    raise queue.Empty
+
+            data = ctypes.string_at(self.__slot, self.__length.value)
+            skipped = self.__sequence.value - self.__taken_sequence.value - 1
+            self.__taken_sequence.value = self.__sequence.value
+
+        return pickle.loads(data), skipped
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Takes the newest value.
+
+        Raises queue.Empty if no new value arrived in time.
+        """
+        item, _ = self.get_latest(block, timeout)
+        return item
+
+    def get_nowait(self) -> object:
+        """
+        Takes the newest value without blocking.
+        """
+        return self.get(False)
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> "list[object]":
+        """
+        Takes the newest value as a batch of at most 1 .
+
+        Returns an empty list if no new value arrived in time.
+        """
+        if max_items <= 0:
+            return []
+
+        try:
+            return [self.get(True, timeout)]
+        except queue.Empty:
+            return []
+
+    def qsize(self) -> int:
+        """
+        1 if there is a value not yet taken, otherwise 0 .
+        """
+        return int(self.__sequence.value != self.__taken_sequence.value)
+
+    def empty(self) -> bool:
+        """
+        Whether there is no value waiting to be taken.
+        """
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        """
+        Always False, puts never block.
+        """
+        return False
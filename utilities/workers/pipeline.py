@@ -0,0 +1,308 @@
+"""
+Worker pipeline built from a topology.
+"""
+
+import importlib
+import multiprocessing.managers
+
+from modules.common.modules.logger import logger
+from utilities.workers import pipeline_topology
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import queue_selector
+from utilities.workers import restart_policy
+from utilities.workers import shutdown_coordinator
+from utilities.workers import worker_controller
+from utilities.workers import worker_execution
+from utilities.workers import worker_manager
+from utilities.workers import worker_resources
+
+
+class Pipeline:
+    """
+    Queues and worker managers of every stage of a topology.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        topology: pipeline_topology.PipelineTopology,
+        stage_arguments: "dict[str, tuple]",
+        controller: worker_controller.WorkerController,
+        local_logger: logger.Logger,
+        mp_manager: multiprocessing.managers.SyncManager | None = None,
+        main_selector: queue_selector.QueueSelector | None = None,
+        stage_selectors: "dict[str, queue_selector.QueueSelector] | None" = None,
+        worker_restart_policy: restart_policy.RestartPolicy | None = None,
+        on_crash_loop: "(str, int) -> None | None" = None,  # type: ignore
+        warm_spare_count: int = 0,
+        stall_deadline: "float | None" = None,
+    ) -> "tuple[bool, Pipeline | None]":
+        """
+        Creates the queues and the workers of every stage, which wait until start() .
+
+        topology: Stages and queues.
+        stage_arguments: Arguments for worker internals by stage name, stages not listed get none.
+        controller: Worker controller of all workers.
+        local_logger: Existing logger from process.
+        mp_manager: Manager serving the queues, only required for the manager backend.
+        main_selector: Selector main waits on, the queues main consumes are registered to it
+            in the order of get_main_queue_names() .
+        stage_selectors: Selector by stage name, the input queues of the stage are registered
+            to it in order, pass it to the workers in the stage arguments.
+        worker_restart_policy, on_crash_loop, warm_spare_count:
+            Passed to the worker manager of every stage.
+        stall_deadline: Passed to the worker managers of stages running in processes.
+
+        Returns whether the pipeline was able to be created and the pipeline.
+        """
+        stage_selectors = {} if stage_selectors is None else stage_selectors
+        stage_names = [stage.name for stage in topology.get_stages()]
+        for name in stage_arguments:
+            if name not in stage_names:
+                local_logger.error(f"Arguments given for unknown stage {name}", True)
+                return False, None
+
+        for name in stage_selectors:
+            if name not in stage_names:
+                local_logger.error(f"Selector given for unknown stage {name}", True)
+                return False, None
+
+        queues: "dict[str, queue_proxy_wrapper.QueueProxyWrapper]" = {}
+        for queue_spec in topology.get_queues():
+            if (
+                queue_spec.backend == queue_proxy_wrapper.QueueBackend.MANAGER
+                and mp_manager is None
+            ):
+                local_logger.error(f"Queue {queue_spec.name} requires a manager", True)
+                Pipeline.__close_queues(list(queues.values()))
+                return False, None
+
+            queues[queue_spec.name] = queue_proxy_wrapper.QueueProxyWrapper(
+                mp_manager,
+                queue_spec.max_size,
+                queue_spec.backend,
+                queue_spec.item_size,
+                queue_spec.instrumented,
+                queue_spec.name,
+            )
+
+        # Before the workers are created, so that producers signal on put
+        if main_selector is not None:
+            for name in topology.get_main_queue_names():
+                main_selector.register(queues[name])
+
+        for stage in topology.get_stages():
+            if stage.name in stage_selectors:
+                for name in stage.input_queue_names:
+                    stage_selectors[stage.name].register(queues[name])
+
+        managers = []
+        for stage in topology.get_stages():
+            result, target = Pipeline.__resolve_target(stage.target_path)
+            if not result:
+                local_logger.error(f"Stage {stage.name} target {stage.target_path} not found", True)
+                Pipeline.__close_queues(list(queues.values()))
+                return False, None
+
+            result, properties = worker_manager.WorkerProperties.create(
+                count=stage.count,
+                target=target,
+                work_arguments=stage_arguments.get(stage.name, ()),
+                input_queues=[queues[name] for name in stage.input_queue_names],
+                output_queues=[queues[name] for name in stage.output_queue_names],
+                controller=controller,
+                local_logger=local_logger,
+                execution_mode=stage.execution_mode,
+                cpu_set=stage.cpu_set,
+                nice=stage.nice,
+                hot_standby=stage.hot_standby,
+            )
+            if not result:
+                local_logger.error(f"Failed to create {stage.name} properties", True)
+                Pipeline.__close_queues(list(queues.values()))
+                return False, None
+
+            # Get Pylance to stop complaining
+            assert properties is not None
+
+            # Only processes can be killed when they hang
+            stage_stall_deadline = None
+            if stage.execution_mode == worker_execution.ExecutionMode.PROCESS:
+                stage_stall_deadline = stall_deadline
+
+            result, manager = worker_manager.WorkerManager.create(
+                properties,
+                local_logger,
+                worker_restart_policy=worker_restart_policy,
+                on_crash_loop=on_crash_loop,
+                worker_scaling_policy=stage.scaling_policy,
+                warm_spare_count=warm_spare_count,
+                stall_deadline=stage_stall_deadline,
+            )
+            if not result:
+                # Workers already created are cancelled at exit
+                local_logger.error(f"Failed to create {stage.name} manager", True)
+                Pipeline.__close_queues(list(queues.values()))
+                return False, None
+
+            managers.append(manager)
+
+        return True, Pipeline(
+            cls.__create_key, list(queues.values()), queues, stage_names, managers
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        ordered_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+        queues: "dict[str, queue_proxy_wrapper.QueueProxyWrapper]",
+        stage_names: "list[str]",
+        managers: "list[worker_manager.WorkerManager]",
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is Pipeline.__create_key, "Use create() method"
+
+        # From start to end
+        self.__ordered_queues = ordered_queues
+        self.__queues = queues
+        self.__stage_names = stage_names
+        self.__managers = managers
+
+    @staticmethod
+    def __resolve_target(target_path: str) -> "tuple[bool, (...) -> object | None]":  # type: ignore
+        """
+        Imports the function at a module.function path.
+        """
+        module_path, _, function_name = target_path.rpartition(".")
+        try:
+            module = importlib.import_module(module_path)
+        except ImportError:
+            return False, None
+
+        target = getattr(module, function_name, None)
+        if not callable(target):
+            return False, None
+
+        return True, target
+
+    @staticmethod
+    def __close_queues(queues: "list[queue_proxy_wrapper.QueueProxyWrapper]") -> None:
+        """
+        Releases queues no worker is attached to.
+        """
+        for stage_queue in queues:
+            stage_queue.close()
+
+    def start(self) -> None:
+        """
+        Starts the workers and their supervisors, from start to end.
+        """
+        for manager in self.__managers:
+            manager.start_workers()
+
+        for manager in self.__managers:
+            manager.start_supervisor()
+
+    def stop_supervisors(self) -> None:
+        """
+        Stops restarting and resizing, call after requesting exit.
+        """
+        for manager in self.__managers:
+            manager.stop_supervisor()
+
+    def replenish_spares(self) -> None:
+        """
+        Starts the spares the supervisors used up, call periodically from main.
+        """
+        for manager in self.__managers:
+            manager.replenish_spares()
+
+    def fill_and_drain_queues(self) -> None:
+        """
+        Fills and drains the queues from END TO START, waking blocked workers.
+        """
+        for stage_queue in reversed(self.__ordered_queues):
+            stage_queue.fill_and_drain_queue()
+
+    def join_workers(self) -> None:
+        """
+        Joins the workers from end to start.
+        """
+        for manager in reversed(self.__managers):
+            manager.join_workers()
+
+    def shutdown(
+        self,
+        controller: worker_controller.WorkerController,
+        local_logger: logger.Logger,
+        deadline: float,
+        terminate_grace: float,
+    ) -> "tuple[bool, list[shutdown_coordinator.StageShutdownReport]]":
+        """
+        Requests exit and stops every stage in parallel, instead of stop_supervisors() ,
+        fill_and_drain_queues() , and join_workers() .
+        Stages still running at the deadline are terminated, then killed.
+
+        controller: Worker controller of all workers.
+        local_logger: Existing logger from process.
+        deadline: Time for all workers to exit on their own, in seconds.
+        terminate_grace: Time for workers to end after each of SIGTERM and SIGKILL, in seconds.
+
+        Returns whether the shutdown was able to run and a report per stage, from start to end.
+        """
+        result, coordinator = shutdown_coordinator.ShutdownCoordinator.create(
+            list(zip(self.__stage_names, self.__managers)),
+            self.__ordered_queues,
+            controller,
+            local_logger,
+            deadline,
+            terminate_grace,
+        )
+        if not result:
+            return False, []
+
+        # Get Pylance to stop complaining
+        assert coordinator is not None
+
+        return True, coordinator.shutdown()
+
+    def close_queues(self) -> None:
+        """
+        Releases the queues, call after all workers have joined.
+        """
+        Pipeline.__close_queues(list(reversed(self.__ordered_queues)))
+
+    def sample_resources(self) -> "list[worker_resources.WorkerResourceSample]":
+        """
+        Returns the resource usage of every worker process, from start to end.
+        """
+        samples = []
+        for manager in self.__managers:
+            samples.extend(manager.sample_resources())
+
+        return samples
+
+    def get_queue(self, name: str) -> "tuple[bool, queue_proxy_wrapper.QueueProxyWrapper | None]":
+        """
+        Returns whether the queue exists and the queue.
+        """
+        if name not in self.__queues:
+            return False, None
+
+        return True, self.__queues[name]
+
+    def get_queues(self) -> "list[queue_proxy_wrapper.QueueProxyWrapper]":
+        """
+        Returns the queues from start to end.
+        """
+        return self.__ordered_queues
+
+    def get_managers(self) -> "list[worker_manager.WorkerManager]":
+        """
+        Returns the worker managers from start to end.
+        """
+        return self.__managers
@@ -0,0 +1,443 @@
+"""
+Stages and queues of a worker pipeline, read from configuration.
+
+Configuration layout, every key of a queue and stage other than the target is optional:
+```
+queues:
+  telemetry_queue:
+    max_size: 10
+    backend: latest_value  # manager, shared_memory, latest_value, or in_process
+    item_size: 0  # bytes, shared memory backends only, 0 for the default
+    instrumented: true
+stages:
+  command:
+    target: modules.command.command_worker.command_worker
+    count: 1
+    execution: process  # process, thread, or asyncio
+    cpu_set: [3]  # CPUs each worker process may run on, processes only
+    nice: -5  # nice value of each worker process, processes only
+    hot_standby: false  # spares run the target setup ahead of time, processes only
+    input_queues: [telemetry_queue]
+    output_queues: [report_queue]
+    scaling:  # ScalingPolicy.create() arguments other than min_count, which is count
+      max_count: 3
+```
+Queues without a consuming stage are consumed by main.
+In process queues can only connect stages running in threads or asyncio tasks, and main.
+"""
+
+import copy
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import scaling_policy
+from utilities.workers import worker_execution
+
+
+_QUEUE_KEYS = {"max_size", "backend", "item_size", "instrumented"}
+_STAGE_KEYS = {
+    "target",
+    "count",
+    "execution",
+    "cpu_set",
+    "nice",
+    "hot_standby",
+    "input_queues",
+    "output_queues",
+    "scaling",
+}
+
+
+def merge_config(defaults: dict, overrides: "dict | None") -> object:
+    """
+    Applies overrides to defaults, nested mappings are merged key by key.
+    None, such as an empty configuration section, overrides nothing.
+
+    Returns the merged copy, or a copy of overrides that are not a mapping.
+    The arguments are not modified.
+    """
+    if overrides is None:
+        return copy.deepcopy(defaults)
+
+    if not isinstance(overrides, dict):
+        return copy.deepcopy(overrides)
+
+    merged = copy.deepcopy(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+
+    return merged
+
+
+def _is_int(value: object) -> bool:
+    """
+    Whether the value is an integer, YAML booleans are not.
+    """
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class QueueSpec:
+    """
+    Queue between stages.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int,
+        backend: queue_proxy_wrapper.QueueBackend,
+        item_size: int,
+        instrumented: bool,
+    ) -> None:
+        self.name = name
+        self.max_size = max_size
+        self.backend = backend
+        self.item_size = item_size
+        self.instrumented = instrumented
+
+
+class StageSpec:  # pylint: disable=too-many-instance-attributes
+    """
+    Group of identical workers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        target_path: str,
+        count: int,
+        execution_mode: worker_execution.ExecutionMode,
+        input_queue_names: "list[str]",
+        output_queue_names: "list[str]",
+        worker_scaling_policy: "scaling_policy.ScalingPolicy | None",
+        cpu_set: "list[int] | None" = None,
+        nice: "int | None" = None,
+        hot_standby: bool = False,
+    ) -> None:
+        self.name = name
+        self.target_path = target_path
+        self.count = count
+        self.execution_mode = execution_mode
+        self.cpu_set = cpu_set
+        self.nice = nice
+        self.hot_standby = hot_standby
+        self.input_queue_names = input_queue_names
+        self.output_queue_names = output_queue_names
+        self.scaling_policy = worker_scaling_policy
+
+    def get_max_count(self) -> int:
+        """
+        Returns the most workers the stage can have.
+        """
+        if self.scaling_policy is None:
+            return self.count
+
+        return self.scaling_policy.max_count
+
+
+class PipelineTopology:
+    """
+    Validated stages and queues, in data path order.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(cls, pipeline_config: object) -> "tuple[bool, PipelineTopology | None, str]":
+        """
+        Reads and validates a topology.
+
+        pipeline_config: Mapping with queues and stages, see the module docstring.
+
+        Returns whether the topology is valid, the topology, and the reason if it is not.
+        """
+        if not isinstance(pipeline_config, dict):
+            return False, None, "Pipeline must be a mapping"
+
+        queues_config = pipeline_config.get("queues", {})
+        stages_config = pipeline_config.get("stages", {})
+        if not isinstance(queues_config, dict) or not isinstance(stages_config, dict):
+            return False, None, "Pipeline queues and stages must be mappings"
+
+        if len(stages_config) == 0:
+            return False, None, "Pipeline has no stages"
+
+        queues: "dict[str, QueueSpec]" = {}
+        for name, queue_config in queues_config.items():
+            result, queue_spec, reason = PipelineTopology.__parse_queue(name, queue_config)
+            if not result:
+                return False, None, reason
+
+            queues[name] = queue_spec
+
+        stages: "list[StageSpec]" = []
+        for name, stage_config in stages_config.items():
+            result, stage_spec, reason = PipelineTopology.__parse_stage(name, stage_config, queues)
+            if not result:
+                return False, None, reason
+
+            stages.append(stage_spec)
+
+        result, stages = PipelineTopology.__sort_stages(stages)
+        if not result:
+            return False, None, "Pipeline stages form a cycle"
+
+        # Queues follow their producers, so they are listed from start to end
+        ordered_queues = []
+        main_queue_names = []
+        for stage in stages:
+            for name in stage.output_queue_names:
+                if queues[name] not in ordered_queues:
+                    ordered_queues.append(queues[name])
+
+        for queue_spec in queues.values():
+            if queue_spec not in ordered_queues:
+                return False, None, f"Queue {queue_spec.name} has no producer"
+
+            producer_count = sum(
+                stage.get_max_count()
+                for stage in stages
+                if queue_spec.name in stage.output_queue_names
+            )
+            consumer_count = sum(
+                stage.get_max_count()
+                for stage in stages
+                if queue_spec.name in stage.input_queue_names
+            )
+            if consumer_count == 0:
+                main_queue_names.append(queue_spec.name)
+                consumer_count = 1
+
+            if queue_spec.backend == queue_proxy_wrapper.QueueBackend.IN_PROCESS and any(
+                stage.execution_mode == worker_execution.ExecutionMode.PROCESS
+                and queue_spec.name in stage.input_queue_names + stage.output_queue_names
+                for stage in stages
+            ):
+                return (
+                    False,
+                    None,
+                    f"Queue {queue_spec.name} is in process but used by a stage in processes",
+                )
+
+            # Filling and draining at exit moves max size items,
+            # which must wake every blocked producer and consumer
+            # Latest value queues never block and shared memory queues have a default capacity
+            if (
+                queue_spec.backend != queue_proxy_wrapper.QueueBackend.LATEST_VALUE
+                and queue_spec.max_size > 0
+                and queue_spec.max_size < max(producer_count, consumer_count)
+            ):
+                return (
+                    False,
+                    None,
+                    f"Queue {queue_spec.name} max size {queue_spec.max_size} is less than "
+                    f"its {producer_count} producers or {consumer_count} consumers",
+                )
+
+        main_queue_names.sort(key=lambda name: ordered_queues.index(queues[name]))
+
+        return (
+            True,
+            PipelineTopology(cls.__create_key, stages, ordered_queues, main_queue_names),
+            "",
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        stages: "list[StageSpec]",
+        queues: "list[QueueSpec]",
+        main_queue_names: "list[str]",
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is PipelineTopology.__create_key, "Use create() method"
+
+        self.__stages = stages
+        self.__queues = queues
+        self.__main_queue_names = main_queue_names
+
+    @staticmethod
+    def __parse_queue(name: str, queue_config: object) -> "tuple[bool, QueueSpec | None, str]":
+        """
+        Reads a queue, None for all defaults.
+        """
+        if queue_config is None:
+            queue_config = {}
+
+        if not isinstance(queue_config, dict):
+            return False, None, f"Queue {name} must be a mapping"
+
+        unknown_keys = set(queue_config) - _QUEUE_KEYS
+        if len(unknown_keys) > 0:
+            return False, None, f"Queue {name} has unknown keys {sorted(unknown_keys)}"
+
+        max_size = queue_config.get("max_size", 0)
+        item_size = queue_config.get("item_size", 0)
+        if not _is_int(max_size) or not _is_int(item_size) or item_size < 0:
+            return False, None, f"Queue {name} sizes must be integers, item size at least 0"
+
+        backend_name = queue_config.get("backend", "manager")
+        backend_names = [backend.name.lower() for backend in queue_proxy_wrapper.QueueBackend]
+        if backend_name not in backend_names:
+            return False, None, f"Queue {name} backend must be one of {backend_names}"
+
+        instrumented = queue_config.get("instrumented", False)
+        if not isinstance(instrumented, bool):
+            return False, None, f"Queue {name} instrumented must be true or false"
+
+        return (
+            True,
+            QueueSpec(
+                name,
+                max_size,
+                queue_proxy_wrapper.QueueBackend[backend_name.upper()],
+                item_size,
+                instrumented,
+            ),
+            "",
+        )
+
+    @staticmethod
+    def __parse_stage(
+        name: str, stage_config: object, queues: "dict[str, QueueSpec]"
+    ) -> "tuple[bool, StageSpec | None, str]":
+        """
+        Reads a stage, its queues must already be read.
+        """
+        if not isinstance(stage_config, dict):
+            return False, None, f"Stage {name} must be a mapping"
+
+        unknown_keys = set(stage_config) - _STAGE_KEYS
+        if len(unknown_keys) > 0:
+            return False, None, f"Stage {name} has unknown keys {sorted(unknown_keys)}"
+
+        # Resolved when building, importing workers here would import all of their dependencies
+        target_path = stage_config.get("target")
+        if not isinstance(target_path, str) or "." not in target_path:
+            return False, None, f"Stage {name} target must be a module.function path"
+
+        count = stage_config.get("count", 1)
+        if not _is_int(count) or count <= 0:
+            return False, None, f"Stage {name} count must be an integer greater than 0"
+
+        execution_name = stage_config.get("execution", "process")
+        execution_names = [mode.name.lower() for mode in worker_execution.ExecutionMode]
+        if execution_name not in execution_names:
+            return False, None, f"Stage {name} execution must be one of {execution_names}"
+
+        # Availability of the CPUs is checked when building, on the machine running the workers
+        cpu_set = stage_config.get("cpu_set")
+        nice = stage_config.get("nice")
+        if cpu_set is not None and (
+            not isinstance(cpu_set, list)
+            or len(cpu_set) == 0
+            or not all(_is_int(cpu) and cpu >= 0 for cpu in cpu_set)
+        ):
+            return False, None, f"Stage {name} cpu_set must be a list of CPU numbers"
+
+        if nice is not None and not _is_int(nice):
+            return False, None, f"Stage {name} nice must be an integer"
+
+        if (cpu_set is not None or nice is not None) and execution_name != "process":
+            return False, None, f"Stage {name} cpu_set and nice only apply to processes"
+
+        # The target must wait in worker_standby.wait_until_active() , which is not checked here
+        hot_standby = stage_config.get("hot_standby", False)
+        if not isinstance(hot_standby, bool):
+            return False, None, f"Stage {name} hot_standby must be true or false"
+
+        if hot_standby and execution_name != "process":
+            return False, None, f"Stage {name} hot_standby only applies to processes"
+
+        queue_names = []
+        for key in ["input_queues", "output_queues"]:
+            names = stage_config.get(key, [])
+            if not isinstance(names, list):
+                return False, None, f"Stage {name} {key} must be a list"
+
+            for queue_name in names:
+                if queue_name not in queues:
+                    return False, None, f"Stage {name} uses unknown queue {queue_name}"
+
+            queue_names.append(names)
+
+        worker_scaling_policy = None
+        scaling_config = stage_config.get("scaling")
+        if scaling_config is not None:
+            if not isinstance(scaling_config, dict) or "min_count" in scaling_config:
+                return False, None, f"Stage {name} scaling must be a mapping without min_count"
+
+            try:
+                result, worker_scaling_policy = scaling_policy.ScalingPolicy.create(
+                    min_count=count, **scaling_config
+                )
+            except TypeError:
+                result = False
+
+            if not result:
+                return False, None, f"Stage {name} scaling is invalid"
+
+        return (
+            True,
+            StageSpec(
+                name,
+                target_path,
+                count,
+                worker_execution.ExecutionMode[execution_name.upper()],
+                queue_names[0],
+                queue_names[1],
+                worker_scaling_policy,
+                cpu_set,
+                nice,
+                hot_standby,
+            ),
+            "",
+        )
+
+    @staticmethod
+    def __sort_stages(stages: "list[StageSpec]") -> "tuple[bool, list[StageSpec]]":
+        """
+        Orders stages so that producers come before their consumers,
+        otherwise keeping the configured order.
+
+        Returns whether the stages are acyclic and the ordered stages.
+        """
+        ordered_stages: "list[StageSpec]" = []
+        remaining_stages = list(stages)
+        while len(remaining_stages) > 0:
+            for stage in remaining_stages:
+                # Ready once no other remaining stage produces its inputs
+                if not any(
+                    producer is not stage
+                    and len(set(producer.output_queue_names) & set(stage.input_queue_names)) > 0
+                    for producer in remaining_stages
+                ):
+                    ordered_stages.append(stage)
+                    remaining_stages.remove(stage)
+                    break
+            else:
+                return False, []
+
+        return True, ordered_stages
+
+    def get_stages(self) -> "list[StageSpec]":
+        """
+        Returns the stages from start to end.
+        """
+        return self.__stages
+
+    def get_queues(self) -> "list[QueueSpec]":
+        """
+        Returns the queues from start to end.
+        """
+        return self.__queues
+
+    def get_main_queue_names(self) -> "list[str]":
+        """
+        Returns the names of the queues consumed by main, from start to end.
+        """
+        return self.__main_queue_names
@@ -2,24 +2,292 @@
 Queue.
 """
 
+import enum
 import multiprocessing.managers
+import multiprocessing.synchronize
 import queue
 import time
 
+from utilities.workers import batch_queue
+from utilities.workers import latest_value_mailbox
+from utilities.workers import queue_statistics
+from utilities.workers import shared_memory_queue
+
+
+class QueueBackend(enum.Enum):
+    """
+    Transport used by the underlying queue.
+    """
+
+    # Queue proxy served by a SyncManager process, batched with a BatchQueueManager
+    MANAGER = 0
+    # Ring buffer in shared memory, no manager round trip
+    SHARED_MEMORY = 1
+    # Single slot in shared memory overwritten by each put, producers never block
+    LATEST_VALUE = 2
+    # Queue in the memory of this process, items are not pickled
+    # Only for workers running in threads or asyncio tasks of the process creating it
+    IN_PROCESS = 3
+
+
+class _StampedItem:
+    """
+    Item with the time it was put, for instrumented queues.
+    """
+
+    def __init__(self, item: object, put_time: float) -> None:
+        self.item = item
+        self.put_time = put_time
+
 
 class QueueProxyWrapper:
     """
     Wrapper for an underlying queue proxy which also stores `maxsize`.
 
     `maxsize <= 0` means infinite size.
+    The shared memory backend is always bounded, and uses a default capacity instead.
+    The latest value backend holds a single value regardless of `maxsize` .
+
+    Batches take a single round trip, except with a manager other than BatchQueueManager ,
+    where each item of a batch is a round trip of its own.
+
+    Instrumented queues stamp each item with its put time and record statistics,
+    which requires producers and consumers to use the put and get methods of the wrapper.
     """
 
     __QUEUE_TIMEOUT = 0.1  # seconds
     __QUEUE_DELAY = 0.1  # seconds
 
-    def __init__(self, mp_manager: multiprocessing.managers.SyncManager, maxsize: int = 0) -> None:
-        self.queue = mp_manager.Queue(maxsize)
+    __SHARED_MEMORY_DEFAULT_CAPACITY = 1024
+    __SHARED_MEMORY_DEFAULT_ITEM_SIZE = 4096  # bytes
+
+    __LATEST_DRAIN_BATCH_SIZE = 64
+
+    def __init__(
+        self,
+        mp_manager: multiprocessing.managers.SyncManager | None,
+        maxsize: int = 0,
+        backend: QueueBackend = QueueBackend.MANAGER,
+        item_size: int = 0,
+        instrumented: bool = False,
+        name: str = "queue",
+    ) -> None:
+        """
+        mp_manager: Manager serving the queue, only required for the manager backend.
+        maxsize: Maximum number of items in the queue.
+        backend: Transport used by the queue.
+        item_size: Maximum pickled size of an item in bytes, shared memory backends only.
+        instrumented: Whether to record latency, depth, and blocking statistics.
+        name: Name of the queue in statistics.
+        """
         self.maxsize = maxsize
+        self.backend = backend
+        self.statistics = queue_statistics.QueueStatistics(name) if instrumented else None
+
+        if item_size <= 0:
+            item_size = self.__SHARED_MEMORY_DEFAULT_ITEM_SIZE
+
+        if backend == QueueBackend.SHARED_MEMORY:
+            capacity = maxsize if maxsize > 0 else self.__SHARED_MEMORY_DEFAULT_CAPACITY
+            self.queue = shared_memory_queue.SharedMemoryQueue(capacity, item_size)
+        elif backend == QueueBackend.LATEST_VALUE:
+            self.queue = latest_value_mailbox.LatestValueMailbox(item_size)
+        elif backend == QueueBackend.IN_PROCESS:
+            self.queue = batch_queue.BatchQueue(maxsize)
+        else:
+            assert mp_manager is not None, "Manager backend requires a manager"
+            if isinstance(mp_manager, batch_queue.BatchQueueManager):
+                self.queue = mp_manager.BatchQueue(maxsize)
+            else:
+                self.queue = mp_manager.Queue(maxsize)
+
+        # Set on every put, for consumers waiting on several queues
+        self.__data_event: "multiprocessing.synchronize.Event | None" = None
+
+    def attach_data_event(self, data_event: "multiprocessing.synchronize.Event") -> None:
+        """
+        Sets an event on every put through the wrapper.
+        Must be called before the queue is passed to the producers.
+        """
+        self.__data_event = data_event
+
+    def put_many(self, items: "list[object]", timeout: "float | None" = None) -> None:
+        """
+        Puts all items into the queue in a single round trip.
+
+        items: Items to put, in order.
+        timeout: Time waiting in seconds before giving up, None to block.
+
+        Raises queue.Full if there was no space in time.
+        """
+        if len(items) == 0:
+            return
+
+        start_time = time.monotonic()
+        if self.statistics is not None:
+            items = [_StampedItem(item, start_time) for item in items]
+
+        if len(items) == 1:
+            self.queue.put(items[0], timeout=timeout)
+        elif self.__has_batch_operations():
+            self.queue.put_many(items, timeout=timeout)
+        else:
+            self.__put_each(items, timeout)
+
+        if self.statistics is not None:
+            self.statistics.record_put(
+                len(items), time.monotonic() - start_time, self.queue.qsize()
+            )
+
+        if self.__data_event is not None:
+            self.__data_event.set()
+
+    def put(self, item: object, timeout: "float | None" = None) -> None:
+        """
+        Puts an item into the queue.
+
+        item: Item to put.
+        timeout: Time waiting in seconds before giving up, None to block.
+
+        Raises queue.Full if there was no space in time.
+        """
+        if self.statistics is not None:
+            self.put_many([item], timeout)
+            return
+
+        self.queue.put(item, timeout=timeout)
+
+        if self.__data_event is not None:
+            self.__data_event.set()
+
+    def get(self, timeout: "float | None" = None) -> object:
+        """
+        Gets an item from the queue.
+
+        timeout: Time waiting in seconds, 0 to not wait and None to block.
+
+        Raises queue.Empty if nothing arrived in time.
+        """
+        items = self.get_many(1, timeout)
+        if len(items) == 0:
+            raise queue.Empty
+
+        return items[0]
+
+    def get_many(self, max_items: int, timeout: "float | None" = 0.0) -> "list[object]":
+        """
+        Gets up to `max_items` items. Only waits for the first item,
+        the rest are the items that are immediately available.
+
+        max_items: Maximum number of items to return, must be greater than 0 .
+        timeout: Time waiting in seconds for the first item, 0 to not wait and None to block.
+
+        Returns the items in order, which is empty if nothing arrived in time.
+        """
+        if max_items <= 0:
+            return []
+
+        start_time = time.monotonic()
+        if self.__has_batch_operations():
+            items = self.queue.get_many(max_items, timeout=timeout)
+        else:
+            items = self.__get_each(max_items, timeout)
+
+        return self.__unstamp(items, start_time)
+
+    def __has_batch_operations(self) -> bool:
+        """
+        Whether the underlying queue has put_many() and get_many() ,
+        which only a plain SyncManager queue lacks.
+        """
+        return hasattr(self.queue, "get_many")
+
+    def __put_each(self, items: "list[object]", timeout: "float | None") -> None:
+        """
+        Puts the items one at a time, within the timeout overall.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for item in items:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            self.queue.put(item, timeout=remaining)
+
+    def __get_each(self, max_items: int, timeout: "float | None") -> "list[object]":
+        """
+        Gets up to `max_items` items one at a time, only waiting for the first.
+        """
+        items = []
+        try:
+            if timeout is not None and timeout <= 0.0:
+                items.append(self.queue.get_nowait())
+            else:
+                items.append(self.queue.get(timeout=timeout))
+
+            while len(items) < max_items:
+                items.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        return items
+
+    def __unstamp(self, items: "list[object]", start_time: float) -> "list[object]":
+        """
+        Removes put time stamps and records statistics, if instrumented.
+        Unstamped items such as sentinels are passed through.
+
+        start_time: When the get call started.
+        """
+        if self.statistics is None:
+            return items
+
+        end_time = time.monotonic()
+        latencies = []
+        unstamped_items = []
+        for item in items:
+            if isinstance(item, _StampedItem):
+                latencies.append(end_time - item.put_time)
+                item = item.item
+
+            unstamped_items.append(item)
+
+        self.statistics.record_get(latencies, end_time - start_time)
+
+        return unstamped_items
+
+    def get_latest(self, timeout: "float | None" = 0.0) -> "tuple[bool, object, int]":
+        """
+        Gets the newest item, discarding older ones.
+        A sentinel (None) is returned in preference to newer items so that consumers still exit.
+
+        timeout: Time waiting in seconds for an item, 0 to not wait and None to block.
+
+        Returns whether there was an item, the item, and the number of older items skipped.
+        """
+        if self.backend == QueueBackend.LATEST_VALUE:
+            start_time = time.monotonic()
+            try:
+                item, skipped = self.queue.get_latest(True, timeout)
+            except queue.Empty:
+                self.__unstamp([], start_time)
+                return False, None, 0
+
+            return True, self.__unstamp([item], start_time)[0], skipped
+
+        items = self.get_many(self.__LATEST_DRAIN_BATCH_SIZE, timeout)
+        if len(items) == 0:
+            return False, None, 0
+
+        # Take everything else that is already waiting
+        while True:
+            more_items = self.get_many(self.__LATEST_DRAIN_BATCH_SIZE)
+            if len(more_items) == 0:
+                break
+
+            items += more_items
+
+        if None in items:
+            return True, None, len(items) - 1
+
+        return True, items[-1], len(items) - 1
 
     def fill_queue_with_sentinel(self, timeout: float = 0.0) -> None:
         """
@@ -58,3 +326,26 @@ class QueueProxyWrapper:
         self.fill_queue_with_sentinel()
         time.sleep(self.__QUEUE_DELAY)
         self.drain_queue()
+
+    def get_statistics_snapshot(
+        self, reset: bool = False
+    ) -> "tuple[bool, queue_statistics.QueueStatisticsSnapshot | None]":
+        """
+        Copies the statistics of an instrumented queue.
+
+        reset: Whether to zero the statistics afterwards.
+
+        Returns whether the queue is instrumented and the snapshot.
+        """
+        if self.statistics is None:
+            return False, None
+
+        return True, self.statistics.snapshot(reset)
+
+    def close(self) -> None:
+        """
+        Releases resources held by the queue, call once from main after all workers have joined.
+        """
+        # Latest value mailbox memory is freed with the process
+        if self.backend == QueueBackend.SHARED_MEMORY:
+            self.queue.close()
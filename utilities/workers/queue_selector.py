@@ -0,0 +1,119 @@
+"""
+Waiting on several queues at once.
+"""
+
+import multiprocessing as mp
+import time
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+
+
+class QueueSelector:
+    """
+    Blocks until any registered queue has data, then drains all of them.
+
+    Producers signal a shared event on every put through the wrapper,
+    so queues must be registered before the workers using them are started.
+    A registered controller signals the same event, so waits also end on exit and pause requests.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor creates the shared event.
+        """
+        self.__data_event = mp.Event()
+        self.__queues: "list[queue_proxy_wrapper.QueueProxyWrapper]" = []
+        self.__controller: "worker_controller.WorkerController | None" = None
+
+    def register(self, input_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Adds a queue to wait on.
+        """
+        input_queue.attach_data_event(self.__data_event)
+        self.__queues.append(input_queue)
+
+    def register_controller(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Ends waits once the controller requests exit or pause.
+        Must be called before the controller is passed to the workers.
+        """
+        controller.attach_wake_event(self.__data_event)
+        self.__controller = controller
+
+    def wait(self, timeout: "float | None" = None) -> bool:
+        """
+        Waits until any registered queue has data, without taking it.
+        Also ends once the registered controller requests exit or pause.
+
+        timeout: Time waiting in seconds, None to block.
+
+        Returns whether any registered queue has data.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # Clear before checking so a put racing with the check wakes the next wait
+            self.__data_event.clear()
+            if any(input_queue.queue.qsize() > 0 for input_queue in self.__queues):
+                return True
+
+            if self.__is_interrupted():
+                return False
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0.0:
+                return False
+
+            # Rechecked either way, another waiter may have cleared the event first
+            self.__data_event.wait(remaining)
+
+    def select(self, max_items: int, timeout: "float | None" = None) -> "list[list[object]]":
+        """
+        Waits until any registered queue has data, then drains every registered queue.
+        Also ends once the registered controller requests exit or pause.
+
+        max_items: Maximum number of items taken from each queue per round trip.
+        timeout: Time waiting in seconds, None to block.
+
+        Returns the items of each queue in registration order, all empty on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # Clear before draining so a put racing with the drain wakes the next wait
+            self.__data_event.clear()
+            batches = [self.__drain(input_queue, max_items) for input_queue in self.__queues]
+            if any(len(batch) > 0 for batch in batches):
+                return batches
+
+            if self.__is_interrupted():
+                return batches
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0.0:
+                return batches
+
+            if not self.__data_event.wait(remaining):
+                return batches
+
+    def __is_interrupted(self) -> bool:
+        """
+        Returns whether the registered controller has requested exit or pause.
+        """
+        if self.__controller is None:
+            return False
+
+        return self.__controller.is_exit_requested() or self.__controller.is_pause_requested()
+
+    @staticmethod
+    def __drain(
+        input_queue: queue_proxy_wrapper.QueueProxyWrapper, max_items: int
+    ) -> "list[object]":
+        """
+        Takes everything that is immediately available.
+        """
+        items = []
+        while True:
+            batch = input_queue.get_many(max_items)
+            items += batch
+            if len(batch) < max_items:
+                return items
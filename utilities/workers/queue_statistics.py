@@ -0,0 +1,187 @@
+"""
+Queue statistics.
+"""
+
+import ctypes
+import multiprocessing as mp
+
+
+# Upper bounds of the latency histogram buckets, 10 us doubling up to about 0.33 s
+# Latencies above the last bound go into an overflow bucket
+LATENCY_BUCKET_BOUNDS = [0.00001 * 2**i for i in range(16)]  # seconds
+
+
+class QueueStatisticsSnapshot:  # pylint: disable=too-many-instance-attributes
+    """
+    Copy of the statistics of a queue at one point in time.
+    Times are in seconds.
+    """
+
+    def __init__(self, name: str, counters: "list[float]") -> None:
+        """
+        name: Name of the queue.
+        counters: Raw counters, in the layout of QueueStatistics .
+        """
+        self.name = name
+
+        self.put_count = int(counters[QueueStatistics.PUT_COUNT])
+        self.put_blocked_total = counters[QueueStatistics.PUT_BLOCKED_TOTAL]
+        self.put_blocked_max = counters[QueueStatistics.PUT_BLOCKED_MAX]
+
+        self.get_count = int(counters[QueueStatistics.GET_COUNT])
+        self.get_calls = int(counters[QueueStatistics.GET_CALLS])
+        self.get_waiting_total = counters[QueueStatistics.GET_WAITING_TOTAL]
+        self.get_waiting_max = counters[QueueStatistics.GET_WAITING_MAX]
+
+        self.depth_samples = int(counters[QueueStatistics.DEPTH_SAMPLES])
+        self.depth_total = counters[QueueStatistics.DEPTH_TOTAL]
+        self.depth_max = int(counters[QueueStatistics.DEPTH_MAX])
+
+        self.latency_total = counters[QueueStatistics.LATENCY_TOTAL]
+        self.latency_max = counters[QueueStatistics.LATENCY_MAX]
+        self.latency_histogram = [
+            int(count) for count in counters[QueueStatistics.LATENCY_HISTOGRAM :]
+        ]
+
+    def mean_depth(self) -> float:
+        """
+        Mean of the depth samples, 0 if there are none.
+        """
+        if self.depth_samples == 0:
+            return 0.0
+
+        return self.depth_total / self.depth_samples
+
+    def mean_latency(self) -> float:
+        """
+        Mean enqueue to dequeue latency, 0 if nothing was dequeued.
+        """
+        if self.get_count == 0:
+            return 0.0
+
+        return self.latency_total / self.get_count
+
+    def latency_percentile(self, percentile: float) -> float:
+        """
+        Upper bound of the histogram bucket containing the percentile, in the range [0, 100] .
+        Returns the maximum latency if it falls in the overflow bucket, 0 if nothing was dequeued.
+        """
+        total = sum(self.latency_histogram)
+        if total == 0:
+            return 0.0
+
+        threshold = total * percentile / 100.0
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKET_BOUNDS, self.latency_histogram):
+            cumulative += count
+            if cumulative >= threshold:
+                return bound
+
+        return self.latency_max
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: "
+            f"put {self.put_count} (blocked total {self.put_blocked_total:.3f}s, "
+            f"max {self.put_blocked_max * 1000:.2f}ms), "
+            f"get {self.get_count} in {self.get_calls} calls "
+            f"(waiting total {self.get_waiting_total:.3f}s, "
+            f"max {self.get_waiting_max * 1000:.2f}ms), "
+            f"depth mean {self.mean_depth():.2f} max {self.depth_max}, "
+            f"latency mean {self.mean_latency() * 1000:.3f}ms "
+            f"p50 <= {self.latency_percentile(50) * 1000:.3f}ms "
+            f"p99 <= {self.latency_percentile(99) * 1000:.3f}ms "
+            f"max {self.latency_max * 1000:.3f}ms"
+        )
+
+
+class QueueStatistics:
+    """
+    Statistics of a queue, shared between processes.
+    Producers record puts and consumers record gets, main takes snapshots.
+    """
+
+    # Counter layout
+    PUT_COUNT = 0
+    PUT_BLOCKED_TOTAL = 1
+    PUT_BLOCKED_MAX = 2
+    GET_COUNT = 3
+    GET_CALLS = 4
+    GET_WAITING_TOTAL = 5
+    GET_WAITING_MAX = 6
+    DEPTH_SAMPLES = 7
+    DEPTH_TOTAL = 8
+    DEPTH_MAX = 9
+    LATENCY_TOTAL = 10
+    LATENCY_MAX = 11
+    LATENCY_HISTOGRAM = 12
+    # Histogram has an extra overflow bucket
+    __COUNTER_COUNT = LATENCY_HISTOGRAM + len(LATENCY_BUCKET_BOUNDS) + 1
+
+    def __init__(self, name: str) -> None:
+        """
+        name: Name of the queue, used in snapshots.
+        """
+        self.name = name
+        self.__counters = mp.Array(ctypes.c_double, self.__COUNTER_COUNT)
+
+    def record_put(self, count: int, blocked_time: float, depth: int) -> None:
+        """
+        Records a put call.
+
+        count: Number of items put.
+        blocked_time: Time spent in the put call.
+        depth: Queue depth after the put.
+        """
+        with self.__counters.get_lock():
+            counters = self.__counters.get_obj()
+            counters[self.PUT_COUNT] += count
+            counters[self.PUT_BLOCKED_TOTAL] += blocked_time
+            counters[self.PUT_BLOCKED_MAX] = max(counters[self.PUT_BLOCKED_MAX], blocked_time)
+            counters[self.DEPTH_SAMPLES] += 1
+            counters[self.DEPTH_TOTAL] += depth
+            counters[self.DEPTH_MAX] = max(counters[self.DEPTH_MAX], depth)
+
+    def record_get(self, latencies: "list[float]", waiting_time: float) -> None:
+        """
+        Records a get call.
+
+        latencies: Enqueue to dequeue latency of each item received.
+        waiting_time: Time spent in the get call.
+        """
+        with self.__counters.get_lock():
+            counters = self.__counters.get_obj()
+            counters[self.GET_CALLS] += 1
+            counters[self.GET_WAITING_TOTAL] += waiting_time
+            counters[self.GET_WAITING_MAX] = max(counters[self.GET_WAITING_MAX], waiting_time)
+            for latency in latencies:
+                counters[self.GET_COUNT] += 1
+                counters[self.LATENCY_TOTAL] += latency
+                counters[self.LATENCY_MAX] = max(counters[self.LATENCY_MAX], latency)
+                counters[self.LATENCY_HISTOGRAM + self.__bucket_index(latency)] += 1
+
+    @staticmethod
+    def __bucket_index(latency: float) -> int:
+        """
+        Histogram bucket of the latency.
+        """
+        for i, bound in enumerate(LATENCY_BUCKET_BOUNDS):
+            if latency <= bound:
+                return i
+
+        return len(LATENCY_BUCKET_BOUNDS)
+
+    def snapshot(self, reset: bool = False) -> QueueStatisticsSnapshot:
+        """
+        Copies the statistics.
+
+        reset: Whether to zero the counters afterwards, so the next snapshot covers only the interval.
+        """
+        with self.__counters.get_lock():
+            counters = list(self.__counters.get_obj())
+            if reset:
+                ctypes.memset(
+                    self.__counters.get_obj(), 0, ctypes.sizeof(self.__counters.get_obj())
+                )
+
+        return QueueStatisticsSnapshot(self.name, counters)
@@ -0,0 +1,339 @@
+"""
+When to restart crashed workers.
+"""
+
+import collections
+import random
+
+
+class RestartPolicy:
+    """
+    Exponential backoff with jitter between restarts of a crashing worker,
+    and the limits for detecting a crash loop.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        initial_delay: float = 0.1,
+        max_delay: float = 10.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.2,
+        healthy_uptime: float = 10.0,
+        crash_loop_window: float = 30.0,
+        crash_loop_limit: int = 5,
+    ) -> "tuple[bool, RestartPolicy | None]":
+        """
+        Creates a restart policy.
+
+        initial_delay: Delay before the second consecutive restart in seconds, the first is immediate.
+        max_delay: Longest delay between restarts in seconds.
+        multiplier: Growth of the delay per consecutive crash.
+        jitter: Fraction of the delay randomly added or removed, so crashed workers do not restart in lockstep.
+        healthy_uptime: Workers running at least this long in seconds reset their backoff when they crash.
+        crash_loop_window: Length of the sliding window counting crashes of the group in seconds.
+        crash_loop_limit: Number of crashes within the window that is a crash loop.
+
+        Returns whether the policy was able to be created and the policy.
+        """
+        if initial_delay < 0.0 or max_delay < initial_delay:
+            return False, None
+
+        if multiplier < 1.0:
+            return False, None
+
+        if jitter < 0.0 or jitter >= 1.0:
+            return False, None
+
+        if healthy_uptime < 0.0 or crash_loop_window <= 0.0 or crash_loop_limit <= 0:
+            return False, None
+
+        return True, RestartPolicy(
+            cls.__create_key,
+            initial_delay,
+            max_delay,
+            multiplier,
+            jitter,
+            healthy_uptime,
+            crash_loop_window,
+            crash_loop_limit,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        initial_delay: float,
+        max_delay: float,
+        multiplier: float,
+        jitter: float,
+        healthy_uptime: float,
+        crash_loop_window: float,
+        crash_loop_limit: int,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is RestartPolicy.__create_key, "Use create() method"
+
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.healthy_uptime = healthy_uptime
+        self.crash_loop_window = crash_loop_window
+        self.crash_loop_limit = crash_loop_limit
+
+    def get_restart_delay(self, consecutive_crashes: int) -> float:
+        """
+        Delay before restarting a worker.
+
+        consecutive_crashes: Crashes of the worker without a healthy run in between, including this one.
+
+        Returns the delay in seconds.
+        """
+        if consecutive_crashes <= 1:
+            return 0.0
+
+        delay = min(
+            self.max_delay, self.initial_delay * self.multiplier ** (consecutive_crashes - 2)
+        )
+        return delay * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+    def is_healthy_uptime(self, uptime: float) -> bool:
+        """
+        Whether a worker ran long enough before crashing to reset its backoff.
+        """
+        return uptime >= self.healthy_uptime
+
+    def create_crash_loop_detector(self) -> "CrashLoopDetector":
+        """
+        Creates a detector with the limits of this policy, one per worker group.
+        """
+        return CrashLoopDetector(self.crash_loop_window, self.crash_loop_limit)
+
+
+class CrashLoopDetector:
+    """
+    Counts crashes in a sliding time window.
+    """
+
+    def __init__(self, window: float, limit: int) -> None:
+        """
+        window: Length of the window in seconds.
+        limit: Number of crashes within the window that is a crash loop.
+        """
+        self.__window = window
+        self.__limit = limit
+        self.__crash_times: "collections.deque[float]" = collections.deque()
+
+    def record_crash(self, crash_time: float) -> bool:
+        """
+        Records a crash.
+
+        crash_time: Monotonic time of the crash in seconds, non decreasing between calls.
+
+        Returns whether the group is crash looping.
+        """
+        self.__crash_times.append(crash_time)
+        while self.__crash_times[0] <= crash_time - self.__window:
+            self.__crash_times.popleft()
+
+        return len(self.__crash_times) >= self.__limit
+
+    def get_crash_count(self) -> int:
+        """
+        Returns the number of crashes in the window as of the last recorded crash.
+        """
+        return len(self.__crash_times)
+
+    def reset(self) -> None:
+        """
+        Forgets all crashes.
+        """
+        self.__crash_times.clear()
+
+
+class RestartTracker:  # pylint: disable=too-many-instance-attributes
+    """
+    Restart state of a worker group by worker index, following a restart policy:
+    when each worker started, its consecutive crashes, and the dead workers waiting to restart.
+    The group is parked when it crash loops, its dead workers then wait until it is resumed.
+    Not thread safe, use one per worker group.
+    """
+
+    # Failed restarts are retried no sooner than this, even without a backoff delay
+    __RETRY_MIN_DELAY = 0.1  # seconds
+
+    def __init__(self, policy: RestartPolicy, worker_count: int) -> None:
+        """
+        policy: Backoff and crash loop limits.
+        worker_count: Number of workers, all alive.
+        """
+        self.__policy = policy
+        self.__crash_loop_detector = policy.create_crash_loop_detector()
+        self.__start_times = [0.0 for _ in range(worker_count)]
+        self.__consecutive_crashes = [0 for _ in range(worker_count)]
+        self.__restart_counts = [0 for _ in range(worker_count)]
+        self.__restart_latencies: "list[float]" = []
+        # Dead workers by index, to the time they are due to restart or None while parked
+        self.__dead_workers: "dict[int, float | None]" = {}
+        self.__is_parked = False
+        self.__is_crash_loop_notified = False
+
+    def add_worker(self, start_time: float) -> None:
+        """
+        Adds a started worker after the others.
+        """
+        self.__start_times.append(start_time)
+        self.__consecutive_crashes.append(0)
+        self.__restart_counts.append(0)
+
+    def remove_worker(self, index: int) -> None:
+        """
+        Removes the worker at the index, the workers after it move down.
+        """
+        self.__start_times.pop(index)
+        self.__consecutive_crashes.pop(index)
+        self.__restart_counts.pop(index)
+        self.__dead_workers = {
+            i if i < index else i - 1: due_time
+            for i, due_time in self.__dead_workers.items()
+            if i != index
+        }
+
+    def record_start(self, index: int, start_time: float) -> None:
+        """
+        Records when the worker at the index started running.
+        """
+        self.__start_times[index] = start_time
+
+    def record_death(self, index: int, detection_time: float) -> "tuple[float, float | None]":
+        """
+        Schedules the restart of the dead worker at the index, or parks the group on a crash loop.
+
+        detection_time: When the death was detected, from time.perf_counter() .
+
+        Returns the uptime of the worker, and the delay before its restart,
+        None if the group is parked.
+        """
+        uptime = detection_time - self.__start_times[index]
+        if self.__policy.is_healthy_uptime(uptime):
+            self.__consecutive_crashes[index] = 0
+
+        self.__consecutive_crashes[index] += 1
+
+        if self.__is_parked:
+            self.__dead_workers[index] = None
+            return uptime, None
+
+        if self.__crash_loop_detector.record_crash(detection_time):
+            self.__is_parked = True
+            for i in self.__dead_workers:
+                self.__dead_workers[i] = None
+
+            self.__dead_workers[index] = None
+            return uptime, None
+
+        delay = self.__policy.get_restart_delay(self.__consecutive_crashes[index])
+        self.__dead_workers[index] = detection_time + delay
+        return uptime, delay
+
+    def record_restart(self, index: int, start_time: float, due_time: float) -> float:
+        """
+        Records that the dead worker at the index was replaced.
+
+        start_time: When the replacement started running, from time.perf_counter() .
+        due_time: When the restart was due.
+
+        Returns the restart latency, from when the restart was due so backoff is not counted.
+        """
+        del self.__dead_workers[index]
+        self.__start_times[index] = start_time
+        self.__restart_counts[index] += 1
+
+        restart_latency = start_time - due_time
+        self.__restart_latencies.append(restart_latency)
+        return restart_latency
+
+    def record_failed_restart(self, index: int, now: float) -> None:
+        """
+        Retries the restart of the dead worker at the index with the next backoff delay,
+        rather than spinning on the failure.
+        """
+        self.__consecutive_crashes[index] += 1
+        delay = self.__policy.get_restart_delay(self.__consecutive_crashes[index])
+        self.__dead_workers[index] = now + max(delay, self.__RETRY_MIN_DELAY)
+
+    def resume(self, now: float) -> None:
+        """
+        Unparks the group, its dead workers are due immediately with a fresh backoff.
+        """
+        self.__is_parked = False
+        self.__is_crash_loop_notified = False
+        self.__crash_loop_detector.reset()
+        for i in self.__dead_workers:
+            self.__consecutive_crashes[i] = 0
+            self.__dead_workers[i] = now
+
+    def take_crash_loop_notification(self) -> bool:
+        """
+        Returns whether the group was parked since the last call returned True,
+        so a crash loop is notified once per parking.
+        """
+        is_notified = self.__is_parked and not self.__is_crash_loop_notified
+        self.__is_crash_loop_notified = self.__is_parked
+        return is_notified
+
+    def is_dead(self, index: int) -> bool:
+        """
+        Returns whether the worker at the index is dead and not yet restarted.
+        """
+        return index in self.__dead_workers
+
+    def is_parked(self) -> bool:
+        """
+        Returns whether the group stopped restarting workers because of a crash loop.
+        """
+        return self.__is_parked
+
+    def get_due_restarts(self, now: float) -> "list[tuple[int, float]]":
+        """
+        Returns the index and due time of each dead worker whose backoff has passed.
+        """
+        return [
+            (i, due_time)
+            for i, due_time in self.__dead_workers.items()
+            if due_time is not None and due_time <= now
+        ]
+
+    def get_due_times(self) -> "list[float]":
+        """
+        Returns when each dead worker is due to restart, except while parked.
+        """
+        return [due_time for due_time in self.__dead_workers.values() if due_time is not None]
+
+    def get_consecutive_crashes(self, index: int) -> int:
+        """
+        Returns the crashes of the worker at the index without a healthy run in between.
+        """
+        return self.__consecutive_crashes[index]
+
+    def get_crash_count(self) -> int:
+        """
+        Returns the number of crashes of the group in the crash loop window.
+        """
+        return self.__crash_loop_detector.get_crash_count()
+
+    def get_restart_counts(self) -> "list[int]":
+        """
+        Returns the number of restarts of each worker.
+        """
+        return list(self.__restart_counts)
+
+    def get_restart_latencies(self) -> "list[float]":
+        """
+        Returns the latency of every restart in seconds.
+        """
+        return list(self.__restart_latencies)
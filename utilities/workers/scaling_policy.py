@@ -0,0 +1,314 @@
+"""
+When to grow and shrink worker groups.
+"""
+
+import collections
+import queue
+
+from modules.common.modules.logger import logger
+from utilities.workers import queue_proxy_wrapper
+
+
+class ScalingPolicy:  # pylint: disable=too-many-instance-attributes
+    """
+    Decides the size of a worker group from its input queue depth and consumer idle time.
+
+    Growing and shrinking use separate thresholds and must be sustained over several samples,
+    and no decision is made during the cooldown after a change, so the group does not flap.
+    Holds the state of the samples, use one per worker group.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        min_count: int,
+        max_count: int,
+        scale_up_depth: float = 4.0,
+        scale_down_depth: float = 0.5,
+        scale_down_idle: float = 0.8,
+        sustain_count: int = 3,
+        cooldown: float = 5.0,
+        sample_period: float = 1.0,
+    ) -> "tuple[bool, ScalingPolicy | None]":
+        """
+        Creates a scaling policy.
+
+        min_count: Fewest workers.
+        max_count: Most workers.
+        scale_up_depth: Grow when the queued items per worker are above this.
+        scale_down_depth: Shrink only when the queued items per worker are at most this,
+            must be less than scale_up_depth .
+        scale_down_idle: Shrink only when consumers spend at least this fraction of time waiting.
+        sustain_count: Number of consecutive samples a condition must hold.
+        cooldown: Time after a change during which no change is made, in seconds.
+        sample_period: Time between samples, in seconds.
+
+        Returns whether the policy was able to be created and the policy.
+        """
+        if min_count <= 0 or max_count < min_count:
+            return False, None
+
+        if scale_down_depth < 0.0 or scale_up_depth <= scale_down_depth:
+            return False, None
+
+        if scale_down_idle < 0.0 or scale_down_idle > 1.0:
+            return False, None
+
+        if sustain_count <= 0 or cooldown < 0.0 or sample_period <= 0.0:
+            return False, None
+
+        return True, ScalingPolicy(
+            cls.__create_key,
+            min_count,
+            max_count,
+            scale_up_depth,
+            scale_down_depth,
+            scale_down_idle,
+            sustain_count,
+            cooldown,
+            sample_period,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        min_count: int,
+        max_count: int,
+        scale_up_depth: float,
+        scale_down_depth: float,
+        scale_down_idle: float,
+        sustain_count: int,
+        cooldown: float,
+        sample_period: float,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is ScalingPolicy.__create_key, "Use create() method"
+
+        self.min_count = min_count
+        self.max_count = max_count
+        self.scale_up_depth = scale_up_depth
+        self.scale_down_depth = scale_down_depth
+        self.scale_down_idle = scale_down_idle
+        self.sustain_count = sustain_count
+        self.cooldown = cooldown
+        self.sample_period = sample_period
+
+        self.__up_samples = 0
+        self.__down_samples = 0
+        self.__last_change_time: "float | None" = None
+
+    def evaluate(
+        self, worker_count: int, queue_depth: int, idle_fraction: float, now: float
+    ) -> int:
+        """
+        Records a sample and decides on a change.
+
+        worker_count: Current number of workers.
+        queue_depth: Number of items waiting in the input queues.
+        idle_fraction: Fraction of the last sample period the consumers spent waiting, in [0, 1] .
+        now: Monotonic time of the sample in seconds.
+
+        Returns the change in the number of workers: 1, -1, or 0 .
+        """
+        # Bounds are restored without waiting
+        if worker_count < self.min_count:
+            return self.__change(1, now)
+
+        if worker_count > self.max_count:
+            return self.__change(-1, now)
+
+        depth_per_worker = queue_depth / max(worker_count, 1)
+
+        if depth_per_worker > self.scale_up_depth:
+            self.__up_samples += 1
+        else:
+            self.__up_samples = 0
+
+        if depth_per_worker <= self.scale_down_depth and idle_fraction >= self.scale_down_idle:
+            self.__down_samples += 1
+        else:
+            self.__down_samples = 0
+
+        if self.__last_change_time is not None and now - self.__last_change_time < self.cooldown:
+            return 0
+
+        if self.__up_samples >= self.sustain_count and worker_count < self.max_count:
+            return self.__change(1, now)
+
+        if self.__down_samples >= self.sustain_count and worker_count > self.min_count:
+            return self.__change(-1, now)
+
+        return 0
+
+    def __change(self, change: int, now: float) -> int:
+        """
+        Starts the cooldown and requires the conditions to be sustained again.
+        """
+        self.__up_samples = 0
+        self.__down_samples = 0
+        self.__last_change_time = now
+
+        return change
+
+
+class GroupScaler:  # pylint: disable=too-many-instance-attributes
+    """
+    Resizing state of a worker group: samples the load of its input queues for a scaling policy,
+    and tracks the workers asked to retire until one exits cleanly for each.
+    Not thread safe, use one per worker group.
+    """
+
+    # Retiring workers not exiting in time are assumed to have missed the sentinel
+    __RETIREMENT_TIMEOUT = 5.0  # seconds
+
+    def __init__(
+        self,
+        policy: ScalingPolicy,
+        input_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+        target_name: str,
+        local_logger: logger.Logger,
+    ) -> None:
+        """
+        policy: Bounds and thresholds for resizing the group.
+        input_queues: Input queues of the group.
+        target_name: Name of the target of the group, for logging.
+        local_logger: Existing logger from process.
+        """
+        self.policy = policy
+        self.__input_queues = input_queues
+        self.__target_name = target_name
+        self.__local_logger = local_logger
+
+        # Deadlines of workers asked to exit for shrinking the group
+        self.__retirement_deadlines: "list[float]" = []
+        self.__last_sample_time = 0.0
+        self.__last_waiting_total = 0.0
+        # Elapsed and waiting times of the samples in the sustain window
+        self.__load_samples: "collections.deque[tuple[float, float]]" = collections.deque(
+            maxlen=policy.sustain_count
+        )
+
+    def start(self, now: float) -> None:
+        """
+        Starts measuring the load, when the workers start.
+
+        now: Current time, from time.perf_counter() .
+        """
+        self.__last_sample_time = now
+
+    def sample(self, now: float, worker_count: int) -> int:
+        """
+        Samples the load and decides on a change, workers still retiring are not counted.
+
+        now: Current time, from time.perf_counter() .
+        worker_count: Current number of workers.
+
+        Returns the change in the number of workers: 1, -1, or 0 .
+        """
+        self.__expire_retirements(now)
+
+        worker_count -= len(self.__retirement_deadlines)
+        queue_depth, idle_fraction = self.__sample_load(now, worker_count)
+        change = self.policy.evaluate(worker_count, queue_depth, idle_fraction, now)
+        if change != 0:
+            self.__local_logger.info(
+                f"{'Growing' if change > 0 else 'Shrinking'} {self.__target_name} workers "
+                f"to {worker_count + change}, queue depth {queue_depth}, "
+                f"idle {idle_fraction * 100:.0f}%",
+                True,
+            )
+
+        return change
+
+    def retire(self, now: float) -> bool:
+        """
+        Asks one worker to exit by putting a sentinel in the first input queue,
+        whichever worker takes it exits cleanly.
+
+        now: Current time, from time.perf_counter() .
+
+        Returns whether the sentinel was able to be sent.
+        """
+        if len(self.__input_queues) == 0:
+            self.__local_logger.warning(
+                f"{self.__target_name} workers have no input queue "
+                "to send an exit sentinel through, not shrinking",
+                True,
+            )
+            return False
+
+        try:
+            self.__input_queues[0].put(None, timeout=0.0)
+        except queue.Full:
+            self.__local_logger.warning("Input queue full, not shrinking", True)
+            return False
+
+        self.__retirement_deadlines.append(now + self.__RETIREMENT_TIMEOUT)
+        return True
+
+    def complete_retirement(self) -> bool:
+        """
+        Completes the oldest retirement, for a worker that exited cleanly.
+        All workers in the group are identical, so it does not matter which one took the sentinel.
+
+        Returns whether a retirement was pending, otherwise the worker was not retiring.
+        """
+        if len(self.__retirement_deadlines) == 0:
+            return False
+
+        self.__retirement_deadlines.pop(0)
+        return True
+
+    def __expire_retirements(self, now: float) -> None:
+        """
+        Gives up on retirements not completed in time, such as when the sentinel was
+        overwritten in a latest value queue.
+        """
+        while len(self.__retirement_deadlines) > 0 and self.__retirement_deadlines[0] <= now:
+            self.__retirement_deadlines.pop(0)
+            self.__local_logger.warning(
+                f"{self.__target_name} worker did not retire in time",
+                True,
+            )
+
+    def __sample_load(self, now: float, worker_count: int) -> "tuple[int, float]":
+        """
+        Measures the input queues.
+
+        Waiting time is recorded when a get call returns, so the idle fraction is averaged over
+        the sustain window, which should be longer than the timeout consumers wait with.
+
+        Returns the number of queued items and the fraction of time consumers spent waiting,
+        which is 1 if no input queue is instrumented so that depth alone decides.
+        """
+        queue_depth = sum(input_queue.queue.qsize() for input_queue in self.__input_queues)
+
+        is_instrumented = False
+        waiting_total = 0.0
+        for input_queue in self.__input_queues:
+            result, snapshot = input_queue.get_statistics_snapshot()
+            if result:
+                is_instrumented = True
+                waiting_total += snapshot.get_waiting_total
+
+        elapsed_time = now - self.__last_sample_time
+        waiting_time = waiting_total - self.__last_waiting_total
+        # Main resetting the statistics makes the total go backwards
+        if waiting_time < 0.0:
+            waiting_time = waiting_total
+
+        self.__last_sample_time = now
+        self.__last_waiting_total = waiting_total
+        self.__load_samples.append((elapsed_time, waiting_time))
+
+        window_time = sum(sample[0] for sample in self.__load_samples)
+        if not is_instrumented or window_time <= 0.0:
+            return queue_depth, 1.0
+
+        window_waiting_time = sum(sample[1] for sample in self.__load_samples)
+        idle_fraction = window_waiting_time / (window_time * max(worker_count, 1))
+        return queue_depth, min(idle_fraction, 1.0)
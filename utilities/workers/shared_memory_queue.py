@@ -0,0 +1,233 @@
+"""
+Shared memory queue.
+"""
+
+import multiprocessing as mp
+import multiprocessing.shared_memory
+import os
+import pickle
+import queue
+import struct
+import time
+
+
+class SharedMemoryQueue:  # pylint: disable=too-many-instance-attributes
+    """
+    Bounded multi-producer multi-consumer queue backed by a shared memory ring buffer.
+
+    Each item is pickled once straight into a fixed size slot, so there is no round trip
+    to a manager server process. Blocking uses semaphores, which are futex backed on Linux.
+    Supports the subset of the `queue.Queue` interface used by the workers.
+    """
+
+    # Header holds the head (next slot to write) and tail (next slot to read) counters
+    # Producers only write the head and consumers only write the tail
+    __COUNTER_FORMAT = "=Q"
+    __HEAD_OFFSET = 0
+    __TAIL_OFFSET = struct.calcsize(__COUNTER_FORMAT)
+    __HEADER_SIZE = 2 * struct.calcsize(__COUNTER_FORMAT)
+    # Length prefix of each slot
+    __LENGTH_FORMAT = "=I"
+    __LENGTH_SIZE = struct.calcsize(__LENGTH_FORMAT)
+
+    def __init__(self, capacity: int, slot_size: int) -> None:
+        """
+        Constructor allocates the ring buffer and its semaphores.
+
+        capacity: Number of slots, must be greater than 0 .
+        slot_size: Maximum pickled size of an item in bytes, must be greater than 0 .
+        """
+        assert capacity > 0, "Capacity must be greater than 0"
+        assert slot_size > 0, "Slot size must be greater than 0"
+
+        self.__capacity = capacity
+        self.__slot_size = slot_size
+        self.__stride = self.__LENGTH_SIZE + slot_size
+
+        self.__shared_memory = multiprocessing.shared_memory.SharedMemory(
+            create=True,
+            size=self.__HEADER_SIZE + capacity * self.__stride,
+        )
+        self.__shared_memory.buf[: self.__HEADER_SIZE] = bytes(self.__HEADER_SIZE)
+        self.__owner_pid = os.getpid()
+
+        self.__empty_slots = mp.Semaphore(capacity)
+        self.__filled_slots = mp.Semaphore(0)
+        self.__put_lock = mp.Lock()
+        self.__get_lock = mp.Lock()
+
+    def __slot_offset(self, index: int) -> int:
+        """
+        Byte offset of the slot for a head or tail counter value.
+        """
+        return self.__HEADER_SIZE + (index % self.__capacity) * self.__stride
+
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Puts an item into the queue.
+
+        Raises queue.Full if no slot became free in time,
+        and ValueError if the pickled item does not fit in a slot.
+        """
+        data = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.__slot_size:
+            raise ValueError(f"Item of {len(data)} bytes exceeds slot size {self.__slot_size}")
+
+        if not self.__empty_slots.acquire(block, timeout):
+            raise queue.Full
+
+        buffer = self.__shared_memory.buf
+        with self.__put_lock:
+            (head,) = struct.unpack_from(self.__COUNTER_FORMAT, buffer, self.__HEAD_OFFSET)
+            offset = self.__slot_offset(head)
+            struct.pack_into(self.__LENGTH_FORMAT, buffer, offset, len(data))
+            start = offset + self.__LENGTH_SIZE
+            buffer[start : start + len(data)] = data
+            struct.pack_into(self.__COUNTER_FORMAT, buffer, self.__HEAD_OFFSET, head + 1)
+
+        self.__filled_slots.release()
+
+    def put_many(self, items: "list[object]", timeout: "float | None" = None) -> None:
+        """
+        Puts all items into the queue, taking the producer lock once per run of free slots.
+        Only waits while holding no slot, so producers cannot starve each other of slots.
+
+        Raises queue.Full if no slot became free in time,
+        in which case the items not yet written are not put,
+        and ValueError if any pickled item does not fit in a slot.
+        """
+        batch = [pickle.dumps(item, pickle.HIGHEST_PROTOCOL) for item in items]
+        for data in batch:
+            if len(data) > self.__slot_size:
+                raise ValueError(f"Item of {len(data)} bytes exceeds slot size {self.__slot_size}")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        start = 0
+        while start < len(batch):
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            if not self.__empty_slots.acquire(True, remaining):
+                raise queue.Full
+
+            # Then only the slots that are free right now
+            count = 1
+            while start + count < len(batch) and self.__empty_slots.acquire(False):
+                count += 1
+
+            self.__write_chunk(batch[start : start + count])
+            start += count
+
+    def __write_chunk(self, chunk: "list[bytes]") -> None:
+        """
+        Writes pickled items into slots already reserved for them.
+        """
+        buffer = self.__shared_memory.buf
+        with self.__put_lock:
+            (head,) = struct.unpack_from(self.__COUNTER_FORMAT, buffer, self.__HEAD_OFFSET)
+            for i, data in enumerate(chunk):
+                offset = self.__slot_offset(head + i)
+                struct.pack_into(self.__LENGTH_FORMAT, buffer, offset, len(data))
+                start = offset + self.__LENGTH_SIZE
+                buffer[start : start + len(data)] = data
+
+            struct.pack_into(self.__COUNTER_FORMAT, buffer, self.__HEAD_OFFSET, head + len(chunk))
+
+        for _ in chunk:
+            self.__filled_slots.release()
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Puts an item into the queue without blocking.
+        """
+        self.put(item, False)
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Removes and returns an item from the queue.
+
+        Raises queue.Empty if no item arrived in time.
+        """
+        if not self.__filled_slots.acquire(block, timeout):
+            raise queue.Empty
+
+        buffer = self.__shared_memory.buf
+        with self.__get_lock:
+            (tail,) = struct.unpack_from(self.__COUNTER_FORMAT, buffer, self.__TAIL_OFFSET)
+            offset = self.__slot_offset(tail)
+            (length,) = struct.unpack_from(self.__LENGTH_FORMAT, buffer, offset)
+            start = offset + self.__LENGTH_SIZE
+            data = bytes(buffer[start : start + length])
+            struct.pack_into(self.__COUNTER_FORMAT, buffer, self.__TAIL_OFFSET, tail + 1)
+
+        self.__empty_slots.release()
+
+        return pickle.loads(data)
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> "list[object]":
+        """
+        Removes and returns up to `max_items` items, taking the consumer lock once.
+        Waits for the first item only, the rest are what is immediately available.
+
+        Returns an empty list if no item arrived in time.
+        """
+        if max_items <= 0:
+            return []
+
+        if not self.__filled_slots.acquire(True, timeout):
+            return []
+
+        count = 1
+        while count < max_items and self.__filled_slots.acquire(False):
+            count += 1
+
+        buffer = self.__shared_memory.buf
+        batch = []
+        with self.__get_lock:
+            (tail,) = struct.unpack_from(self.__COUNTER_FORMAT, buffer, self.__TAIL_OFFSET)
+            for i in range(count):
+                offset = self.__slot_offset(tail + i)
+                (length,) = struct.unpack_from(self.__LENGTH_FORMAT, buffer, offset)
+                start = offset + self.__LENGTH_SIZE
+                batch.append(bytes(buffer[start : start + length]))
+
+            struct.pack_into(self.__COUNTER_FORMAT, buffer, self.__TAIL_OFFSET, tail + count)
+
+        for _ in range(count):
+            self.__empty_slots.release()
+
+        return [pickle.loads(data) for data in batch]
+
+    def get_nowait(self) -> object:
+        """
+        Removes and returns an item from the queue without blocking.
+        """
+        return self.get(False)
+
+    def qsize(self) -> int:
+        """
+        Approximate number of items in the queue.
+        """
+        buffer = self.__shared_memory.buf
+        (head,) = struct.unpack_from(self.__COUNTER_FORMAT, buffer, self.__HEAD_OFFSET)
+        (tail,) = struct.unpack_from(self.__COUNTER_FORMAT, buffer, self.__TAIL_OFFSET)
+        return head - tail
+
+    def empty(self) -> bool:
+        """
+        Whether the queue is approximately empty.
+        """
+        return self.qsize() <= 0
+
+    def full(self) -> bool:
+        """
+        Whether the queue is approximately full.
+        """
+        return self.qsize() >= self.__capacity
+
+    def close(self) -> None:
+        """
+        Detaches from the shared memory, and frees it if called from the creating process.
+        The queue must not be used afterwards.
+        """
+        self.__shared_memory.close()
+        if os.getpid() == self.__owner_pid:
+            self.__shared_memory.unlink()
@@ -0,0 +1,253 @@
+"""
+Stopping all worker groups at once, within a deadline.
+"""
+
+import threading
+import time
+
+from modules.common.modules.logger import logger
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+
+
+class StageShutdownReport:
+    """
+    How a stage shut down.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        shutdown_time: float,
+        terminated_count: int,
+        killed_count: int,
+        is_stopped: bool,
+    ) -> None:
+        """
+        name: Name of the stage.
+        shutdown_time: Time from requesting exit to the last worker ending, in seconds.
+            Time until giving up if the stage did not stop.
+        terminated_count: Workers still running at the deadline, sent SIGTERM.
+        killed_count: Workers still running after the grace period, sent SIGKILL.
+        is_stopped: Whether every worker ended.
+        """
+        self.name = name
+        self.shutdown_time = shutdown_time
+        self.terminated_count = terminated_count
+        self.killed_count = killed_count
+        self.is_stopped = is_stopped
+
+    def __str__(self) -> str:
+        status = "stopped" if self.is_stopped else "NOT STOPPED"
+        return (
+            f"{self.name}: {status} in {self.shutdown_time * 1000:.1f} ms, "
+            f"terminated {self.terminated_count}, killed {self.killed_count}"
+        )
+
+
+class ShutdownCoordinator:
+    """
+    Requests exit from every group, keeps the queues moving so that no worker stays blocked on
+    them, and joins all groups in parallel.
+    Groups still running at the deadline are all terminated together, then those still running
+    after one shared grace period are all killed together.
+
+    The queues are drained once the workers have ended, but not closed:
+    workers in threads cannot be killed and may still use them,
+    so closing is left to the caller once every stage is stopped.
+    """
+
+    __create_key = object()
+
+    # Queue sentinels stay in place for this long before the queues are drained again
+    __PUMP_PERIOD = 0.02  # seconds
+    # Filling and draining gives up on a queue after waiting this long for space or items
+    __PUMP_TIMEOUT = 0.001  # seconds
+
+    @classmethod
+    def create(
+        cls,
+        stages: "list[tuple[str, worker_manager.WorkerManager]]",
+        queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+        controller: worker_controller.WorkerController,
+        local_logger: logger.Logger,
+        deadline: float,
+        terminate_grace: float,
+    ) -> "tuple[bool, ShutdownCoordinator | None]":
+        """
+        stages: Name and worker manager of each stage.
+        queues: Queues between and out of the stages.
+        controller: Worker controller of all workers.
+        local_logger: Existing logger from process.
+        deadline: Time for all workers to exit on their own, in seconds.
+        terminate_grace: Time for workers to end after each of SIGTERM and SIGKILL, in seconds.
+
+        Returns whether the coordinator was able to be created and the coordinator.
+        """
+        if deadline <= 0.0:
+            local_logger.error("Shutdown deadline is less than or equal to zero", True)
+            return False, None
+
+        if terminate_grace <= 0.0:
+            local_logger.error("Shutdown terminate grace is less than or equal to zero", True)
+            return False, None
+
+        return True, ShutdownCoordinator(
+            cls.__create_key,
+            stages,
+            queues,
+            controller,
+            local_logger,
+            deadline,
+            terminate_grace,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        stages: "list[tuple[str, worker_manager.WorkerManager]]",
+        queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+        controller: worker_controller.WorkerController,
+        local_logger: logger.Logger,
+        deadline: float,
+        terminate_grace: float,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is ShutdownCoordinator.__create_key, "Use create() method"
+
+        self.__stages = stages
+        self.__queues = queues
+        self.__controller = controller
+        self.__local_logger = local_logger
+        self.__deadline = deadline
+        self.__terminate_grace = terminate_grace
+
+    def shutdown(self) -> "list[StageShutdownReport]":
+        """
+        Stops every stage, returning within the deadline and 2 grace periods
+        unless a queue operation blocks.
+
+        Returns a report per stage, in the order of the stages.
+        """
+        start_time = time.monotonic()
+        self.__controller.request_exit()
+
+        # Exiting workers must not be restarted
+        for _, manager in self.__stages:
+            manager.stop_supervisor()
+
+        # Each stage is joined in its own thread, which records when the stage ended
+        end_times: "dict[str, float]" = {}
+        join_threads = []
+        for name, manager in self.__stages:
+            join_thread = threading.Thread(
+                target=self.__join_stage,
+                args=(name, manager, start_time + self.__deadline, end_times),
+                name=f"Shutdown-{name}",
+                daemon=True,
+            )
+            join_thread.start()
+            join_threads.append(join_thread)
+
+        # Sentinels wake consumers blocked on get, draining wakes producers blocked on put
+        while any(join_thread.is_alive() for join_thread in join_threads):
+            for stage_queue in self.__queues:
+                stage_queue.fill_queue_with_sentinel(self.__PUMP_TIMEOUT)
+
+            time.sleep(self.__PUMP_PERIOD)
+
+            for stage_queue in self.__queues:
+                stage_queue.drain_queue(self.__PUMP_TIMEOUT)
+
+        late_stages = [(name, manager) for name, manager in self.__stages if name not in end_times]
+        escalations = self.__escalate(late_stages)
+        end_time = time.monotonic()
+
+        # Nothing is left for the stopped workers, and nothing stays referenced by the queues
+        for stage_queue in self.__queues:
+            stage_queue.drain_queue(self.__PUMP_TIMEOUT)
+
+        reports = []
+        for name, _ in self.__stages:
+            terminated_count, killed_count, is_stopped = escalations.get(name, (0, 0, True))
+            if name in escalations:
+                end_times[name] = end_time
+
+            reports.append(
+                StageShutdownReport(
+                    name,
+                    end_times[name] - start_time,
+                    terminated_count,
+                    killed_count,
+                    is_stopped,
+                )
+            )
+
+        return reports
+
+    @staticmethod
+    def __join_stage(
+        name: str,
+        manager: worker_manager.WorkerManager,
+        deadline_time: float,
+        end_times: "dict[str, float]",
+    ) -> None:
+        """
+        Joins the workers of a stage until the deadline, recording the end time if they ended.
+        """
+        if manager.join_workers(max(0.0, deadline_time - time.monotonic())):
+            end_times[name] = time.monotonic()
+
+    def __escalate(
+        self, stages: "list[tuple[str, worker_manager.WorkerManager]]"
+    ) -> "dict[str, tuple[int, int, bool]]":
+        """
+        Terminates the workers still running in every stage, then kills those still running
+        after the grace, so the stages share the grace periods instead of taking turns.
+
+        Returns the number of workers terminated and killed, and whether all of them ended,
+        by stage name.
+        """
+        terminated_counts = {}
+        for name, manager in stages:
+            terminated_counts[name] = manager.terminate_workers()
+            self.__local_logger.warning(
+                f"{name} did not exit within {self.__deadline} s, "
+                f"terminated {terminated_counts[name]}",
+                True,
+            )
+
+        late_stages = self.__join_stages(stages)
+
+        killed_counts = {}
+        for name, manager in late_stages:
+            killed_counts[name] = manager.kill_workers()
+            self.__local_logger.error(
+                f"{name} did not terminate, killed {killed_counts[name]}", True
+            )
+
+        # Threads cannot be killed, they end with the process
+        unstopped_names = {name for name, _ in self.__join_stages(late_stages)}
+
+        return {
+            name: (terminated_counts[name], killed_counts.get(name, 0), name not in unstopped_names)
+            for name, _ in stages
+        }
+
+    def __join_stages(
+        self, stages: "list[tuple[str, worker_manager.WorkerManager]]"
+    ) -> "list[tuple[str, worker_manager.WorkerManager]]":
+        """
+        Joins the stages within one grace period shared by all of them.
+
+        Returns the stages that did not end.
+        """
+        deadline_time = time.monotonic() + self.__terminate_grace
+        return [
+            (name, manager)
+            for name, manager in stages
+            if not manager.join_workers(max(0.0, deadline_time - time.monotonic()))
+        ]
@@ -0,0 +1,206 @@
+"""
+Worker processes started ahead of time.
+"""
+
+import multiprocessing as mp
+import multiprocessing.util
+import weakref
+
+from utilities.workers import worker_standby
+
+
+# Warm processes not yet released, cancelled at exit so that joining them does not hang
+_unreleased_processes: "weakref.WeakSet[WarmProcess]" = weakref.WeakSet()
+
+
+def _run_when_released(
+    release_receiver: "mp.connection.Connection",
+    target: "(...) -> object",  # type: ignore
+    args: "tuple",
+) -> None:
+    """
+    Entry point of warm processes, blocks until released then runs the target.
+    """
+    try:
+        is_released = release_receiver.recv()
+    except EOFError:
+        # Parent closed the pipe without releasing
+        return
+
+    release_receiver.close()
+    if is_released:
+        target(*args)
+
+
+def _cancel_unreleased_processes() -> None:
+    """
+    Cancels warm processes not yet released.
+    """
+    for process in list(_unreleased_processes):
+        process.cancel()
+
+
+# Finalizers with an exit priority run before multiprocessing joins child processes at exit
+multiprocessing.util.Finalize(None, _cancel_unreleased_processes, exitpriority=0)
+
+
+class WarmProcess:
+    """
+    Process started before it is needed, which runs its target once released.
+
+    Interpreter startup and imports happen in warm(), so release() only writes to a pipe.
+    A hot process also runs the setup of its target in warm(), up to
+    `worker_standby.wait_until_active()` , which the target must call before its loop.
+    Arguments are given at construction because synchronization primitives
+    can only be passed to a process when it starts.
+    Has the subset of the `mp.Process` interface used by the worker manager.
+    """
+
+    def __init__(
+        self,
+        target: "(...) -> object",  # type: ignore
+        args: "tuple",
+        context: "mp.context.BaseContext | None" = None,
+        is_hot: bool = False,
+    ) -> None:
+        """
+        target: Function.
+        args: Target function arguments.
+        context: Multiprocessing context, None for the default start method.
+        is_hot: Whether the target runs on warm() and waits in `worker_standby.wait_until_active()` .
+        """
+        if context is None:
+            context = mp.get_context()
+
+        self.__release_receiver, self.__release_sender = context.Pipe(False)
+        entry_point = worker_standby.run_standby if is_hot else _run_when_released
+        self.__process = context.Process(
+            target=entry_point, args=(self.__release_receiver, target, args)
+        )
+        self.__is_warm = False
+        self.__is_released = False
+
+    def warm(self) -> None:
+        """
+        Starts the process, which waits to be released.
+        Does nothing if already started.
+        """
+        if self.__is_warm:
+            return
+
+        # Forked processes, including this one, must not hold the pipe open,
+        # otherwise this process never sees EOF if the parent dies
+        multiprocessing.util.register_after_fork(self, WarmProcess.__close_after_fork)
+        self.__process.start()
+        self.__release_receiver.close()
+        self.__is_warm = True
+        _unreleased_processes.add(self)
+
+    def release(self) -> None:
+        """
+        Lets the started process run its target.
+        Does nothing if already released or cancelled.
+        """
+        self.__send_release(True)
+
+    def start(self) -> None:
+        """
+        Starts the process if needed and runs the target, like `mp.Process.start()` .
+        """
+        self.warm()
+        self.release()
+
+    def cancel(self) -> None:
+        """
+        Makes the started process exit without running the target.
+        Does nothing if already released or cancelled.
+        """
+        self.__send_release(False)
+
+    def __send_release(self, is_released: bool) -> None:
+        """
+        Sends the decision to a started process, only once.
+        """
+        if not self.__is_warm or self.__release_sender.closed:
+            return
+
+        try:
+            self.__release_sender.send(is_released)
+        except (BrokenPipeError, ConnectionResetError):
+            # Process already died, its sentinel reports it
+            pass
+
+        self.__release_sender.close()
+        self.__is_released = is_released
+        _unreleased_processes.discard(self)
+
+    def __close_after_fork(self) -> None:
+        """
+        Closes the inherited copy of the pipe in a forked child.
+        """
+        self.__release_sender.close()
+        _unreleased_processes.discard(self)
+
+    def is_released(self) -> bool:
+        """
+        Returns whether the target was allowed to run.
+        """
+        return self.__is_released
+
+    @property
+    def name(self) -> str:
+        """
+        Name of the process.
+        """
+        return self.__process.name
+
+    @property
+    def pid(self) -> "int | None":
+        """
+        Process ID, None before warm() .
+        """
+        return self.__process.pid
+
+    @property
+    def sentinel(self) -> int:
+        """
+        Handle that becomes ready when the process ends, only after warm() .
+        """
+        return self.__process.sentinel
+
+    @property
+    def exitcode(self) -> "int | None":
+        """
+        Exit code, None while running.
+        """
+        return self.__process.exitcode
+
+    def is_alive(self) -> bool:
+        """
+        Whether the process is running, including while waiting to be released.
+        """
+        return self.__process.is_alive()
+
+    def join(self, timeout: "float | None" = None) -> None:
+        """
+        Waits for the process to end.
+        """
+        self.__process.join(timeout)
+
+    def terminate(self) -> None:
+        """
+        Sends SIGTERM to the process.
+        """
+        self.__process.terminate()
+
+    def kill(self) -> None:
+        """
+        Sends SIGKILL to the process.
+        """
+        self.__process.kill()
+
+    def close(self) -> None:
+        """
+        Releases the resources of an ended process.
+        """
+        self.__process.close()
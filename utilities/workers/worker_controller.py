@@ -2,66 +2,107 @@
 For controlling workers.
 """
 
+import ctypes
 import multiprocessing as mp
-import time
 
 
 class WorkerController:
     """
     For interprocess communication from main to worker.
     Contains exit and pause requests.
+
+    Requests are bits of a state word in shared memory, so polling them is a plain memory read.
+    Events let workers block while paused and wait for exit without busy waiting.
     """
 
-    __QUEUE_DELAY = 0.1  # seconds
+    __EXIT_REQUESTED = 0b01
+    __PAUSE_REQUESTED = 0b10
 
     def __init__(self) -> None:
         """
-        Constructor creates internal queue and semaphore.
+        Constructor creates the shared state word and events.
         """
-        self.__pause = mp.BoundedSemaphore(1)
-        self.__is_paused = False
-        self.__exit_queue = mp.Queue(1)
+        self.__state = mp.RawValue(ctypes.c_int, 0)
+        # Only serializes the read-modify-write of requests, polling does not take it
+        self.__state_lock = mp.Lock()
+        # Set while workers may run, which is when not paused or exit has been requested
+        self.__run_event = mp.Event()
+        self.__run_event.set()
+        self.__exit_event = mp.Event()
+        # Set on every request, for workers waiting on queues and requests at once
+        self.__wake_events: "list[mp.synchronize.Event]" = []
+
+    def attach_wake_event(self, wake_event: "mp.synchronize.Event") -> None:
+        """
+        Sets an event on every pause, resume, and exit request.
+        Must be called before the controller is passed to the workers.
+        """
+        self.__wake_events.append(wake_event)
+
+    def __wake(self) -> None:
+        """
+        Sets every attached event.
+        """
+        for wake_event in self.__wake_events:
+            wake_event.set()
 
     def request_pause(self) -> None:
         """
         Requests worker processes to pause.
         """
-        if not self.__is_paused:
-            self.__pause.acquire()
-            self.__is_paused = True
+        with self.__state_lock:
+            self.__state.value |= self.__PAUSE_REQUESTED
+            if not self.__state.value & self.__EXIT_REQUESTED:
+                self.__run_event.clear()
+
+        self.__wake()
 
     def request_resume(self) -> None:
         """
         Requests worker processes to resume.
         """
-        if self.__is_paused:
-            self.__pause.release()
-            self.__is_paused = False
+        with self.__state_lock:
+            self.__state.value &= ~self.__PAUSE_REQUESTED
+            self.__run_event.set()
+
+        self.__wake()
 
     def check_pause(self) -> None:
         """
         Blocks worker if main has requested it to pause, otherwise continues.
+        An exit request also releases paused workers so they can exit.
         """
-        self.__pause.acquire()
-        self.__pause.release()
+        if self.__state.value & self.__PAUSE_REQUESTED:
+            self.__run_event.wait()
+
+    def is_pause_requested(self) -> bool:
+        """
+        Returns whether main has requested the worker process to pause.
+        """
+        return bool(self.__state.value & self.__PAUSE_REQUESTED)
 
     def request_exit(self) -> None:
         """
         Requests worker processes to exit.
         Does nothing if already requested.
         """
-        time.sleep(self.__QUEUE_DELAY)
-        if self.__exit_queue.empty():
-            self.__exit_queue.put(None)
+        with self.__state_lock:
+            self.__state.value |= self.__EXIT_REQUESTED
+            self.__exit_event.set()
+            self.__run_event.set()
+
+        self.__wake()
 
     def clear_exit(self) -> None:
         """
         Clears the exit request condition.
         Does nothing if already cleared.
         """
-        time.sleep(self.__QUEUE_DELAY)
-        if not self.__exit_queue.empty():
-            _ = self.__exit_queue.get()
+        with self.__state_lock:
+            self.__state.value &= ~self.__EXIT_REQUESTED
+            self.__exit_event.clear()
+            if self.__state.value & self.__PAUSE_REQUESTED:
+                self.__run_event.clear()
 
     def is_exit_requested(self) -> bool:
         """
@@ -69,4 +110,14 @@ class WorkerController:
         There is a race condition, but it's fine because the worker process
         will do at most 1 additional loop.
         """
-        return not self.__exit_queue.empty()
+        return bool(self.__state.value & self.__EXIT_REQUESTED)
+
+    def wait_for_exit(self, timeout: "float | None" = None) -> bool:
+        """
+        Blocks until main requests exit, use instead of sleeping in worker loops.
+
+        timeout: Time waiting in seconds, None to block.
+
+        Returns whether exit has been requested.
+        """
+        return self.__exit_event.wait(timeout)
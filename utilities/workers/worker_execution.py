@@ -0,0 +1,389 @@
+"""
+How workers run: in their own process, or in a thread or asyncio task of this process.
+"""
+
+import asyncio
+import concurrent.futures
+import enum
+import itertools
+import multiprocessing.util
+import os
+import threading
+import traceback
+
+
+class ExecutionMode(enum.Enum):
+    """
+    What runs each worker of a group.
+    """
+
+    # Separate process, isolated from crashes and can be killed
+    PROCESS = 0
+    # Thread of this process, for targets blocking on I/O
+    THREAD = 1
+    # Task on the event loop thread shared by this process, for coroutine targets
+    ASYNCIO = 2
+
+
+_worker_numbers = itertools.count(1)
+
+# Runs the tasks of all asyncio workers of this process, started on first use
+_event_loop: "asyncio.AbstractEventLoop | None" = None
+_event_loop_lock = threading.Lock()
+
+# Runs the function targets of asyncio workers, each holding a thread until it returns,
+# so it grows to a thread per running worker unlike the default executor of the event loop
+_executor: "concurrent.futures.ThreadPoolExecutor | None" = None
+_executor_size: int = 0
+_executor_demand: int = 0
+
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the event loop of this process, starting its thread if needed.
+    """
+    # Shared by all asyncio workers of this process
+    # pylint: disable-next=global-statement
+    global _event_loop
+
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_event_loop.run_forever, name="WorkerEventLoop", daemon=True
+            ).start()
+
+        return _event_loop
+
+
+def _submit_to_executor(
+    target: "(...) -> object",  # type: ignore
+    args: "tuple",
+) -> concurrent.futures.Future:
+    """
+    Runs a function target in the executor, growing it first if all its threads are taken.
+    Call _release_executor_thread() once the target returns.
+
+    Returns the future of the target.
+    """
+    # Shared by all asyncio workers of this process
+    # pylint: disable-next=global-statement
+    global _executor, _executor_size, _executor_demand
+
+    # Submitted under the lock, so the executor is not replaced in between
+    with _event_loop_lock:
+        _executor_demand += 1
+        if _executor is None or _executor_demand > _executor_size:
+            # Running targets keep their threads, which end when they return
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+
+            _executor_size = max(2 * _executor_size, _executor_demand)
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                _executor_size, thread_name_prefix="WorkerExecutor"
+            )
+
+        return _executor.submit(target, *args)
+
+
+def _release_executor_thread() -> None:
+    """
+    Counts a function target that returned, or was never submitted.
+    """
+    # Shared by all asyncio workers of this process
+    # pylint: disable-next=global-statement
+    global _executor_demand
+
+    with _event_loop_lock:
+        _executor_demand -= 1
+
+
+def _forget_event_loop() -> None:
+    """
+    Forked children do not have the thread running the event loop, nor the executor threads.
+    """
+    # Only reset in the forked child
+    # pylint: disable-next=global-statement
+    global _event_loop, _event_loop_lock, _executor, _executor_size, _executor_demand
+
+    _event_loop = None
+    _event_loop_lock = threading.Lock()
+    _executor = None
+    _executor_size = 0
+    _executor_demand = 0
+
+
+os.register_at_fork(after_in_child=_forget_event_loop)
+
+
+# Range of nice values, lower runs first
+MIN_NICE = -20
+MAX_NICE = 19
+
+
+def check_process_scheduling(cpu_set: "list[int] | None", nice: "int | None") -> "tuple[bool, str]":
+    """
+    Checks that the CPUs are available to this process and the nice value is in range.
+
+    Returns whether the settings can be applied, and the reason if not.
+    """
+    if cpu_set is not None:
+        if len(cpu_set) == 0:
+            return False, "CPU set is empty"
+
+        unavailable_cpus = set(cpu_set) - os.sched_getaffinity(0)
+        if len(unavailable_cpus) > 0:
+            return False, f"CPUs {sorted(unavailable_cpus)} are not available"
+
+    if nice is not None and not MIN_NICE <= nice <= MAX_NICE:
+        return False, f"Nice value {nice} is not in [{MIN_NICE}, {MAX_NICE}]"
+
+    return True, ""
+
+
+def set_process_scheduling(
+    pid: int, cpu_set: "list[int] | None", nice: "int | None"
+) -> "tuple[bool, str]":
+    """
+    Pins a process to CPUs and sets its nice value.
+    Both apply to the main thread, threads it starts afterwards inherit them.
+
+    pid: Process ID.
+    cpu_set: CPUs the process may run on, None to leave unchanged.
+    nice: Nice value, None to leave unchanged. Lowering it needs CAP_SYS_NICE .
+
+    Returns whether everything was applied, and the reason if not.
+    """
+    try:
+        if cpu_set is not None:
+            os.sched_setaffinity(pid, cpu_set)
+
+        if nice is not None:
+            os.setpriority(os.PRIO_PROCESS, pid, nice)
+    except OSError as e:
+        return False, str(e)
+
+    return True, ""
+
+
+class InProcessWorker:  # pylint: disable=too-many-instance-attributes
+    """
+    Worker running in a thread or asyncio task of this process.
+
+    Has the same subset of the `mp.Process` interface as `warm_process.WarmProcess` ,
+    with a sentinel that becomes ready when the worker ends.
+    Nothing is started ahead of time, so warm() only allows release() .
+    Threads cannot be stopped from outside, so kill() and terminate() only cancel coroutine tasks.
+    Coroutine targets run as tasks, other targets in asyncio mode run in an executor
+    with a thread for each of them.
+    """
+
+    def __init__(
+        self,
+        target: "(...) -> object",  # type: ignore
+        args: "tuple",
+        execution_mode: ExecutionMode,
+    ) -> None:
+        """
+        target: Function or coroutine function.
+        args: Target function arguments.
+        execution_mode: Thread or asyncio.
+        """
+        assert execution_mode != ExecutionMode.PROCESS, "Use warm_process.WarmProcess"
+
+        self.__target = target
+        self.__args = args
+        self.__execution_mode = execution_mode
+        self.__name = f"{execution_mode.name.capitalize()}Worker-{next(_worker_numbers)}"
+
+        # Closing the sending end makes the receiving end readable
+        self.__sentinel_receiver, self.__sentinel_sender = os.pipe()
+        # Forked processes must not hold the sending end open
+        multiprocessing.util.register_after_fork(self, InProcessWorker.__close_after_fork)
+
+        self.__is_warm = False
+        self.__is_decided = False
+        self.__is_released = False
+        self.__ended = threading.Event()
+        self.__end_lock = threading.Lock()
+        self.__is_closed = False
+        self.__exitcode: "int | None" = None
+        self.__future: concurrent.futures.Future | None = None
+        self.__is_in_executor = False
+
+    def warm(self) -> None:
+        """
+        Allows release(), there is no startup to do ahead of time.
+        """
+        self.__is_warm = True
+
+    def release(self) -> None:
+        """
+        Starts running the target.
+        Does nothing if not warm, or already released or cancelled.
+        """
+        if not self.__is_warm or self.__is_decided:
+            return
+
+        self.__is_decided = True
+        self.__is_released = True
+
+        if self.__execution_mode == ExecutionMode.THREAD:
+            threading.Thread(target=self.__run_thread, name=self.__name, daemon=True).start()
+        else:
+            self.__future = asyncio.run_coroutine_threadsafe(self.__run_task(), _get_event_loop())
+            # A task cancelled before it runs never reaches its finally
+            self.__future.add_done_callback(lambda _: self.__end(1))
+
+    def start(self) -> None:
+        """
+        Runs the target, like `mp.Process.start()` .
+        """
+        self.warm()
+        self.release()
+
+    def cancel(self) -> None:
+        """
+        Ends the worker without running the target.
+        Does nothing if not warm, or already released or cancelled.
+        """
+        if not self.__is_warm or self.__is_decided:
+            return
+
+        self.__is_decided = True
+        self.__end(0)
+
+    def __run_thread(self) -> None:
+        """
+        Thread entry point, exceptions are reported by `threading.excepthook` .
+        """
+        exitcode = 1
+        try:
+            self.__target(*self.__args)
+            exitcode = 0
+        finally:
+            self.__end(exitcode)
+
+    async def __run_task(self) -> None:
+        """
+        Task entry point.
+        """
+        exitcode = 1
+        try:
+            if asyncio.iscoroutinefunction(self.__target):
+                await self.__target(*self.__args)
+            else:
+                self.__is_in_executor = True
+                await asyncio.wrap_future(_submit_to_executor(self.__target, self.__args))
+            exitcode = 0
+        # Reported like an exception ending a process
+        # pylint: disable-next=broad-exception-caught
+        except Exception:
+            traceback.print_exc()
+        finally:
+            self.__end(exitcode)
+
+    def __end(self, exitcode: int) -> None:
+        """
+        Records the exit code and makes the sentinel ready, only once.
+        """
+        with self.__end_lock:
+            if self.__ended.is_set():
+                return
+
+            self.__exitcode = exitcode
+            if self.__is_in_executor:
+                _release_executor_thread()
+
+            os.close(self.__sentinel_sender)
+            self.__ended.set()
+
+    def __close_after_fork(self) -> None:
+        """
+        Closes the inherited copies of the pipe in a forked child.
+        """
+        # Otherwise the numbers may belong to other files by now
+        if self.__is_closed:
+            return
+
+        os.close(self.__sentinel_receiver)
+        if not self.__ended.is_set():
+            os.close(self.__sentinel_sender)
+
+    def is_released(self) -> bool:
+        """
+        Returns whether the target was allowed to run.
+        """
+        return self.__is_released
+
+    @property
+    def name(self) -> str:
+        """
+        Name of the worker.
+        """
+        return self.__name
+
+    @property
+    def pid(self) -> int:
+        """
+        Process ID, of this process.
+        """
+        return os.getpid()
+
+    @property
+    def sentinel(self) -> int:
+        """
+        Handle that becomes ready when the worker ends.
+        """
+        return self.__sentinel_receiver
+
+    @property
+    def exitcode(self) -> "int | None":
+        """
+        0 if the target returned, 1 if it raised or was cancelled, None while running.
+        """
+        return self.__exitcode
+
+    def is_alive(self) -> bool:
+        """
+        Whether the worker is running, including while waiting to be released.
+        """
+        return self.__is_warm and not self.__ended.is_set()
+
+    def join(self, timeout: "float | None" = None) -> None:
+        """
+        Waits for the worker to end.
+        """
+        if not self.__is_warm:
+            return
+
+        self.__ended.wait(timeout)
+
+    def terminate(self) -> None:
+        """
+        Cancels a coroutine task, does nothing otherwise.
+        """
+        self.kill()
+
+    def kill(self) -> None:
+        """
+        Cancels a coroutine task, does nothing otherwise.
+        """
+        # Cancelling a task running a function in the executor would leave the function running
+        if self.__future is not None and asyncio.iscoroutinefunction(self.__target):
+            self.__future.cancel()
+
+    def close(self) -> None:
+        """
+        Releases the resources of an ended worker.
+        """
+        if self.is_alive():
+            raise ValueError(f"Cannot close {self.__name} while it is still running")
+
+        if self.__is_closed:
+            return
+
+        self.__is_closed = True
+        os.close(self.__sentinel_receiver)
+        if not self.__ended.is_set():
+            os.close(self.__sentinel_sender)
@@ -0,0 +1,200 @@
+"""
+Progress of worker loops in shared memory, for detecting hung workers.
+"""
+
+import ctypes
+import multiprocessing as mp
+import time
+
+
+# Slot of this process, set in worker processes by run_bound()
+_bound_stamps: "ctypes.Array[ctypes.c_double] | None" = None
+_bound_iterations: "ctypes.Array[ctypes.c_uint64] | None" = None
+_bound_slot: int = -1
+
+
+def report_progress() -> None:
+    """
+    Records that the worker loop of this process made progress.
+    Call once per loop iteration, does nothing if the process is not bound to a slot.
+    """
+    if _bound_slot < 0:
+        return
+
+    _bound_stamps[_bound_slot] = time.monotonic()
+    _bound_iterations[_bound_slot] += 1
+
+
+def run_bound(
+    board: "LivenessBoard",
+    slot: int,
+    target: "(...) -> object",  # type: ignore
+    args: "tuple",
+) -> None:
+    """
+    Worker process entry point, binds the process to the slot then runs the target.
+    """
+    # Only set in this worker process
+    # pylint: disable-next=global-statement
+    global _bound_stamps, _bound_iterations, _bound_slot
+
+    _bound_stamps, _bound_iterations = board.get_arrays()
+    _bound_slot = slot
+
+    target(*args)
+
+
+class LivenessBoard:
+    """
+    Last progress stamp and iteration count of each worker.
+    Each slot is only written by the worker bound to it, so there is no lock.
+    Slots are allocated by the manager.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        capacity: Number of slots, must be greater than 0 .
+        """
+        assert capacity > 0, "Capacity must be greater than 0"
+
+        self.__stamps = mp.RawArray(ctypes.c_double, capacity)
+        self.__iterations = mp.RawArray(ctypes.c_uint64, capacity)
+        self.__free_slots = list(range(capacity))
+
+    def allocate_slot(self) -> "tuple[bool, int]":
+        """
+        Returns whether a slot was free and the slot.
+        """
+        if len(self.__free_slots) == 0:
+            return False, -1
+
+        return True, self.__free_slots.pop()
+
+    def free_slot(self, slot: int) -> None:
+        """
+        Returns the slot for reuse once its worker has ended.
+        """
+        self.__free_slots.append(slot)
+
+    def reset_slot(self, slot: int, now: float) -> None:
+        """
+        Starts the slot over, before its worker is released.
+
+        now: Monotonic time in seconds, counts as the first progress.
+        """
+        self.__stamps[slot] = now
+        self.__iterations[slot] = 0
+
+    def get_progress(self, slot: int) -> "tuple[float, int]":
+        """
+        Returns the last progress stamp in monotonic seconds, and the number of iterations.
+        """
+        return self.__stamps[slot], self.__iterations[slot]
+
+    def get_arrays(
+        self,
+    ) -> "tuple[ctypes.Array[ctypes.c_double], ctypes.Array[ctypes.c_uint64]]":
+        """
+        Returns the stamp and iteration arrays, for binding a worker.
+        """
+        return self.__stamps, self.__iterations
+
+
+class StallDetector:
+    """
+    Workers of a group bound to slots of a board, and which of them missed the stall deadline.
+    Progress made before the last pause does not count, paused workers make none.
+    Not thread safe, use one per worker group.
+    """
+
+    # Stalls are noticed at most a quarter of the deadline late
+    __CHECKS_PER_DEADLINE = 4
+
+    def __init__(self, capacity: int, stall_deadline: float) -> None:
+        """
+        capacity: Number of workers monitored at once, must be greater than 0 .
+        stall_deadline: Seconds without progress before a worker is stalled.
+        """
+        self.__board = LivenessBoard(capacity)
+        self.__stall_deadline = stall_deadline
+        # Slot of each worker
+        self.__slots: "dict[object, int]" = {}
+        self.__last_pause_time = 0.0
+
+    def bind(
+        self,
+        target: "(...) -> object",  # type: ignore
+        args: "tuple",
+    ) -> "tuple[bool, int, (...) -> object, tuple]":  # type: ignore
+        """
+        Allocates a slot for a worker about to be created.
+
+        Returns whether a slot was free, the slot,
+        and the target and arguments that bind the worker process to it.
+        Unchanged if no slot was free.
+        """
+        result, slot = self.__board.allocate_slot()
+        if not result:
+            return False, -1, target, args
+
+        return True, slot, run_bound, (self.__board, slot, target, args)
+
+    def unbind(self, slot: int) -> None:
+        """
+        Frees the slot of a worker that was not created.
+        """
+        self.__board.free_slot(slot)
+
+    def track(self, worker: object, slot: int) -> None:
+        """
+        Monitors the created worker bound to the slot.
+        """
+        self.__slots[worker] = slot
+
+    def reset(self, worker: object, now: float) -> None:
+        """
+        Starts the deadline of the worker over, before it is released.
+
+        now: Monotonic time in seconds.
+        """
+        slot = self.__slots.get(worker, -1)
+        if slot >= 0:
+            self.__board.reset_slot(slot, now)
+
+    def untrack(self, worker: object) -> None:
+        """
+        Stops monitoring the reaped worker and frees its slot.
+        """
+        slot = self.__slots.pop(worker, -1)
+        if slot >= 0:
+            self.__board.free_slot(slot)
+
+    def record_pause(self, now: float) -> None:
+        """
+        Records that the workers are paused, their deadline starts over on resume.
+
+        now: Monotonic time in seconds.
+        """
+        self.__last_pause_time = now
+
+    def get_stall(self, worker: object, now: float) -> "tuple[bool, float, int]":
+        """
+        now: Monotonic time in seconds.
+
+        Returns whether the worker missed the deadline,
+        its time since the last progress in seconds, and its number of iterations.
+        Workers not monitored are never stalled.
+        """
+        slot = self.__slots.get(worker, -1)
+        if slot < 0:
+            return False, 0.0, 0
+
+        stamp, iterations = self.__board.get_progress(slot)
+        stall_time = now - max(stamp, self.__last_pause_time)
+        return stall_time > self.__stall_deadline, stall_time, iterations
+
+    def get_check_period(self) -> float:
+        """
+        Returns how often to check for stalls in seconds.
+        """
+        return self.__stall_deadline / self.__CHECKS_PER_DEADLINE
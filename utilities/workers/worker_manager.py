@@ -3,13 +3,22 @@ For managing workers.
 """
 
 import multiprocessing as mp
+import multiprocessing.connection
+import threading
+import time
 
 from modules.common.modules.logger import logger
 from utilities.workers import worker_controller
 from utilities.workers import queue_proxy_wrapper
+from utilities.workers import restart_policy
+from utilities.workers import scaling_policy
+from utilities.workers import warm_process
+from utilities.workers import worker_execution
+from utilities.workers import worker_liveness
+from utilities.workers import worker_resources
 
 
-class WorkerProperties:
+class WorkerProperties:  # pylint: disable=too-many-instance-attributes
     """
     Worker Properties.
     """
@@ -26,17 +35,29 @@ class WorkerProperties:
         output_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
         controller: worker_controller.WorkerController,
         local_logger: logger.Logger,
+        execution_mode: worker_execution.ExecutionMode = worker_execution.ExecutionMode.PROCESS,
+        cpu_set: "list[int] | None" = None,
+        nice: "int | None" = None,
+        hot_standby: bool = False,
     ) -> "tuple[bool, WorkerProperties | None]":
         """
         Creates worker properties.
 
         count: Number of workers.
-        target: Function.
+        target: Function, or coroutine function for asyncio execution.
         work_arguments: Arguments for worker internals.
         input_queues: Input queues.
         output_queues: Output queues.
         controller: Worker controller.
         local_logger: Existing logger from process.
+        execution_mode: What runs each worker, threads and asyncio tasks run in this process
+            and can use in process queues.
+        cpu_set: CPUs each worker process may run on, None for any.
+        nice: Nice value of each worker process, lower runs first, None to inherit.
+            Lowering it below that of this process needs CAP_SYS_NICE ,
+            without it workers run at the inherited priority.
+        hot_standby: Whether spares run the setup of the target ahead of time,
+            the target must call `worker_standby.wait_until_active()` after its setup.
 
         Returns the WorkerProperties object.
         """
@@ -47,6 +68,19 @@ class WorkerProperties:
             )
             return False, None
 
+        if (cpu_set is not None or nice is not None or hot_standby) and (
+            execution_mode != worker_execution.ExecutionMode.PROCESS
+        ):
+            local_logger.error(
+                "CPU set, nice value, or hot standby requested for workers not in processes", True
+            )
+            return False, None
+
+        result, reason = worker_execution.check_process_scheduling(cpu_set, nice)
+        if not result:
+            local_logger.error(f"Invalid worker scheduling: {reason}", True)
+            return False, None
+
         return True, WorkerProperties(
             cls.__create_key,
             count,
@@ -55,6 +89,10 @@ class WorkerProperties:
             input_queues,
             output_queues,
             controller,
+            execution_mode,
+            cpu_set,
+            nice,
+            hot_standby,
         )
 
     def __init__(
@@ -66,6 +104,10 @@ class WorkerProperties:
         input_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
         output_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
         controller: worker_controller.WorkerController,
+        execution_mode: worker_execution.ExecutionMode,
+        cpu_set: "list[int] | None",
+        nice: "int | None",
+        hot_standby: bool,
     ) -> None:
         """
         Private constructor, use create() method.
@@ -78,6 +120,10 @@ class WorkerProperties:
         self.__input_queues = input_queues
         self.__output_queues = output_queues
         self.__controller = controller
+        self.__execution_mode = execution_mode
+        self.__cpu_set = cpu_set
+        self.__nice = nice
+        self.__hot_standby = hot_standby
 
     def get_worker_arguments(self) -> "tuple":
         """
@@ -104,6 +150,36 @@ class WorkerProperties:
         """
         return self.__target
 
+    def get_controller(self) -> worker_controller.WorkerController:
+        """
+        Returns the worker controller.
+        """
+        return self.__controller
+
+    def get_execution_mode(self) -> worker_execution.ExecutionMode:
+        """
+        Returns what runs each worker.
+        """
+        return self.__execution_mode
+
+    def get_cpu_set(self) -> "list[int] | None":
+        """
+        Returns the CPUs each worker process may run on, None for any.
+        """
+        return self.__cpu_set
+
+    def get_nice(self) -> "int | None":
+        """
+        Returns the nice value of each worker process, None to inherit.
+        """
+        return self.__nice
+
+    def is_hot_standby(self) -> bool:
+        """
+        Returns whether workers run the setup of the target before they are released.
+        """
+        return self.__hot_standby
+
     def get_input_queues(self) -> "list[queue_proxy_wrapper.QueueProxyWrapper]":
         """
         Returns the input queues.
@@ -117,7 +193,7 @@ class WorkerProperties:
         return self.__target.__name__
 
 
-class WorkerManager:
+class WorkerManager:  # pylint: disable=too-many-instance-attributes
     """
     For interprocess communication from main to worker.
     Contains exit and pause requests.
@@ -130,41 +206,104 @@ class WorkerManager:
         cls,
         worker_properties: WorkerProperties,
         local_logger: logger.Logger,
+        worker_restart_policy: "restart_policy.RestartPolicy | None" = None,
+        on_crash_loop: "(str, int) -> None | None" = None,  # type: ignore
+        worker_scaling_policy: "scaling_policy.ScalingPolicy | None" = None,
+        warm_spare_count: int = 0,
+        stall_deadline: "float | None" = None,
     ) -> "tuple[bool, WorkerManager | None]":
         """
         Create identical workers and append them to a workers list.
+        Workers are started right away and wait until start_workers() releases them,
+        so their interpreter startup and imports are done before they are needed.
 
         worker_properties: Worker properties.
         local_logger: Existing logger from process.
+        worker_restart_policy: Backoff and crash loop limits, None for the defaults.
+        on_crash_loop: Called with the target name and crash count when the group is parked,
+            from the supervisor thread if it detected the crash loop.
+        worker_scaling_policy: Bounds and thresholds for resizing the group, None for a fixed size.
+        warm_spare_count: Number of started workers kept waiting to replace dead workers
+            and grow the group. With the fork start method, the supervisor only restarts
+            and grows from spares, which main starts through replenish_spares() .
+        stall_deadline: Workers whose loop reports no progress for this long in seconds
+            are killed and restarted, None to not detect hangs.
+            Only for process execution, threads cannot be killed.
 
         Returns whether the workers were able to be created and the Worker Manager.
         """
+        if worker_restart_policy is None:
+            result, worker_restart_policy = restart_policy.RestartPolicy.create()
+            if not result:
+                local_logger.error("Failed to create default restart policy", True)
+                return False, None
+
+        # Get Pylance to stop complaining
+        assert worker_restart_policy is not None
+
+        if warm_spare_count < 0:
+            local_logger.error("Warm spare count requested is less than zero", True)
+            return False, None
+
+        stall_detector = None
+        if stall_deadline is not None:
+            if worker_properties.get_execution_mode() != worker_execution.ExecutionMode.PROCESS:
+                local_logger.error("Stall deadline requested for workers not in processes", True)
+                return False, None
+
+            if stall_deadline <= 0.0:
+                local_logger.error("Stall deadline requested is less than or equal to zero", True)
+                return False, None
+
+            max_count = worker_properties.get_worker_count()
+            if worker_scaling_policy is not None:
+                max_count = max(max_count, worker_scaling_policy.max_count)
+
+            # Dead and retiring workers hold their slot until they are reaped
+            stall_detector = worker_liveness.StallDetector(
+                2 * (max_count + warm_spare_count), stall_deadline
+            )
+
         workers = []
-        for _ in range(0, worker_properties.get_worker_count()):
+        for _ in range(0, worker_properties.get_worker_count() + warm_spare_count):
             result, worker = WorkerManager.__create_single_worker(
-                worker_properties.get_worker_target(),
-                worker_properties.get_worker_arguments(),
-                local_logger,
+                worker_properties, local_logger, stall_detector
             )
             if not result:
                 local_logger.error("Failed to create worker", True)
+                # Do not leave started workers waiting
+                for created_worker in workers:
+                    created_worker.cancel()
                 return False, None
 
             workers.append(worker)
 
+        spares = workers[worker_properties.get_worker_count() :]
+        workers = workers[: worker_properties.get_worker_count()]
+
         return True, WorkerManager(
             cls.__create_key,
             workers,
+            spares,
             worker_properties,
             local_logger,
+            worker_restart_policy,
+            on_crash_loop,
+            worker_scaling_policy,
+            stall_detector,
         )
 
     def __init__(
         self,
         class_private_create_key: object,
-        workers: "list[mp.Process]",
+        workers: "list[warm_process.WarmProcess | worker_execution.InProcessWorker]",
+        spares: "list[warm_process.WarmProcess | worker_execution.InProcessWorker]",
         worker_properties: WorkerProperties,
         local_logger: logger.Logger,
+        worker_restart_policy: restart_policy.RestartPolicy,
+        on_crash_loop: "(str, int) -> None | None",  # type: ignore
+        worker_scaling_policy: scaling_policy.ScalingPolicy | None,
+        stall_detector: worker_liveness.StallDetector | None,
     ) -> None:
         """
         Private constructor, use create() method.
@@ -172,76 +311,742 @@ class WorkerManager:
         assert class_private_create_key is WorkerManager.__create_key, "Use create() method"
 
         self.__workers = workers
+        # Started workers waiting to be released, all ready to run the same target and arguments
+        self.__spares = spares
+        self.__warm_spare_count = len(spares)
         self.__worker_properties = worker_properties
         self.__local_logger = local_logger
 
+        # Shared between main and the supervisor thread, the restart and scaling state
+        # is indexed by worker and only used under the lock
+        self.__workers_lock = threading.Lock()
+        self.__restart_tracker = restart_policy.RestartTracker(worker_restart_policy, len(workers))
+        self.__on_crash_loop = on_crash_loop
+
+        self.__scaler = None
+        if worker_scaling_policy is not None:
+            self.__scaler = scaling_policy.GroupScaler(
+                worker_scaling_policy,
+                worker_properties.get_input_queues(),
+                worker_properties.get_target_name(),
+                local_logger,
+            )
+
+        # Monitors the workers and spares, under the lock
+        self.__stall_detector = stall_detector
+
+        # Time and CPU time of the previous resource sample of each process
+        self.__last_cpu_times: "dict[int, tuple[float, float]]" = {}
+
+        self.__supervisor_thread: "threading.Thread | None" = None
+        self.__supervisor_wake_receiver: "multiprocessing.connection.Connection | None" = None
+        self.__supervisor_wake_sender: "multiprocessing.connection.Connection | None" = None
+
     @staticmethod
-    def __create_single_worker(target: "(...) -> object", args: "tuple", local_logger: logger.Logger) -> "tuple[bool, mp.Process | None]":  # type: ignore
+    def __create_single_worker(
+        worker_properties: WorkerProperties,
+        local_logger: logger.Logger,
+        stall_detector: "worker_liveness.StallDetector | None" = None,
+    ) -> "tuple[bool, warm_process.WarmProcess | worker_execution.InProcessWorker | None]":
         """
-        Creates a single worker.
+        Creates a single worker and starts it, waiting to be released.
 
-        target: Function.
-        args: Target function arguments.
+        worker_properties: Target, arguments, and how to run the worker.
         local_logger: Existing logger from process.
+        stall_detector: Monitors the worker for hangs, None to not monitor it.
 
         Returns whether a worker was created and the worker.
         """
+        target = worker_properties.get_worker_target()
+        args = worker_properties.get_worker_arguments()
+        execution_mode = worker_properties.get_execution_mode()
+        liveness_slot = -1
+        if stall_detector is not None:
+            result, liveness_slot, target, args = stall_detector.bind(target, args)
+            if not result:
+                local_logger.warning(
+                    "No free liveness slot, new worker is not monitored for hangs", True
+                )
+
         try:
-            worker = mp.Process(target=target, args=args)
+            if execution_mode == worker_execution.ExecutionMode.PROCESS:
+                worker = warm_process.WarmProcess(
+                    target, args, is_hot=worker_properties.is_hot_standby()
+                )
+            else:
+                worker = worker_execution.InProcessWorker(target, args, execution_mode)
+            worker.warm()
         # Catching all exceptions for library call
         # pylint: disable-next=broad-exception-caught
         except Exception as e:
             local_logger.error(f"Exception raised while creating a worker: {e}", True)
+            if stall_detector is not None and liveness_slot >= 0:
+                stall_detector.unbind(liveness_slot)
             return False, None
 
+        if stall_detector is not None and liveness_slot >= 0:
+            stall_detector.track(worker, liveness_slot)
+
+        # Applied while the process waits, so it runs on its CPUs and priority from the start
+        cpu_set = worker_properties.get_cpu_set()
+        nice = worker_properties.get_nice()
+        if cpu_set is not None or nice is not None:
+            result, reason = worker_execution.set_process_scheduling(worker.pid, cpu_set, nice)
+            if not result:
+                # Still usable, only less isolated
+                local_logger.warning(
+                    f"Failed to set scheduling of {worker_properties.get_target_name()} "
+                    f"{worker.name}: {reason}",
+                    True,
+                )
+
         return True, worker
 
     def start_workers(self) -> None:
         """
-        Start workers.
+        Start workers, releasing the already started processes.
         """
-        for worker in self.__workers:
-            worker.start()
+        with self.__workers_lock:
+            for i, worker in enumerate(self.__workers):
+                self.__release_worker(worker)
+                self.__restart_tracker.record_start(i, time.perf_counter())
+
+            if self.__scaler is not None:
+                self.__scaler.start(time.perf_counter())
 
-    def join_workers(self) -> None:
+    def join_workers(self, timeout: "float | None" = None) -> bool:
         """
-        Join workers.
+        Join workers, and make the spares exit.
+        Stop the supervisor first, otherwise exiting workers may be restarted.
+
+        timeout: Time waiting for all workers in seconds, None to block.
+
+        Returns whether all workers and spares have ended.
         """
-        for worker in self.__workers:
-            worker.join()
+        with self.__workers_lock:
+            # Spares stay listed until they end, so they can be terminated and joined again
+            for spare in self.__spares:
+                spare.cancel()
+
+            workers = self.__spares + self.__workers
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in workers:
+            remaining_time = None if deadline is None else max(0.0, deadline - time.monotonic())
+            worker.join(remaining_time)
+
+        with self.__workers_lock:
+            self.__spares = [spare for spare in self.__spares if spare.is_alive()]
+
+        return all(not worker.is_alive() for worker in workers)
+
+    def terminate_workers(self) -> int:
+        """
+        Sends SIGTERM to the workers and spares that have not ended, after join_workers() timed out.
+        Workers in threads cannot be stopped, only coroutine tasks are cancelled.
+
+        Returns the number of workers signalled.
+        """
+        with self.__workers_lock:
+            workers = [worker for worker in self.__spares + self.__workers if worker.is_alive()]
+
+        for worker in workers:
+            worker.terminate()
+
+        return len(workers)
+
+    def kill_workers(self) -> int:
+        """
+        Sends SIGKILL to the workers and spares that have not ended, after terminate_workers() .
+
+        Returns the number of workers signalled.
+        """
+        with self.__workers_lock:
+            workers = [worker for worker in self.__spares + self.__workers if worker.is_alive()]
+
+        for worker in workers:
+            worker.kill()
+
+        return len(workers)
 
     def check_and_restart_dead_workers(self) -> bool:
         """
-        Check and restart dead workers.
+        Check and restart dead workers, following the restart policy.
+        Dead workers still backing off are restarted by a later call.
 
-        Returns whether the dead workers were able to be restarted.
+        Returns whether the dead workers were able to be restarted or are waiting to be,
+        False if the group is parked.
         """
-        new_workers = []
-        for worker in self.__workers:
-            if worker.is_alive():
-                new_workers.append(worker)
-                continue
+        now = time.perf_counter()
+        with self.__workers_lock:
+            # Copied, retired workers are removed while iterating
+            for worker in list(self.__workers):
+                if not worker.is_alive():
+                    self.__handle_death(worker, now)
 
-            # Log dead worker
-            target_and_worker_name = f"{self.__worker_properties.get_target_name()} {worker.name}"
-            self.__local_logger.warning(
-                f"Worker died, restarting {target_and_worker_name}",
+            self.__restart_due_workers(now)
+            is_parked = self.__restart_tracker.is_parked()
+
+        self.__notify_if_crash_loop()
+        # For the workers the supervisor restarts
+        self.replenish_spares()
+
+        return not is_parked
+
+    def is_parked(self) -> bool:
+        """
+        Returns whether the group stopped restarting workers because of a crash loop.
+        """
+        with self.__workers_lock:
+            return self.__restart_tracker.is_parked()
+
+    def resume_parked_workers(self) -> None:
+        """
+        Restarts the dead workers of a parked group immediately, with a fresh backoff.
+        Does nothing if the group is not parked.
+        """
+        now = time.perf_counter()
+        with self.__workers_lock:
+            if not self.__restart_tracker.is_parked():
+                return
+
+            self.__local_logger.info(
+                f"Resuming parked {self.__worker_properties.get_target_name()} workers", True
+            )
+            self.__restart_tracker.resume(now)
+            self.__restart_due_workers(now)
+
+        # The supervisor waits on the restarted workers from now on
+        self.__wake_supervisor()
+
+    def __handle_death(
+        self,
+        worker: warm_process.WarmProcess | worker_execution.InProcessWorker,
+        detection_time: float,
+    ) -> None:
+        """
+        Reaps a dead worker and schedules its restart, or parks the group on a crash loop.
+        Retiring workers are removed instead.
+        Does nothing if the death was already handled, or the worker replaced or removed since.
+        Must hold the workers lock.
+
+        worker: The dead worker.
+        detection_time: When the death was detected, from time.perf_counter() .
+        """
+        # Main and the supervisor can both detect the same death
+        if worker not in self.__workers:
+            return
+
+        index = self.__workers.index(worker)
+        if self.__restart_tracker.is_dead(index):
+            return
+
+        # Returns immediately, reaps the process so the exit code is available
+        worker.join()
+
+        # Any clean exit completes a retirement
+        if (
+            worker.exitcode == 0
+            and self.__scaler is not None
+            and self.__scaler.complete_retirement()
+        ):
+            self.__remove_worker(index)
+            self.__local_logger.info(
+                f"Retired {self.__worker_properties.get_target_name()} {worker.name}, "
+                f"{len(self.__workers)} workers",
                 True,
             )
+            return
+
+        target_and_worker_name = f"{self.__worker_properties.get_target_name()} {worker.name}"
+        was_parked = self.__restart_tracker.is_parked()
+        uptime, delay = self.__restart_tracker.record_death(index, detection_time)
+
+        # Log dead worker
+        self.__local_logger.warning(
+            f"Worker died with exit code {worker.exitcode} after {uptime:.3f} s: "
+            f"{target_and_worker_name}",
+            True,
+        )
 
-            # Create a new worker
-            result, new_worker = WorkerManager.__create_single_worker(
-                self.__worker_properties.get_worker_target(),
-                self.__worker_properties.get_worker_arguments(),
-                self.__local_logger,
+        if delay is None:
+            if not was_parked:
+                self.__local_logger.error(
+                    f"{self.__worker_properties.get_target_name()} workers are crash looping, "
+                    f"{self.__restart_tracker.get_crash_count()} crashes, parking",
+                    True,
+                )
+            return
+
+        if delay > 0.0:
+            self.__local_logger.info(
+                f"Restarting {target_and_worker_name} in {delay:.3f} s, "
+                f"consecutive crashes {self.__restart_tracker.get_consecutive_crashes(index)}",
+                True,
             )
+
+    def __notify_if_crash_loop(self) -> None:
+        """
+        Calls the crash loop callback once per parking.
+        Must not hold the workers lock, the callback may call back into the manager.
+        """
+        with self.__workers_lock:
+            notify = self.__restart_tracker.take_crash_loop_notification()
+            crash_count = self.__restart_tracker.get_crash_count()
+
+        if notify and self.__on_crash_loop is not None:
+            self.__on_crash_loop(self.__worker_properties.get_target_name(), crash_count)
+
+    def __restart_due_workers(self, now: float) -> None:
+        """
+        Restarts dead workers whose backoff has passed, retrying later on failure.
+        Must hold the workers lock.
+
+        now: Current time, from time.perf_counter() .
+        """
+        for i, due_time in self.__restart_tracker.get_due_restarts(now):
+            # Waits for main to start a spare, see replenish_spares()
+            if len(self.__spares) == 0 and not self.__can_create_worker():
+                continue
+
+            if not self.__restart_worker(i, due_time):
+                self.__restart_tracker.record_failed_restart(i, now)
+
+    def __restart_worker(self, index: int, due_time: float) -> bool:
+        """
+        Replaces the dead worker at the index with a new started worker.
+        Must hold the workers lock.
+
+        index: Index of the dead worker.
+        due_time: When the restart was due, from time.perf_counter() .
+
+        Returns whether the worker was able to be restarted.
+        """
+        worker = self.__workers[index]
+        target_and_worker_name = f"{self.__worker_properties.get_target_name()} {worker.name}"
+
+        result, new_worker = self.__take_warm_worker()
+        if not result:
+            self.__local_logger.error(f"Failed to restart {target_and_worker_name}", True)
+            return False
+
+        # Get Pylance to stop complaining
+        assert new_worker is not None
+
+        self.__release_worker(new_worker)
+        restart_latency = self.__restart_tracker.record_restart(
+            index, time.perf_counter(), due_time
+        )
+        self.__discard_worker(worker)
+
+        # Replace the dead worker
+        self.__workers[index] = new_worker
+
+        self.__local_logger.info(
+            f"Restarted {target_and_worker_name} as {new_worker.name} "
+            f"in {restart_latency * 1000:.1f} ms, "
+            f"restart count {self.__restart_tracker.get_restart_counts()[index]}",
+            True,
+        )
+
+        # Off the critical path, the replacement is already running
+        self.__replenish_spares()
+
+        return True
+
+    def __take_warm_worker(
+        self,
+    ) -> "tuple[bool, warm_process.WarmProcess | worker_execution.InProcessWorker | None]":
+        """
+        Takes a spare, or creates a worker if there are none.
+        Must hold the workers lock.
+
+        Returns whether a worker was available and the worker, started but not released.
+        """
+        # Skip spares that died while waiting
+        while len(self.__spares) > 0:
+            spare = self.__spares.pop(0)
+            if spare.is_alive():
+                return True, spare
+
+            spare.join()
+            self.__discard_worker(spare)
+
+        if not self.__can_create_worker():
+            return False, None
+
+        return self.__create_worker()
+
+    def __can_create_worker(self) -> bool:
+        """
+        Returns whether this thread may start a worker.
+        A process forked from another thread keeps only that thread, and the locks other threads
+        held at the fork, such as of the logger or of queue feeders, stay locked forever.
+        So with the fork start method, only main starts worker processes.
+        """
+        if self.__worker_properties.get_execution_mode() != worker_execution.ExecutionMode.PROCESS:
+            return True
+
+        if mp.get_start_method() != "fork":
+            return True
+
+        return threading.current_thread() is threading.main_thread()
+
+    def __create_worker(
+        self,
+    ) -> "tuple[bool, warm_process.WarmProcess | worker_execution.InProcessWorker | None]":
+        """
+        Creates a single worker, monitored for hangs if they are detected.
+        Must hold the workers lock.
+
+        Returns whether a worker was created and the worker, started but not released.
+        """
+        return WorkerManager.__create_single_worker(
+            self.__worker_properties, self.__local_logger, self.__stall_detector
+        )
+
+    def __release_worker(
+        self, worker: warm_process.WarmProcess | worker_execution.InProcessWorker
+    ) -> None:
+        """
+        Lets a started worker run, counting the release as its first progress.
+        Must hold the workers lock.
+        """
+        if self.__stall_detector is not None:
+            self.__stall_detector.reset(worker, time.monotonic())
+
+        worker.start()
+
+    def __discard_worker(
+        self, worker: warm_process.WarmProcess | worker_execution.InProcessWorker
+    ) -> None:
+        """
+        Releases the resources and liveness slot of a reaped worker.
+        Must hold the workers lock.
+        """
+        if self.__stall_detector is not None:
+            self.__stall_detector.untrack(worker)
+
+        worker.close()
+
+    def replenish_spares(self) -> None:
+        """
+        Starts spares up to the warm spare count, plus one for each dead worker due to restart.
+        With the fork start method the supervisor only restarts and grows from spares,
+        so main must call this periodically. Otherwise the supervisor also does it.
+        """
+        with self.__workers_lock:
+            due_count = len(self.__restart_tracker.get_due_times())
+            self.__replenish_spares(due_count)
+
+        # Restarts from the new spares
+        if due_count > 0:
+            self.__wake_supervisor()
+
+    def __replenish_spares(self, extra_count: int = 0) -> None:
+        """
+        Starts spares up to the warm spare count, does nothing if this thread may not.
+        Must hold the workers lock.
+
+        extra_count: Spares to start beyond the warm spare count.
+        """
+        if not self.__can_create_worker():
+            return
+
+        while len(self.__spares) < self.__warm_spare_count + extra_count:
+            result, spare = self.__create_worker()
             if not result:
-                self.__local_logger.error(f"Failed to restart {target_and_worker_name}", True)
+                return
+
+            # Get Pylance to stop complaining
+            assert spare is not None
+
+            self.__spares.append(spare)
+
+    def start_supervisor(self) -> None:
+        """
+        Starts a thread that restarts workers as soon as they die and their backoff passes,
+        until exit is requested.
+        Call after start_workers() .
+        """
+        if self.__supervisor_thread is not None:
+            return
+
+        self.__supervisor_wake_receiver, self.__supervisor_wake_sender = mp.Pipe(False)
+        self.__supervisor_thread = threading.Thread(
+            target=self.__supervise,
+            name=f"{self.__worker_properties.get_target_name()}_supervisor",
+            daemon=True,
+        )
+        self.__supervisor_thread.start()
+
+    def stop_supervisor(self) -> None:
+        """
+        Stops the supervisor thread, does nothing if it is not running.
+        """
+        if self.__supervisor_thread is None:
+            return
+
+        # Get Pylance to stop complaining
+        assert self.__supervisor_wake_sender is not None
+        assert self.__supervisor_wake_receiver is not None
+
+        self.__supervisor_wake_sender.send(True)
+        self.__supervisor_thread.join()
+        self.__supervisor_wake_sender.close()
+        self.__supervisor_wake_receiver.close()
+
+        self.__supervisor_thread = None
+        self.__supervisor_wake_sender = None
+        self.__supervisor_wake_receiver = None
+
+    def __wake_supervisor(self) -> None:
+        """
+        Makes the supervisor recollect the workers to wait on, if it is running.
+        """
+        if self.__supervisor_wake_sender is not None:
+            self.__supervisor_wake_sender.send(False)
+
+    def __supervise(self) -> None:
+        """
+        Supervisor thread, blocks on the process sentinels of all live workers
+        until one dies or the earliest backoff passes.
+        """
+        controller = self.__worker_properties.get_controller()
+        next_sample_time = time.perf_counter()
+        if self.__scaler is not None:
+            next_sample_time += self.__scaler.policy.sample_period
+
+        liveness_period = None
+        next_liveness_time = time.perf_counter()
+        if self.__stall_detector is not None:
+            liveness_period = self.__stall_detector.get_check_period()
+            next_liveness_time += liveness_period
+
+        while True:
+            with self.__workers_lock:
+                sentinels = {
+                    worker.sentinel: worker
+                    for i, worker in enumerate(self.__workers)
+                    if not self.__restart_tracker.is_dead(i)
+                }
+                due_times = self.__restart_tracker.get_due_times()
+                # Past due restarts wait for a spare, main wakes the supervisor once it starts one
+                if len(self.__spares) == 0 and not self.__can_create_worker():
+                    now = time.perf_counter()
+                    due_times = [due_time for due_time in due_times if due_time > now]
+
+            if self.__scaler is not None:
+                due_times.append(next_sample_time)
+
+            if liveness_period is not None:
+                due_times.append(next_liveness_time)
+
+            timeout = None
+            if len(due_times) > 0:
+                timeout = max(0.0, min(due_times) - time.perf_counter())
+
+            ready = multiprocessing.connection.wait(
+                list(sentinels.keys()) + [self.__supervisor_wake_receiver], timeout
+            )
+            now = time.perf_counter()
+
+            if self.__supervisor_wake_receiver in ready:
+                # True is a stop, False only refreshes the workers
+                if self.__supervisor_wake_receiver.recv():
+                    return
+
+                ready.remove(self.__supervisor_wake_receiver)
+
+            # Workers exiting on request are not restarted
+            if controller.is_exit_requested():
+                return
+
+            with self.__workers_lock:
+                for sentinel in ready:
+                    self.__handle_death(sentinels[sentinel], now)
+
+                self.__restart_due_workers(now)
+
+            self.__notify_if_crash_loop()
+
+            if self.__scaler is not None and now >= next_sample_time:
+                self.check_and_scale_workers()
+                next_sample_time = now + self.__scaler.policy.sample_period
+
+            if liveness_period is not None and now >= next_liveness_time:
+                self.check_and_kill_stalled_workers()
+                next_liveness_time = now + liveness_period
+
+    def check_and_scale_workers(self) -> bool:
+        """
+        Samples the load of the group and grows or shrinks it by at most 1 worker.
+        The supervisor calls this every sample period of the scaling policy.
+
+        Returns whether the group was able to be resized as decided,
+        True if there is no scaling policy.
+        """
+        if self.__scaler is None:
+            return True
+
+        now = time.perf_counter()
+        with self.__workers_lock:
+            # Parked groups are not grown until resumed
+            if self.__restart_tracker.is_parked():
                 return False
 
-            # Append the new worker
-            new_workers.append(new_worker)
+            change = self.__scaler.sample(now, len(self.__workers))
+            if change > 0:
+                return self.__add_worker()
 
-        self.__workers = new_workers
+            if change < 0:
+                # Whichever worker takes the sentinel exits cleanly and is removed
+                return self.__scaler.retire(now)
 
         return True
+
+    def __add_worker(self) -> bool:
+        """
+        Starts a new worker, from the spares if there are any.
+        Must hold the workers lock.
+
+        Returns whether the worker was able to be started.
+        """
+        result, worker = self.__take_warm_worker()
+        if not result:
+            self.__local_logger.error(
+                f"Failed to add {self.__worker_properties.get_target_name()} worker", True
+            )
+            return False
+
+        # Get Pylance to stop complaining
+        assert worker is not None
+
+        self.__release_worker(worker)
+        self.__workers.append(worker)
+        self.__restart_tracker.add_worker(time.perf_counter())
+
+        self.__replenish_spares()
+
+        return True
+
+    def __remove_worker(self, index: int) -> None:
+        """
+        Removes the reaped worker at the index.
+        Must hold the workers lock.
+        """
+        self.__discard_worker(self.__workers.pop(index))
+        self.__restart_tracker.remove_worker(index)
+
+    def check_and_kill_stalled_workers(self) -> bool:
+        """
+        Kills workers whose loop reported no progress within the stall deadline,
+        they are then restarted as crashed workers. Workers are not checked while paused.
+        The supervisor calls this every quarter of the deadline.
+
+        Returns whether all workers were making progress, True if hangs are not detected.
+        """
+        if self.__stall_detector is None:
+            return True
+
+        # Same clock as the stamps
+        now = time.monotonic()
+        is_paused = self.__worker_properties.get_controller().is_pause_requested()
+
+        is_progressing = True
+        with self.__workers_lock:
+            if is_paused:
+                # Paused workers make no progress, the deadline starts over on resume
+                self.__stall_detector.record_pause(now)
+                return True
+
+            for i, worker in enumerate(self.__workers):
+                if self.__restart_tracker.is_dead(i):
+                    continue
+
+                is_stalled, stall_time, iterations = self.__stall_detector.get_stall(worker, now)
+                if not is_stalled:
+                    continue
+
+                is_progressing = False
+                # Already killed, waiting to be reaped
+                if not worker.is_alive():
+                    continue
+
+                self.__local_logger.error(
+                    f"Worker stalled for {stall_time:.1f} s after {iterations} iterations, "
+                    f"killing {self.__worker_properties.get_target_name()} {worker.name}",
+                    True,
+                )
+                worker.kill()
+
+        return is_progressing
+
+    def sample_resources(self) -> "list[worker_resources.WorkerResourceSample]":
+        """
+        Reads the resource usage of each live worker process from /proc .
+        Workers in threads or asyncio tasks share the process of main and are not sampled.
+
+        Returns a sample per worker, CPU percent is over the time since the previous call.
+        """
+        if self.__worker_properties.get_execution_mode() != worker_execution.ExecutionMode.PROCESS:
+            return []
+
+        with self.__workers_lock:
+            workers = [
+                (worker.name, worker.pid)
+                for i, worker in enumerate(self.__workers)
+                if not self.__restart_tracker.is_dead(i) and worker.pid is not None
+            ]
+
+        target_name = self.__worker_properties.get_target_name()
+        samples = []
+        last_cpu_times = {}
+        for worker_name, pid in workers:
+            result, usage = worker_resources.read_process_usage(pid)
+            if not result:
+                # Died since, the supervisor restarts it
+                continue
+
+            # Get Pylance to stop complaining
+            assert usage is not None
+
+            now = time.time()
+            cpu_percent = 0.0
+            if pid in self.__last_cpu_times:
+                last_time, last_cpu_time = self.__last_cpu_times[pid]
+                if now > last_time:
+                    cpu_percent = 100.0 * (usage.cpu_time - last_cpu_time) / (now - last_time)
+
+            # Only live workers are kept, so restarted workers start over
+            last_cpu_times[pid] = (now, usage.cpu_time)
+            samples.append(
+                worker_resources.WorkerResourceSample(
+                    now, target_name, worker_name, pid, usage, cpu_percent
+                )
+            )
+
+        self.__last_cpu_times = last_cpu_times
+
+        return samples
+
+    def get_worker_count(self) -> int:
+        """
+        Returns the current number of workers, including dead ones waiting to restart.
+        """
+        with self.__workers_lock:
+            return len(self.__workers)
+
+    def get_restart_counts(self) -> "list[int]":
+        """
+        Returns the number of restarts of each worker.
+        """
+        with self.__workers_lock:
+            return self.__restart_tracker.get_restart_counts()
+
+    def get_restart_latencies(self) -> "list[float]":
+        """
+        Returns the time from detecting each death to the replacement starting, in seconds.
+        """
+        with self.__workers_lock:
+            return self.__restart_tracker.get_restart_latencies()
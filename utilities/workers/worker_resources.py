@@ -0,0 +1,195 @@
+"""
+Resource usage of worker processes, read from /proc .
+"""
+
+import collections
+import csv
+import json
+import os
+import pathlib
+
+
+# Units of the CPU times in /proc/<pid>/stat
+_CLOCK_TICKS_PER_SECOND = os.sysconf("SC_CLK_TCK")
+
+# Fields of a sample, in CSV column order
+SAMPLE_FIELDS = [
+    "timestamp",
+    "target_name",
+    "worker_name",
+    "pid",
+    "cpu_time",
+    "cpu_percent",
+    "rss",
+    "voluntary_context_switches",
+    "involuntary_context_switches",
+    "open_fds",
+]
+
+
+class ProcessUsage:
+    """
+    Cumulative resource usage of a process at one point in time.
+    """
+
+    def __init__(
+        self,
+        cpu_time: float,
+        rss: int,
+        voluntary_context_switches: int,
+        involuntary_context_switches: int,
+        open_fds: int,
+    ) -> None:
+        """
+        cpu_time: User and system time, in seconds.
+        rss: Resident set size, in bytes.
+        voluntary_context_switches: Switches from waiting, such as on a queue or socket.
+        involuntary_context_switches: Switches from being preempted, a sign of CPU contention.
+        open_fds: Number of open file descriptors.
+        """
+        self.cpu_time = cpu_time
+        self.rss = rss
+        self.voluntary_context_switches = voluntary_context_switches
+        self.involuntary_context_switches = involuntary_context_switches
+        self.open_fds = open_fds
+
+
+def read_process_usage(pid: int) -> "tuple[bool, ProcessUsage | None]":
+    """
+    Reads the usage of a process of this machine.
+
+    Returns whether the process exists and could be read, and its usage.
+    """
+    proc_path = pathlib.Path("/proc", str(pid))
+    try:
+        stat = (proc_path / "stat").read_text(encoding="utf-8")
+        status = (proc_path / "status").read_text(encoding="utf-8")
+        open_fds = len(os.listdir(proc_path / "fd"))
+    except OSError:
+        return False, None
+
+    # The name can contain spaces and parentheses, the fields after it cannot
+    # utime and stime are fields 14 and 15, the state after the name is field 3
+    stat_fields = stat.rsplit(")", 1)[1].split()
+    cpu_ticks = int(stat_fields[11]) + int(stat_fields[12])
+
+    status_values = {}
+    for line in status.splitlines():
+        key, _, value = line.partition(":")
+        status_values[key] = value.split()
+
+    try:
+        # Zombies have no memory lines
+        rss = int(status_values.get("VmRSS", ["0"])[0]) * 1024
+        voluntary_context_switches = int(status_values["voluntary_ctxt_switches"][0])
+        involuntary_context_switches = int(status_values["nonvoluntary_ctxt_switches"][0])
+    except (KeyError, IndexError, ValueError):
+        return False, None
+
+    return True, ProcessUsage(
+        cpu_ticks / _CLOCK_TICKS_PER_SECOND,
+        rss,
+        voluntary_context_switches,
+        involuntary_context_switches,
+        open_fds,
+    )
+
+
+class WorkerResourceSample:
+    """
+    Usage of a worker, with the CPU use since the previous sample of the same worker.
+    """
+
+    def __init__(
+        self,
+        timestamp: float,
+        target_name: str,
+        worker_name: str,
+        pid: int,
+        usage: ProcessUsage,
+        cpu_percent: float,
+    ) -> None:
+        """
+        timestamp: Time of the sample, from time.time() .
+        target_name: Name of the worker group.
+        worker_name: Name of the worker.
+        pid: Process ID.
+        usage: Usage read.
+        cpu_percent: Percent of one core used since the previous sample, 0 for the first.
+        """
+        self.timestamp = timestamp
+        self.target_name = target_name
+        self.worker_name = worker_name
+        self.pid = pid
+        self.usage = usage
+        self.cpu_percent = cpu_percent
+
+    def to_dict(self) -> "dict[str, object]":
+        """
+        Returns the fields of SAMPLE_FIELDS .
+        """
+        return {
+            "timestamp": self.timestamp,
+            "target_name": self.target_name,
+            "worker_name": self.worker_name,
+            "pid": self.pid,
+            "cpu_time": self.usage.cpu_time,
+            "cpu_percent": self.cpu_percent,
+            "rss": self.usage.rss,
+            "voluntary_context_switches": self.usage.voluntary_context_switches,
+            "involuntary_context_switches": self.usage.involuntary_context_switches,
+            "open_fds": self.usage.open_fds,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"{self.target_name} {self.worker_name} (pid {self.pid}): "
+            f"CPU {self.cpu_percent:.1f}% ({self.usage.cpu_time:.2f}s total), "
+            f"RSS {self.usage.rss / 2**20:.1f}MiB, "
+            f"context switches {self.usage.voluntary_context_switches} voluntary "
+            f"{self.usage.involuntary_context_switches} involuntary, "
+            f"{self.usage.open_fds} fds"
+        )
+
+
+class ResourceTimeSeries:
+    """
+    Samples of all workers over time, written out as CSV or JSON.
+    """
+
+    def __init__(self, max_sample_count: int = 0) -> None:
+        """
+        max_sample_count: Most samples kept, the oldest are dropped, 0 for unbounded.
+        """
+        self.__samples: "collections.deque[WorkerResourceSample]" = collections.deque(
+            maxlen=max_sample_count if max_sample_count > 0 else None
+        )
+
+    def record(self, samples: "list[WorkerResourceSample]") -> None:
+        """
+        Adds samples.
+        """
+        self.__samples.extend(samples)
+
+    def get_samples(self) -> "list[WorkerResourceSample]":
+        """
+        Returns the samples, oldest first.
+        """
+        return list(self.__samples)
+
+    def write_csv(self, path: pathlib.Path) -> None:
+        """
+        Writes a row per sample, with a header of SAMPLE_FIELDS .
+        """
+        with open(path, "w", encoding="utf-8", newline="") as csv_file:
+            writer = csv.DictWriter(csv_file, SAMPLE_FIELDS)
+            writer.writeheader()
+            for sample in self.__samples:
+                writer.writerow(sample.to_dict())
+
+    def write_json(self, path: pathlib.Path) -> None:
+        """
+        Writes a list with an object per sample.
+        """
+        with open(path, "w", encoding="utf-8") as json_file:
+            json.dump([sample.to_dict() for sample in self.__samples], json_file, indent=1)
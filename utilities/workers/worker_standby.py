@@ -0,0 +1,54 @@
+"""
+Hot standby workers, set up ahead of time and waiting inside their target to take over.
+"""
+
+import multiprocessing.connection
+
+
+# Release pipe of this process while it is a hot standby, set by run_standby()
+_release_receiver: "multiprocessing.connection.Connection | None" = None
+
+
+def wait_until_active() -> bool:
+    """
+    Call from a worker target once it is set up, before its loop.
+    A hot standby waits here until it replaces a worker, other workers return at once.
+
+    Returns whether to run the loop, False if the standby was cancelled.
+    """
+    # Only set in hot standby processes
+    # pylint: disable-next=global-statement
+    global _release_receiver
+
+    if _release_receiver is None:
+        return True
+
+    release_receiver = _release_receiver
+    _release_receiver = None
+    try:
+        is_released = release_receiver.recv()
+    except EOFError:
+        # Parent closed the pipe without releasing
+        return False
+    finally:
+        release_receiver.close()
+
+    return is_released
+
+
+def run_standby(
+    release_receiver: multiprocessing.connection.Connection,
+    target: "(...) -> object",  # type: ignore
+    args: "tuple",
+) -> None:
+    """
+    Entry point of hot standby processes, runs the target right away,
+    which sets up and then waits in wait_until_active() to be released.
+    """
+    # Only set in this worker process
+    # pylint: disable-next=global-statement
+    global _release_receiver
+
+    _release_receiver = release_receiver
+
+    target(*args)